@@ -4,6 +4,8 @@ import argparse
 import os
 import sys
 
+import polaris.benchmark.harness as benchmark
+import polaris.run.pack as run_pack
 import polaris.run.serial as run_serial
 from polaris import cache, list, setup, suite
 from polaris.version import __version__
@@ -20,10 +22,12 @@ def main():
 polaris <command> [<args>]
 
 The available polaris commands are:
-    list    List the available test cases
-    setup   Set up a test case
-    suite   Manage a regression test suite
-    serial  Run a suite, test case or step in task serial
+    list       List the available test cases
+    setup      Set up a test case
+    suite      Manage a regression test suite
+    serial     Run a suite, test case or step in task serial
+    pack       Run the steps of several tasks or suites concurrently in one job
+    benchmark  Time polaris kernels on synthetic meshes and datasets
 
  To get help on an individual command, run:
 
@@ -50,6 +54,8 @@ The available polaris commands are:
         'setup': setup.main,
         'suite': suite.main,
         'serial': run_serial.main,
+        'pack': run_pack.main,
+        'benchmark': benchmark.main,
     }
 
     # only allow the "polaris cache" command if we're on Chrysalis
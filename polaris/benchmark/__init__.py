@@ -0,0 +1,9 @@
+from polaris.benchmark.harness import append_history as append_history
+from polaris.benchmark.harness import (
+    compare_to_baseline as compare_to_baseline,
+)
+from polaris.benchmark.harness import read_history as read_history
+from polaris.benchmark.harness import run_benchmarks as run_benchmarks
+from polaris.benchmark.kernels import BENCHMARKS as BENCHMARKS
+from polaris.benchmark.kernels import SIZES as SIZES
+from polaris.benchmark.kernels import Benchmark as Benchmark
@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from mpas_tools.logging import LoggingContext
+
+from polaris.benchmark.kernels import BENCHMARKS, SIZES
+from polaris.version import __version__
+
+
+def run_benchmarks(
+    names=None, size='small', repeat=3, benchmarks=None, logger=None
+):
+    """
+    Time kernels on synthetic data
+
+    Each benchmark builds its inputs once, in a temporary directory, and the
+    kernel is then run ``repeat`` times.
+
+    Parameters
+    ----------
+    names : list of str, optional
+        The benchmarks to run.  The default is all of them.
+
+    size : {'small', 'medium', 'large'}, optional
+        The problem size
+
+    repeat : int, optional
+        The number of times to run each kernel
+
+    benchmarks : dict of polaris.benchmark.Benchmark, optional
+        The benchmarks to choose from, keyed by name.  The default is
+        :py:data:`polaris.benchmark.BENCHMARKS`.
+
+    logger : logging.Logger, optional
+        A logger for the time of each benchmark
+
+    Returns
+    -------
+    results : list of dict
+        A record of each benchmark's name, size and run times, ready to be
+        added to a history with :py:func:`polaris.benchmark.append_history()`
+    """
+    if benchmarks is None:
+        benchmarks = BENCHMARKS
+    if names is None:
+        names = list(benchmarks)
+    unknown = [name for name in names if name not in benchmarks]
+    if unknown:
+        raise ValueError(
+            f'Unknown benchmark(s) {unknown}, available benchmarks are: '
+            f'{list(benchmarks)}'
+        )
+    if size not in SIZES:
+        raise ValueError(f'Unknown size {size}, expected one of {SIZES}')
+    if repeat < 1:
+        raise ValueError(f'repeat must be at least 1, not {repeat}')
+
+    timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    host = platform.node()
+    results = []
+    cwd = os.getcwd()
+    for name in names:
+        benchmark = benchmarks[name]
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                kernel = benchmark.setup(benchmark.sizes[size])
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    kernel()
+                    times.append(time.perf_counter() - start)
+            finally:
+                os.chdir(cwd)
+
+        result = dict(
+            benchmark=name,
+            size=size,
+            problem_size=benchmark.sizes[size],
+            times=times,
+            best=min(times),
+            median=float(np.median(times)),
+            timestamp=timestamp,
+            host=host,
+            polaris_version=__version__,
+            python_version=platform.python_version(),
+        )
+        results.append(result)
+        if logger is not None:
+            logger.info(
+                f'  {name:<24} {size:<6} best: {result["best"]:10.4f} s  '
+                f'median: {result["median"]:10.4f} s'
+            )
+    return results
+
+
+def append_history(results, filename):
+    """
+    Add benchmark results to a history file with one JSON record per line
+
+    Parameters
+    ----------
+    results : list of dict
+        Results from :py:func:`polaris.benchmark.run_benchmarks()`
+
+    filename : str
+        The history file, created if it doesn't exist
+    """
+    with open(filename, 'a') as history_file:
+        for result in results:
+            history_file.write(json.dumps(result, sort_keys=True))
+            history_file.write('\n')
+
+
+def read_history(filename):
+    """
+    Read the benchmark results in a history file
+
+    Parameters
+    ----------
+    filename : str
+        The history file
+
+    Returns
+    -------
+    results : list of dict
+        The results, oldest first
+    """
+    results = []
+    with open(filename) as history_file:
+        for line in history_file:
+            line = line.strip()
+            if line:
+                results.append(json.loads(line))
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """
+    Compare benchmark results with the most recent baseline results for the
+    same benchmark and size
+
+    Parameters
+    ----------
+    results : list of dict
+        The new results
+
+    baseline : list of dict
+        The baseline results, oldest first, as read from a history file
+
+    tolerance : float, optional
+        The fraction by which the best time may exceed the baseline's before
+        it is considered a regression
+
+    Returns
+    -------
+    comparisons : list of dict
+        For each result with a baseline, the benchmark name and size, the
+        best time of each, their ratio and whether it is a regression
+    """
+    latest = dict()
+    for record in baseline:
+        latest[(record['benchmark'], record['size'])] = record
+
+    comparisons = []
+    for result in results:
+        key = (result['benchmark'], result['size'])
+        if key not in latest:
+            continue
+        baseline_best = latest[key]['best']
+        ratio = result['best'] / baseline_best
+        comparisons.append(
+            dict(
+                benchmark=result['benchmark'],
+                size=result['size'],
+                best=result['best'],
+                baseline=baseline_best,
+                ratio=ratio,
+                regression=bool(ratio > 1.0 + tolerance),
+            )
+        )
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time polaris kernels on synthetic meshes and datasets',
+        prog='polaris benchmark',
+    )
+    parser.add_argument(
+        '-b',
+        '--benchmarks',
+        dest='benchmarks',
+        nargs='+',
+        help='The benchmarks to run.  By default, all of them.',
+    )
+    parser.add_argument(
+        '-s',
+        '--size',
+        dest='size',
+        choices=SIZES,
+        default='small',
+        help='The problem size.',
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        dest='repeat',
+        type=int,
+        default=3,
+        help='The number of times to run each kernel.',
+    )
+    parser.add_argument(
+        '--history',
+        dest='history',
+        default='polaris_benchmarks.jsonl',
+        help='A file the results are added to.',
+    )
+    parser.add_argument(
+        '--baseline',
+        dest='baseline',
+        help='A history file from a previous run to compare against.',
+    )
+    parser.add_argument(
+        '--tolerance',
+        dest='tolerance',
+        type=float,
+        default=0.2,
+        help='The fraction by which a benchmark may be slower than the '
+        'baseline before it counts as a regression.',
+    )
+    parser.add_argument(
+        '-l',
+        '--list',
+        dest='list',
+        action='store_true',
+        help='List the available benchmarks and their sizes.',
+    )
+    args = parser.parse_args(sys.argv[2:])
+
+    if args.list:
+        for name, benchmark in BENCHMARKS.items():
+            sizes = ', '.join(
+                f'{size}: {benchmark.sizes[size]}' for size in SIZES
+            )
+            print(f'{name}\n    {benchmark.description}\n    ({sizes})')
+        return
+
+    # read the baseline first, in case it is also the history file
+    baseline = None
+    if args.baseline is not None:
+        baseline = read_history(args.baseline)
+
+    with LoggingContext('polaris_benchmark') as logger:
+        logger.info('Benchmarks:')
+        results = run_benchmarks(
+            names=args.benchmarks,
+            size=args.size,
+            repeat=args.repeat,
+            logger=logger,
+        )
+        append_history(results, args.history)
+        logger.info(f'Results added to {args.history}')
+
+        if baseline is None:
+            return
+
+        comparisons = compare_to_baseline(
+            results, baseline, tolerance=args.tolerance
+        )
+        logger.info(f'Comparison with {args.baseline}:')
+        regressions = 0
+        for comparison in comparisons:
+            status = 'SLOWER' if comparison['regression'] else 'ok'
+            logger.info(
+                f'  {comparison["benchmark"]:<24} {comparison["size"]:<6} '
+                f'{comparison["best"]:10.4f} s vs. '
+                f'{comparison["baseline"]:10.4f} s  '
+                f'({comparison["ratio"]:5.2f}x)  {status}'
+            )
+            if comparison['regression']:
+                regressions += 1
+        if regressions > 0:
+            logger.error(
+                f'FAIL: {regressions} benchmark(s) were more than '
+                f'{100 * args.tolerance:g}% slower than the baseline'
+            )
+            sys.exit(1)
@@ -0,0 +1,394 @@
+import numpy as np
+import xarray as xr
+from mpas_tools.io import write_netcdf
+from mpas_tools.planar_hex import make_planar_hex_mesh
+from scipy import ndimage
+
+from polaris.config import PolarisConfigParser
+from polaris.mesh.reconstruct import build_reconstruction_weights
+from polaris.mesh.spherical.coastline import _flood_fill_ocean
+from polaris.mesh.spherical.unified.effective_ocean import (
+    flood_fill_from_seeds,
+    widen_passages,
+)
+from polaris.model_step import make_graph_file
+from polaris.ocean.rpe import compute_rpe
+from polaris.ocean.vertical.ztilde import (
+    geom_height_from_pseudo_height,
+    pressure_and_spec_vol_from_state_at_geom_height,
+)
+
+SIZES = ('small', 'medium', 'large')
+
+# the seed of the random number generator for synthetic data, so every run
+# times exactly the same problem
+SEED = 12345
+
+
+class Benchmark:
+    """
+    A kernel to time on synthetic data of a configurable size
+
+    Attributes
+    ----------
+    name : str
+        The name of the benchmark
+
+    description : str
+        A short description of what is timed
+
+    sizes : dict
+        The problem size for each of ``small``, ``medium`` and ``large``,
+        whose meaning (e.g. the number of cells in each direction of a mesh)
+        depends on the benchmark
+
+    setup : function
+        A function that takes a problem size, builds the synthetic inputs
+        (writing any files to the current directory) and returns a function
+        with no arguments that runs the kernel.  Only the latter is timed.
+    """
+
+    def __init__(self, name, description, sizes, setup):
+        """
+        Define a benchmark
+
+        Parameters
+        ----------
+        name : str
+            The name of the benchmark
+
+        description : str
+            A short description of what is timed
+
+        sizes : dict
+            The problem size for each of ``small``, ``medium`` and ``large``
+
+        setup : function
+            A function that builds the inputs for a given problem size and
+            returns the kernel to time
+        """
+        self.name = name
+        self.description = description
+        self.sizes = sizes
+        self.setup = setup
+
+
+def make_hex_mesh(n):
+    """
+    Make a doubly periodic, planar hexagonal MPAS mesh
+
+    Parameters
+    ----------
+    n : int
+        The number of cells in each direction
+
+    Returns
+    -------
+    ds_mesh : xarray.Dataset
+        The mesh with ``n`` x ``n`` cells
+    """
+    ds_mesh = make_planar_hex_mesh(
+        nx=n, ny=n, dc=10e3, nonperiodic_x=False, nonperiodic_y=False
+    )
+    return ds_mesh
+
+
+def make_ocean_columns(n_cells, n_vert_levels=60, bottom_depth=4000.0):
+    """
+    Make ocean columns with stratified temperature and salinity and a
+    bathymetry that varies from column to column
+
+    Parameters
+    ----------
+    n_cells : int
+        The number of columns
+
+    n_vert_levels : int, optional
+        The number of vertical levels
+
+    bottom_depth : float, optional
+        The maximum depth of the columns in m
+
+    Returns
+    -------
+    ds : xarray.Dataset
+        A dataset with ``layerThickness``, ``temperature``, ``salinity``,
+        ``bottomDepth``, ``minLevelCell`` and ``maxLevelCell`` (both
+        zero-based) with dimensions ``nCells`` and ``nVertLevels``
+    """
+    rng = np.random.default_rng(SEED)
+    dz = bottom_depth / n_vert_levels
+    max_level_cell = rng.integers(
+        n_vert_levels // 2, n_vert_levels, size=n_cells
+    )
+    min_level_cell = np.zeros(n_cells, dtype=int)
+
+    levels = np.arange(n_vert_levels)
+    valid = levels[np.newaxis, :] <= max_level_cell[:, np.newaxis]
+    layer_thickness = np.where(valid, dz, 0.0)
+    z_mid = -dz * (levels + 0.5)
+    temperature = 2.0 + 18.0 * np.exp(z_mid / 500.0)
+    temperature = temperature + 0.1 * rng.standard_normal(
+        (n_cells, n_vert_levels)
+    )
+    salinity = 34.5 + 0.5 * np.exp(z_mid / 1000.0)
+    salinity = np.broadcast_to(salinity, (n_cells, n_vert_levels)).copy()
+
+    dims = ('nCells', 'nVertLevels')
+    ds = xr.Dataset()
+    ds['layerThickness'] = (dims, layer_thickness)
+    ds['temperature'] = (dims, temperature)
+    ds['salinity'] = (dims, salinity)
+    ds['bottomDepth'] = ('nCells', dz * (max_level_cell + 1))
+    ds['minLevelCell'] = ('nCells', min_level_cell)
+    ds['maxLevelCell'] = ('nCells', max_level_cell)
+    return ds
+
+
+def make_land_mask(n_lat):
+    """
+    Make a global lat-lon grid of candidate ocean with continents, islands
+    and lakes of many sizes
+
+    Parameters
+    ----------
+    n_lat : int
+        The number of latitudes; there are twice as many longitudes
+
+    Returns
+    -------
+    ocean : numpy.ndarray
+        A boolean mask that is ``True`` over ocean
+
+    lat : numpy.ndarray
+        The latitude of each row in degrees
+
+    lon : numpy.ndarray
+        The longitude of each column in degrees
+    """
+    rng = np.random.default_rng(SEED)
+    n_lon = 2 * n_lat
+    noise = rng.standard_normal((n_lat, n_lon))
+    field = ndimage.gaussian_filter(noise, sigma=n_lat / 30.0, mode='wrap')
+    # about 70% of the globe is ocean
+    ocean = field < np.quantile(field, 0.7)
+    # an open polar ocean to seed the fill from
+    ocean[-1, :] = True
+    lat = np.linspace(-90.0, 90.0, n_lat)
+    lon = np.linspace(-180.0, 180.0, n_lon, endpoint=False)
+    return ocean, lat, lon
+
+
+def _setup_reconstruction(location):
+    """
+    Get the setup function for reconstruction weights at cells or vertices
+    """
+
+    def setup(size):
+        ds_mesh = make_hex_mesh(size)
+        return lambda: build_reconstruction_weights(ds_mesh, location)
+
+    return setup
+
+
+def _setup_eos_iteration(size):
+    """
+    Set up the TEOS-10 iteration for pressure and specific volume
+    """
+    config = PolarisConfigParser()
+    config.add_from_package('polaris.ocean.eos', 'teos10.cfg')
+    ds = make_ocean_columns(size)
+    surf_pressure = xr.zeros_like(ds.bottomDepth)
+
+    def run():
+        pressure_and_spec_vol_from_state_at_geom_height(
+            config=config,
+            geom_layer_thickness=ds.layerThickness,
+            temperature=ds.temperature,
+            salinity=ds.salinity,
+            surf_pressure=surf_pressure,
+            iter_count=5,
+        )
+
+    return run
+
+
+def _setup_geom_height(size):
+    """
+    Set up summing geometric heights from pseudo-heights
+    """
+    ds = make_ocean_columns(size)
+    spec_vol = 1.0 / (1026.0 + 0.01 * ds.layerThickness.cumsum('nVertLevels'))
+
+    def run():
+        geom_height_from_pseudo_height(
+            geom_z_bot=-ds.bottomDepth,
+            h_tilde=ds.layerThickness,
+            spec_vol=spec_vol,
+            min_level_cell=ds.minLevelCell,
+            max_level_cell=ds.maxLevelCell,
+        )
+
+    return run
+
+
+def _setup_rpe(size):
+    """
+    Set up the reference potential energy of two synthetic model outputs
+    """
+    rng = np.random.default_rng(SEED)
+    ds = make_ocean_columns(size)
+    n_cells = ds.sizes['nCells']
+    ds_mesh = xr.Dataset()
+    ds_mesh['xEdge'] = ('nEdges', rng.uniform(0.0, 1e6, 3 * n_cells))
+    ds_mesh['yEdge'] = ('nEdges', rng.uniform(0.0, 1e6, 3 * n_cells))
+    ds_mesh['areaCell'] = ('nCells', np.full(n_cells, 1e6**2 / n_cells))
+
+    ds_init = ds[['bottomDepth', 'layerThickness']].copy()
+    # minLevelCell and maxLevelCell are one-based in model files
+    ds_init['minLevelCell'] = ds.minLevelCell + 1
+    ds_init['maxLevelCell'] = ds.maxLevelCell + 1
+
+    ds_outputs = []
+    for _ in range(2):
+        ds_out = xr.Dataset()
+        n_times = 3
+        density = 1026.0 + rng.uniform(0.0, 2.0, ds.layerThickness.shape)
+        ds_out['layerThickness'] = xr.concat(
+            [ds.layerThickness] * n_times, dim='Time'
+        )
+        ds_out['density'] = (
+            ('Time', 'nCells', 'nVertLevels'),
+            np.stack([density] * n_times),
+        )
+        ds_out['daysSinceStartOfSim'] = ('Time', np.arange(n_times))
+        ds_outputs.append(ds_out)
+
+    return lambda: compute_rpe(ds_mesh, ds_init, ds_outputs)
+
+
+def _setup_coastline_flood_fill(size):
+    """
+    Set up the flood fill of coastline candidate ocean from the north pole
+    """
+    ocean, lat, _ = make_land_mask(size)
+    return lambda: _flood_fill_ocean(ocean, lat)
+
+
+def _setup_seeded_flood_fill(size):
+    """
+    Set up the flood fill of the effective ocean from seed points
+    """
+    ocean, lat, lon = make_land_mask(size)
+    seed_points = [(0.0, 90.0), (-150.0, 0.0), (-30.0, -30.0), (80.0, -20.0)]
+    return lambda: flood_fill_from_seeds(ocean, lat, lon, seed_points)
+
+
+def _setup_widen_passages(size):
+    """
+    Set up widening short passage lines scattered over a lat-lon grid
+    """
+    rng = np.random.default_rng(SEED)
+    _, lat, lon = make_land_mask(size)
+    resolution = 180.0 / size
+    passages = np.zeros((lat.size, lon.size), dtype=bool)
+    for _ in range(50):
+        length = int(rng.integers(size // 100 + 1, size // 10 + 2))
+        row = int(rng.integers(0, lat.size - length))
+        col = int(rng.integers(0, lon.size))
+        steps = np.arange(length)
+        passages[row + steps, (col + steps) % lon.size] = True
+    # a background cell width that is coarser toward the poles
+    width_km = np.broadcast_to(
+        (30.0 + 30.0 * np.abs(lat) / 90.0)[:, np.newaxis], passages.shape
+    )
+
+    def run():
+        widen_passages(
+            passages=passages,
+            lat=lat,
+            lon=lon,
+            resolution=resolution,
+            width_km=width_km,
+            factor=1.5,
+            high_lat_factor=3.0,
+        )
+
+    return run
+
+
+def _setup_graph_file(size):
+    """
+    Set up writing a graph file from a mesh file
+    """
+    ds_mesh = make_hex_mesh(size)
+    write_netcdf(ds_mesh, 'mesh.nc')
+    return lambda: make_graph_file('mesh.nc', graph_filename='graph.info')
+
+
+BENCHMARKS = {
+    benchmark.name: benchmark
+    for benchmark in [
+        Benchmark(
+            name='reconstruct_cell',
+            description='build_reconstruction_weights() at cells of an '
+            'n x n planar hex mesh',
+            sizes={'small': 20, 'medium': 60, 'large': 150},
+            setup=_setup_reconstruction('cell'),
+        ),
+        Benchmark(
+            name='reconstruct_vertex',
+            description='build_reconstruction_weights() at vertices of an '
+            'n x n planar hex mesh',
+            sizes={'small': 20, 'medium': 60, 'large': 150},
+            setup=_setup_reconstruction('vertex'),
+        ),
+        Benchmark(
+            name='eos_iteration',
+            description='5 TEOS-10 iterations of pressure and specific '
+            'volume in n columns of 60 levels',
+            sizes={'small': 1000, 'medium': 20000, 'large': 200000},
+            setup=_setup_eos_iteration,
+        ),
+        Benchmark(
+            name='geom_height',
+            description='geom_height_from_pseudo_height() in n columns of '
+            '60 levels',
+            sizes={'small': 1000, 'medium': 20000, 'large': 200000},
+            setup=_setup_geom_height,
+        ),
+        Benchmark(
+            name='rpe',
+            description='compute_rpe() for 2 outputs of 3 times in n '
+            'columns of 60 levels',
+            sizes={'small': 1000, 'medium': 20000, 'large': 200000},
+            setup=_setup_rpe,
+        ),
+        Benchmark(
+            name='coastline_flood_fill',
+            description='Flood fill of the ocean from the north pole on an '
+            'n x 2n lat-lon grid',
+            sizes={'small': 180, 'medium': 720, 'large': 2160},
+            setup=_setup_coastline_flood_fill,
+        ),
+        Benchmark(
+            name='seeded_flood_fill',
+            description='Flood fill of the ocean from seed points on an '
+            'n x 2n lat-lon grid',
+            sizes={'small': 180, 'medium': 720, 'large': 2160},
+            setup=_setup_seeded_flood_fill,
+        ),
+        Benchmark(
+            name='widen_passages',
+            description='Widen 50 passage lines on an n x 2n lat-lon grid',
+            sizes={'small': 180, 'medium': 720, 'large': 2160},
+            setup=_setup_widen_passages,
+        ),
+        Benchmark(
+            name='graph_file',
+            description='make_graph_file() for an n x n planar hex mesh',
+            sizes={'small': 50, 'medium': 200, 'large': 600},
+            setup=_setup_graph_file,
+        ),
+    ]
+}
@@ -0,0 +1,342 @@
+"""
+A writer for large NetCDF files in the CDF-5 (``NETCDF3_64BIT_DATA``) format.
+
+The netCDF library writes CDF-5 files slowly for large meshes, so polaris has
+often written NetCDF4 files and converted them with ``ncks -5``.  CDF-5 is a
+simple format: a header describing all dimensions, attributes and variables
+(including the offset of each variable's data) followed by the data of each
+variable, contiguous and big-endian.  Here, the whole header is laid out up
+front and then the data of each variable is streamed to the file in large
+contiguous blocks, so files are written once, in their final format.
+"""
+
+import mpas_tools.io
+import netCDF4
+import numpy as np
+
+# the approximate number of bytes of a variable written at a time
+BLOCK_SIZE = 2**26
+
+_NC_DIMENSION = 10
+_NC_VARIABLE = 11
+_NC_ATTRIBUTE = 12
+
+# NetCDF type codes and the big-endian numpy type of each
+_NC_TYPES = {
+    'i1': (1, '>i1'),
+    'S1': (2, 'S1'),
+    'i2': (3, '>i2'),
+    'i4': (4, '>i4'),
+    'f4': (5, '>f4'),
+    'f8': (6, '>f8'),
+    'u1': (7, '>u1'),
+    'u2': (8, '>u2'),
+    'u4': (9, '>u4'),
+    'i8': (10, '>i8'),
+    'u8': (11, '>u8'),
+}
+
+
+def write_cdf5(ds, filename, unlimited_dims=None, block_size=BLOCK_SIZE):
+    """
+    Write a dataset to a NetCDF file in the CDF-5 (``NETCDF3_64BIT_DATA``)
+    format
+
+    As with ``mpas_tools.io.write_netcdf``, NaNs in floating-point variables
+    are replaced by the default NetCDF fill value (and a ``_FillValue``
+    attribute is added) and 64-bit integers are written as 32-bit integers,
+    which is what MPAS components expect.  Booleans are written as bytes and
+    strings as characters with an added ``string<n>`` dimension.  Variables
+    are read (e.g. from a lazily loaded dataset) and written one block at a
+    time.
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        The dataset to write, including its coordinates and attributes
+
+    filename : str
+        The file to write
+
+    unlimited_dims : list of str, optional
+        The record dimension, if any.  By default, ``unlimited_dims`` from
+        the dataset's encoding is used.
+
+    block_size : int, optional
+        The approximate number of bytes of a variable written at a time
+    """
+    if unlimited_dims is None:
+        unlimited_dims = ds.encoding.get('unlimited_dims', [])
+    unlimited_dims = list(unlimited_dims)
+    if len(unlimited_dims) > 1:
+        raise ValueError(
+            f'CDF-5 files have at most one unlimited dimension, got '
+            f'{unlimited_dims}'
+        )
+    record_dim = unlimited_dims[0] if unlimited_dims else None
+
+    variables = [_Variable(name, ds.variables[name]) for name in ds.variables]
+
+    dims = dict(ds.sizes)
+    for var in variables:
+        if var.string_dim is not None:
+            dims.setdefault(var.string_dim, var.string_length)
+    dim_ids = {dim: index for index, dim in enumerate(dims)}
+    n_records = dims[record_dim] if record_dim is not None else 0
+
+    fixed = [var for var in variables if record_dim not in var.dims]
+    records = [var for var in variables if record_dim in var.dims]
+    for var in records:
+        if var.dims[0] != record_dim:
+            raise ValueError(
+                f'The unlimited dimension {record_dim} must be the first '
+                f'dimension of {var.name}'
+            )
+        var.is_record = True
+    for var in variables:
+        var.vsize = _pad(var.vsize_unpadded)
+        if var.is_record and len(records) == 1:
+            # a single record variable is not padded between records
+            var.record_size = var.vsize_unpadded
+        else:
+            var.record_size = var.vsize
+
+    # the header doesn't depend on the offsets, so its size is known first
+    header_size = len(
+        _header(ds.attrs, dims, record_dim, n_records, variables, dim_ids)
+    )
+    offset = header_size
+    for var in fixed:
+        var.begin = offset
+        offset += var.vsize
+    record_stride = sum(var.record_size for var in records)
+    for var in records:
+        var.begin = offset
+        offset += var.record_size
+    header = _header(ds.attrs, dims, record_dim, n_records, variables, dim_ids)
+
+    with open(filename, 'wb') as handle:
+        handle.write(header)
+        for var in fixed:
+            _write_fixed(handle, var, block_size)
+        for record in range(n_records):
+            for var in records:
+                handle.seek(var.begin + record * record_stride)
+                data = var.read(record, record + 1)
+                handle.write(data.tobytes())
+                handle.write(b'\0' * (var.record_size - data.nbytes))
+
+
+class _Variable:
+    """
+    A variable with its NetCDF type, dimensions and layout in the file
+    """
+
+    def __init__(self, name, variable):
+        self.name = name
+        self.variable = variable
+        self.dims = variable.dims
+        self.attrs = dict(variable.attrs)
+        self.attrs.pop('_FillValue', None)
+        self.string_dim = None
+        self.string_length = None
+        self.is_record = False
+        self.begin = 0
+
+        dtype = variable.dtype
+        self.fill_value = None
+        if dtype.kind in 'OU':
+            values = np.char.encode(np.asarray(variable.values, dtype=str))
+            self.variable = variable.copy(data=values)
+            dtype = values.dtype
+        if dtype.kind == 'S':
+            self.string_length = max(dtype.itemsize, 1)
+            self.string_dim = variable.encoding.get(
+                'char_dim_name', f'string{self.string_length}'
+            )
+            key = 'S1'
+        elif dtype.kind == 'b':
+            key = 'i1'
+        elif dtype.kind == 'M' or dtype.kind == 'm':
+            raise TypeError(
+                f'Cannot write {name} with dtype {dtype}; encode times '
+                f'before writing'
+            )
+        elif dtype == np.int64:
+            key = 'i4'
+        elif dtype == np.uint64:
+            key = 'u4'
+        else:
+            key = f'{dtype.kind}{dtype.itemsize}'
+        if key not in _NC_TYPES:
+            raise TypeError(f'Unsupported dtype {dtype} for {name}')
+        self.nc_type, self.out_dtype = _NC_TYPES[key]
+        self.itemsize = np.dtype(self.out_dtype).itemsize
+        if dtype.kind == 'f':
+            self.fill_value = np.dtype(self.out_dtype).type(
+                netCDF4.default_fillvals[key]
+            )
+            if bool(np.isnan(variable.values).any()):
+                self.attrs['_FillValue'] = self.fill_value
+
+        self.nc_dims = list(self.dims)
+        if self.string_dim is not None:
+            self.nc_dims.append(self.string_dim)
+        self.vsize = 0
+        self.record_size = 0
+
+    @property
+    def vsize_unpadded(self):
+        """
+        The size of the variable (or of one record) without padding
+        """
+        shape = [self.variable.sizes[dim] for dim in self.dims]
+        if self.is_record:
+            shape = shape[1:]
+        size = int(np.prod(shape)) * self.itemsize
+        if self.string_length is not None:
+            size *= self.string_length
+        return size
+
+    def read(self, start, stop):
+        """
+        Read and convert the data along the first dimension from ``start``
+        to ``stop``
+        """
+        if len(self.dims) == 0:
+            values = np.asarray(self.variable.values)
+        else:
+            values = self.variable[start:stop].values
+        if self.string_length is not None:
+            values = np.asarray(values, dtype=f'S{self.string_length}')
+            values = values.view('S1')
+        elif self.fill_value is not None:
+            values = np.where(np.isnan(values), self.fill_value, values)
+        return np.ascontiguousarray(values, dtype=self.out_dtype)
+
+
+def _write_fixed(handle, var, block_size):
+    """
+    Write a fixed-size variable in blocks along its first dimension
+    """
+    handle.seek(var.begin)
+    written = 0
+    if len(var.dims) == 0:
+        data = var.read(0, 1)
+        handle.write(data.tobytes())
+        written = data.nbytes
+    else:
+        count = var.variable.shape[0]
+        row_size = max(var.vsize_unpadded // max(count, 1), 1)
+        rows = max(block_size // row_size, 1)
+        for start in range(0, count, rows):
+            data = var.read(start, min(start + rows, count))
+            data.tofile(handle)
+            written += data.nbytes
+    handle.write(b'\0' * (var.vsize - written))
+
+
+def _header(attrs, dims, record_dim, n_records, variables, dim_ids):
+    """
+    Build the header of a CDF-5 file
+    """
+    parts = [b'CDF\x05', _int64(n_records)]
+    if len(dims) == 0:
+        parts.append(_int32(0) + _int64(0))
+    else:
+        parts.append(_int32(_NC_DIMENSION) + _int64(len(dims)))
+        for dim, size in dims.items():
+            parts.append(_name(dim))
+            parts.append(_int64(0 if dim == record_dim else size))
+    parts.append(_attributes(attrs))
+    if len(variables) == 0:
+        parts.append(_int32(0) + _int64(0))
+    else:
+        parts.append(_int32(_NC_VARIABLE) + _int64(len(variables)))
+        for var in variables:
+            parts.append(_name(var.name))
+            parts.append(_int64(len(var.nc_dims)))
+            for dim in var.nc_dims:
+                parts.append(_int64(dim_ids[dim]))
+            parts.append(_attributes(var.attrs))
+            parts.append(_int32(var.nc_type))
+            parts.append(_int64(var.vsize))
+            parts.append(_int64(var.begin))
+    return b''.join(parts)
+
+
+def _attributes(attrs):
+    """
+    Build the list of attributes of a file or a variable
+    """
+    if len(attrs) == 0:
+        return _int32(0) + _int64(0)
+    parts = [_int32(_NC_ATTRIBUTE) + _int64(len(attrs))]
+    for name, value in attrs.items():
+        if isinstance(value, str):
+            nc_type = 2
+            data = value.encode('utf-8')
+            count = len(data)
+        else:
+            values = np.atleast_1d(np.asarray(value))
+            if values.dtype.kind == 'b':
+                values = values.astype(np.int8)
+            elif values.dtype.kind in 'OUS':
+                raise TypeError(f'Unsupported value of attribute {name}')
+            key = f'{values.dtype.kind}{values.dtype.itemsize}'
+            nc_type, out_dtype = _NC_TYPES[key]
+            data = values.astype(out_dtype).tobytes()
+            count = values.size
+        parts.append(_name(name))
+        parts.append(_int32(nc_type))
+        parts.append(_int64(count))
+        parts.append(data + b'\0' * (_pad(len(data)) - len(data)))
+    return b''.join(parts)
+
+
+def _name(name):
+    """
+    A name as its length followed by its padded UTF-8 characters
+    """
+    data = name.encode('utf-8')
+    return _int64(len(data)) + data + b'\0' * (_pad(len(data)) - len(data))
+
+
+def _pad(size):
+    """
+    Round a size up to a multiple of 4 bytes
+    """
+    return -(-size // 4) * 4
+
+
+def _int32(value):
+    return np.array(value, dtype='>i4').tobytes()
+
+
+def _int64(value):
+    return np.array(value, dtype='>i8').tobytes()
+
+
+def write_netcdf(ds, filename, format=None):
+    """
+    Write a dataset to a NetCDF file, using :py:func:`write_cdf5` for the
+    CDF-5 format and ``mpas_tools.io.write_netcdf`` for other formats
+
+    Parameters
+    ----------
+    ds : xarray.Dataset
+        The dataset to write
+
+    filename : str
+        The file to write
+
+    format : str, optional
+        The NetCDF format, ``mpas_tools.io.default_format`` by default (set
+        from the ``format`` config option in the ``io`` section)
+    """
+    if format is None:
+        format = mpas_tools.io.default_format
+    if format == 'NETCDF3_64BIT_DATA':
+        write_cdf5(ds, filename)
+    else:
+        mpas_tools.io.write_netcdf(ds, filename, format=format)
@@ -7,6 +7,7 @@ from mpas_tools.io import open_dataset, write_netcdf
 from mpas_tools.logging import check_call
 
 from polaris.config import PolarisConfigParser
+from polaris.parallel import add_packed_host_args
 
 
 class Component:
@@ -140,6 +141,8 @@ class Component:
             cpus_per_task=cpus_per_task,
             gpus_per_task=gpus_per_task,
         )
+        # a step run by ``polaris pack`` runs on the nodes assigned to it
+        command_line_args = add_packed_host_args(command_line_args, env)
         check_call(command_line_args, logger, env=env)
 
     def add_task(self, task):
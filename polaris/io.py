@@ -1,12 +1,18 @@
 import os
 import tempfile
+import threading
 from urllib.parse import urlparse
 
 import progressbar
 import requests
 
+# a lock for each destination path, so that steps being set up concurrently
+# never download the same file at the same time
+_DOWNLOAD_LOCKS: dict[str, threading.Lock] = dict()
+_DOWNLOAD_LOCKS_LOCK = threading.Lock()
 
-def download(url, dest_path, config, exceptions=True):  # noqa: C901
+
+def download(url, dest_path, config, exceptions=True):
     """
     Download a file from a URL to the given path or path name
 
@@ -31,7 +37,17 @@ def download(url, dest_path, config, exceptions=True):  # noqa: C901
     dest_path : str
         The resulting file name if the download was successful, or None if not
     """
+    dest_path = os.path.abspath(dest_path)
+    with _DOWNLOAD_LOCKS_LOCK:
+        lock = _DOWNLOAD_LOCKS.setdefault(dest_path, threading.Lock())
+    with lock:
+        return _download(url, dest_path, config, exceptions)
+
 
+def _download(url, dest_path, config, exceptions):  # noqa: C901
+    """
+    Download a file from a URL to the given absolute path
+    """
     in_file_name = os.path.basename(urlparse(url).path)
     dest_path = os.path.abspath(dest_path)
     out_file_name = os.path.basename(dest_path)
@@ -0,0 +1,595 @@
+import os
+import pickle
+import shlex
+import socket
+import subprocess
+import time
+
+import numpy as np
+
+from polaris.parallel import PACKED_HOST_ARGS, get_host_args
+from polaris.run import setup_config
+
+
+class PackedStep:
+    """
+    A step to be run concurrently with others in a shared batch allocation
+
+    Attributes
+    ----------
+    name : str
+        The name of the step
+
+    path : str
+        The path of the step within the component
+
+    work_dir : str
+        The work directory of the step, which identifies it
+
+    cores : int
+        The target number of cores for the step
+
+    min_cores : int
+        The minimum number of cores the step can run with
+
+    gpus : int
+        The target number of GPUs for the step
+
+    min_gpus : int
+        The minimum number of GPUs the step can run with
+
+    dependencies : list of str
+        The work directories of the steps that must succeed before this one
+        can run
+
+    tasks : list of str
+        The paths of the tasks that run this step
+
+    status : {'pending', 'running', 'succeeded', 'failed', 'skipped'}
+        Where the step is in running the packed steps
+
+    log_filename : str
+        The log file for the step's output
+    """
+
+    def __init__(self, step):
+        """
+        Describe a step for packing
+
+        Parameters
+        ----------
+        step : polaris.Step
+            The step, as pickled during setup
+        """
+        self.name = step.name
+        self.path = step.path
+        self.work_dir = step.work_dir
+        self.cores = step.cpus_per_task * step.ntasks
+        self.min_cores = step.min_cpus_per_task * step.min_tasks
+        self.gpus = step.gpus_per_task * step.ntasks
+        self.min_gpus = step.min_gpus_per_task * step.min_tasks
+        self.dependencies: list[str] = []
+        self.tasks: list[str] = []
+        self.status = 'pending'
+        self.log_filename = os.path.join(step.work_dir, f'{step.name}.log')
+
+
+class NodePool:
+    """
+    The cores and GPUs of the nodes in a batch allocation that are not in use
+    by running steps
+
+    Steps that fit on a node are packed onto the busiest node they fit on (a
+    best fit), leaving whole nodes free for steps that need them.  Steps
+    larger than a node take whole nodes.
+
+    Attributes
+    ----------
+    cores_per_node : int
+        The number of cores on each node
+
+    gpus_per_node : int
+        The number of GPUs on each node
+
+    free_cores : numpy.ndarray
+        The number of unused cores on each node
+
+    free_gpus : numpy.ndarray
+        The number of unused GPUs on each node
+    """
+
+    def __init__(self, nodes, cores_per_node, gpus_per_node=0):
+        """
+        Create a pool of free nodes
+
+        Parameters
+        ----------
+        nodes : int
+            The number of nodes to pack steps onto
+
+        cores_per_node : int
+            The number of cores on each node
+
+        gpus_per_node : int, optional
+            The number of GPUs on each node
+        """
+        if nodes < 1:
+            raise ValueError(f'At least one node is required, not {nodes}.')
+        self.cores_per_node = cores_per_node
+        self.gpus_per_node = gpus_per_node
+        self.free_cores = np.full(nodes, cores_per_node, dtype=int)
+        self.free_gpus = np.full(nodes, gpus_per_node, dtype=int)
+
+    @property
+    def nodes(self):
+        """
+        The number of nodes in the pool
+        """
+        return self.free_cores.size
+
+    def fit_request(self, step):
+        """
+        Reduce the resources a step asks for to what the pool can provide,
+        as the step would do itself when it is constrained to the resources
+        of the allocation
+
+        Parameters
+        ----------
+        step : polaris.job.packing.PackedStep
+            The step, whose ``cores`` and ``gpus`` are updated
+        """
+        total_cores = self.nodes * self.cores_per_node
+        if step.min_cores > total_cores:
+            raise ValueError(
+                f'Step {step.path} needs at least {step.min_cores} cores but '
+                f'only {total_cores} are available on {self.nodes} node(s).'
+            )
+        step.cores = max(min(step.cores, total_cores), 1)
+
+        if self.gpus_per_node == 0:
+            # GPUs are not scheduled on machines without them
+            step.gpus = 0
+            return
+        total_gpus = self.nodes * self.gpus_per_node
+        if step.min_gpus > total_gpus:
+            raise ValueError(
+                f'Step {step.path} needs at least {step.min_gpus} GPUs but '
+                f'only {total_gpus} are available on {self.nodes} node(s).'
+            )
+        step.gpus = min(step.gpus, total_gpus)
+
+    def allocate(self, cores, gpus=0):
+        """
+        Reserve cores and GPUs for a step if they are free
+
+        Parameters
+        ----------
+        cores : int
+            The number of cores
+
+        gpus : int, optional
+            The number of GPUs
+
+        Returns
+        -------
+        allocation : list of tuple or None
+            The node index and the number of cores and GPUs reserved on it
+            for each node used, or ``None`` if the resources are not free
+        """
+        if cores <= self.cores_per_node and gpus <= self.gpus_per_node:
+            fits = np.logical_and(
+                self.free_cores >= cores, self.free_gpus >= gpus
+            )
+            if not np.any(fits):
+                return None
+            candidates = np.nonzero(fits)[0]
+            node = candidates[np.argmin(self.free_cores[candidates])]
+            allocation = [(int(node), cores, gpus)]
+        else:
+            node_count = int(np.ceil(cores / self.cores_per_node))
+            if self.gpus_per_node > 0:
+                node_count = max(
+                    node_count, int(np.ceil(gpus / self.gpus_per_node))
+                )
+            idle = np.nonzero(
+                np.logical_and(
+                    self.free_cores == self.cores_per_node,
+                    self.free_gpus == self.gpus_per_node,
+                )
+            )[0]
+            if idle.size < node_count:
+                return None
+            allocation = [
+                (int(node), self.cores_per_node, self.gpus_per_node)
+                for node in idle[:node_count]
+            ]
+
+        for node, node_cores, node_gpus in allocation:
+            self.free_cores[node] -= node_cores
+            self.free_gpus[node] -= node_gpus
+        return allocation
+
+    def release(self, allocation):
+        """
+        Return the resources of a finished step to the pool
+
+        Parameters
+        ----------
+        allocation : list of tuple
+            An allocation returned by :py:meth:`allocate()`
+        """
+        for node, node_cores, node_gpus in allocation:
+            self.free_cores[node] += node_cores
+            self.free_gpus[node] += node_gpus
+
+
+def read_tasks(work_dir):
+    """
+    Read the tasks that were set up in a task or suite work directory
+
+    Parameters
+    ----------
+    work_dir : str
+        A task work directory, a base work directory with a single suite, or
+        the pickle file of a suite
+
+    Returns
+    -------
+    tasks : dict of polaris.Task
+        The tasks, keyed by path
+    """
+    if work_dir.endswith('.pickle'):
+        pickle_filename = work_dir
+    elif os.path.exists(os.path.join(work_dir, 'task.pickle')):
+        pickle_filename = os.path.join(work_dir, 'task.pickle')
+    else:
+        pickles = [
+            filename
+            for filename in sorted(os.listdir(work_dir))
+            if filename.endswith('.pickle')
+        ]
+        if len(pickles) != 1:
+            raise ValueError(
+                f'Expected one task or suite pickle file in {work_dir}, '
+                f'found {len(pickles)}.  Please give the suite pickle file '
+                f'instead.'
+            )
+        pickle_filename = os.path.join(work_dir, pickles[0])
+
+    with open(pickle_filename, 'rb') as handle:
+        suite = pickle.load(handle)
+    return suite['tasks']
+
+
+def collect_steps(tasks):
+    """
+    Find the steps that still need to run for a set of tasks, including any
+    dependencies from outside the tasks that have not run yet
+
+    Parameters
+    ----------
+    tasks : dict of polaris.Task
+        The tasks, keyed by path
+
+    Returns
+    -------
+    steps : dict of polaris.job.packing.PackedStep
+        The steps to run, keyed by work directory, with dependencies before
+        the steps that depend on them
+    """
+    steps: dict[str, PackedStep] = dict()
+    for task in tasks.values():
+        config = setup_config(task.base_work_dir, task.config.filepath)
+        step_names = config.get(task.name, 'steps_to_run')
+        for step_name in step_names.replace(',', ' ').split():
+            if step_name not in task.steps:
+                raise ValueError(
+                    f'A step "{step_name}" was requested but is not one of '
+                    f'the steps in task {task.path}: {list(task.steps)}'
+                )
+            packed = _add_step(steps, task.steps[step_name])
+            if packed is not None and task.path not in packed.tasks:
+                packed.tasks.append(task.path)
+    return steps
+
+
+def run_packed_steps(
+    steps, pool, logger, launch=None, poll_interval=5.0, on_finish=None
+):
+    """
+    Run steps concurrently, launching each as soon as its dependencies have
+    succeeded and there are free resources for it
+
+    Steps that are ready to run are tried largest first, so the steps that
+    are hardest to fit are placed before the small ones that can fill the
+    gaps they leave.
+
+    Parameters
+    ----------
+    steps : dict of polaris.job.packing.PackedStep
+        The steps to run, keyed by work directory
+
+    pool : polaris.job.packing.NodePool
+        The free resources of the allocation
+
+    logger : logging.Logger
+        A logger for progress
+
+    launch : function, optional
+        A function that takes a step and its allocation from
+        :py:meth:`polaris.job.packing.NodePool.allocate()` and returns a
+        handle, like a ``subprocess.Popen``, whose ``poll()`` method returns
+        the step's return code once it has finished.  The default is a
+        :py:class:`polaris.job.packing.StepLauncher` that runs
+        ``polaris serial`` in the step's work directory on the node this
+        process is running on.
+
+    poll_interval : float, optional
+        The time in seconds between checks for finished steps
+
+    on_finish : function, optional
+        A function called with each step as it finishes or is skipped
+    """
+    if launch is None:
+        launch = StepLauncher(system='single_node', hosts=None)
+
+    for step in steps.values():
+        pool.fit_request(step)
+
+    pending = [step for step in steps.values() if step.status == 'pending']
+    running = dict()
+    while len(pending) > 0 or len(running) > 0:
+        for step in list(pending):
+            dependencies = [steps[work_dir] for work_dir in step.dependencies]
+            if any(
+                dependency.status in ['failed', 'skipped']
+                for dependency in dependencies
+            ):
+                step.status = 'skipped'
+                pending.remove(step)
+                logger.info(f'  skipped:   {step.path}')
+                if on_finish is not None:
+                    on_finish(step)
+
+        ready = [
+            step
+            for step in pending
+            if all(
+                steps[work_dir].status == 'succeeded'
+                for work_dir in step.dependencies
+            )
+        ]
+        ready.sort(key=lambda step: (step.gpus, step.cores), reverse=True)
+        for step in ready:
+            allocation = pool.allocate(step.cores, step.gpus)
+            if allocation is None:
+                continue
+            pending.remove(step)
+            step.status = 'running'
+            logger.info(f'  launching: {step.path}')
+            running[step.work_dir] = (launch(step, allocation), allocation)
+
+        if len(running) == 0:
+            if len(pending) > 0:
+                raise ValueError(
+                    'The remaining steps can never run, their dependencies '
+                    'form a cycle: '
+                    f'{[step.path for step in pending]}'
+                )
+            break
+
+        finished = []
+        for work_dir, (handle, allocation) in running.items():
+            return_code = handle.poll()
+            if return_code is None:
+                continue
+            finished.append(work_dir)
+            pool.release(allocation)
+            step = steps[work_dir]
+            complete = os.path.exists(
+                os.path.join(step.work_dir, 'polaris_step_complete.log')
+            )
+            if return_code == 0 and complete:
+                step.status = 'succeeded'
+                logger.info(f'  finished:  {step.path}')
+            else:
+                step.status = 'failed'
+                logger.error(
+                    f'  failed:    {step.path}, see: {step.log_filename}'
+                )
+            if on_finish is not None:
+                on_finish(step)
+
+        for work_dir in finished:
+            running.pop(work_dir)
+        if len(finished) == 0:
+            time.sleep(poll_interval)
+
+
+class StepLauncher:
+    """
+    Launches steps on the nodes of their allocations with the launcher of the
+    parallel system
+
+    On Slurm and PBS systems, ``polaris serial`` for a step is run with
+    ``srun`` or ``mpiexec`` on the first node assigned to the step, with the
+    cores assigned to it on that node.  The launcher arguments that select all
+    of the step's nodes are passed to the step in the
+    ``POLARIS_PACKED_HOST_ARGS`` environment variable, so its parallel runs
+    (see :py:meth:`polaris.Component.run_parallel_command()`) are placed on
+    those nodes.  On other systems, steps run on the current node.
+
+    Attributes
+    ----------
+    system : str
+        The parallel system, e.g. ``slurm``, ``pbs`` or ``single_node``
+
+    hosts : list of str or None
+        The host name of each node of the pool, or ``None`` if steps run on
+        the current node
+    """
+
+    def __init__(self, system, hosts):
+        """
+        Create a launcher
+
+        Parameters
+        ----------
+        system : str
+            The parallel system, e.g. ``slurm``, ``pbs`` or ``single_node``
+
+        hosts : list of str or None
+            The host name of each node of the pool (see
+            :py:func:`polaris.job.packing.get_node_hosts()`), required on
+            Slurm and PBS systems
+        """
+        if system in ['slurm', 'pbs'] and hosts is None:
+            raise ValueError(
+                f'The host names of the nodes are required to launch steps '
+                f'on a {system} system.'
+            )
+        self.system = system
+        self.hosts = hosts
+
+    def __call__(self, step, allocation):
+        """
+        Start running a step in its work directory, writing its output to
+        its log file
+
+        Parameters
+        ----------
+        step : polaris.job.packing.PackedStep
+            The step to run
+
+        allocation : list of tuple
+            The nodes, cores and GPUs reserved for the step by
+            :py:meth:`polaris.job.packing.NodePool.allocate()`
+
+        Returns
+        -------
+        process : subprocess.Popen
+            The process running the step
+        """
+        args, env = self.get_command(step, allocation)
+        with open(step.log_filename, 'w') as log_file:
+            return subprocess.Popen(
+                args,
+                cwd=step.work_dir,
+                env=env,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+
+    def get_command(self, step, allocation):
+        """
+        Get the command and environment that run a step on its nodes
+
+        Parameters
+        ----------
+        step : polaris.job.packing.PackedStep
+            The step to run
+
+        allocation : list of tuple
+            The nodes, cores and GPUs reserved for the step by
+            :py:meth:`polaris.job.packing.NodePool.allocate()`
+
+        Returns
+        -------
+        args : list of str
+            The command
+
+        env : dict
+            The environment for the command
+        """
+        args = ['polaris', 'serial', '--step_is_subprocess']
+        env = dict(os.environ)
+        env.pop(PACKED_HOST_ARGS, None)
+        if self.system not in ['slurm', 'pbs']:
+            return args, env
+
+        assert self.hosts is not None
+        hosts = [self.hosts[node] for node, _, _ in allocation]
+        cores = allocation[0][1]
+        if self.system == 'slurm':
+            # the step's own parallel runs share its cores (--overlap)
+            launcher = [
+                'srun',
+                '--nodes=1',
+                '--ntasks=1',
+                f'--cpus-per-task={cores}',
+                f'--nodelist={hosts[0]}',
+                '--exact',
+                '--overlap',
+            ]
+        else:
+            launcher = [
+                'mpiexec',
+                '-n',
+                '1',
+                '--hosts',
+                hosts[0],
+                '--cpu-bind',
+                'none',
+            ]
+        env[PACKED_HOST_ARGS] = shlex.join(get_host_args(self.system, hosts))
+        return launcher + args, env
+
+
+def get_node_hosts(system):
+    """
+    Get the host names of the nodes of the current batch allocation
+
+    Parameters
+    ----------
+    system : str
+        The parallel system, e.g. ``slurm``, ``pbs`` or ``single_node``
+
+    Returns
+    -------
+    hosts : list of str
+        The host name of each node, in the order the scheduler lists them
+    """
+    if system == 'slurm':
+        nodelist = os.environ.get('SLURM_JOB_NODELIST')
+        if nodelist is None:
+            raise ValueError(
+                'SLURM_JOB_NODELIST is not set; polaris pack must run in a '
+                'Slurm allocation.'
+            )
+        output = subprocess.check_output(
+            ['scontrol', 'show', 'hostnames', nodelist], text=True
+        )
+        return output.split()
+    if system == 'pbs':
+        nodefile = os.environ.get('PBS_NODEFILE')
+        if nodefile is None:
+            raise ValueError(
+                'PBS_NODEFILE is not set; polaris pack must run in a PBS '
+                'allocation.'
+            )
+        with open(nodefile) as handle:
+            # the node file has a line for each core or chunk of a node
+            hosts = [line.strip() for line in handle if line.strip()]
+        return list(dict.fromkeys(hosts))
+    return [socket.gethostname()]
+
+
+def _add_step(steps, step):
+    """
+    Add a step and the dependencies that still need to run, returning the
+    packed step or ``None`` if it doesn't need to run
+    """
+    if step.work_dir in steps:
+        return steps[step.work_dir]
+    if step.cached or os.path.exists(
+        os.path.join(step.work_dir, 'polaris_step_complete.log')
+    ):
+        return None
+
+    packed = PackedStep(step)
+    for dependency in step.dependencies.values():
+        packed_dependency = _add_step(steps, dependency)
+        if packed_dependency is not None:
+            packed.dependencies.append(packed_dependency.work_dir)
+    steps[step.work_dir] = packed
+    return packed
@@ -1,3 +1,5 @@
+import multiprocessing
+
 import cartopy
 import cartopy.crs as ccrs
 import jigsawpy
@@ -8,10 +10,10 @@ from jigsawpy.savejig import savejig
 from mpas_tools.io import open_dataset, write_netcdf
 from mpas_tools.logging import check_call
 from mpas_tools.mesh.creation.jigsaw_to_netcdf import jigsaw_to_netcdf
-from mpas_tools.ocean.inject_meshDensity import inject_spherical_meshDensity
 from mpas_tools.transects import lon_lat_to_cartesian
 from mpas_tools.viz.colormaps import register_sci_viz_colormaps
 from mpas_tools.viz.paraview_extractor import extract_vtk
+from scipy.interpolate import RegularGridInterpolator
 
 from polaris import Step
 from polaris.constants import get_constant
@@ -19,6 +21,9 @@ from polaris.mesh.reconstruct import compute_reconstruction_weights
 from polaris.mesh.spherical.quality import check_cell_polygon_quality
 from polaris.model_step import make_graph_file
 
+# the in-memory mesh shared with forked workers that write its outputs
+_WORKER_MESH = None
+
 
 class SphericalBaseStep(Step):
     """
@@ -51,7 +56,15 @@ class SphericalBaseStep(Step):
         mesh_name : str, optional
             The name of the mesh
         """
-        super().__init__(component=component, name=name, subdir=subdir)
+        # the reconstruction weights, VTK output and graph file are written
+        # concurrently once the MPAS mesh is finished
+        super().__init__(
+            component=component,
+            name=name,
+            subdir=subdir,
+            cpus_per_task=3,
+            min_cpus_per_task=1,
+        )
 
         # setup files for JIGSAW
         self.opts = jigsawpy.jigsaw_jig_t()
@@ -130,37 +143,42 @@ class SphericalBaseStep(Step):
         args = ['MpasMeshConverter.x', 'mesh_triangles.nc', tmp_mesh_filename]
         check_call(args=args, logger=logger)
 
-        # open the mesh and rewrite it in the desired NetCDF format
-        ds_mesh = open_dataset(tmp_mesh_filename)
+        # finish the mesh in memory and write it once in the desired NetCDF
+        # format
+        with open_dataset(tmp_mesh_filename) as ds_mesh:
+            ds_mesh.load()
 
         angle_edge = recompute_angle_edge(ds_mesh)
         ds_mesh.angleEdge.values = angle_edge.values
+
+        if section.getboolean('add_mesh_density'):
+            logger.info('Add meshDensity to the mesh')
+            cell_width_filename = section.get('cell_width_filename')
+            with xr.open_dataset(cell_width_filename) as ds:
+                ds_mesh['meshDensity'] = compute_spherical_mesh_density(
+                    ds_mesh=ds_mesh,
+                    cell_width=ds.cellWidth.values,
+                    lon=ds.lon.values,
+                    lat=ds.lat.values,
+                )
+
         write_netcdf(ds_mesh, mpas_mesh_filename)
 
         self._check_cell_polygon_quality(ds_mesh=ds_mesh)
 
+        jobs = []
         if section.getboolean('generate_reconstruction_weights'):
-            logger.info('\n')
             logger.info(
                 'Compute vector-reconstruction weights at cell centers'
             )
             reconstruction_weights_filename = section.get(
                 'reconstruction_weights_filename'
             )
-            ds_weights = compute_reconstruction_weights(
-                ds_mesh, location='cell'
-            )
-            write_netcdf(ds_weights, reconstruction_weights_filename)
-
-        if section.getboolean('add_mesh_density'):
-            logger.info('Add meshDensity into the mesh file')
-            cell_width_filename = section.get('cell_width_filename')
-            ds = xr.open_dataset(cell_width_filename)
-            inject_spherical_meshDensity(
-                ds.cellWidth.values,
-                ds.lon.values,
-                ds.lat.values,
-                mesh_filename=mpas_mesh_filename,
+            jobs.append(
+                (
+                    _write_reconstruction_weights,
+                    (reconstruction_weights_filename,),
+                )
             )
 
         if section.getboolean('convert_to_vtk'):
@@ -170,19 +188,17 @@ class SphericalBaseStep(Step):
             lat_lon = section.getboolean('vtk_lat_lon')
 
             logger.info('Create vtk file for visualization')
-            extract_vtk(
-                ignore_time=True,
-                lonlat=lat_lon,
-                dimension_list=['maxEdges='],
-                variable_list=['allOnCells'],
-                filename_pattern=mpas_mesh_filename,
-                out_dir=vtk_dir,
-                use_progress_bar=use_progress_bar,
+            jobs.append(
+                (
+                    _write_vtk,
+                    (mpas_mesh_filename, vtk_dir, lat_lon, use_progress_bar),
+                )
             )
 
-        make_graph_file(
-            mesh_filename=mpas_mesh_filename, graph_filename='graph.info'
-        )
+        logger.info('Make the graph file')
+        jobs.append((_write_graph_file, (mpas_mesh_filename, 'graph.info')))
+
+        _run_jobs(ds_mesh, jobs, workers=self.cpus_per_task)
 
     def _check_cell_polygon_quality(self, ds_mesh):
         """
@@ -644,6 +660,48 @@ class IcosahedralMeshStep(SphericalBaseStep):
         return cell_width
 
 
+def compute_spherical_mesh_density(ds_mesh, cell_width, lon, lat):
+    """
+    Compute the ``meshDensity`` of a spherical MPAS mesh from the cell width
+    on a lon/lat grid, ``(min(cell_width) / cell_width)**4``, bilinearly
+    interpolated to cell centers
+
+    Parameters
+    ----------
+    ds_mesh : xarray.Dataset
+        The MPAS mesh
+
+    cell_width : numpy.ndarray
+        m x n array of cell width in km
+
+    lon : numpy.ndarray
+        longitude in degrees (length n and between -180 and 180)
+
+    lat : numpy.ndarray
+        latitude in degrees (length m and between -90 and 90)
+
+    Returns
+    -------
+    mesh_density : xarray.DataArray
+        The mesh density at cell centers
+    """
+    density = (np.amin(cell_width) / cell_width) ** 4
+    interpolator = RegularGridInterpolator(
+        (np.deg2rad(lat), np.deg2rad(lon)),
+        density,
+        bounds_error=False,
+        fill_value=None,
+    )
+    lon_cell = np.mod(ds_mesh.lonCell.values + np.pi, 2.0 * np.pi) - np.pi
+    lat_cell = ds_mesh.latCell.values
+    mesh_density = xr.DataArray(
+        interpolator(np.column_stack((lat_cell, lon_cell))), dims=('nCells',)
+    )
+    if 'meshDensity' in ds_mesh:
+        mesh_density.attrs = ds_mesh.meshDensity.attrs
+    return mesh_density
+
+
 def recompute_angle_edge(ds_mesh):
     nml_en = np.zeros((ds_mesh.sizes['nEdges'], 2))
     nml_en = calc_edge_normal_vector(ds_mesh)
@@ -715,3 +773,63 @@ def calc_vector_east_north(x, y, z):
     east = east / np.linalg.norm(east, axis=0)
     north = north / np.linalg.norm(north, axis=0)
     return east, north
+
+
+def _run_jobs(ds_mesh, jobs, workers):
+    """
+    Run jobs that write outputs of a finished mesh, in forked worker
+    processes if there is more than one worker
+    """
+    global _WORKER_MESH
+    _WORKER_MESH = ds_mesh
+    try:
+        n_workers = min(workers, len(jobs))
+        if n_workers > 1:
+            ctx = multiprocessing.get_context('fork')
+            with ctx.Pool(processes=n_workers) as pool:
+                results = [pool.apply_async(func, args) for func, args in jobs]
+                for result in results:
+                    result.get()
+        else:
+            for func, args in jobs:
+                func(*args)
+    finally:
+        _WORKER_MESH = None
+
+
+def _write_reconstruction_weights(filename):
+    """
+    Compute and write vector-reconstruction weights at cell centers of the
+    shared mesh
+    """
+    ds_weights = compute_reconstruction_weights(_WORKER_MESH, location='cell')
+    write_netcdf(ds_weights, filename)
+
+
+def _write_vtk(mesh_filename, vtk_dir, lat_lon, use_progress_bar):
+    """
+    Write VTK output of the mesh file for visualization
+
+    ``extract_vtk()`` only reads files, so this job reads the mesh back from
+    ``mesh_filename`` rather than sharing the in-memory mesh.
+    """
+    extract_vtk(
+        ignore_time=True,
+        lonlat=lat_lon,
+        dimension_list=['maxEdges='],
+        variable_list=['allOnCells'],
+        filename_pattern=mesh_filename,
+        out_dir=vtk_dir,
+        use_progress_bar=use_progress_bar,
+    )
+
+
+def _write_graph_file(mesh_filename, graph_filename):
+    """
+    Write the graph file of the shared mesh, written to ``mesh_filename``
+    """
+    make_graph_file(
+        mesh_filename=mesh_filename,
+        graph_filename=graph_filename,
+        ds_mesh=_WORKER_MESH,
+    )
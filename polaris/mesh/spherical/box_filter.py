@@ -0,0 +1,141 @@
+"""
+Box filters on global lat/lon rasters built from cumulative-sum (integral
+image) tables.
+
+A box sum over any window costs two lookups in a cumulative-sum table, so
+windows that vary from row to row (e.g. a longitude window that grows as
+1/cos(latitude)) can be applied to whole latitude bands at once instead of
+filtering one row at a time.  Boxes use nearest-neighbor extension at the
+latitude boundaries and wrap around periodically in longitude, matching
+``scipy.ndimage.uniform_filter1d`` with ``mode='nearest'`` and
+``mode='wrap'``, respectively.
+"""
+
+import numpy as np
+
+# the maximum number of raster cells processed together in one latitude band
+MAX_BAND_ELEMENTS = 2**22
+
+
+def iter_box_sums(
+    field, rows, lat_windows, lon_windows, max_elements=MAX_BAND_ELEMENTS
+):
+    """
+    Compute box sums of a field centered on each cell of the requested rows,
+    one latitude band at a time.
+
+    Each requested row ``rows[i]`` is summed over ``lat_windows[i]`` rows and
+    ``lon_windows[i]`` columns, with the window positioned as in
+    ``scipy.ndimage.uniform_filter1d`` (starting ``window // 2`` cells before
+    the center).  A row may be requested more than once with different
+    windows.
+
+    Parameters
+    ----------
+    field : numpy.ndarray
+        The field to sum, with dimensions ``(lat, lon)``
+
+    rows : numpy.ndarray
+        The row indices at which to compute box sums, ideally in increasing
+        order so that each band spans a compact range of latitudes
+
+    lat_windows : int or numpy.ndarray
+        The latitude window (in grid cells) for each requested row
+
+    lon_windows : int or numpy.ndarray
+        The longitude window (in grid cells) for each requested row
+
+    max_elements : int, optional
+        The approximate maximum number of raster cells in a band, bounding
+        the memory used by the cumulative-sum tables
+
+    Yields
+    ------
+    band : slice
+        The slice into ``rows`` covered by this band
+
+    sums : numpy.ndarray
+        The box sums for the rows in the band, with dimensions
+        ``(band_size, lon)``
+    """
+    field = np.asarray(field)
+    nlat, nlon = field.shape
+    rows = np.asarray(rows, dtype=np.int64)
+    lat_windows = np.broadcast_to(
+        np.asarray(lat_windows, dtype=np.int64), rows.shape
+    )
+    lon_windows = np.broadcast_to(
+        np.asarray(lon_windows, dtype=np.int64), rows.shape
+    )
+    if np.any(lat_windows < 1) or np.any(lon_windows < 1):
+        raise ValueError('Box-filter windows must be at least one cell.')
+
+    first = field[0].astype(np.float64)
+    last = field[-1].astype(np.float64)
+    band_size = max(1, max_elements // nlon)
+    for start in range(0, rows.size, band_size):
+        band = slice(start, min(start + band_size, rows.size))
+        lat_sums = _lat_box_sums(
+            field, rows[band], lat_windows[band], first, last
+        )
+        yield band, _periodic_box_sums(lat_sums, lon_windows[band])
+
+
+def _lat_box_sums(field, rows, lat_windows, first, last):
+    """
+    Sum the field over latitude windows centered on the given rows, with
+    nearest-neighbor extension beyond the first and last rows.
+    """
+    nlat, nlon = field.shape
+    lower = rows - lat_windows // 2
+    upper = lower + lat_windows
+
+    # a cumulative-sum table over only the rows this band touches
+    slab_lower = max(0, int(lower.min()))
+    slab_upper = min(nlat, int(upper.max()))
+    table = np.zeros((slab_upper - slab_lower + 1, nlon), dtype=np.float64)
+    np.cumsum(field[slab_lower:slab_upper], axis=0, out=table[1:])
+
+    lower_clip = np.clip(lower, slab_lower, slab_upper) - slab_lower
+    upper_clip = np.clip(upper, slab_lower, slab_upper) - slab_lower
+    sums = table[upper_clip] - table[lower_clip]
+
+    below = np.maximum(0, -lower).astype(np.float64)
+    above = np.maximum(0, upper - nlat).astype(np.float64)
+    if np.any(below > 0):
+        sums += below[:, np.newaxis] * first
+    if np.any(above > 0):
+        sums += above[:, np.newaxis] * last
+    return sums
+
+
+def _periodic_box_sums(values, lon_windows):
+    """
+    Sum each row of values over a longitude window that wraps around
+    periodically, with one window width per row.
+
+    Rows that share a window (typically many rows of a latitude band) are
+    summed together with contiguous slices of one cumulative-sum table.
+    """
+    sums = np.empty(values.shape, dtype=np.float64)
+    for window in np.unique(lon_windows):
+        group = np.nonzero(lon_windows == window)[0]
+        sums[group] = _periodic_window_sums(values[group], int(window))
+    return sums
+
+
+def _periodic_window_sums(values, window):
+    """
+    Sum each row of values over the same periodic longitude window.
+    """
+    nlon = values.shape[1]
+    turns, partial = divmod(window, nlon)
+    # the first column of the window centered on column 0, wrapped
+    start = (-(window // 2)) % nlon
+    wrapped = np.arange(start, start + nlon + partial) % nlon
+    table = np.zeros((values.shape[0], nlon + partial + 1), dtype=np.float64)
+    np.cumsum(values[:, wrapped], axis=1, out=table[:, 1:])
+    sums = table[:, partial : partial + nlon] - table[:, :nlon]
+    if turns > 0:
+        sums += turns * table[:, nlon : nlon + 1]
+    return sums
@@ -4,13 +4,14 @@ import netCDF4
 import numpy as np
 import xarray as xr
 from scipy import ndimage
-from scipy.spatial import cKDTree
 
-from polaris.constants import get_constant
 from polaris.mesh.spherical.critical_transects import CriticalTransects
+from polaris.mesh.spherical.signed_distance import (
+    BoundaryDistance,
+    SignedDistanceCache,
+)
 
 CONVENTIONS = ('calving_front', 'grounding_line', 'bedrock_zero')
-EARTH_RADIUS = get_constant('mean_radius')
 
 
 def build_coastline_datasets(
@@ -21,6 +22,7 @@ def build_coastline_datasets(
     distance_chunk_size=64,
     workers=1,
     critical_transects=None,
+    max_distance=None,
 ):
     """
     Build coastline datasets from combined topography.
@@ -40,14 +42,19 @@ def build_coastline_datasets(
         Elevation threshold used to classify below-sea-level cells
 
     distance_chunk_size : int, optional
-        Number of latitude rows per signed-distance query chunk
+        Number of latitude rows (and longitude columns) per signed-distance
+        query tile
 
     workers : int, optional
-        Number of workers to use in KD-tree queries
+        Number of worker processes for signed-distance queries
 
     critical_transects : CriticalTransects, optional
         Critical land blockages and passages to rasterize before flood fill
 
+    max_distance : float, optional
+        Distance in meters at which the signed distance saturates; only
+        cells within this distance of the coastline are queried
+
     Returns
     -------
     ds_coastlines : dict[str, xr.Dataset]
@@ -81,6 +88,16 @@ def build_coastline_datasets(
 
     ds_coastlines: dict[str, xr.Dataset] = {}
 
+    # conventions that end up with the same ocean mask share one coastline
+    # tree and signed-distance field
+    distance_cache = SignedDistanceCache(
+        lon=lon,
+        lat=lat,
+        max_distance=max_distance,
+        chunk_size=distance_chunk_size,
+        workers=workers,
+    )
+
     for convention in CONVENTIONS:
         candidate_ocean = candidate_masks[convention]
         candidate_ocean = np.logical_and(
@@ -89,16 +106,7 @@ def build_coastline_datasets(
         candidate_ocean = np.logical_or(candidate_ocean, passages)
 
         ocean_mask = _flood_fill_ocean(candidate_ocean, lat)
-        edge_east, edge_north = _coastline_edges(ocean_mask)
-        signed_distance = _signed_distance_from_mask(
-            ocean_mask=ocean_mask,
-            edge_east=edge_east,
-            edge_north=edge_north,
-            lon=lon,
-            lat=lat,
-            chunk_size=distance_chunk_size,
-            workers=workers,
-        )
+        signed_distance = distance_cache.signed_distance(ocean_mask)
 
         ds_coastlines[convention] = _build_single_coastline_dataset(
             convention=convention,
@@ -109,6 +117,10 @@ def build_coastline_datasets(
             ocean_mask=ocean_mask.astype(np.int8),
             signed_distance=signed_distance.astype(np.float32),
         )
+        if max_distance is not None:
+            ds_coastlines[convention].attrs['signed_distance_saturation_m'] = (
+                max_distance
+            )
 
     return ds_coastlines
 
@@ -122,6 +134,7 @@ def build_coastline_dataset(
     distance_chunk_size=64,
     workers=1,
     critical_transects=None,
+    max_distance=None,
 ):
     """
     Build a coastline dataset for one coastline convention.
@@ -134,6 +147,7 @@ def build_coastline_dataset(
         distance_chunk_size=distance_chunk_size,
         workers=workers,
         critical_transects=critical_transects,
+        max_distance=max_distance,
     )
     return ds_coastlines[convention]
 
@@ -144,6 +158,7 @@ def signed_distance_from_ocean_mask(
     lat,
     distance_chunk_size=64,
     workers=1,
+    max_distance=None,
 ):
     """
     Compute the signed distance to the coastline of an ocean mask.
@@ -160,10 +175,15 @@ def signed_distance_from_ocean_mask(
         The latitude coordinate in degrees
 
     distance_chunk_size : int, optional
-        Number of latitude rows per signed-distance query chunk
+        Number of latitude rows (and longitude columns) per signed-distance
+        query tile
 
     workers : int, optional
-        Number of workers to use in KD-tree queries
+        Number of worker processes for signed-distance queries
+
+    max_distance : float, optional
+        Distance in meters at which the signed distance saturates; only
+        cells within this distance of the coastline are queried
 
     Returns
     -------
@@ -171,16 +191,14 @@ def signed_distance_from_ocean_mask(
         The signed distance in meters to the nearest coastline sample
         (positive over ocean, negative over land)
     """
-    edge_east, edge_north = _coastline_edges(ocean_mask)
-    return _signed_distance_from_mask(
+    boundary = BoundaryDistance(
         ocean_mask=ocean_mask,
-        edge_east=edge_east,
-        edge_north=edge_north,
         lon=lon,
         lat=lat,
+        max_distance=max_distance,
         chunk_size=distance_chunk_size,
-        workers=workers,
     )
+    return boundary.signed_distance(ocean_mask, workers=workers)
 
 
 def rasterize_critical_transects(critical_transects, lon, lat):
@@ -315,121 +333,6 @@ def _flood_fill_ocean(candidate_ocean, lat):
     return ocean_mask
 
 
-def _coastline_edges(ocean_mask):
-    """
-    Build east and north coastline edge diagnostics from an ocean mask.
-    """
-    edge_east = ocean_mask != np.roll(ocean_mask, -1, axis=1)
-    edge_north = np.zeros_like(ocean_mask, dtype=bool)
-    edge_north[:-1, :] = ocean_mask[:-1, :] != ocean_mask[1:, :]
-    return edge_east, edge_north
-
-
-def _signed_distance_from_mask(
-    ocean_mask,
-    edge_east,
-    edge_north,
-    lon,
-    lat,
-    chunk_size,
-    workers,
-):
-    """
-    Compute signed distance to the nearest raster coastline sample.
-    """
-    sample_points = _coastline_sample_xyz(
-        edge_east=edge_east, edge_north=edge_north, lon=lon, lat=lat
-    )
-    if sample_points.shape[0] == 0:
-        return np.where(ocean_mask, np.inf, -np.inf)
-
-    tree = cKDTree(sample_points)
-    lon_rad = np.deg2rad(lon)
-    cos_lon = np.cos(lon_rad)
-    sin_lon = np.sin(lon_rad)
-
-    distance = np.empty(ocean_mask.shape, dtype=np.float64)
-    for start in range(0, lat.size, chunk_size):
-        stop = min(start + chunk_size, lat.size)
-        lat_rad = np.deg2rad(lat[start:stop])
-        cos_lat = np.cos(lat_rad)[:, np.newaxis]
-        sin_lat = np.sin(lat_rad)[:, np.newaxis]
-        xyz = np.empty((stop - start, lon.size, 3), dtype=np.float64)
-        xyz[:, :, 0] = cos_lat * cos_lon[np.newaxis, :]
-        xyz[:, :, 1] = cos_lat * sin_lon[np.newaxis, :]
-        xyz[:, :, 2] = sin_lat
-        points = xyz.reshape((-1, 3))
-        chord_distance, _ = _tree_query(tree, points, workers)
-        chord_distance = np.clip(chord_distance, 0.0, 2.0)
-        angle = 2.0 * np.arcsin(0.5 * chord_distance)
-        distance[start:stop, :] = angle.reshape((stop - start, lon.size))
-
-    signed_distance = EARTH_RADIUS * distance
-    return np.where(ocean_mask, signed_distance, -signed_distance)
-
-
-def _coastline_sample_xyz(edge_east, edge_north, lon, lat):
-    """
-    Convert coastline edge midpoints into Cartesian coordinates.
-    """
-    east_rows, east_cols = np.nonzero(edge_east)
-    north_rows, north_cols = np.nonzero(edge_north)
-
-    sample_xyz = []
-
-    if east_rows.size > 0:
-        east_lon = _angular_midpoint(
-            lon[east_cols], lon[(east_cols + 1) % lon.size]
-        )
-        east_lat = lat[east_rows]
-        sample_xyz.append(_lon_lat_to_xyz(east_lon, east_lat))
-
-    if north_rows.size > 0:
-        north_lon = lon[north_cols]
-        north_lat = 0.5 * (lat[north_rows] + lat[north_rows + 1])
-        sample_xyz.append(_lon_lat_to_xyz(north_lon, north_lat))
-
-    if not sample_xyz:
-        return np.empty((0, 3), dtype=np.float64)
-
-    return np.vstack(sample_xyz)
-
-
-def _angular_midpoint(lon_a, lon_b):
-    """
-    Compute the midpoint between longitudes, respecting antimeridian wrap.
-    """
-    lon_a_rad = np.deg2rad(lon_a)
-    lon_b_rad = np.deg2rad(lon_b)
-    x = np.cos(lon_a_rad) + np.cos(lon_b_rad)
-    y = np.sin(lon_a_rad) + np.sin(lon_b_rad)
-    return np.rad2deg(np.arctan2(y, x))
-
-
-def _lon_lat_to_xyz(lon, lat):
-    """
-    Convert lon/lat coordinates in degrees to Cartesian coordinates.
-    """
-    lon_rad = np.deg2rad(lon)
-    lat_rad = np.deg2rad(lat)
-    cos_lat = np.cos(lat_rad)
-    xyz = np.empty((lon_rad.size, 3), dtype=np.float64)
-    xyz[:, 0] = cos_lat * np.cos(lon_rad)
-    xyz[:, 1] = cos_lat * np.sin(lon_rad)
-    xyz[:, 2] = np.sin(lat_rad)
-    return xyz
-
-
-def _tree_query(tree, points, workers):
-    """
-    Query a KD-tree with SciPy-version-compatible worker support.
-    """
-    try:
-        return tree.query(points, workers=workers)
-    except TypeError:
-        return tree.query(points)
-
-
 def _write_netcdf_with_fill_values(ds, filename, format='NETCDF4'):
     """
     Write an xarray Dataset with NetCDF4 fill values where needed.
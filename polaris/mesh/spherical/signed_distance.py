@@ -0,0 +1,392 @@
+"""
+Signed distance to the coastline of a lat-lon ocean mask.
+
+The distance from every raster cell to the nearest coastline sample (the
+midpoints of cell edges across which the mask changes) is found with a
+KD-tree of the samples in Cartesian coordinates.  To keep the cost
+proportional to the length of the coastline rather than the size of the
+raster, the distance can be saturated at ``max_distance``: the raster is
+divided into tiles and only tiles that may lie within ``max_distance`` of a
+coastline sample (a narrow band around the coastline) are queried cell by
+cell.  Row chunks of tiles can be processed by a pool of forked worker
+processes that share the tree and the coordinate arrays.
+"""
+
+import hashlib
+import multiprocessing
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from polaris.constants import get_constant
+
+EARTH_RADIUS = get_constant('mean_radius')
+
+# Module-level state shared with fork-based parallel workers.
+# Set by BoundaryDistance.unsigned_angle before Pool creation.
+_WORKER_BOUNDARY = None
+
+
+class BoundaryDistance:
+    """
+    A KD-tree of the coastline samples of one ocean mask, used to compute
+    the (optionally saturated) distance to the coastline on the mask's
+    lat-lon grid.
+
+    Attributes
+    ----------
+    lon : numpy.ndarray
+        The longitude coordinate in degrees
+
+    lat : numpy.ndarray
+        The latitude coordinate in degrees
+
+    tree : scipy.spatial.cKDTree or None
+        A tree of coastline samples on the unit sphere, or ``None`` if the
+        mask has no coastline
+
+    max_distance : float or None
+        The distance in meters at which distances saturate, or ``None``
+        to compute the full distance everywhere
+
+    chunk_size : int
+        The number of latitude rows (and longitude columns) per tile
+    """
+
+    def __init__(self, ocean_mask, lon, lat, max_distance=None, chunk_size=64):
+        """
+        Build the tree of coastline samples for an ocean mask.
+
+        Parameters
+        ----------
+        ocean_mask : numpy.ndarray
+            A boolean ocean mask with dimensions ``(lat, lon)``
+
+        lon : numpy.ndarray
+            The longitude coordinate in degrees
+
+        lat : numpy.ndarray
+            The latitude coordinate in degrees
+
+        max_distance : float, optional
+            The distance in meters at which distances saturate
+
+        chunk_size : int, optional
+            The number of latitude rows (and longitude columns) per tile
+        """
+        if max_distance is not None and max_distance <= 0.0:
+            raise ValueError(
+                f'max_distance must be positive, got {max_distance}.'
+            )
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.max_distance = max_distance
+        self.chunk_size = chunk_size
+
+        edge_east, edge_north = _coastline_edges(ocean_mask)
+        sample_points = _coastline_sample_xyz(
+            edge_east=edge_east, edge_north=edge_north, lon=lon, lat=lat
+        )
+        if sample_points.shape[0] == 0:
+            self.tree = None
+        else:
+            self.tree = cKDTree(sample_points)
+
+        lon_rad = np.deg2rad(self.lon)
+        lat_rad = np.deg2rad(self.lat)
+        self._cos_lon = np.cos(lon_rad)
+        self._sin_lon = np.sin(lon_rad)
+        self._cos_lat = np.cos(lat_rad)
+        self._sin_lat = np.sin(lat_rad)
+
+        if max_distance is None:
+            self._max_angle = np.pi
+        else:
+            self._max_angle = min(np.pi, max_distance / EARTH_RADIUS)
+
+    def signed_distance(self, ocean_mask, workers=1):
+        """
+        Compute the signed distance to the coastline.
+
+        Parameters
+        ----------
+        ocean_mask : numpy.ndarray
+            The boolean ocean mask used to build the tree
+
+        workers : int, optional
+            The number of worker processes
+
+        Returns
+        -------
+        signed_distance : numpy.ndarray
+            The signed distance in meters to the nearest coastline sample
+            (positive over ocean, negative over land), saturated at
+            ``max_distance`` if it was given
+        """
+        if self.tree is None:
+            return np.where(ocean_mask, np.inf, -np.inf)
+        distance = EARTH_RADIUS * self.unsigned_angle(workers=workers)
+        return np.where(ocean_mask, distance, -distance)
+
+    def unsigned_angle(self, workers=1):
+        """
+        Compute the angular distance in radians to the nearest coastline
+        sample for every cell of the grid.
+
+        Parameters
+        ----------
+        workers : int, optional
+            The number of worker processes
+
+        Returns
+        -------
+        angle : numpy.ndarray
+            The angular distance with dimensions ``(lat, lon)``
+        """
+        nlat = self.lat.size
+        chunks = [
+            (start, min(start + self.chunk_size, nlat))
+            for start in range(0, nlat, self.chunk_size)
+        ]
+        near_tiles = self._near_tiles()
+
+        angle = np.empty((nlat, self.lon.size), dtype=np.float64)
+        n_workers = min(workers, len(chunks))
+        if n_workers > 1:
+            global _WORKER_BOUNDARY
+            _WORKER_BOUNDARY = self
+            tasks = [
+                (start, stop, near_tiles[index])
+                for index, (start, stop) in enumerate(chunks)
+            ]
+            ctx = multiprocessing.get_context('fork')
+            with ctx.Pool(processes=n_workers) as pool:
+                results = pool.starmap(_worker_chunk_angle, tasks)
+            _WORKER_BOUNDARY = None
+            for (start, stop), chunk_angle in zip(
+                chunks, results, strict=True
+            ):
+                angle[start:stop, :] = chunk_angle
+        else:
+            for index, (start, stop) in enumerate(chunks):
+                angle[start:stop, :] = self._chunk_angle(
+                    start, stop, near_tiles[index]
+                )
+        return angle
+
+    def _near_tiles(self):
+        """
+        Find the tiles that may contain cells within the saturation
+        distance of a coastline sample.
+
+        Returns a boolean array with dimensions ``(lat tiles, lon tiles)``.
+        """
+        chunk_size = self.chunk_size
+        nlat = self.lat.size
+        nlon = self.lon.size
+        lat_starts = np.arange(0, nlat, chunk_size)
+        lon_starts = np.arange(0, nlon, chunk_size)
+        if self._max_angle >= np.pi:
+            return np.ones((lat_starts.size, lon_starts.size), dtype=bool)
+
+        lat_stops = np.minimum(lat_starts + chunk_size, nlat) - 1
+        lon_stops = np.minimum(lon_starts + chunk_size, nlon) - 1
+        lat_mids = (lat_starts + lat_stops) // 2
+        lon_mids = (lon_starts + lon_stops) // 2
+
+        centers = self._xyz(lat_mids[:, np.newaxis], lon_mids[np.newaxis, :])
+        # the great-circle distance from a tile's center to its cells is
+        # largest at one of its corners
+        radius = np.zeros(centers.shape[:-1])
+        for lat_corner in (lat_starts, lat_stops):
+            for lon_corner in (lon_starts, lon_stops):
+                corner = self._xyz(
+                    lat_corner[:, np.newaxis], lon_corner[np.newaxis, :]
+                )
+                radius = np.maximum(
+                    radius, np.linalg.norm(corner - centers, axis=-1)
+                )
+
+        max_chord = 2.0 * np.sin(0.5 * self._max_angle)
+        chord, _ = self.tree.query(
+            centers.reshape((-1, 3)),
+            distance_upper_bound=max_chord + radius.max(),
+        )
+        chord = chord.reshape(radius.shape)
+        return chord <= max_chord + radius
+
+    def _chunk_angle(self, start, stop, near_tiles):
+        """
+        Compute the angular distance for the rows of one chunk, querying
+        only the cells in tiles near the coastline.
+        """
+        nlon = self.lon.size
+        angle = np.full((stop - start, nlon), self._max_angle)
+        near_cols = np.repeat(near_tiles, self.chunk_size)[:nlon]
+        cols = np.nonzero(near_cols)[0]
+        if cols.size == 0:
+            return angle
+
+        rows = np.arange(start, stop)
+        points = self._xyz(rows[:, np.newaxis], cols[np.newaxis, :])
+        if self._max_angle < np.pi:
+            max_chord = 2.0 * np.sin(0.5 * self._max_angle)
+            chord, _ = self.tree.query(
+                points.reshape((-1, 3)), distance_upper_bound=max_chord
+            )
+        else:
+            chord, _ = self.tree.query(points.reshape((-1, 3)))
+        # cells beyond the upper bound have infinite chord and saturate
+        chord = np.clip(chord, 0.0, 2.0)
+        chunk_angle = np.minimum(2.0 * np.arcsin(0.5 * chord), self._max_angle)
+        angle[:, cols] = chunk_angle.reshape((rows.size, cols.size))
+        return angle
+
+    def _xyz(self, rows, cols):
+        """
+        Cartesian coordinates on the unit sphere of the cells at the
+        broadcast row and column indices.
+        """
+        cos_lat = self._cos_lat[rows]
+        xyz = np.empty(np.broadcast(rows, cols).shape + (3,))
+        xyz[..., 0] = cos_lat * self._cos_lon[cols]
+        xyz[..., 1] = cos_lat * self._sin_lon[cols]
+        xyz[..., 2] = self._sin_lat[rows]
+        return xyz
+
+
+class SignedDistanceCache:
+    """
+    Compute signed distances for several ocean masks on the same grid,
+    building the coastline tree and distance field only once for each
+    distinct mask (e.g. coastline conventions that produce identical masks).
+    """
+
+    def __init__(self, lon, lat, max_distance=None, chunk_size=64, workers=1):
+        """
+        Create an empty cache.
+
+        Parameters
+        ----------
+        lon : numpy.ndarray
+            The longitude coordinate in degrees
+
+        lat : numpy.ndarray
+            The latitude coordinate in degrees
+
+        max_distance : float, optional
+            The distance in meters at which distances saturate
+
+        chunk_size : int, optional
+            The number of latitude rows (and longitude columns) per tile
+
+        workers : int, optional
+            The number of worker processes
+        """
+        self.lon = lon
+        self.lat = lat
+        self.max_distance = max_distance
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self._distances: dict[str, np.ndarray] = {}
+
+    def signed_distance(self, ocean_mask):
+        """
+        Get the signed distance to the coastline of an ocean mask.
+
+        Parameters
+        ----------
+        ocean_mask : numpy.ndarray
+            A boolean ocean mask with dimensions ``(lat, lon)``
+
+        Returns
+        -------
+        signed_distance : numpy.ndarray
+            The signed distance in meters (positive over ocean, negative
+            over land); a copy, so callers may modify it
+        """
+        ocean_mask = np.asarray(ocean_mask, dtype=bool)
+        key = hashlib.sha1(
+            np.packbits(ocean_mask).tobytes() + str(ocean_mask.shape).encode()
+        ).hexdigest()
+        if key not in self._distances:
+            boundary = BoundaryDistance(
+                ocean_mask=ocean_mask,
+                lon=self.lon,
+                lat=self.lat,
+                max_distance=self.max_distance,
+                chunk_size=self.chunk_size,
+            )
+            self._distances[key] = boundary.signed_distance(
+                ocean_mask, workers=self.workers
+            )
+        return self._distances[key].copy()
+
+
+def _worker_chunk_angle(start, stop, near_tiles):
+    """
+    Compute the angular distance for one chunk in a forked worker.
+    """
+    return _WORKER_BOUNDARY._chunk_angle(start, stop, near_tiles)
+
+
+def _coastline_edges(ocean_mask):
+    """
+    Build east and north coastline edge diagnostics from an ocean mask.
+    """
+    edge_east = ocean_mask != np.roll(ocean_mask, -1, axis=1)
+    edge_north = np.zeros_like(ocean_mask, dtype=bool)
+    edge_north[:-1, :] = ocean_mask[:-1, :] != ocean_mask[1:, :]
+    return edge_east, edge_north
+
+
+def _coastline_sample_xyz(edge_east, edge_north, lon, lat):
+    """
+    Convert coastline edge midpoints into Cartesian coordinates.
+    """
+    east_rows, east_cols = np.nonzero(edge_east)
+    north_rows, north_cols = np.nonzero(edge_north)
+
+    sample_xyz = []
+
+    if east_rows.size > 0:
+        east_lon = _angular_midpoint(
+            lon[east_cols], lon[(east_cols + 1) % lon.size]
+        )
+        east_lat = lat[east_rows]
+        sample_xyz.append(_lon_lat_to_xyz(east_lon, east_lat))
+
+    if north_rows.size > 0:
+        north_lon = lon[north_cols]
+        north_lat = 0.5 * (lat[north_rows] + lat[north_rows + 1])
+        sample_xyz.append(_lon_lat_to_xyz(north_lon, north_lat))
+
+    if not sample_xyz:
+        return np.empty((0, 3), dtype=np.float64)
+
+    return np.vstack(sample_xyz)
+
+
+def _angular_midpoint(lon_a, lon_b):
+    """
+    Compute the midpoint between longitudes, respecting antimeridian wrap.
+    """
+    lon_a_rad = np.deg2rad(lon_a)
+    lon_b_rad = np.deg2rad(lon_b)
+    x = np.cos(lon_a_rad) + np.cos(lon_b_rad)
+    y = np.sin(lon_a_rad) + np.sin(lon_b_rad)
+    return np.rad2deg(np.arctan2(y, x))
+
+
+def _lon_lat_to_xyz(lon, lat):
+    """
+    Convert lon/lat coordinates in degrees to Cartesian coordinates.
+    """
+    lon_rad = np.deg2rad(lon)
+    lat_rad = np.deg2rad(lat)
+    cos_lat = np.cos(lat_rad)
+    xyz = np.empty((lon_rad.size, 3), dtype=np.float64)
+    xyz[:, 0] = cos_lat * np.cos(lon_rad)
+    xyz[:, 1] = cos_lat * np.sin(lon_rad)
+    xyz[:, 2] = np.sin(lat_rad)
+    return xyz
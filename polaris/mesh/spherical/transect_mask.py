@@ -0,0 +1,440 @@
+"""
+Cell and edge masks of transects on a spherical MPAS mesh.
+
+Each transect is subdivided along great circles into points spaced finely
+enough that no cell or edge it passes through is skipped.  Because MPAS
+meshes are Voronoi tessellations, the cell containing a point is the cell
+whose center is nearest, found with a KD-tree of cell centers that is built
+once per mesh and shared by any number of feature collections.  Each cell is
+divided into one triangle per edge (the cell center and the edge's two
+vertices), so the edge whose triangle contains the point is found among the
+edges of its cell.
+
+Masks are stored sparsely, as the indices of the cells and edges that each
+transect touches, so that memory and time scale with the length of the
+transects rather than with the number of transects times the size of the
+mesh.  Dense ``(nCells, nTransects)`` masks are only built on request.
+"""
+
+import numpy as np
+import xarray as xr
+from scipy.spatial import cKDTree
+
+# the fraction of the smallest distance between cell centers used as the
+# spacing between points on a transect
+SPACING_FRACTION = 0.25
+
+# the number of transect points whose edges are located together
+_EDGE_CHUNK_SIZE = 2**16
+
+
+class MeshTransectIndex:
+    """
+    A spatial index of the cells and edges of a spherical MPAS mesh, used to
+    compute masks of the cells and edges that transects pass through
+
+    Attributes
+    ----------
+    n_cells : int
+        The number of cells in the mesh
+
+    n_edges : int
+        The number of edges in the mesh
+
+    radius : float
+        The radius of the sphere in meters
+
+    min_spacing : float
+        The smallest distance in meters between neighboring cell centers
+
+    tree : scipy.spatial.cKDTree
+        A tree of cell centers on the unit sphere
+    """
+
+    def __init__(self, ds_mesh):
+        """
+        Build the spatial index of a mesh
+
+        Parameters
+        ----------
+        ds_mesh : xarray.Dataset
+            A spherical MPAS mesh
+        """
+        self.n_cells = ds_mesh.sizes['nCells']
+        self.n_edges = ds_mesh.sizes['nEdges']
+
+        cell_xyz = np.stack(
+            [ds_mesh[f'{coord}Cell'].values for coord in 'xyz'], axis=1
+        )
+        self.radius = float(np.linalg.norm(cell_xyz[0]))
+        self._cell_xyz = cell_xyz / self.radius
+        vertex_xyz = np.stack(
+            [ds_mesh[f'{coord}Vertex'].values for coord in 'xyz'], axis=1
+        )
+        self._vertex_xyz = vertex_xyz / self.radius
+
+        self.min_spacing = float(ds_mesh.dcEdge.min())
+        self.tree = cKDTree(self._cell_xyz)
+
+        # zero-based connectivity, with -1 for missing entries
+        n_edges_on_cell = ds_mesh.nEdgesOnCell.values
+        edges_on_cell = ds_mesh.edgesOnCell.values - 1
+        max_edges = edges_on_cell.shape[1]
+        valid = np.arange(max_edges) < n_edges_on_cell[:, np.newaxis]
+        self._edges_on_cell = np.where(valid, edges_on_cell, -1)
+        self._vertices_on_edge = ds_mesh.verticesOnEdge.values - 1
+
+    def compute_masks(
+        self,
+        fc,
+        mask_types=('cell', 'edge'),
+        max_spacing=10e3,
+        workers=1,
+    ):
+        """
+        Compute sparse masks of the cells and edges that each transect in a
+        feature collection passes through
+
+        Parameters
+        ----------
+        fc : geometric_features.FeatureCollection
+            A feature collection of ``LineString`` or ``MultiLineString``
+            transects
+
+        mask_types : tuple of {'cell', 'edge'}, optional
+            The types of masks to compute
+
+        max_spacing : float, optional
+            The maximum distance in meters between points on a transect.  A
+            smaller spacing is used if the mesh requires it.
+
+        workers : int, optional
+            The number of threads used to query the KD-tree
+
+        Returns
+        -------
+        masks : polaris.mesh.spherical.transect_mask.TransectMasks
+            The cells and (if requested) edges that each transect passes
+            through
+        """
+        for mask_type in mask_types:
+            if mask_type not in ['cell', 'edge']:
+                raise ValueError(f'Unexpected mask type {mask_type}')
+
+        find_edges = 'edge' in mask_types
+        names = []
+        cells = []
+        edges = []
+        for feature in fc.features:
+            names.append(feature['properties']['name'])
+            transect_cells, transect_edges = self.transect_cells_and_edges(
+                feature['geometry'],
+                find_edges=find_edges,
+                max_spacing=max_spacing,
+                workers=workers,
+            )
+            cells.append(transect_cells)
+            edges.append(transect_edges)
+
+        return TransectMasks(
+            names=names,
+            cells=cells,
+            edges=edges if find_edges else None,
+            n_cells=self.n_cells,
+            n_edges=self.n_edges,
+        )
+
+    def transect_cells_and_edges(
+        self, geometry, find_edges=True, max_spacing=10e3, workers=1
+    ):
+        """
+        Find the cells and edges that a transect passes through
+
+        Parameters
+        ----------
+        geometry : dict
+            A GeoJSON ``LineString`` or ``MultiLineString`` geometry with
+            coordinates in degrees
+
+        find_edges : bool, optional
+            Whether to find the edges as well as the cells
+
+        max_spacing : float, optional
+            The maximum distance in meters between points on the transect
+
+        workers : int, optional
+            The number of threads used to query the KD-tree
+
+        Returns
+        -------
+        cells : numpy.ndarray
+            The sorted, unique zero-based indices of cells
+
+        edges : numpy.ndarray or None
+            The sorted, unique zero-based indices of edges, or ``None`` if
+            ``find_edges`` is ``False``
+        """
+        spacing = min(max_spacing, SPACING_FRACTION * self.min_spacing)
+        points = _subdivide_transect(geometry, spacing / self.radius)
+        _, point_cells = self.tree.query(points, workers=workers)
+        cells = np.unique(point_cells)
+        if not find_edges:
+            return cells, None
+
+        point_edges = np.zeros(points.shape[0], dtype=int)
+        for start in range(0, points.shape[0], _EDGE_CHUNK_SIZE):
+            stop = start + _EDGE_CHUNK_SIZE
+            point_edges[start:stop] = self._locate_edges(
+                points[start:stop], point_cells[start:stop]
+            )
+        edges = np.unique(point_edges)
+        return cells, edges
+
+    def _locate_edges(self, points, point_cells):
+        """
+        Find the edge whose triangle within its cell contains each point
+        """
+        candidates = self._edges_on_cell[point_cells]
+        valid = candidates >= 0
+        safe = np.where(valid, candidates, 0)
+        vertices = self._vertices_on_edge[safe]
+        center = self._cell_xyz[point_cells][:, np.newaxis, :]
+        vertex0 = self._vertex_xyz[vertices[..., 0]]
+        vertex1 = self._vertex_xyz[vertices[..., 1]]
+        point = points[:, np.newaxis, :]
+
+        # the point is in the triangle if it is on the same side of all three
+        # great circles bounding it
+        sides = np.stack(
+            [
+                _triple_product(center, vertex0, point),
+                _triple_product(vertex0, vertex1, point),
+                _triple_product(vertex1, center, point),
+            ],
+            axis=-1,
+        )
+        scale = np.max(np.abs(sides), axis=-1, keepdims=True)
+        tol = 1e-12 * scale
+        inside = np.logical_or(
+            np.all(sides >= -tol, axis=-1), np.all(sides <= tol, axis=-1)
+        )
+        inside = np.logical_and(inside, valid)
+
+        # fall back on the edge with the nearest midpoint if round-off leaves
+        # a point outside all triangles
+        midpoint = vertex0 + vertex1
+        distance = np.linalg.norm(
+            midpoint / np.linalg.norm(midpoint, axis=-1, keepdims=True)
+            - point,
+            axis=-1,
+        )
+        distance = np.where(valid, distance, np.inf)
+        choice = np.where(
+            np.any(inside, axis=1),
+            np.argmax(inside, axis=1),
+            np.argmin(distance, axis=1),
+        )
+        return candidates[np.arange(points.shape[0]), choice]
+
+
+class TransectMasks:
+    """
+    Sparse masks of the cells and edges that each of a set of transects
+    passes through
+
+    Attributes
+    ----------
+    names : list of str
+        The name of each transect
+
+    cells : list of numpy.ndarray
+        The sorted, unique zero-based indices of the cells that each transect
+        passes through
+
+    edges : list of numpy.ndarray or None
+        The sorted, unique zero-based indices of the edges that each transect
+        passes through, or ``None`` if edges were not computed
+
+    n_cells : int
+        The number of cells in the mesh
+
+    n_edges : int
+        The number of edges in the mesh
+    """
+
+    def __init__(self, names, cells, edges, n_cells, n_edges):
+        """
+        Create sparse transect masks
+
+        Parameters
+        ----------
+        names : list of str
+            The name of each transect
+
+        cells : list of numpy.ndarray
+            The zero-based indices of the cells of each transect
+
+        edges : list of numpy.ndarray or None
+            The zero-based indices of the edges of each transect
+
+        n_cells : int
+            The number of cells in the mesh
+
+        n_edges : int
+            The number of edges in the mesh
+        """
+        self.names = list(names)
+        self.cells = cells
+        self.edges = edges
+        self.n_cells = n_cells
+        self.n_edges = n_edges
+
+    def widen_edges(self, ds_mesh, latitude_threshold=43.0):
+        """
+        Widen transects at high latitudes to be at least two cells wide, to
+        avoid blockage by sea ice, by adding both cells on each edge of the
+        transect poleward of the latitude threshold.  This is the sparse
+        equivalent of
+        ``mpas_tools.ocean.coastline_alteration.widen_transect_edge_masks()``.
+
+        Parameters
+        ----------
+        ds_mesh : xarray.Dataset
+            The MPAS mesh
+
+        latitude_threshold : float, optional
+            The latitude in degrees, poleward of which transects are widened
+
+        Returns
+        -------
+        masks : polaris.mesh.spherical.transect_mask.TransectMasks
+            The masks with widened cells
+        """
+        if self.edges is None:
+            raise ValueError('Edge masks are required to widen transects.')
+        lat_edge = ds_mesh.latEdge.values
+        cells_on_edge = ds_mesh.cellsOnEdge.values - 1
+        threshold = np.deg2rad(latitude_threshold)
+        cells = []
+        for transect_cells, transect_edges in zip(
+            self.cells, self.edges, strict=True
+        ):
+            polar_edges = transect_edges[
+                np.abs(lat_edge[transect_edges]) > threshold
+            ]
+            neighbors = cells_on_edge[polar_edges].ravel()
+            neighbors = neighbors[neighbors >= 0]
+            cells.append(np.union1d(transect_cells, neighbors))
+        return TransectMasks(
+            names=self.names,
+            cells=cells,
+            edges=self.edges,
+            n_cells=self.n_cells,
+            n_edges=self.n_edges,
+        )
+
+    def cell_union(self):
+        """
+        Get the cells that any of the transects pass through
+
+        Returns
+        -------
+        cells : numpy.ndarray
+            The sorted, unique zero-based indices of cells
+        """
+        if len(self.cells) == 0:
+            return np.zeros(0, dtype=int)
+        return np.unique(np.concatenate(self.cells))
+
+    def to_dataset(self):
+        """
+        Get dense masks with the same variables as produced by
+        ``mpas_tools.mesh.mask.compute_mpas_transect_masks()``
+
+        Returns
+        -------
+        ds_masks : xarray.Dataset
+            A dataset with ``transectNames`` and with ``transectCellMasks``
+            and (if edges were computed) ``transectEdgeMasks``, which are 1
+            for cells and edges that each transect passes through and 0
+            elsewhere
+        """
+        n_transects = len(self.names)
+        ds_masks = xr.Dataset()
+        ds_masks['transectNames'] = ('nTransects', self.names)
+        ds_masks['transectCellMasks'] = (
+            ('nCells', 'nTransects'),
+            _dense_mask(self.n_cells, self.cells, n_transects),
+        )
+        if self.edges is not None:
+            ds_masks['transectEdgeMasks'] = (
+                ('nEdges', 'nTransects'),
+                _dense_mask(self.n_edges, self.edges, n_transects),
+            )
+        return ds_masks
+
+
+def _subdivide_transect(geometry, max_angle):
+    """
+    Subdivide the great-circle arcs of a transect into points on the unit
+    sphere no more than ``max_angle`` radians apart
+    """
+    if geometry['type'] == 'LineString':
+        lines = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiLineString':
+        lines = geometry['coordinates']
+    else:
+        raise ValueError(
+            f'Transects must be LineString or MultiLineString geometries, '
+            f'not {geometry["type"]}'
+        )
+
+    all_points = []
+    for line in lines:
+        coords = np.deg2rad(np.asarray(line, dtype=float)[:, 0:2])
+        lon = coords[:, 0]
+        lat = coords[:, 1]
+        xyz = np.stack(
+            [
+                np.cos(lat) * np.cos(lon),
+                np.cos(lat) * np.sin(lon),
+                np.sin(lat),
+            ],
+            axis=1,
+        )
+        all_points.append(xyz[0:1])
+        for start, end in zip(xyz[:-1], xyz[1:], strict=True):
+            angle = np.arctan2(
+                np.linalg.norm(np.cross(start, end)), np.dot(start, end)
+            )
+            count = max(1, int(np.ceil(angle / max_angle)))
+            frac = np.arange(1, count + 1)[:, np.newaxis] / count
+            if angle > 0.0:
+                # spherical linear interpolation along the great circle
+                points = (
+                    np.sin((1.0 - frac) * angle) * start
+                    + np.sin(frac * angle) * end
+                ) / np.sin(angle)
+            else:
+                points = np.repeat(end[np.newaxis, :], count, axis=0)
+            all_points.append(points)
+    return np.concatenate(all_points, axis=0)
+
+
+def _triple_product(a, b, c):
+    """
+    The triple product of three arrays of vectors, whose sign is the side of
+    the great circle through ``a`` and ``b`` that ``c`` is on
+    """
+    return np.sum(np.cross(a, b) * c, axis=-1)
+
+
+def _dense_mask(size, indices, n_transects):
+    """
+    Build a mask with dimensions ``(size, n_transects)`` from the indices
+    touched by each transect
+    """
+    mask = np.zeros((size, n_transects), dtype=np.int32)
+    for transect, transect_indices in enumerate(indices):
+        mask[transect_indices, transect] = 1
+    return mask
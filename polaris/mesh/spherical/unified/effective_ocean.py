@@ -22,10 +22,16 @@ from scipy import ndimage
 from scipy.spatial import cKDTree
 
 from polaris.constants import get_constant
+from polaris.mesh.spherical.box_filter import iter_box_sums
 
 EARTH_RADIUS = get_constant('mean_radius')
 KM_PER_DEG = np.pi / 180.0 * EARTH_RADIUS / 1e3
 
+# the size in grid cells of the square tiles that passage cells are grouped
+# into; the swath around the passage cells in each tile is found within the
+# tile's own bounding box
+PASSAGE_TILE_SIZE = 64
+
 
 def build_effective_ocean_mask(
     candidate_fraction,
@@ -201,7 +207,10 @@ def variable_box_average(frac, lat, resolution, width_km, max_window=720):
 
     The width field is quantized into geometric bins; each bin gets a
     separable box filter (nearest at the latitude boundaries, periodic
-    in longitude) whose longitude window grows as 1/cos(latitude).
+    in longitude) whose longitude window grows as 1/cos(latitude).  The
+    box sums for all rows and bins are computed from cumulative-sum
+    tables one latitude band at a time (see
+    :py:func:`polaris.mesh.spherical.box_filter.iter_box_sums`).
 
     Parameters
     ----------
@@ -235,24 +244,42 @@ def variable_box_average(frac, lat, resolution, width_km, max_window=720):
     centers = np.exp(0.5 * (edges[:-1] + edges[1:]))
     bin_index = np.clip(np.digitize(log_width, edges) - 1, 0, nbins - 1)
 
-    cos_lat = np.maximum(np.cos(np.radians(lat)), 1e-3)
+    nlat = frac.shape[0]
+    lat_windows = np.maximum(1, np.round(centers / dlat_km)).astype(np.int64)
+
+    # (row, bin) pairs spanning the bins that occur in each row, in row
+    # order
+    min_bin = bin_index.min(axis=1)
+    bin_count = bin_index.max(axis=1) - min_bin + 1
+    pair_rows = np.repeat(np.arange(nlat), bin_count)
+    first_pair = np.cumsum(bin_count) - bin_count
+    pair_bins = min_bin[pair_rows] + (
+        np.arange(pair_rows.size) - first_pair[pair_rows]
+    )
+
+    cos_lat = np.maximum(np.cos(np.radians(lat[pair_rows])), 1e-3)
+    lon_windows = np.round(centers[pair_bins] / (dlat_km * cos_lat))
+    lon_windows = np.clip(lon_windows, 1, max_window).astype(np.int64)
+    pair_lat_windows = lat_windows[pair_bins]
+
+    # rows that lie entirely in one bin can be copied whole
+    single_bin = bin_count[pair_rows] == 1
+
     out = np.empty_like(frac)
-    for bin, width in enumerate(centers):
-        rows = np.nonzero(np.any(bin_index == bin, axis=1))[0]
-        if rows.size == 0:
-            continue
-        lat_window = max(1, int(round(width / dlat_km)))
-        filtered = ndimage.uniform_filter1d(
-            frac, size=lat_window, axis=0, mode='nearest'
-        )
-        for row in rows:
-            lon_window = max(1, int(round(width / (dlat_km * cos_lat[row]))))
-            lon_window = min(lon_window, max_window)
-            values = ndimage.uniform_filter1d(
-                filtered[row], size=lon_window, mode='wrap'
-            )
-            mask = bin_index[row] == bin
-            out[row, mask] = values[mask]
+    for band, sums in iter_box_sums(
+        frac, pair_rows, pair_lat_windows, lon_windows
+    ):
+        rows = pair_rows[band]
+        sums /= (pair_lat_windows[band] * lon_windows[band])[:, np.newaxis]
+        single = single_bin[band]
+        out[rows[single]] = sums[single]
+        multiple = np.logical_not(single)
+        if np.any(multiple):
+            rows = rows[multiple]
+            sums = sums[multiple]
+            in_bin = bin_index[rows] == pair_bins[band][multiple, np.newaxis]
+            pair, col = np.nonzero(in_bin)
+            out[rows[pair], col] = sums[pair, col]
     return out
 
 
@@ -270,6 +297,13 @@ def widen_passages(
     Dilate rasterized passage lines to a swath proportional to the
     local ocean background cell width.
 
+    A grid cell joins the swath if its great-circle distance to the nearest
+    passage cell is within its own swath radius.  Distances are only
+    measured in bounding boxes around tiles of passage cells (padded in
+    longitude for the convergence of meridians and wrapping periodically),
+    so the cost scales with the length of the passages rather than with the
+    size of the raster.
+
     Parameters
     ----------
     passages : numpy.ndarray
@@ -307,25 +341,53 @@ def widen_passages(
     if factor <= 0.0 or not passages.any():
         return passages.copy()
 
+    nlat, nlon = passages.shape
     rows, cols = np.nonzero(passages)
     tree = cKDTree(_lon_lat_to_xyz(lon[cols], lat[rows]))
 
-    factor_2d = np.full((lat.size, lon.size), factor, dtype=float)
+    row_factor = np.full(nlat, factor, dtype=float)
     if high_lat_factor is not None:
-        factor_2d[np.abs(lat) > latitude_threshold, :] = high_lat_factor
-    radius_km = 0.5 * factor_2d * width_km
-    max_radius_km = float(np.max(radius_km))
-    pad = int(np.ceil(max_radius_km / (resolution * KM_PER_DEG))) + 1
-
-    # only query grid cells near the passages
-    region = ndimage.binary_dilation(
-        passages, structure=np.ones((3, 3), dtype=bool), iterations=pad
-    )
+        row_factor[np.abs(lat) > latitude_threshold] = high_lat_factor
+    # the largest swath radius in each row bounds how far the passages can
+    # be widened into that row
+    row_radius_km = 0.5 * row_factor * np.max(width_km, axis=1)
+    cell_km = resolution * KM_PER_DEG
+    max_pad = int(np.ceil(np.max(row_radius_km) / cell_km)) + 1
+
+    # the union of the bounding boxes, so no cell is measured twice
+    region = np.zeros(passages.shape, dtype=bool)
+    for tile_rows, tile_cols in _iter_passage_tiles(rows, cols, nlon):
+        row_min = int(tile_rows.min())
+        row_max = int(tile_rows.max())
+        near = slice(
+            max(row_min - max_pad, 0), min(row_max + max_pad + 1, nlat)
+        )
+        box_rows, box_cols = _passage_box(
+            row_min,
+            row_max,
+            int(tile_cols.min()),
+            int(tile_cols.max()),
+            lat,
+            nlon,
+            resolution,
+            radius_km=float(np.max(row_radius_km[near])),
+        )
+        region[box_rows[0] : box_rows[-1] + 1, box_cols] = True
+    region &= np.logical_not(passages)
+
     r_rows, r_cols = np.nonzero(region)
-    chord, _ = tree.query(_lon_lat_to_xyz(lon[r_cols], lat[r_rows]))
-    chord = np.clip(chord, 0.0, 2.0)
+    max_chord = 2.0 * np.sin(0.5e3 * np.max(row_radius_km) / EARTH_RADIUS)
+    chord, _ = tree.query(
+        _lon_lat_to_xyz(lon[r_cols], lat[r_rows]),
+        distance_upper_bound=max_chord * (1.0 + 1e-9),
+    )
+    found = np.isfinite(chord)
+    r_rows = r_rows[found]
+    r_cols = r_cols[found]
+    chord = np.minimum(chord[found], 2.0)
     distance_km = 2.0 * np.arcsin(0.5 * chord) * EARTH_RADIUS / 1e3
-    keep = distance_km <= radius_km[r_rows, r_cols]
+    radius_km = 0.5 * row_factor[r_rows] * width_km[r_rows, r_cols]
+    keep = distance_km <= radius_km
     widened = passages.copy()
     widened[r_rows[keep], r_cols[keep]] = True
     return widened
@@ -410,6 +472,52 @@ def hysteresis_grow(filled, frac, grow_threshold):
     return _keep_components(labels, count, find, seed_roots, grow_mask)
 
 
+def _iter_passage_tiles(rows, cols, nlon):
+    """
+    Group passage cells into square tiles of ``PASSAGE_TILE_SIZE`` grid
+    cells, yielding the rows and columns of the cells in each occupied tile.
+    """
+    tiles_per_row = nlon // PASSAGE_TILE_SIZE + 1
+    tile = (rows // PASSAGE_TILE_SIZE) * tiles_per_row + (
+        cols // PASSAGE_TILE_SIZE
+    )
+    order = np.argsort(tile, kind='stable')
+    _, starts = np.unique(tile[order], return_index=True)
+    for indices in np.split(order, starts[1:]):
+        yield rows[indices], cols[indices]
+
+
+def _passage_box(
+    row_min, row_max, col_min, col_max, lat, nlon, resolution, radius_km
+):
+    """
+    Find the rows and (wrapped) columns of the grid cells that may be within
+    ``radius_km`` of a box of passage cells.
+
+    The row padding follows from the meridional distance.  The column
+    padding is the largest longitude difference between points within the
+    radius, ``2 arcsin(sin(d / 2) / cos(lat))`` for an angular radius ``d``
+    at the highest latitude in the box, so the box spans all longitudes
+    near the poles.
+    """
+    nlat = lat.size
+    lat_pad = int(np.ceil(radius_km / (resolution * KM_PER_DEG))) + 1
+    box_rows = np.arange(
+        max(row_min - lat_pad, 0), min(row_max + lat_pad + 1, nlat)
+    )
+
+    cos_lat = np.cos(np.radians(np.max(np.abs(lat[box_rows]))))
+    half_angle = 0.5e3 * radius_km / EARTH_RADIUS
+    if cos_lat <= 0.0 or np.sin(half_angle) >= cos_lat:
+        return box_rows, np.arange(nlon)
+    delta_lon = np.degrees(2.0 * np.arcsin(np.sin(half_angle) / cos_lat))
+    lon_pad = int(np.ceil(delta_lon / resolution)) + 1
+    if col_max - col_min + 2 * lon_pad + 1 >= nlon:
+        return box_rows, np.arange(nlon)
+    box_cols = np.arange(col_min - lon_pad, col_max + lon_pad + 1) % nlon
+    return box_rows, box_cols
+
+
 def _label_with_wrap(mask):
     """
     Label 4-connected components with longitude wrap via union-find.
@@ -0,0 +1,378 @@
+"""
+A columnar on-disk cache of a polyline shapefile such as HydroRIVERS.
+
+Decoding the multi-gigabyte HydroRIVERS shapefile record by record is slow,
+so it is converted once into a directory of NumPy ``.npy`` files: one
+coordinate array for all vertices, offset arrays marking where each part and
+each record begins, and one array per attribute field.  The arrays are
+memory-mapped when the cache is opened, so selecting records with an array
+mask only reads the vertices of the selected records from disk.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import shapefile
+import shapely
+from shapely import line_merge
+
+# the cache layout version, bumped whenever the on-disk layout changes
+CACHE_VERSION = 1
+
+# the number of records converted together before their vertices are packed
+# into a contiguous array
+_CONVERT_CHUNK_SIZE = 100000
+
+_MANIFEST_FILENAME = 'manifest.json'
+
+
+class ColumnarLineCache:
+    """
+    A lazily loaded, columnar cache of polyline records.
+
+    Attributes
+    ----------
+    directory : str
+        The directory holding the cached arrays
+
+    fields : list of str
+        The names of the attribute fields, in shapefile order
+
+    coords : numpy.ndarray
+        Memory-mapped longitude-latitude coordinates of all vertices, with
+        dimensions ``(nVertices, 2)``
+
+    part_offsets : numpy.ndarray
+        The index of the first vertex of each part, with a final entry equal
+        to ``nVertices``
+
+    record_offsets : numpy.ndarray
+        The index of the first part of each record, with a final entry equal
+        to the number of parts
+    """
+
+    def __init__(self, directory):
+        """
+        Open an existing cache.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the cached arrays
+        """
+        manifest = _read_manifest(directory)
+        if manifest is None or manifest['version'] != CACHE_VERSION:
+            raise ValueError(
+                f'{directory!r} is not a valid columnar line cache.'
+            )
+        self.directory = directory
+        self.fields = list(manifest['fields'])
+        self.coords = self._load('coords')
+        self.part_offsets = self._load('part_offsets')
+        self.record_offsets = self._load('record_offsets')
+        self._field_arrays = dict()
+
+    @classmethod
+    def from_shapefile(cls, shp_filename, directory):
+        """
+        Open the cache for a shapefile, converting the shapefile first if the
+        cache is missing or was built from a different version of the file.
+
+        Parameters
+        ----------
+        shp_filename : str
+            The path to a polyline shapefile
+
+        directory : str
+            The directory for the cached arrays
+
+        Returns
+        -------
+        cache : polaris.mesh.spherical.unified.river.columnar.ColumnarLineCache
+            The opened cache
+        """
+        source = _source_signature(shp_filename)
+        manifest = _read_manifest(directory)
+        if (
+            manifest is None
+            or manifest['version'] != CACHE_VERSION
+            or manifest['source'] != source
+        ):
+            convert_shapefile_to_columnar(shp_filename, directory)
+        return cls(directory)
+
+    def __len__(self):
+        return self.record_offsets.size - 1
+
+    def field(self, name):
+        """
+        Get the memory-mapped array for one attribute field.
+
+        Parameters
+        ----------
+        name : str
+            The field name, matched case-insensitively
+
+        Returns
+        -------
+        values : numpy.ndarray
+            The field values, one per record
+        """
+        key = self._field_key(name)
+        if key is None:
+            raise KeyError(f'Field {name!r} is not in the cache.')
+        if key not in self._field_arrays:
+            self._field_arrays[key] = self._load(f'field_{key}')
+        return self._field_arrays[key]
+
+    def has_field(self, name):
+        """
+        Whether the cache has an attribute field, matched case-insensitively.
+
+        Parameters
+        ----------
+        name : str
+            The field name
+
+        Returns
+        -------
+        has_field : bool
+            Whether the field is present
+        """
+        return self._field_key(name) is not None
+
+    def select(self, mask):
+        """
+        Get the indices of the records selected by a mask.
+
+        Parameters
+        ----------
+        mask : numpy.ndarray
+            A boolean mask with one entry per record
+
+        Returns
+        -------
+        indices : numpy.ndarray
+            The indices of the selected records
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self),):
+            raise ValueError(
+                f'Expected a mask of shape ({len(self)},), got {mask.shape}.'
+            )
+        return np.nonzero(mask)[0]
+
+    def geometries(self, indices):
+        """
+        Build shapely line geometries for the given records.
+
+        Multi-part records are merged into a single line where possible, the
+        same way multi-part GeoJSON geometries are handled.
+
+        Parameters
+        ----------
+        indices : numpy.ndarray
+            The indices of the records
+
+        Returns
+        -------
+        geometries : numpy.ndarray
+            An object array of shapely geometries, one per record
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        geometries = np.empty(indices.size, dtype=object)
+        if indices.size == 0:
+            return geometries
+
+        parts, part_record = _ranges(
+            self.record_offsets[indices], self.record_offsets[indices + 1]
+        )
+        vertices, vertex_part = _ranges(
+            self.part_offsets[parts], self.part_offsets[parts + 1]
+        )
+        lines = shapely.linestrings(
+            np.asarray(self.coords[vertices]), indices=vertex_part
+        )
+
+        part_counts = np.bincount(part_record, minlength=indices.size)
+        single = part_counts == 1
+        first_part = np.zeros(indices.size, dtype=np.int64)
+        np.cumsum(part_counts[:-1], out=first_part[1:])
+        geometries[single] = lines[first_part[single]]
+        for record in np.nonzero(~single)[0]:
+            start = first_part[record]
+            merged = line_merge(
+                shapely.multilinestrings(
+                    lines[start : start + part_counts[record]]
+                )
+            )
+            geometries[record] = merged
+        return geometries
+
+    def _field_key(self, name):
+        """
+        Find the stored name of a field, matched case-insensitively.
+        """
+        for field in self.fields:
+            if field.lower() == name.lower():
+                return field
+        return None
+
+    def _load(self, name):
+        """
+        Memory-map one cached array.
+        """
+        return np.load(
+            os.path.join(self.directory, f'{name}.npy'), mmap_mode='r'
+        )
+
+
+def convert_shapefile_to_columnar(shp_filename, directory):
+    """
+    Convert a polyline shapefile into a columnar cache.
+
+    The cache is written to a temporary directory and moved into place only
+    once complete, so an interrupted conversion never leaves a partial cache
+    behind.
+
+    Parameters
+    ----------
+    shp_filename : str
+        The path to a polyline shapefile
+
+    directory : str
+        The directory for the cached arrays, replaced if it already exists
+    """
+    reader = shapefile.Reader(shp_filename)
+    fields = [field for field in reader.fields if field[0] != 'DeletionFlag']
+    field_names = [field[0] for field in fields]
+
+    coord_chunks = []
+    part_counts = []
+    vertex_counts = []
+    values = [[] for _ in fields]
+    chunk_coords = []
+    for shape_record in reader.iterShapeRecords():
+        shape = shape_record.shape
+        points = shape.points
+        parts = list(shape.parts) + [len(points)]
+        part_counts.append(len(parts) - 1)
+        vertex_counts.extend(np.diff(parts))
+        chunk_coords.extend(points)
+        for field_values, value in zip(
+            values, shape_record.record, strict=True
+        ):
+            field_values.append(value)
+        if len(part_counts) % _CONVERT_CHUNK_SIZE == 0:
+            coord_chunks.append(_pack_coords(chunk_coords))
+            chunk_coords = []
+    coord_chunks.append(_pack_coords(chunk_coords))
+
+    tmp_directory = f'{directory}.tmp'
+    if os.path.exists(tmp_directory):
+        shutil.rmtree(tmp_directory)
+    os.makedirs(tmp_directory)
+
+    arrays = dict(
+        coords=np.concatenate(coord_chunks),
+        part_offsets=_offsets(vertex_counts),
+        record_offsets=_offsets(part_counts),
+    )
+    for field, field_values in zip(fields, values, strict=True):
+        arrays[f'field_{field[0]}'] = _field_array(field, field_values)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_directory, f'{name}.npy'), array)
+
+    manifest = dict(
+        version=CACHE_VERSION,
+        source=_source_signature(shp_filename),
+        fields=field_names,
+    )
+    with open(
+        os.path.join(tmp_directory, _MANIFEST_FILENAME), 'w', encoding='utf-8'
+    ) as outfile:
+        json.dump(manifest, outfile, indent=2)
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.rename(tmp_directory, directory)
+
+
+def _read_manifest(directory):
+    """
+    Read the manifest of a cache, or return None if there is none.
+    """
+    filename = os.path.join(directory, _MANIFEST_FILENAME)
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r', encoding='utf-8') as infile:
+        return json.load(infile)
+
+
+def _source_signature(shp_filename):
+    """
+    Identify the version of a shapefile (and its attribute table) by size and
+    modification time.
+    """
+    signature = dict()
+    base, _ = os.path.splitext(shp_filename)
+    for extension in ('.shp', '.dbf'):
+        stat = os.stat(f'{base}{extension}')
+        signature[extension] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def _pack_coords(points):
+    """
+    Pack a list of vertices into a contiguous coordinate array.
+    """
+    coords = np.array(points, dtype=np.float64)
+    return coords.reshape((-1, 2))
+
+
+def _offsets(counts):
+    """
+    Convert counts into offsets with a leading zero.
+    """
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _field_array(field, values):
+    """
+    Convert the values of one attribute field into an array of the matching
+    type.
+    """
+    field_type = str(field[1])
+    decimal = field[3]
+    if field_type == 'N' and decimal == 0:
+        return np.array(
+            [0 if value is None else value for value in values],
+            dtype=np.int64,
+        )
+    if field_type in ('N', 'F'):
+        return np.array(
+            [np.nan if value is None else value for value in values],
+            dtype=np.float64,
+        )
+    if field_type == 'L':
+        return np.array([bool(value) for value in values], dtype=bool)
+    return np.array(
+        ['' if value is None else str(value) for value in values], dtype=str
+    )
+
+
+def _ranges(starts, stops):
+    """
+    Concatenate the index ranges ``[starts[i], stops[i])``, also returning
+    which range each index came from.
+    """
+    counts = stops - starts
+    owner = np.repeat(np.arange(counts.size), counts)
+    first = np.zeros(counts.size, dtype=np.int64)
+    np.cumsum(counts[:-1], out=first[1:])
+    indices = starts[owner] + np.arange(owner.size) - first[owner]
+    return indices, owner
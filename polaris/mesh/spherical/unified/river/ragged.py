@@ -0,0 +1,399 @@
+"""
+Vectorized operations on ragged arrays of polylines.
+
+A set of lines is stored as one ``(nPoints, 2)`` array of longitude-latitude
+coordinates together with an ``offsets`` array of length ``nLines + 1``, so
+that line ``i`` is ``coords[offsets[i]:offsets[i + 1]]``.  Densifying and
+clipping every line of a river network then costs a handful of NumPy
+operations over all vertices instead of a Python loop per vertex.
+"""
+
+import numpy as np
+
+
+def pack_lines(lines):
+    """
+    Pack a sequence of coordinate arrays into a ragged array.
+
+    Parameters
+    ----------
+    lines : list of numpy.ndarray
+        Coordinate arrays, each with dimensions ``(nLinePoints, 2)``
+
+    Returns
+    -------
+    coords : numpy.ndarray
+        The coordinates of all lines, with dimensions ``(nPoints, 2)``
+
+    offsets : numpy.ndarray
+        The index of the first point of each line, with a final entry equal
+        to ``nPoints``
+    """
+    counts = [len(line) for line in lines]
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    if offsets[-1] == 0:
+        return np.zeros((0, 2), dtype=float), offsets
+    coords = np.concatenate(
+        [np.asarray(line, dtype=float).reshape((-1, 2)) for line in lines]
+    )
+    return coords, offsets
+
+
+def split_lines(coords, offsets):
+    """
+    Split a ragged array back into one coordinate array per line.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The coordinates of all lines, with dimensions ``(nPoints, 2)``
+
+    offsets : numpy.ndarray
+        The index of the first point of each line, with a final entry equal
+        to ``nPoints``
+
+    Returns
+    -------
+    lines : list of numpy.ndarray
+        One coordinate array per line
+    """
+    return [
+        coords[start:stop]
+        for start, stop in zip(offsets[:-1], offsets[1:], strict=True)
+    ]
+
+
+def densify_lines(coords, offsets, max_spacing_deg, drop_repeated=True):
+    """
+    Insert evenly spaced points along each line segment so that no two
+    consecutive points are more than ``max_spacing_deg`` apart in longitude
+    or latitude.
+
+    Segments take the short way around in longitude, and inserted points
+    are wrapped into the [-180, 180) interval.  The first point of each line
+    is kept as is.  Lines with fewer than two points are left unchanged.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The coordinates of all lines, with dimensions ``(nPoints, 2)``
+
+    offsets : numpy.ndarray
+        The index of the first point of each line, with a final entry equal
+        to ``nPoints``
+
+    max_spacing_deg : float
+        The maximum spacing between points in degrees
+
+    drop_repeated : bool, optional
+        Whether to drop points that repeat the previous point of the line
+        (see :py:func:`drop_repeated_points`)
+
+    Returns
+    -------
+    dense_coords : numpy.ndarray
+        The coordinates of the densified lines
+
+    dense_offsets : numpy.ndarray
+        The offsets of the densified lines
+    """
+    coords = np.asarray(coords, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    counts = np.diff(offsets)
+
+    # segments join consecutive points of lines with at least two points
+    has_segments = counts >= 2
+    segment_start = np.ones(coords.shape[0], dtype=bool)
+    segment_start[offsets[1:][has_segments] - 1] = False
+    segment_start[offsets[:-1][counts == 1]] = False
+    starts = np.nonzero(segment_start)[0]
+
+    delta_lon = _wrapped_longitude_difference(
+        coords[starts + 1, 0] - coords[starts, 0]
+    )
+    delta_lat = coords[starts + 1, 1] - coords[starts, 1]
+    extent = np.maximum(np.abs(delta_lon), np.abs(delta_lat))
+    n_steps = np.maximum(1, np.ceil(extent / max_spacing_deg)).astype(np.int64)
+
+    # each segment contributes its n_steps points after the start point
+    segment = np.repeat(np.arange(starts.size), n_steps)
+    first_step = np.zeros(starts.size, dtype=np.int64)
+    np.cumsum(n_steps[:-1], out=first_step[1:])
+    step = np.arange(segment.size) - first_step[segment] + 1
+    fraction = step / n_steps[segment]
+    inserted = np.empty((segment.size, 2), dtype=float)
+    inserted[:, 0] = _wrap_longitude(
+        coords[starts[segment], 0] + fraction * delta_lon[segment]
+    )
+    inserted[:, 1] = coords[starts[segment], 1] + fraction * delta_lat[segment]
+
+    # each line is its first point (or all its points if it has no
+    # segments) followed by the points inserted along its segments
+    line_of_start = np.searchsorted(offsets, starts, side='right') - 1
+    inserted_counts = np.bincount(
+        line_of_start, weights=n_steps, minlength=counts.size
+    ).astype(np.int64)
+    kept_counts = np.where(has_segments, 1, counts)
+    dense_offsets = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum(kept_counts + inserted_counts, out=dense_offsets[1:])
+
+    dense_coords = np.empty((dense_offsets[-1], 2), dtype=float)
+    kept, kept_line = _ranges(offsets[:-1], offsets[:-1] + kept_counts)
+    first_kept = dense_offsets[:-1] - offsets[:-1]
+    dense_coords[kept + first_kept[kept_line]] = coords[kept]
+    first_inserted = dense_offsets[:-1] + kept_counts
+    inserted_line = line_of_start[segment]
+    inserted_start = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum(inserted_counts, out=inserted_start[1:])
+    position = (
+        first_inserted[inserted_line]
+        + np.arange(segment.size)
+        - inserted_start[inserted_line]
+    )
+    dense_coords[position] = inserted
+
+    if drop_repeated:
+        dense_coords, dense_offsets = drop_repeated_points(
+            dense_coords, dense_offsets
+        )
+    return dense_coords, dense_offsets
+
+
+def drop_repeated_points(coords, offsets):
+    """
+    Drop points that repeat the previously kept point of their line, as
+    judged by ``numpy.allclose()``.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The coordinates of all lines, with dimensions ``(nPoints, 2)``
+
+    offsets : numpy.ndarray
+        The index of the first point of each line, with a final entry equal
+        to ``nPoints``
+
+    Returns
+    -------
+    coords : numpy.ndarray
+        The coordinates without repeated points
+
+    offsets : numpy.ndarray
+        The offsets of the lines without repeated points
+    """
+    coords = np.asarray(coords, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    line_start = np.zeros(coords.shape[0], dtype=bool)
+    line_start[offsets[:-1][offsets[:-1] < coords.shape[0]]] = True
+
+    keep = np.ones(coords.shape[0], dtype=bool)
+    keep[1:] = ~_all_close(coords[:-1], coords[1:])
+    keep[line_start] = True
+
+    # a point following a dropped point must be compared with the last
+    # kept point instead of its neighbor.  For an isolated dropped point,
+    # that is the point before it, and the follower usually stays kept;
+    # the remaining runs are rare, so they are resolved one point at a time
+    dropped = np.nonzero(~keep)[0]
+    follower = dropped + 1
+    has_follower = follower < coords.shape[0]
+    has_follower[has_follower] = ~line_start[follower[has_follower]]
+    settled = ~has_follower
+    isolated = has_follower & (dropped >= 1)
+    isolated[isolated] = keep[follower[isolated]] & keep[dropped[isolated] - 1]
+    settled[isolated] = ~_all_close(
+        coords[dropped[isolated] - 1], coords[follower[isolated]]
+    )
+    resolved = 0
+    for index in dropped[~settled]:
+        if index < resolved:
+            continue
+        anchor = index - 1
+        while True:
+            keep[index] = not _all_close(coords[anchor], coords[index])
+            index += 1
+            if keep[index - 1]:
+                break
+            if index == coords.shape[0] or line_start[index]:
+                break
+        resolved = index
+
+    kept_total = np.zeros(coords.shape[0] + 1, dtype=np.int64)
+    np.cumsum(keep, out=kept_total[1:])
+    new_offsets = kept_total[offsets]
+    return coords[keep], new_offsets
+
+
+def clip_lines_by_threshold(coords, offsets, values, threshold):
+    """
+    Keep the pieces of each line where a sampled value is at or below a
+    threshold.
+
+    Each maximal run of points with ``values <= threshold`` becomes one
+    piece.  Where a piece begins or ends partway along a line, it is
+    extended to the point on the neighboring segment at which the linearly
+    interpolated value crosses the threshold.  Repeated points are dropped
+    and pieces with fewer than two points are discarded.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The coordinates of all lines, with dimensions ``(nPoints, 2)``
+
+    offsets : numpy.ndarray
+        The index of the first point of each line, with a final entry equal
+        to ``nPoints``
+
+    values : numpy.ndarray
+        The value sampled at each point
+
+    threshold : float
+        The largest value that is kept
+
+    Returns
+    -------
+    piece_coords : numpy.ndarray
+        The coordinates of the clipped pieces
+
+    piece_offsets : numpy.ndarray
+        The offsets of the clipped pieces
+
+    piece_line : numpy.ndarray
+        The index of the line each piece was clipped from
+    """
+    coords = np.asarray(coords, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    counts = np.diff(offsets)
+    line = np.repeat(np.arange(counts.size), counts)
+
+    # lines with a single point have no segments and produce no pieces
+    valid = (values <= threshold) & (counts[line] >= 2)
+    npoints = coords.shape[0]
+    previous_valid = np.zeros(npoints, dtype=bool)
+    previous_valid[1:] = valid[:-1]
+    next_valid = np.zeros(npoints, dtype=bool)
+    next_valid[:-1] = valid[1:]
+    first_point = np.zeros(npoints, dtype=bool)
+    first_point[offsets[:-1][counts > 0]] = True
+    last_point = np.zeros(npoints, dtype=bool)
+    last_point[offsets[1:][counts > 0] - 1] = True
+
+    run_start = valid & (first_point | ~previous_valid)
+    run_stop = valid & (last_point | ~next_valid)
+    starts = np.nonzero(run_start)[0]
+    stops = np.nonzero(run_stop)[0] + 1
+    entries = ~first_point[starts]
+    exits = ~last_point[stops - 1]
+
+    # each piece is its run of valid points plus any crossing points
+    piece_counts = stops - starts + entries + exits
+    piece_offsets = np.zeros(starts.size + 1, dtype=np.int64)
+    np.cumsum(piece_counts, out=piece_offsets[1:])
+    piece_coords = np.empty((piece_offsets[-1], 2), dtype=float)
+
+    points, piece = _ranges(starts, stops)
+    first_run_point = piece_offsets[:-1] + entries - starts
+    piece_coords[points + first_run_point[piece]] = coords[points]
+
+    entry_index = starts[entries]
+    piece_coords[piece_offsets[:-1][entries]] = _threshold_crossing(
+        coords, values, entry_index - 1, entry_index, threshold
+    )
+    exit_index = stops[exits] - 1
+    piece_coords[piece_offsets[1:][exits] - 1] = _threshold_crossing(
+        coords, values, exit_index, exit_index + 1, threshold
+    )
+
+    piece_coords, piece_offsets = drop_repeated_points(
+        piece_coords, piece_offsets
+    )
+    long_enough = np.diff(piece_offsets) >= 2
+    piece_coords, piece_offsets = select_lines(
+        piece_coords, piece_offsets, long_enough
+    )
+    return piece_coords, piece_offsets, line[starts][long_enough]
+
+
+def select_lines(coords, offsets, mask):
+    """
+    Select a subset of the lines in a ragged array.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The coordinates of all lines, with dimensions ``(nPoints, 2)``
+
+    offsets : numpy.ndarray
+        The index of the first point of each line, with a final entry equal
+        to ``nPoints``
+
+    mask : numpy.ndarray
+        A boolean mask with one entry per line
+
+    Returns
+    -------
+    coords : numpy.ndarray
+        The coordinates of the selected lines
+
+    offsets : numpy.ndarray
+        The offsets of the selected lines
+    """
+    mask = np.asarray(mask, dtype=bool)
+    counts = np.diff(offsets)[mask]
+    points, _ = _ranges(offsets[:-1][mask], offsets[1:][mask])
+    new_offsets = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_offsets[1:])
+    return coords[points], new_offsets
+
+
+def _threshold_crossing(coords, values, start, end, threshold):
+    """
+    Find the points along segments where the linearly interpolated value
+    crosses the threshold.
+    """
+    start_value = values[start]
+    end_value = values[end]
+    parallel = np.isclose(end_value, start_value)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = (threshold - start_value) / (end_value - start_value)
+    fraction = np.where(parallel, 0.5, fraction)
+    fraction = np.clip(fraction, 0.0, 1.0)[:, np.newaxis]
+    return coords[start] + fraction * (coords[end] - coords[start])
+
+
+def _all_close(points_a, points_b):
+    """
+    Row-wise ``numpy.allclose(point_a, point_b)`` with its default
+    tolerances.
+    """
+    close = np.abs(points_a - points_b) <= 1.0e-8 + 1.0e-5 * np.abs(points_b)
+    return np.all(close, axis=-1)
+
+
+def _ranges(starts, stops):
+    """
+    Concatenate the index ranges ``[starts[i], stops[i])``, also returning
+    which range each index came from.
+    """
+    counts = stops - starts
+    owner = np.repeat(np.arange(counts.size), counts)
+    first = np.zeros(counts.size, dtype=np.int64)
+    np.cumsum(counts[:-1], out=first[1:])
+    indices = starts[owner] + np.arange(owner.size) - first[owner]
+    return indices, owner
+
+
+def _wrapped_longitude_difference(delta_lon):
+    """
+    Wrap a longitude difference into the [-180, 180) interval.
+    """
+    return (delta_lon + 180.0) % 360.0 - 180.0
+
+
+def _wrap_longitude(lon):
+    """
+    Wrap a longitude into the [-180, 180) interval.
+    """
+    return _wrapped_longitude_difference(lon)
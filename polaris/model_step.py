@@ -6,10 +6,16 @@ from typing import Dict, List, Union
 import numpy as np
 from lxml import etree
 from mpas_tools.io import open_dataset
-from mpas_tools.logging import check_call
 
 import polaris.namelist
 import polaris.streams
+from polaris.partition import (
+    PARTITION_CACHE_DIR,
+    add_to_cache,
+    get_cached_graph_filename,
+    partition_graph,
+    restore_from_cache,
+)
 from polaris.step import Step
 from polaris.yaml import PolarisYaml, yaml_to_mpas_streams
 
@@ -559,6 +565,7 @@ class ModelStep(Step):
             make_graph_file(
                 mesh_filename=self.mesh_filename,
                 graph_filename=self.graph_filename,
+                cache_dir=self._get_partition_cache_dir(),
             )
 
         if self.partition_graph:
@@ -709,8 +716,26 @@ class ModelStep(Step):
         ntasks = self.ntasks
         if ntasks > 1:
             executable = self.config.get('parallel', 'partition_executable')
-            args = [executable, graph_file, f'{ntasks}']
-            check_call(args, self.logger)
+            partition_graph(
+                graph_filename=graph_file,
+                ntasks=ntasks,
+                executable=executable,
+                logger=self.logger,
+                cache_dir=self._get_partition_cache_dir(),
+            )
+
+    def _get_partition_cache_dir(self):
+        """
+        Get the directory where graph files and partitions are cached for
+        reuse by other steps, or ``None`` if they aren't cached
+        """
+        config = self.config
+        cache = config.has_option(
+            'parallel', 'cache_partitions'
+        ) and config.getboolean('parallel', 'cache_partitions')
+        if not cache:
+            return None
+        return os.path.join(self.base_work_dir, PARTITION_CACHE_DIR)
 
     @staticmethod
     def _process_model(config, base_work_dir):
@@ -1071,7 +1096,11 @@ class ModelStep(Step):
 
 
 def make_graph_file(
-    mesh_filename, graph_filename='graph.info', weight_field=None
+    mesh_filename,
+    graph_filename='graph.info',
+    weight_field=None,
+    cache_dir=None,
+    ds_mesh=None,
 ):
     """
     Make a graph file from the MPAS mesh for use in the Metis graph
@@ -1088,21 +1117,32 @@ def make_graph_file(
     weight_field : str
         The name of a variable in the MPAS mesh file to use as a field of
         weights
-    """
 
-    with open_dataset(mesh_filename) as ds:
-        nCells = ds.sizes['nCells']
+    cache_dir : str, optional
+        A directory of cached graph files.  If a graph file has already been
+        made from a mesh file with the same contents, it is copied from the
+        cache.  Otherwise, the graph file that is made is added to the cache.
 
-        nEdgesOnCell = ds.nEdgesOnCell.values
-        cellsOnCell = ds.cellsOnCell.values - 1
-        if weight_field is not None:
-            if weight_field in ds:
-                raise ValueError(
-                    f'weight_field {weight_field} not found in {mesh_filename}'
-                )
-            weights = ds[weight_field].values
-        else:
-            weights = None
+    ds_mesh : xarray.Dataset, optional
+        The mesh already loaded in memory, used instead of reading
+        ``mesh_filename``
+    """
+    if cache_dir is not None:
+        cache_filename = get_cached_graph_filename(
+            cache_dir, mesh_filename, weight_field
+        )
+        if restore_from_cache(cache_filename, graph_filename):
+            return
+
+    if ds_mesh is None:
+        with open_dataset(mesh_filename) as ds:
+            nCells, nEdgesOnCell, cellsOnCell, weights = _read_graph_fields(
+                ds, mesh_filename, weight_field
+            )
+    else:
+        nCells, nEdgesOnCell, cellsOnCell, weights = _read_graph_fields(
+            ds_mesh, mesh_filename, weight_field
+        )
 
     nEdges = 0
     for i in range(nCells):
@@ -1130,3 +1170,25 @@ def make_graph_file(
                     if cellsOnCell[i][j] >= 0:
                         graph.write(f'{cellsOnCell[i][j] + 1} ')
                 graph.write('\n')
+
+    if cache_dir is not None:
+        add_to_cache(graph_filename, cache_filename)
+
+
+def _read_graph_fields(ds, mesh_filename, weight_field):
+    """
+    Read the fields of a mesh needed to make its graph file
+    """
+    nCells = ds.sizes['nCells']
+
+    nEdgesOnCell = ds.nEdgesOnCell.values
+    cellsOnCell = ds.cellsOnCell.values - 1
+    if weight_field is not None:
+        if weight_field in ds:
+            raise ValueError(
+                f'weight_field {weight_field} not found in {mesh_filename}'
+            )
+        weights = ds[weight_field].values
+    else:
+        weights = None
+    return nCells, nEdgesOnCell, cellsOnCell, weights
@@ -1,8 +1,13 @@
+import numpy as np
+
 from polaris.constants import get_constant
 
 cp_sw = get_constant('seawater_specific_heat_capacity_reference')
 rho_sw = get_constant('seawater_density_reference')
 
+# the number of cells read at a time when computing fused totals
+CELL_CHUNK_SIZE = 100000
+
 
 def compute_total_mass(ds_mesh, ds):
     """
@@ -57,6 +62,101 @@ def compute_total_salt(ds_mesh, ds):
     return compute_total_tracer(ds_mesh, ds, tracer_name='salinity')
 
 
+def compute_conservation_totals(
+    ds_mesh,
+    ds,
+    mass=False,
+    energy=False,
+    tracer_names=None,
+    time_indices=(0, -1),
+    chunk_size=CELL_CHUNK_SIZE,
+):
+    """
+    Compute the total mass, heat content and tracer contents at several times
+    in one pass over an ocean model output file
+
+    The cell areas are read once, and the layer thickness at each time is read
+    once per chunk of cells and shared by all requested totals, so checking
+    several conserved quantities costs about one read of the data.
+
+    Parameters
+    ----------
+    ds_mesh : xarray.Dataset
+        The horizontal mesh, with ``areaCell``
+
+    ds : xarray.Dataset
+        The ocean model output, with a ``Time`` dimension
+
+    mass : bool, optional
+        Whether to compute the total mass, as in :py:func:`compute_total_mass`
+
+    energy : bool, optional
+        Whether to compute the total heat content, as in
+        :py:func:`compute_total_energy`
+
+    tracer_names : list of str, optional
+        Tracers to compute the total content of, as in
+        :py:func:`compute_total_tracer`
+
+    time_indices : tuple of int, optional
+        The indices along ``Time`` at which to compute totals
+
+    chunk_size : int, optional
+        The number of cells read at a time
+
+    Returns
+    -------
+    totals : dict of numpy.ndarray
+        The totals, with one entry per time index, keyed by ``mass``,
+        ``energy`` and the name of each tracer
+    """
+    if tracer_names is None:
+        tracer_names = []
+    tracer_names = list(dict.fromkeys(tracer_names))
+    read_tracers = list(tracer_names)
+    if energy and 'temperature' not in read_tracers:
+        read_tracers.append('temperature')
+
+    area_cell = ds_mesh.areaCell.values
+    layer_thickness = _get_layer_thickness(ds)
+    ntimes = len(time_indices)
+    column_mass = np.zeros(ntimes)
+    tracer_totals = {name: np.zeros(ntimes) for name in read_tracers}
+
+    ncells = area_cell.size
+    for time_index, time in enumerate(time_indices):
+        for start in range(0, ncells, chunk_size):
+            cells = slice(start, min(start + chunk_size, ncells))
+            area = area_cell[cells]
+            thickness = _read_cell_chunk(layer_thickness, time, cells)
+            if mass:
+                column_mass[time_index] += np.nansum(
+                    area * np.nansum(thickness, axis=1)
+                )
+            for name in read_tracers:
+                tracer = _read_cell_chunk(ds[name], time, cells)
+                tracer_totals[name][time_index] += np.nansum(
+                    area * np.nansum(thickness * tracer, axis=1)
+                )
+
+    totals = dict()
+    if mass:
+        totals['mass'] = rho_sw * column_mass
+    if energy:
+        totals['energy'] = rho_sw * cp_sw * tracer_totals['temperature']
+    for name in tracer_names:
+        totals[name] = tracer_totals[name]
+    return totals
+
+
+def _read_cell_chunk(da, time, cells):
+    """
+    Read one time slice of a chunk of cells as a (nCells, nVertLevels) array
+    """
+    da = da.isel(Time=time, nCells=cells)
+    return da.transpose('nCells', 'nVertLevels').values
+
+
 def _reduce_dataset_time_dim(ds):
     for time_dim in ['time', 'Time']:
         if time_dim in ds.dims:
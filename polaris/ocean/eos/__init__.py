@@ -4,6 +4,7 @@ import xarray as xr
 from polaris.config import PolarisConfigParser
 
 from .constant import compute_constant_density
+from .gridded import teos10_from_insitu as teos10_from_insitu
 from .linear import compute_linear_density
 from .teos10 import TRACER_ATTRS as TRACER_ATTRS
 from .teos10 import TRACER_CONVENTIONS as TRACER_CONVENTIONS
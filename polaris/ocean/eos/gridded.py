@@ -0,0 +1,155 @@
+import multiprocessing
+
+import gsw
+import numpy as np
+
+# the maximum number of grid points converted together in one latitude band
+MAX_BAND_POINTS = 2**22
+
+# the fields shared with forked worker processes
+_WORKER_FIELDS = None
+
+
+def teos10_from_insitu(
+    in_situ_temp,
+    practical_salinity,
+    depth,
+    lat,
+    lon,
+    workers=1,
+    max_points=MAX_BAND_POINTS,
+):
+    """
+    Convert in-situ temperature and practical salinity on a 3-D lat-lon grid
+    (such as a gridded climatology) to conservative temperature and absolute
+    salinity.
+
+    Pressure is computed once for each depth and latitude.  The conversion is
+    then performed on whole latitude bands of all depths and longitudes,
+    each with at most about ``max_points`` grid points, optionally split
+    across worker processes.  Points where either field is NaN (e.g. land)
+    stay NaN.
+
+    Parameters
+    ----------
+    in_situ_temp : numpy.ndarray
+        In-situ temperature in degC with dimensions ``(depth, lat, lon)``
+
+    practical_salinity : numpy.ndarray
+        Practical salinity at the same points as ``in_situ_temp``
+
+    depth : numpy.ndarray
+        The depth of each level in m (positive down)
+
+    lat : numpy.ndarray
+        The latitude of each row in degrees
+
+    lon : numpy.ndarray
+        The longitude of each column in degrees
+
+    workers : int, optional
+        The number of worker processes
+
+    max_points : int, optional
+        The approximate maximum number of grid points in a latitude band,
+        bounding the memory used by each conversion
+
+    Returns
+    -------
+    conservative_temp : numpy.ndarray
+        Conservative temperature in degC with the same dimensions as
+        ``in_situ_temp``
+
+    absolute_salinity : numpy.ndarray
+        Absolute salinity in g kg-1 with the same dimensions
+    """
+    in_situ_temp = np.asarray(in_situ_temp)
+    practical_salinity = np.asarray(practical_salinity)
+    depth = np.asarray(depth)
+    lat = np.asarray(lat)
+    lon = np.asarray(lon)
+    ndepth, nlat, nlon = in_situ_temp.shape
+    if practical_salinity.shape != in_situ_temp.shape:
+        raise ValueError(
+            'In-situ temperature and practical salinity must have the same '
+            f'shape, got {in_situ_temp.shape} and {practical_salinity.shape}'
+        )
+    if (depth.size, lat.size, lon.size) != in_situ_temp.shape:
+        raise ValueError(
+            'The sizes of depth, lat and lon must match the dimensions '
+            f'{in_situ_temp.shape} of the fields'
+        )
+
+    pressure = gsw.p_from_z(-depth[:, np.newaxis], lat[np.newaxis, :])
+    fields = dict(
+        in_situ_temp=in_situ_temp,
+        practical_salinity=practical_salinity,
+        pressure=pressure,
+        lat=lat,
+        lon=lon,
+    )
+
+    # small enough to bound memory and to give every worker a band
+    band_size = max(
+        1, min(max_points // (ndepth * nlon), -(-nlat // max(workers, 1)))
+    )
+    bands = [
+        (start, min(start + band_size, nlat))
+        for start in range(0, nlat, band_size)
+    ]
+
+    conservative_temp = np.full(in_situ_temp.shape, np.nan)
+    absolute_salinity = np.full(in_situ_temp.shape, np.nan)
+    n_workers = min(workers, len(bands))
+    if n_workers > 1:
+        global _WORKER_FIELDS
+        _WORKER_FIELDS = fields
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(processes=n_workers) as pool:
+            results = pool.imap(_worker_convert_band, bands)
+            for (start, stop), (ct_band, sa_band) in zip(
+                bands, results, strict=True
+            ):
+                conservative_temp[:, start:stop, :] = ct_band
+                absolute_salinity[:, start:stop, :] = sa_band
+        _WORKER_FIELDS = None
+    else:
+        for start, stop in bands:
+            ct_band, sa_band = _convert_band(fields, start, stop)
+            conservative_temp[:, start:stop, :] = ct_band
+            absolute_salinity[:, start:stop, :] = sa_band
+
+    return conservative_temp, absolute_salinity
+
+
+def _convert_band(fields, start, stop):
+    """
+    Convert the rows ``start:stop`` of all depths and longitudes.
+    """
+    in_situ_temp = fields['in_situ_temp'][:, start:stop, :]
+    practical_salinity = fields['practical_salinity'][:, start:stop, :]
+    valid = np.isfinite(in_situ_temp) & np.isfinite(practical_salinity)
+    depth_index, lat_index, lon_index = np.nonzero(valid)
+    lat_index = lat_index + start
+    pressure = fields['pressure'][depth_index, lat_index]
+
+    conservative_temp = np.full(in_situ_temp.shape, np.nan)
+    absolute_salinity = np.full(in_situ_temp.shape, np.nan)
+    absolute_salinity[valid] = gsw.SA_from_SP(
+        practical_salinity[valid],
+        pressure,
+        fields['lon'][lon_index],
+        fields['lat'][lat_index],
+    )
+    conservative_temp[valid] = gsw.CT_from_t(
+        absolute_salinity[valid], in_situ_temp[valid], pressure
+    )
+    return conservative_temp, absolute_salinity
+
+
+def _worker_convert_band(band):
+    """
+    Convert one latitude band in a forked worker.
+    """
+    start, stop = band
+    return _convert_band(_WORKER_FIELDS, start, stop)
@@ -6,12 +6,7 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 from ruamel.yaml import YAML
 
 from polaris.model_step import ModelStep
-from polaris.ocean.conservation import (
-    compute_total_energy,
-    compute_total_mass,
-    compute_total_salt,
-    compute_total_tracer,
-)
+from polaris.ocean.conservation import compute_conservation_totals
 from polaris.ocean.model.ocean_model_files_mixin import OceanModelFilesMixin
 
 if TYPE_CHECKING:
@@ -494,15 +489,17 @@ class OceanModelStep(OceanModelFilesMixin, ModelStep):
             )
         passed_properties = []
         failed_properties = []
+        mesh_filename = os.path.join(
+            self.work_dir, self.get_horiz_mesh_filename()
+        )
+        ds_mesh = None
         for filename, properties in self.properties_to_check.items():
             filename = str(filename)
-            mesh_filename = os.path.join(
-                self.work_dir, self.get_horiz_mesh_filename()
-            )
+            if ds_mesh is None:
+                ds_mesh = self.component.open_model_dataset(
+                    mesh_filename, self.config
+                )
             this_filename = os.path.join(self.work_dir, filename)
-            ds_mesh = self.component.open_model_dataset(
-                mesh_filename, self.config
-            )
             ds = self.component.open_model_dataset(this_filename, self.config)
             if 'tracer conservation' in properties:
                 # All tracers in mpaso_to_omega.yaml
@@ -522,63 +519,65 @@ class OceanModelStep(OceanModelFilesMixin, ModelStep):
                 for tracer in tracers_to_check:
                     if tracer in ds.keys():
                         properties.append(f'tracer conservation-{tracer}')
+
+            # find the totals each property needs so they can all be
+            # computed in one pass over the output
+            totals_needed = []
+            tolerances = []
             for output_property in properties:
                 if output_property == 'mass conservation':
-                    tol = self.config.getfloat(
-                        'ocean', 'mass_conservation_tolerance'
-                    )
-                    relative_error = self._compute_rel_err(
-                        compute_total_mass, ds_mesh=ds_mesh, ds=ds
-                    )
+                    option = 'mass_conservation_tolerance'
+                    total = 'mass'
                 elif output_property == 'salt conservation':
-                    tol = self.config.getfloat(
-                        'ocean', 'salt_conservation_tolerance'
-                    )
-                    relative_error = self._compute_rel_err(
-                        compute_total_mass, ds_mesh, ds
-                    )
-                    relative_error = self._compute_rel_err(
-                        compute_total_salt, ds_mesh, ds
-                    )
+                    option = 'salt_conservation_tolerance'
+                    total = 'salinity'
                 elif output_property.split('-')[0] == 'tracer conservation':
-                    tol = self.config.getfloat(
-                        'ocean', 'tracer_conservation_tolerance'
-                    )
-                    tracer = output_property.split('-')[1]
-                    relative_error = self._compute_rel_err(
-                        compute_total_tracer,
-                        ds_mesh,
-                        ds,
-                        tracer_name=tracer,
-                    )
+                    option = 'tracer_conservation_tolerance'
+                    total = output_property.split('-')[1]
                 elif output_property == 'energy conservation':
-                    tol = self.config.getfloat(
-                        'ocean', 'energy_conservation_tolerance'
-                    )
-                    relative_error = self._compute_rel_err(
-                        compute_total_energy, ds_mesh, ds
-                    )
+                    option = 'energy_conservation_tolerance'
+                    total = 'energy'
                 else:
                     raise ValueError(
                         'Could not find method to execute property check '
                         f'{output_property}'
                     )
+                totals_needed.append(total)
+                tolerances.append(self.config.getfloat('ocean', option))
+            if len(totals_needed) == 0:
+                continue
+
+            totals = compute_conservation_totals(
+                ds_mesh,
+                ds,
+                mass='mass' in totals_needed,
+                energy='energy' in totals_needed,
+                tracer_names=[
+                    total
+                    for total in totals_needed
+                    if total not in ['mass', 'energy']
+                ],
+            )
+
+            for output_property, total, tol in zip(
+                properties, totals_needed, tolerances, strict=True
+            ):
+                init_val, final_val = totals[total]
+                relative_error = abs(final_val - init_val) / (final_val + 1.0)
 
-                result = relative_error < tol
+                result = bool(relative_error < tol)
                 success = success and result
                 checked = True
-                # We already appended log strings for tracer conservation
-                if output_property != 'tracer conservation':
-                    if not result:
-                        failed_properties.append(
-                            f'{output_property} relative error '
-                            f'{relative_error:.3e} exceeds {tol}'
-                        )
-                    else:
-                        passed_properties.append(
-                            f'{output_property} relative error '
-                            f'{relative_error:.3e}'
-                        )
+                if not result:
+                    failed_properties.append(
+                        f'{output_property} relative error '
+                        f'{relative_error:.3e} exceeds {tol}'
+                    )
+                else:
+                    passed_properties.append(
+                        f'{output_property} relative error '
+                        f'{relative_error:.3e}'
+                    )
         if checked and success:
             log_filename = os.path.join(
                 self.work_dir, 'property_check_passed.log'
@@ -781,20 +780,6 @@ class OceanModelStep(OceanModelFilesMixin, ModelStep):
 
         return out_sections, out_option, out_value
 
-    def _compute_rel_err(
-        self,
-        func,
-        ds_mesh,
-        ds,
-        time_index_start=0,
-        time_index_end=-1,
-        **kwargs,
-    ):
-        init_val = func(ds_mesh, ds.isel(Time=time_index_start), **kwargs)
-        final_val = func(ds_mesh, ds.isel(Time=time_index_end), **kwargs)
-        val_change = final_val - init_val
-        return abs(val_change) / (final_val + 1.0)
-
     @staticmethod
     def _warn_not_found(not_found: List[str]) -> None:
         """Warn about options that were not found in the map"""
@@ -33,8 +33,20 @@ class PStarInitStep(Step, ABC):
 
     The outer fixed-point iteration is provided by
     :py:meth:`run_pstar_init`.
+
+    Attributes
+    ----------
+    pstar_active_set : bool
+        Whether outer iterations after the first recompute only the columns
+        that have neither converged nor been frozen by cell snapping.
+        Subclasses may enable this when :py:meth:`init_tracers` and
+        :py:meth:`_build_pstar_coord_ds` compute each column solely from the
+        ``nCells`` entries of the datasets they are given, so that they also
+        work on a subset of the mesh columns.
     """
 
+    pstar_active_set = False
+
     @abstractmethod
     def init_tracers(
         self, ds: xr.Dataset
@@ -206,71 +218,57 @@ class PStarInitStep(Step, ABC):
         # These are assigned inside the loop; initialise to satisfy type
         # checkers and so the post-loop assembly can reference them even if
         # the loop body executes zero times (pseudothickness_iter_count == 0).
-        ds: xr.Dataset = ds_mesh.copy()
         ct: xr.DataArray = xr.DataArray(
             data=np.zeros((1, ncells, nvertlevels), dtype=float),
             dims=['Time', 'nCells', 'nVertLevels'],
         )
-        sa = ct.copy()
-        p_mid = ct.copy()
-        spec_vol = ct.copy()
-        geom_z_inter: xr.DataArray = xr.DataArray(
-            data=np.zeros((1, ncells, nvertlevels + 1), dtype=float),
-            dims=['Time', 'nCells', 'nVertLevelsP1'],
-        )
-        geom_z_mid = ct.copy()
-        geom_water_column_thickness: xr.DataArray = (
-            goal_geom_water_column_thickness.copy()
+        state = dict(
+            ds=ds_mesh.copy(),
+            ct=ct,
+            sa=ct.copy(),
+            p_mid=ct.copy(),
+            spec_vol=ct.copy(),
+            geom_z_inter=xr.DataArray(
+                data=np.zeros((1, ncells, nvertlevels + 1), dtype=float),
+                dims=['Time', 'nCells', 'nVertLevelsP1'],
+            ),
+            geom_z_mid=ct.copy(),
+            geom_z_min=xr.zeros_like(geom_z_bot, dtype=float),
+            geom_z_max=xr.zeros_like(geom_z_bot, dtype=float),
+            geom_water_column_thickness=(
+                goal_geom_water_column_thickness.copy()
+            ),
         )
 
-        for iteration in range(pseudothickness_iter_count):
-            ds = self._build_pstar_coord_ds(
-                ds_mesh, bottom_pressure, surface_pressure
-            )
-            # ds.BottomPressure is the post-partial-cell-snap value
-            adjusted_bottom_pressure = ds.BottomPressure
-
-            ct, sa = self.init_tracers(ds)
-            p_mid = pressure_from_z_tilde(ds.ZTildeMid)
-
-            logger.debug(f'Iteration {iteration}: p_mid = {p_mid}')
+        # the columns recomputed in each iteration; None means all of them
+        active: np.ndarray | None = None
 
-            spec_vol = compute_specvol(
-                config=config,
-                temperature=ct,
-                salinity=sa,
-                pressure=p_mid,
-            )
-            assert isinstance(spec_vol, xr.DataArray)
-
-            min_level_cell = ds.minLevelCell - 1
-            max_level_cell = ds.maxLevelCell - 1
-
-            geom_z_inter, geom_z_mid = geom_height_from_pseudo_height(
-                geom_z_bot=geom_z_bot,
-                h_tilde=ds.PseudoThickness,
-                spec_vol=spec_vol,
-                min_level_cell=min_level_cell,
-                max_level_cell=max_level_cell,
+        for iteration in range(pseudothickness_iter_count):
+            column_state = self._pstar_iteration(
+                ds_mesh=_take_columns(ds_mesh, active),
+                geom_z_bot=_take_columns(geom_z_bot, active),
+                bottom_pressure=_take_columns(bottom_pressure, active),
+                surface_pressure=_take_columns(surface_pressure, active),
+                iteration=iteration,
             )
+            if active is None:
+                state = column_state
+            else:
+                _scatter_state(state, column_state, active, ds_mesh)
 
-            geom_z_min = geom_z_inter.isel(
-                Time=0, nVertLevelsP1=min_level_cell
-            )
-            geom_z_max = geom_z_inter.isel(
-                Time=0, nVertLevelsP1=max_level_cell + 1
-            )
-            geom_water_column_thickness = geom_z_min - geom_z_max
+            # ds.BottomPressure is the post-partial-cell-snap value
+            adjusted_bottom_pressure = column_state['ds'].BottomPressure
+            geom_water_column_thickness = column_state[
+                'geom_water_column_thickness'
+            ]
 
             # convergence check
+            converged = None
             if prev_geom_water_column_thickness is not None:
-                frac_change = (
-                    np.abs(
-                        geom_water_column_thickness
-                        - prev_geom_water_column_thickness
-                    )
-                    / prev_geom_water_column_thickness
-                )
+                frac_change = np.abs(
+                    geom_water_column_thickness
+                    - _take_columns(prev_geom_water_column_thickness, active)
+                ) / _take_columns(prev_geom_water_column_thickness, active)
                 max_frac_change = frac_change.max().item()
 
                 logger.info(
@@ -287,6 +285,9 @@ class PStarInitStep(Step, ABC):
                         f'({water_col_adjust_frac_change_threshold:.6e}).'
                     )
                     break
+                converged = (
+                    frac_change < water_col_adjust_frac_change_threshold
+                ).values
 
             # Snap stagnation check — the convergence check above takes
             # priority so that a perfect initial guess (scaling = 1) exits
@@ -305,22 +306,24 @@ class PStarInitStep(Step, ABC):
             # some columns are still converging, the loop simply runs out of
             # iterations.  Either way, the post-loop report below describes
             # how far the sea floor had to move.
-            if (
-                prev_adjusted_bottom_pressure is not None
-                and (
-                    adjusted_bottom_pressure == prev_adjusted_bottom_pressure
-                ).all()
-            ):
-                logger.info(
-                    f'Iteration {iteration}: cell snapping is holding '
-                    'BottomPressure constant in every column — stopping '
-                    'early.'
-                )
-                break
+            stagnant = None
+            if prev_adjusted_bottom_pressure is not None:
+                stagnant = (
+                    adjusted_bottom_pressure
+                    == _take_columns(prev_adjusted_bottom_pressure, active)
+                ).values
+                if stagnant.all():
+                    logger.info(
+                        f'Iteration {iteration}: cell snapping is holding '
+                        'BottomPressure constant in every column — stopping '
+                        'early.'
+                    )
+                    break
 
             # proportional-ratio update
             scaling_factor = (
-                goal_geom_water_column_thickness / geom_water_column_thickness
+                _take_columns(goal_geom_water_column_thickness, active)
+                / geom_water_column_thickness
             )
             logger.info(
                 f'Iteration {iteration}: '
@@ -328,14 +331,77 @@ class PStarInitStep(Step, ABC):
                 f'max scaling factor = {scaling_factor.max().item():.6f}'
             )
 
-            bottom_pressure = (
-                surface_pressure
-                + (adjusted_bottom_pressure - surface_pressure)
+            column_bottom_pressure = (
+                _take_columns(surface_pressure, active)
+                + (
+                    adjusted_bottom_pressure
+                    - _take_columns(surface_pressure, active)
+                )
                 * scaling_factor
             )
 
-            prev_adjusted_bottom_pressure = adjusted_bottom_pressure
-            prev_geom_water_column_thickness = geom_water_column_thickness
+            if active is None:
+                bottom_pressure = column_bottom_pressure
+                prev_adjusted_bottom_pressure = adjusted_bottom_pressure
+                prev_geom_water_column_thickness = geom_water_column_thickness
+            else:
+                _scatter_columns(
+                    bottom_pressure, column_bottom_pressure, active
+                )
+                _scatter_columns(
+                    prev_adjusted_bottom_pressure,
+                    adjusted_bottom_pressure,
+                    active,
+                )
+                _scatter_columns(
+                    prev_geom_water_column_thickness,
+                    geom_water_column_thickness,
+                    active,
+                )
+
+            if self.pstar_active_set:
+                # Columns that converged, or whose BottomPressure cell
+                # snapping is holding fixed, keep their current state;
+                # later iterations only recompute the remaining columns.
+                done = np.zeros(adjusted_bottom_pressure.size, dtype=bool)
+                if converged is not None:
+                    done |= converged
+                if stagnant is not None:
+                    done |= stagnant
+                if active is None:
+                    active = np.arange(ncells)
+                    state, bottom_pressure = _own_columns(
+                        state, bottom_pressure, ds_mesh
+                    )
+                    prev_adjusted_bottom_pressure = (
+                        adjusted_bottom_pressure.copy(deep=True)
+                    )
+                    prev_geom_water_column_thickness = (
+                        geom_water_column_thickness.copy(deep=True)
+                    )
+                active = active[~done]
+                if active.size == 0:
+                    logger.info(
+                        f'Stopping after iteration {iteration}: every '
+                        'column has converged or is held fixed by cell '
+                        'snapping.'
+                    )
+                    break
+                logger.info(
+                    f'Iteration {iteration}: {active.size} of {ncells} '
+                    'columns remain active.'
+                )
+
+        ds = state['ds']
+        ct = state['ct']
+        sa = state['sa']
+        p_mid = state['p_mid']
+        spec_vol = state['spec_vol']
+        geom_z_inter = state['geom_z_inter']
+        geom_z_mid = state['geom_z_mid']
+        geom_z_min = state['geom_z_min']
+        geom_z_max = state['geom_z_max']
+        geom_water_column_thickness = state['geom_water_column_thickness']
 
         # Report the columns the iteration could not place on the requested
         # bathymetry, however the loop ended (stagnation, or simply running
@@ -421,6 +487,125 @@ class PStarInitStep(Step, ABC):
 
         return ds
 
+    def _pstar_iteration(
+        self,
+        ds_mesh: xr.Dataset,
+        geom_z_bot: xr.DataArray,
+        bottom_pressure: xr.DataArray,
+        surface_pressure: xr.DataArray,
+        iteration: int,
+    ) -> dict:
+        """
+        Compute the p-star coordinate, tracers, specific volume and
+        geometric heights of the given columns for one outer iteration.
+        """
+        config = self.config
+        ds = self._build_pstar_coord_ds(
+            ds_mesh, bottom_pressure, surface_pressure
+        )
+
+        ct, sa = self.init_tracers(ds)
+        p_mid = pressure_from_z_tilde(ds.ZTildeMid)
+
+        self.logger.debug(f'Iteration {iteration}: p_mid = {p_mid}')
+
+        spec_vol = compute_specvol(
+            config=config,
+            temperature=ct,
+            salinity=sa,
+            pressure=p_mid,
+        )
+        assert isinstance(spec_vol, xr.DataArray)
+
+        min_level_cell = ds.minLevelCell - 1
+        max_level_cell = ds.maxLevelCell - 1
+
+        geom_z_inter, geom_z_mid = geom_height_from_pseudo_height(
+            geom_z_bot=geom_z_bot,
+            h_tilde=ds.PseudoThickness,
+            spec_vol=spec_vol,
+            min_level_cell=min_level_cell,
+            max_level_cell=max_level_cell,
+        )
+
+        geom_z_min = geom_z_inter.isel(Time=0, nVertLevelsP1=min_level_cell)
+        geom_z_max = geom_z_inter.isel(
+            Time=0, nVertLevelsP1=max_level_cell + 1
+        )
+        return dict(
+            ds=ds,
+            ct=ct,
+            sa=sa,
+            p_mid=p_mid,
+            spec_vol=spec_vol,
+            geom_z_inter=geom_z_inter,
+            geom_z_mid=geom_z_mid,
+            geom_z_min=geom_z_min,
+            geom_z_max=geom_z_max,
+            geom_water_column_thickness=geom_z_min - geom_z_max,
+        )
+
+
+def _take_columns(data, cells):
+    """
+    Select a subset of mesh columns, or all of them if ``cells`` is None.
+    """
+    if cells is None:
+        return data
+    return data.isel(nCells=cells)
+
+
+def _scatter_columns(full, subset, cells):
+    """
+    Write the values of a subset of mesh columns back into a full-mesh
+    array in place.
+    """
+    index = [slice(None)] * full.ndim
+    index[full.get_axis_num('nCells')] = cells
+    full.values[tuple(index)] = subset.transpose(*full.dims).values
+
+
+def _cell_variables(ds, ds_mesh):
+    """
+    The variables of a p-star dataset computed per column, as opposed to
+    those of the mesh it was built from.
+    """
+    return [
+        var
+        for var in ds.data_vars
+        if 'nCells' in ds[var].dims and var not in ds_mesh.data_vars
+    ]
+
+
+def _own_columns(state, bottom_pressure, ds_mesh):
+    """
+    Make deep copies of the full-mesh state so that results for subsets of
+    columns can be scattered into it without touching the caller's arrays.
+    """
+    owned = dict()
+    for name, value in state.items():
+        if name == 'ds':
+            ds = value.copy()
+            for var in _cell_variables(ds, ds_mesh):
+                ds[var] = ds[var].copy(deep=True)
+            owned[name] = ds
+        else:
+            owned[name] = value.copy(deep=True)
+    return owned, bottom_pressure.copy(deep=True)
+
+
+def _scatter_state(state, column_state, cells, ds_mesh):
+    """
+    Write the results of one outer iteration on a subset of columns back
+    into the full-mesh state.
+    """
+    for name, value in column_state.items():
+        if name == 'ds':
+            for var in _cell_variables(value, ds_mesh):
+                _scatter_columns(state['ds'][var], value[var], cells)
+        else:
+            _scatter_columns(state[name], value, cells)
+
 
 def _report_snapped_bathymetry(
     logger,
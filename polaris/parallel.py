@@ -1,3 +1,6 @@
+import os
+import shlex
+
 from polaris.config import PolarisConfigParser
 
 
@@ -84,3 +87,59 @@ def _set_parallel_system_for_component(
 
     seen_components.add(component_id)
     component.set_parallel_system(config)
+
+
+# the environment variable with the launcher arguments that restrict the
+# parallel runs of a step to the nodes that ``polaris pack`` assigned to it
+PACKED_HOST_ARGS = 'POLARIS_PACKED_HOST_ARGS'
+
+
+def get_host_args(system, hosts):
+    """
+    Get the launcher arguments that restrict parallel runs to some of the
+    nodes of a batch allocation
+
+    Parameters
+    ----------
+    system : str
+        The parallel system, e.g. ``slurm`` or ``pbs``
+
+    hosts : list of str
+        The host names of the nodes
+
+    Returns
+    -------
+    args : list of str
+        The arguments for ``srun`` or ``mpiexec``, or an empty list if
+        runs are not placed on particular nodes on this system
+    """
+    if system == 'slurm':
+        return [f'--nodelist={",".join(hosts)}']
+    if system == 'pbs':
+        return ['--hosts', ','.join(hosts)]
+    return []
+
+
+def add_packed_host_args(args, env=None):
+    """
+    Add the host arguments of a packed step, if any, to a parallel command
+
+    Parameters
+    ----------
+    args : list of str
+        The parallel command, starting with the launcher (e.g. ``srun``)
+
+    env : dict, optional
+        The environment, ``os.environ`` by default
+
+    Returns
+    -------
+    args : list of str
+        The command with any host arguments right after the launcher
+    """
+    if env is None:
+        env = os.environ
+    host_args = shlex.split(env.get(PACKED_HOST_ARGS, ''))
+    if len(host_args) == 0 or len(args) == 0:
+        return list(args)
+    return [args[0]] + host_args + list(args[1:])
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+from mpas_tools.logging import check_call
+
+# the name of the directory within the base work directory where graph files
+# and partitions are cached
+PARTITION_CACHE_DIR = 'partition_cache'
+
+# hashes of files that have already been computed, keyed by absolute path and
+# by the file's modification time and size when hashed
+_HASH_CACHE: dict[str, tuple[tuple[int, int], str]] = dict()
+
+
+def get_file_hash(filename):
+    """
+    Get a hash of the contents of a file, computing it only if the file has
+    not already been hashed by this process or has changed since
+
+    Parameters
+    ----------
+    filename : str
+        The file to hash, following any symlinks
+
+    Returns
+    -------
+    file_hash : str
+        The SHA-256 hash of the file's contents
+    """
+    path = os.path.realpath(filename)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _HASH_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(2**20), b''):
+            sha.update(block)
+    file_hash = sha.hexdigest()
+    _HASH_CACHE[path] = (signature, file_hash)
+    return file_hash
+
+
+def get_cached_graph_filename(cache_dir, mesh_filename, weight_field=None):
+    """
+    Get the name of the cached graph file for a mesh
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of cached graph files and partitions
+
+    mesh_filename : str
+        The MPAS mesh file the graph file is made from
+
+    weight_field : str, optional
+        The name of the variable in the mesh file used as weights
+
+    Returns
+    -------
+    cache_filename : str
+        The cached graph file, which may not exist yet
+    """
+    key = get_file_hash(mesh_filename)
+    if weight_field is not None:
+        key = f'{key}.{weight_field}'
+    return os.path.join(cache_dir, 'graphs', f'{key}.info')
+
+
+def partition_graph(
+    graph_filename, ntasks, executable, logger, cache_dir=None
+):
+    """
+    Partition a graph file for a number of tasks, writing
+    ``<graph_filename>.part.<ntasks>``
+
+    If a cache directory is given, a partition of the same graph for the same
+    number of tasks made by the same executable is copied from the cache if
+    there is one.  Otherwise, the partition that is made is added to the
+    cache.
+
+    Parameters
+    ----------
+    graph_filename : str
+        The graph file to partition
+
+    ntasks : int
+        The number of tasks (partitions)
+
+    executable : str
+        The graph partitioning executable, such as ``gpmetis``
+
+    logger : logging.Logger
+        A logger for output from the executable
+
+    cache_dir : str, optional
+        The directory of cached graph files and partitions
+    """
+    part_filename = f'{graph_filename}.part.{ntasks}'
+    cache_filename = None
+    if cache_dir is not None:
+        key = get_file_hash(graph_filename)
+        cache_filename = os.path.join(
+            cache_dir,
+            'partitions',
+            os.path.basename(executable),
+            f'{key}.part.{ntasks}',
+        )
+        if restore_from_cache(cache_filename, part_filename):
+            logger.info(f'Reusing cached partition for {ntasks} tasks')
+            return
+
+    check_call([executable, graph_filename, f'{ntasks}'], logger)
+
+    if cache_filename is not None:
+        add_to_cache(part_filename, cache_filename)
+
+
+def restore_from_cache(cache_filename, filename):
+    """
+    Copy a file from the cache if it is there
+
+    Parameters
+    ----------
+    cache_filename : str
+        The file in the cache
+
+    filename : str
+        The destination
+
+    Returns
+    -------
+    restored : bool
+        Whether the file was in the cache
+    """
+    if not os.path.exists(cache_filename):
+        return False
+    shutil.copyfile(cache_filename, filename)
+    return True
+
+
+def add_to_cache(filename, cache_filename):
+    """
+    Copy a file into the cache
+
+    The file is copied to a temporary name and then renamed, so steps running
+    at the same time never see a partial file in the cache.
+
+    Parameters
+    ----------
+    filename : str
+        The file to cache
+
+    cache_filename : str
+        The file in the cache
+    """
+    os.makedirs(os.path.dirname(cache_filename), exist_ok=True)
+    tmp_filename = f'{cache_filename}.{uuid.uuid4().hex}.tmp'
+    shutil.copyfile(filename, tmp_filename)
+    os.replace(tmp_filename, cache_filename)
@@ -0,0 +1,143 @@
+import os
+
+from lxml import etree
+
+# indices of processed registries that have already been parsed, keyed by
+# absolute path and by the file's modification time and size when parsed
+_INDEX_CACHE: dict[str, tuple[tuple[int, int], 'RegistryIndex']] = dict()
+
+
+class RegistryIndex:
+    """
+    Name-to-tag lookups for the streams and variables in a processed MPAS
+    registry
+
+    Attributes
+    ----------
+    stream_tags : dict
+        The tag, ``stream`` or ``immutable_stream``, of each stream defined
+        in the registry
+
+    var_tags : dict
+        The tag, ``stream``, ``var_struct``, ``var_array`` or ``var``, of
+        each name that may appear in the contents of a stream
+    """
+
+    def __init__(self, registry):
+        """
+        Index a processed registry
+
+        Parameters
+        ----------
+        registry : lxml.etree.Element
+            The root of the processed registry
+        """
+        self.stream_tags: dict[str, str] = dict()
+        self.var_tags: dict[str, str] = dict()
+
+        tree = next(registry.iter('registry'))
+        streams = next(tree.iter('streams'))
+        for child in streams:
+            if child.tag != 'stream':
+                continue
+            name = child.attrib['name']
+            if child.attrib.get('immutable') == 'true':
+                self.stream_tags.setdefault(name, 'immutable_stream')
+            else:
+                self.stream_tags.setdefault(name, 'stream')
+            self.var_tags.setdefault(name, 'stream')
+
+        # the first match in document order takes precedence, as when the
+        # registry is searched for each name in turn
+        for child in tree:
+            if child.tag != 'var_struct':
+                continue
+            self.var_tags.setdefault(child.attrib['name'], 'var_struct')
+            for grandchild in child:
+                if grandchild.tag in ['var_struct', 'var_array', 'var']:
+                    self.var_tags.setdefault(
+                        grandchild.attrib['name'], grandchild.tag
+                    )
+                if grandchild.tag in ['var_struct', 'var_array']:
+                    for greatgrand in grandchild:
+                        if greatgrand.tag in ['var_array', 'var']:
+                            self.var_tags.setdefault(
+                                greatgrand.attrib['name'], greatgrand.tag
+                            )
+
+    def get_stream_tag(self, stream):
+        """
+        Get the xml tag, ``stream`` or ``immutable_stream``, for a stream
+
+        Parameters
+        ----------
+        stream : str
+            The name of the stream
+
+        Returns
+        -------
+        tag : str
+            The tag; streams not in the registry can't be immutable streams,
+            so they are ``stream``
+        """
+        return self.stream_tags.get(stream, 'stream')
+
+    def get_var_tag(self, variable):
+        """
+        Get the xml tag -- ``stream``, ``var_struct``, ``var_array`` or
+        ``var`` -- for a variable
+
+        Parameters
+        ----------
+        variable : str
+            The name of a stream, variable structure, variable array or
+            variable
+
+        Returns
+        -------
+        tag : str
+            The tag
+        """
+        tag = self.var_tags.get(variable)
+        if tag is None:
+            raise ValueError(
+                f'Could not find {variable} in preprocessed registry'
+            )
+        return tag
+
+
+def read(processed_registry_filename):
+    """
+    Get the index of a processed registry, parsing the file only if it has
+    not already been parsed by this process or has changed since
+
+    Parameters
+    ----------
+    processed_registry_filename : str
+        The processed registry file
+
+    Returns
+    -------
+    index : polaris.registry.RegistryIndex
+        The index of streams and variables in the registry
+    """
+    path = os.path.abspath(processed_registry_filename)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _INDEX_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(path, 'r') as reg_file:
+        registry_string = reg_file.read()
+    registry_string = registry_string.lstrip('\n')
+    index = RegistryIndex(etree.fromstring(registry_string))
+    _INDEX_CACHE[path] = (signature, index)
+    return index
+
+
+def clear_cache():
+    """
+    Forget the indices of all registries parsed so far
+    """
+    _INDEX_CACHE.clear()
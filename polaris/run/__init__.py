@@ -3,6 +3,10 @@ import pickle as pickle
 
 from polaris.config import PolarisConfigParser as PolarisConfigParser
 
+# config files that have already been parsed by setup_config(), keyed by
+# absolute path and by the file's modification time and size when parsed
+_CONFIG_CACHE: dict[str, tuple[tuple[int, int], PolarisConfigParser]] = dict()
+
 
 def unpickle_suite(suite_name):
     """
@@ -37,6 +41,14 @@ def setup_config(base_work_dir, config_filepath):
     """
     Set up the config object from the config file
 
+    The config file is only read and parsed the first time it is needed in
+    this process or if it has changed since; otherwise, a copy of the config
+    that was parsed before is returned.  Many steps share the config file of
+    their task, so this saves parsing the same file again for each step.
+    Only the parsed file is cached: the copy is combined (with interpolation
+    and absolute paths) when it is first used, because relative paths in the
+    config are made absolute relative to the current working directory.
+
     Parameters
     ----------
     base_work_dir : str
@@ -48,15 +60,36 @@ def setup_config(base_work_dir, config_filepath):
     Returns
     -------
     config : polaris.config.PolarisConfigParser
-        The config object
+        The config object, which the caller is free to modify
     """
-    config_filename = os.path.join(base_work_dir, config_filepath)
-    config = PolarisConfigParser()
-    config.add_from_file(config_filename)
-    config.filepath = config_filepath
+    config_filename = os.path.abspath(
+        os.path.join(base_work_dir, config_filepath)
+    )
+    stat = os.stat(config_filename)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _CONFIG_CACHE.get(config_filename)
+    if cached is not None and cached[0] == signature:
+        parsed_config = cached[1]
+    else:
+        parsed_config = PolarisConfigParser()
+        parsed_config.add_from_file(config_filename)
+        _CONFIG_CACHE[config_filename] = (signature, parsed_config)
+
+    config = PolarisConfigParser(filepath=config_filepath)
+    # appending makes a deep copy of the parsed config files, so changes to
+    # the config returned here don't affect the cached config
+    config.append(parsed_config)
     return config
 
 
+def clear_config_cache():
+    """
+    Forget the config files parsed by :py:func:`polaris.run.setup_config()`
+    so far
+    """
+    _CONFIG_CACHE.clear()
+
+
 def load_dependencies(step):
     """
     Load each dependency from its pickle file to pick up changes that may have
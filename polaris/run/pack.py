@@ -0,0 +1,253 @@
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+from mpas_tools.logging import LoggingContext
+
+from polaris.job import write_job_script
+from polaris.job.packing import (
+    NodePool,
+    StepLauncher,
+    collect_steps,
+    get_node_hosts,
+    read_tasks,
+    run_packed_steps,
+)
+from polaris.parallel import set_parallel_systems
+from polaris.run import setup_config
+from polaris.run.serial import (
+    _read_baseline_status_from_logs,
+    _read_property_status_from_logs,
+    end_color,
+    error_str,
+    fail_str,
+    pass_str,
+    start_time_color,
+)
+
+
+def run_packed_tasks(work_dirs, nodes=None, poll_interval=5.0):
+    """
+    Run the steps of several tasks or suites concurrently, packed onto the
+    nodes of the current batch allocation
+
+    Parameters
+    ----------
+    work_dirs : list of str
+        Task work directories, base work directories with a single suite or
+        suite pickle files
+
+    nodes : int, optional
+        The number of nodes of the allocation to pack steps onto.  The default
+        is all of them.
+
+    poll_interval : float, optional
+        The time in seconds between checks for finished steps
+    """
+    tasks = _read_all_tasks(work_dirs)
+    system, available_resources = _get_available_resources(tasks)
+    if nodes is None:
+        nodes = available_resources['nodes']
+    elif nodes > available_resources['nodes']:
+        raise ValueError(
+            f'{nodes} nodes were requested but the allocation only has '
+            f'{available_resources["nodes"]}.'
+        )
+    pool = NodePool(
+        nodes=nodes,
+        cores_per_node=available_resources['cores_per_node'],
+        gpus_per_node=available_resources['gpus_per_node'],
+    )
+
+    # steps are launched on the nodes they are assigned to
+    hosts = get_node_hosts(system)
+    if system in ['slurm', 'pbs'] and len(hosts) < nodes:
+        raise ValueError(
+            f'{nodes} nodes were requested but only {len(hosts)} hosts were '
+            f'found in the allocation.'
+        )
+    hosts = hosts[:nodes]
+    launcher = StepLauncher(system=system, hosts=hosts)
+
+    steps = collect_steps(tasks)
+
+    with LoggingContext('polaris_pack') as stdout_logger:
+        os.environ['PYTHONUNBUFFERED'] = '1'
+        stdout_logger.info(
+            f'Packing {len(steps)} steps from {len(tasks)} tasks onto '
+            f'{nodes} node(s)'
+        )
+        start = time.time()
+        run_packed_steps(
+            steps,
+            pool,
+            stdout_logger,
+            launch=launcher,
+            poll_interval=poll_interval,
+        )
+        total_time = time.time() - start
+        failures = _log_task_results(stdout_logger, tasks, steps)
+
+        total_time_str = str(timedelta(seconds=round(total_time)))
+        stdout_logger.info(
+            f'Total runtime: {start_time_color}{total_time_str}{end_color}'
+        )
+        if failures == 0:
+            stdout_logger.info('PASS: All passed successfully!')
+        else:
+            message = '1 task' if failures == 1 else f'{failures} tasks'
+            stdout_logger.error(f'FAIL: {message} failed, see above.')
+            sys.exit(1)
+
+
+def write_packed_job_script(work_dirs, nodes, poll_interval=5.0):
+    """
+    Write a job script that runs ``polaris pack`` on the given tasks or
+    suites in a single batch allocation
+
+    Parameters
+    ----------
+    work_dirs : list of str
+        Task work directories, base work directories with a single suite or
+        suite pickle files
+
+    nodes : int
+        The number of nodes to request
+
+    poll_interval : float, optional
+        The time in seconds between checks for finished steps
+    """
+    tasks = _read_all_tasks(work_dirs)
+    task = next(iter(tasks.values()))
+    config = setup_config(task.base_work_dir, f'{task.component.name}.cfg')
+    if config.has_option('build', 'machine'):
+        machine = config.get('build', 'machine')
+    else:
+        machine = None
+
+    dirs = ' '.join(os.path.abspath(work_dir) for work_dir in work_dirs)
+    run_command = (
+        f'source load_polaris_env.sh\n'
+        f'polaris pack {dirs} --nodes {nodes} '
+        f'--poll_interval {poll_interval:g}'
+    )
+    work_dir = os.getcwd()
+    script_filename = os.path.join(work_dir, 'job_script.pack.sh')
+    write_job_script(
+        config=config,
+        machine=machine,
+        work_dir=work_dir,
+        nodes=nodes,
+        suite='pack',
+        script_filename=script_filename,
+        run_command=run_command,
+    )
+    print(f'Wrote {script_filename}')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run the steps of several tasks or suites concurrently '
+        'in one batch allocation',
+        prog='polaris pack',
+    )
+    parser.add_argument(
+        'work_dirs',
+        nargs='+',
+        help='Task work directories, base work directories with a single '
+        'suite or suite pickle files.',
+    )
+    parser.add_argument(
+        '-n',
+        '--nodes',
+        dest='nodes',
+        type=int,
+        help='The number of nodes to pack steps onto.  By default, all nodes '
+        'of the current allocation.  Required with --job_script.',
+    )
+    parser.add_argument(
+        '--job_script',
+        dest='job_script',
+        action='store_true',
+        help='Write job_script.pack.sh to run this command in a batch job '
+        'instead of running the steps now.',
+    )
+    parser.add_argument(
+        '--poll_interval',
+        dest='poll_interval',
+        type=float,
+        default=5.0,
+        help='The time in seconds between checks for finished steps.',
+    )
+    args = parser.parse_args(sys.argv[2:])
+
+    if args.job_script:
+        if args.nodes is None:
+            parser.error('--nodes is required with --job_script')
+        write_packed_job_script(
+            args.work_dirs, args.nodes, poll_interval=args.poll_interval
+        )
+    else:
+        run_packed_tasks(
+            args.work_dirs, nodes=args.nodes, poll_interval=args.poll_interval
+        )
+
+
+def _read_all_tasks(work_dirs):
+    """
+    Read the tasks from all work directories, each task once
+    """
+    tasks = dict()
+    for work_dir in work_dirs:
+        for path, task in read_tasks(work_dir).items():
+            tasks.setdefault(path, task)
+    if len(tasks) == 0:
+        raise ValueError('No tasks were found to pack.')
+    return tasks
+
+
+def _get_available_resources(tasks):
+    """
+    Get the parallel system and the resources of the allocation from the
+    first task's component
+    """
+    task = next(iter(tasks.values()))
+    component = task.component
+    common_config = setup_config(task.base_work_dir, f'{component.name}.cfg')
+    set_parallel_systems(tasks, common_config)
+    if common_config.has_option('parallel', 'system'):
+        system = common_config.get('parallel', 'system')
+    else:
+        system = 'single_node'
+    return system, component.get_available_resources()
+
+
+def _log_task_results(stdout_logger, tasks, steps):
+    """
+    Log whether each task's steps ran successfully and passed their checks,
+    returning the number of tasks that failed
+    """
+    failures = 0
+    stdout_logger.info('Task results:')
+    for path, task in tasks.items():
+        task_steps = [step for step in steps.values() if path in step.tasks]
+        if any(step.status != 'succeeded' for step in task_steps):
+            stdout_logger.error(f'{error_str} {path}')
+            failures += 1
+            continue
+        checks_passed = True
+        for step in task.steps.values():
+            for read_status in [
+                _read_baseline_status_from_logs,
+                _read_property_status_from_logs,
+            ]:
+                if read_status(step.work_dir) is False:
+                    checks_passed = False
+        if checks_passed:
+            stdout_logger.info(f'{pass_str} {path}')
+        else:
+            stdout_logger.error(f'{fail_str} {path}')
+            failures += 1
+    return failures
@@ -4,6 +4,7 @@ import pickle
 import shutil
 import sys
 import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List
 
 from polaris import Task, provenance
@@ -241,15 +242,21 @@ def setup_tasks(
     _expand_and_mark_cached_steps(tasks, cached_steps)
 
     print('Setting up tasks:')
-    for path, task in tasks.items():
-        setup_task(
-            path,
-            task,
-            machine,
-            work_dir,
-            baseline_dir,
-            cached_steps=cached_steps[path],
+    workers = basic_config.getint('setup', 'setup_workers')
+    if workers > 1 and len(tasks) > 1:
+        _setup_tasks_concurrently(
+            tasks, machine, work_dir, baseline_dir, cached_steps, workers
         )
+    else:
+        for path, task in tasks.items():
+            setup_task(
+                path,
+                task,
+                machine,
+                work_dir,
+                baseline_dir,
+                cached_steps=cached_steps[path],
+            )
 
     _check_dependencies(tasks)
 
@@ -327,27 +334,13 @@ def setup_task(path, task, machine, work_dir, baseline_dir, cached_steps):
         identified by a list of subdirectories in the component
     """
 
-    print(f'  {path}')
-
-    task_dir = os.path.join(work_dir, path)
-    try:
-        os.makedirs(task_dir)
-    except FileExistsError:
-        pass
-    task.work_dir = task_dir
-    task.base_work_dir = work_dir
-
-    # add the baseline directory for this task
-    if baseline_dir is not None:
-        task.baseline_dir = os.path.join(baseline_dir, path)
-
-    if len(cached_steps) > 0:
-        print_steps = ' '.join(cached_steps)
-        print(f'    steps with cached outputs: {print_steps}')
+    task_dir = _prepare_task(path, task, work_dir, baseline_dir, cached_steps)
 
     # iterate over steps
     for step in task.steps.values():
-        _setup_step(task, step, work_dir, baseline_dir, task_dir)
+        _symlink_step(task, step, work_dir, task_dir)
+        if not step.setup_complete:
+            _setup_step(step, work_dir, baseline_dir)
 
     # wait until we've set up all the steps before pickling because steps may
     # need other steps to be set up
@@ -355,55 +348,9 @@ def setup_task(path, task, machine, work_dir, baseline_dir, cached_steps):
         if step.setup_complete:
             # this is a shared step that has already been set up
             continue
+        _finalize_step(step, machine)
 
-        # pickle the task and step for use at runtime
-        pickle_filename = os.path.join(step.work_dir, 'step.pickle')
-        with open(pickle_filename, 'wb') as handle:
-            pickle.dump(step, handle, protocol=pickle.HIGHEST_PROTOCOL)
-
-        _symlink_load_script(step.work_dir)
-
-        if machine is not None:
-            cores = step.cpus_per_task * step.ntasks
-            min_cores = step.min_cpus_per_task * step.min_tasks
-            gpus = step.gpus_per_task * step.ntasks
-            min_gpus = step.min_gpus_per_task * step.min_tasks
-            write_job_script(
-                config=step.config,
-                machine=machine,
-                target_cores=cores,
-                min_cores=min_cores,
-                target_gpus=gpus,
-                min_gpus=min_gpus,
-                work_dir=step.work_dir,
-            )
-        step.setup_complete = True
-
-    # pickle the task and step for use at runtime
-    pickle_filename = os.path.join(task.work_dir, 'task.pickle')
-    with open(pickle_filename, 'wb') as handle:
-        suite = {
-            'name': 'task',
-            'tasks': {task.path: task},
-            'work_dir': task.work_dir,
-        }
-        pickle.dump(suite, handle, protocol=pickle.HIGHEST_PROTOCOL)
-
-    _symlink_load_script(task_dir)
-
-    if machine is not None:
-        max_cores, max_of_min_cores, max_gpus, max_of_min_gpus = (
-            _get_required_resources({path: task})
-        )
-        write_job_script(
-            config=task.config,
-            machine=machine,
-            target_cores=max_cores,
-            min_cores=max_of_min_cores,
-            target_gpus=max_gpus,
-            min_gpus=max_of_min_gpus,
-            work_dir=task_dir,
-        )
+    _finalize_task(path, task, machine, task_dir)
 
 
 def main():
@@ -1034,20 +981,144 @@ def _add_tasks_by_name(task_list, all_tasks, cached, tasks, cached_steps):
             tasks[path] = all_tasks[path]
 
 
-def _setup_step(task, step, work_dir, baseline_dir, task_dir):
-    """Set up a step in a task"""
+def _setup_tasks_concurrently(
+    tasks, machine, work_dir, baseline_dir, cached_steps, workers
+):
+    """
+    Set up tasks with a pool of worker threads, which hides the latency of
+    creating many directories, symlinks and pickles on shared filesystems
+
+    Each step, including steps shared between tasks, is set up once.  A step
+    is set up only after its dependencies and the steps before it in its
+    task, so each ``setup()`` sees the same state as in a serial setup.
+    Steps are pickled only once all steps have been set up, and tasks once
+    all their steps have been pickled.
+    """
+    task_dirs = dict()
+    steps = dict()
+    predecessors: Dict[int, List[int]] = dict()
+    for path, task in tasks.items():
+        print(f'  {path}')
+        _print_cached_steps(cached_steps[path])
+        task_dir = os.path.join(work_dir, path)
+        task.work_dir = task_dir
+        task.base_work_dir = work_dir
+        if baseline_dir is not None:
+            task.baseline_dir = os.path.join(baseline_dir, path)
+        task_dirs[path] = task_dir
+
+        previous = None
+        for step in task.steps.values():
+            if step.setup_complete:
+                continue
+            key = id(step)
+            if key not in steps:
+                steps[key] = step
+                predecessors[key] = [] if previous is None else [previous]
+            previous = key
+
+    for key, step in steps.items():
+        step.work_dir = os.path.join(work_dir, step.path)
+        step.base_work_dir = work_dir
+        predecessors[key].extend(
+            id(dependency)
+            for dependency in step.dependencies.values()
+            if id(dependency) in steps
+        )
+
+    def setup_step(key):
+        _setup_step(steps[key], work_dir, baseline_dir)
+
+    def finalize_step(key):
+        _finalize_step(steps[key], machine)
+
+    def finalize_task(path):
+        task = tasks[path]
+        task_dir = task_dirs[path]
+        os.makedirs(task_dir, exist_ok=True)
+        for step in task.steps.values():
+            _symlink_step(task, step, work_dir, task_dir)
+        _finalize_task(path, task, machine, task_dir)
+
+    _run_concurrently(predecessors, setup_step, workers)
+    _run_concurrently({key: [] for key in steps}, finalize_step, workers)
+    _run_concurrently({path: [] for path in tasks}, finalize_task, workers)
 
-    # make the step directory if it doesn't exist
-    step_dir = os.path.join(work_dir, step.path)
 
+def _run_concurrently(predecessors, func, workers):
+    """
+    Call a function on each key in a pool of worker threads, each only once
+    the calls on its predecessors have finished
+    """
+    remaining = {key: set(before) for key, before in predecessors.items()}
+    done: set = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = dict()
+
+        def submit_ready():
+            for key in list(remaining):
+                if remaining[key] <= done:
+                    del remaining[key]
+                    futures[executor.submit(func, key)] = key
+
+        submit_ready()
+        while len(futures) > 0:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = futures.pop(future)
+                # raise any exception from the worker
+                future.result()
+                done.add(key)
+            submit_ready()
+
+    if len(remaining) > 0:
+        raise ValueError(
+            'Steps could not be set up because their dependencies form a '
+            'cycle.'
+        )
+
+
+def _prepare_task(path, task, work_dir, baseline_dir, cached_steps):
+    """Make the work directory for a task, returning its path"""
+    print(f'  {path}')
+
+    task_dir = os.path.join(work_dir, path)
+    try:
+        os.makedirs(task_dir)
+    except FileExistsError:
+        pass
+    task.work_dir = task_dir
+    task.base_work_dir = work_dir
+
+    # add the baseline directory for this task
+    if baseline_dir is not None:
+        task.baseline_dir = os.path.join(baseline_dir, path)
+
+    _print_cached_steps(cached_steps)
+    return task_dir
+
+
+def _print_cached_steps(cached_steps):
+    """Print which steps of a task read their outputs from the cache"""
+    if len(cached_steps) > 0:
+        print_steps = ' '.join(cached_steps)
+        print(f'    steps with cached outputs: {print_steps}')
+
+
+def _symlink_step(task, step, work_dir, task_dir):
+    """Make a symlink in a task to one of its steps, if requested"""
     if step.name in task.step_symlinks:
+        step_dir = os.path.join(work_dir, step.path)
         symlink(
             step_dir, os.path.join(task_dir, task.step_symlinks[step.name])
         )
 
-    if step.setup_complete:
-        # this is a shared step that has already been set up
-        return
+
+def _setup_step(step, work_dir, baseline_dir):
+    """Set up a step"""
+
+    # make the step directory if it doesn't exist
+    step_dir = os.path.join(work_dir, step.path)
     try:
         os.makedirs(step_dir)
     except FileExistsError:
@@ -1067,6 +1138,61 @@ def _setup_step(task, step, work_dir, baseline_dir, task_dir):
     step.process_inputs_and_outputs()
 
 
+def _finalize_step(step, machine):
+    """Pickle a step that has been set up and write its job script"""
+    # pickle the task and step for use at runtime
+    pickle_filename = os.path.join(step.work_dir, 'step.pickle')
+    with open(pickle_filename, 'wb') as handle:
+        pickle.dump(step, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    _symlink_load_script(step.work_dir)
+
+    if machine is not None:
+        cores = step.cpus_per_task * step.ntasks
+        min_cores = step.min_cpus_per_task * step.min_tasks
+        gpus = step.gpus_per_task * step.ntasks
+        min_gpus = step.min_gpus_per_task * step.min_tasks
+        write_job_script(
+            config=step.config,
+            machine=machine,
+            target_cores=cores,
+            min_cores=min_cores,
+            target_gpus=gpus,
+            min_gpus=min_gpus,
+            work_dir=step.work_dir,
+        )
+    step.setup_complete = True
+
+
+def _finalize_task(path, task, machine, task_dir):
+    """Pickle a task whose steps have been set up and write its job script"""
+    # pickle the task and step for use at runtime
+    pickle_filename = os.path.join(task.work_dir, 'task.pickle')
+    with open(pickle_filename, 'wb') as handle:
+        suite = {
+            'name': 'task',
+            'tasks': {task.path: task},
+            'work_dir': task.work_dir,
+        }
+        pickle.dump(suite, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    _symlink_load_script(task_dir)
+
+    if machine is not None:
+        max_cores, max_of_min_cores, max_gpus, max_of_min_gpus = (
+            _get_required_resources({path: task})
+        )
+        write_job_script(
+            config=task.config,
+            machine=machine,
+            target_cores=max_cores,
+            min_cores=max_of_min_cores,
+            target_gpus=max_gpus,
+            min_gpus=max_of_min_gpus,
+            work_dir=task_dir,
+        )
+
+
 def _symlink_load_script(work_dir):
     """make a symlink to the script for loading the polaris env."""
     if 'POLARIS_LOAD_SCRIPT' in os.environ:
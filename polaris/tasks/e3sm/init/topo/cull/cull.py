@@ -1,20 +1,36 @@
+import hashlib
+import multiprocessing
 import os
 
+import numpy as np
 import xarray as xr
-from mpas_tools.io import open_dataset, write_netcdf
-from mpas_tools.logging import check_call
+from mpas_tools.io import open_dataset
 from mpas_tools.mesh.conversion import cull
 from mpas_tools.mesh.creation.sort_mesh import sort_mesh
-from mpas_tools.mesh.cull import map_culled_to_base
-from pyremap import MpasCellMeshDescriptor
+from scipy.spatial import cKDTree
 
 from polaris import Step
+from polaris.cdf5 import write_cdf5, write_netcdf
 from polaris.mesh.reconstruct import compute_reconstruction_weights
 from polaris.model_step import make_graph_file
+from polaris.partition import add_to_cache, get_file_hash, restore_from_cache
 
 CULL_PREFIXES = ['ocean', 'ocean_no_cavities', 'land']
 SCRIP_PREFIXES = ['ocean', 'ocean_no_cavities', 'land']
 
+CULL_VARS = {
+    'ocean': 'oceanCullMask',
+    'ocean_no_cavities': 'oceanNoCavitiesCullMask',
+    'land': 'landCullMask',
+}
+
+# the name of the directory within the base work directory where maps from
+# culled meshes to their base meshes are cached
+CULLED_MAP_CACHE_DIR = 'culled_map_cache'
+
+# the step, base mesh and cull masks shared with forked workers
+_WORKER_CULL = None
+
 
 class CullMeshStep(Step):
     """
@@ -126,10 +142,65 @@ class CullMeshStep(Step):
         Run this step of the test case
         """
         super().run()
-        for prefix in CULL_PREFIXES:
-            self._cull_mesh(prefix)
+        logger = self.logger
 
-    def _cull_mesh(self, prefix):
+        # the base mesh and the cull masks are loaded once and shared by all
+        # targets
+        with open_dataset('base_mesh.nc') as ds:
+            ds_base_mesh = ds.load()
+        with open_dataset('cull_masks.nc') as ds:
+            ds_cull_masks = ds.load()
+
+        section = self.config['cull_mesh']
+        if section.getboolean('cache_culled_maps'):
+            map_cache_dir = os.path.join(
+                self.base_work_dir, CULLED_MAP_CACHE_DIR
+            )
+            base_mesh_hash = get_file_hash('base_mesh.nc')
+        else:
+            map_cache_dir = None
+            base_mesh_hash = None
+
+        n_workers = min(self.cpus_per_task, len(CULL_PREFIXES))
+        query_workers = max(1, self.cpus_per_task // n_workers)
+        logger.info(
+            f'Culling {len(CULL_PREFIXES)} meshes with {n_workers} workers'
+        )
+
+        global _WORKER_CULL
+        _WORKER_CULL = dict(
+            step=self,
+            ds_base_mesh=ds_base_mesh,
+            ds_cull_masks=ds_cull_masks,
+            query_workers=query_workers,
+            map_cache_dir=map_cache_dir,
+            base_mesh_hash=base_mesh_hash,
+        )
+        try:
+            if n_workers > 1:
+                ctx = multiprocessing.get_context('fork')
+                with ctx.Pool(processes=n_workers) as pool:
+                    results = [
+                        pool.apply_async(_worker_cull_mesh, (prefix,))
+                        for prefix in CULL_PREFIXES
+                    ]
+                    for result in results:
+                        result.get()
+            else:
+                for prefix in CULL_PREFIXES:
+                    _worker_cull_mesh(prefix)
+        finally:
+            _WORKER_CULL = None
+
+    def _cull_mesh(
+        self,
+        prefix,
+        ds_base_mesh,
+        ds_cull_masks,
+        query_workers,
+        map_cache_dir,
+        base_mesh_hash,
+    ):
         """
         Cull and sort the mesh to the region specified by the prefix. For
         ocean regions, also produce a graph file and vector-reconstruction
@@ -137,21 +208,12 @@ class CullMeshStep(Step):
         """
         logger = self.logger
 
-        cull_vars = {
-            'ocean': 'oceanCullMask',
-            'ocean_no_cavities': 'oceanNoCavitiesCullMask',
-            'land': 'landCullMask',
-        }
-
-        ds_cull_masks = open_dataset('cull_masks.nc')
-        cull_mask = ds_cull_masks[cull_vars[prefix]]
+        cull_mask = ds_cull_masks[CULL_VARS[prefix]]
         ds_mask = xr.Dataset()
         ds_mask['regionCellMasks'] = cull_mask.expand_dims(
             dim='nRegions', axis=1
         )
 
-        ds_base_mesh = open_dataset('base_mesh.nc')
-
         ds_culled_mesh = cull(
             dsIn=ds_base_mesh,
             dsMask=ds_mask,
@@ -165,14 +227,21 @@ class CullMeshStep(Step):
         out_filename = f'culled_{prefix}_mesh.nc'
         write_netcdf(ds_culled_mesh, out_filename)
         if prefix in SCRIP_PREFIXES:
-            self._create_scrip_file(mesh_filename=out_filename, prefix=prefix)
+            self._create_scrip_file(
+                ds_mesh=ds_culled_mesh,
+                scrip_filename=f'culled_{prefix}_mesh.scrip.nc',
+                prefix=prefix,
+            )
 
-        ds_map_culled_to_base = map_culled_to_base(
-            ds_base=ds_base_mesh,
-            ds_culled=ds_culled_mesh,
-            workers=self.cpus_per_task,
+        self._write_map_culled_to_base(
+            prefix=prefix,
+            ds_base_mesh=ds_base_mesh,
+            ds_culled_mesh=ds_culled_mesh,
+            cull_mask=cull_mask.values,
+            query_workers=query_workers,
+            map_cache_dir=map_cache_dir,
+            base_mesh_hash=base_mesh_hash,
         )
-        write_netcdf(ds_map_culled_to_base, f'{prefix}_map_culled_to_base.nc')
 
         if prefix.startswith('ocean'):
             # we need to make the graph file after sorting
@@ -192,32 +261,295 @@ class CullMeshStep(Step):
                 ds_weights, f'culled_{prefix}_reconstruction_weights.nc'
             )
 
-    def _create_scrip_file(self, mesh_filename, prefix):
+    def _write_map_culled_to_base(
+        self,
+        prefix,
+        ds_base_mesh,
+        ds_culled_mesh,
+        cull_mask,
+        query_workers,
+        map_cache_dir,
+        base_mesh_hash,
+    ):
+        """
+        Write the map from a culled mesh to the base mesh, reusing a cached
+        map for the same base mesh and cull mask if there is one
+        """
+        logger = self.logger
+        map_filename = f'{prefix}_map_culled_to_base.nc'
+        cache_filename = None
+        if map_cache_dir is not None:
+            cache_filename = get_cached_culled_map_filename(
+                map_cache_dir, base_mesh_hash, cull_mask
+            )
+            if restore_from_cache(cache_filename, map_filename):
+                logger.info(f'Reusing cached map for culled {prefix} mesh')
+                return
+
+        ds_map = map_culled_to_base_from_mask(
+            ds_base=ds_base_mesh, ds_culled=ds_culled_mesh, cull_mask=cull_mask
+        )
+        if ds_map is None:
+            logger.info(
+                f'The culled {prefix} mesh does not match its cull mask, '
+                f'so it is mapped to the base mesh with KD-trees'
+            )
+            ds_map = map_culled_to_base(
+                base_trees=build_base_mesh_trees(ds_base_mesh),
+                ds_culled=ds_culled_mesh,
+                workers=query_workers,
+            )
+        write_netcdf(ds_map, map_filename)
+
+        if cache_filename is not None:
+            add_to_cache(map_filename, cache_filename)
+
+    def _create_scrip_file(self, ds_mesh, scrip_filename, prefix):
         """
         Create a SCRIP file from a culled MPAS mesh.
         """
         logger = self.logger
         logger.info(f'Create SCRIP file for culled {prefix} mesh')
 
-        scrip_filename = mesh_filename.replace('.nc', '.scrip.nc')
-        netcdf4_filename = mesh_filename.replace('.nc', '.scrip.netcdf4.nc')
         mesh_name = f'{self.base_mesh_step.mesh_name}_{prefix}'
+        ds_scrip = get_mpas_cell_scrip_dataset(ds_mesh, mesh_name)
+
+        # the SCRIP file is written directly in the CDF-5 format, since
+        # writing it as NetCDF4 and converting with ncks is slow
+        write_cdf5(ds_scrip, scrip_filename)
+
+        logger.info('  Done.')
+
+
+def build_base_mesh_trees(ds_base_mesh):
+    """
+    Build KD-trees of the cell, edge and vertex locations of a base mesh that
+    can be shared when mapping several culled meshes back to the base mesh
+
+    Parameters
+    ----------
+    ds_base_mesh : xarray.Dataset
+        The base MPAS mesh
+
+    Returns
+    -------
+    base_trees : dict
+        KD-trees of the Cartesian coordinates of cells, edges and vertices,
+        with keys ``'Cell'``, ``'Edge'`` and ``'Vertex'``
+    """
+    base_trees = dict()
+    for suffix in ['Cell', 'Edge', 'Vertex']:
+        points = np.stack(
+            [ds_base_mesh[f'{coord}{suffix}'].values for coord in 'xyz'],
+            axis=1,
+        )
+        base_trees[suffix] = cKDTree(points)
+    return base_trees
 
-        descriptor = MpasCellMeshDescriptor(
-            filename=mesh_filename,
-            mesh_name=mesh_name,
+
+def map_culled_to_base(base_trees, ds_culled, workers=1):
+    """
+    Find the base-mesh index of each cell, edge and vertex of a culled mesh
+
+    Parameters
+    ----------
+    base_trees : dict
+        KD-trees of the base mesh from
+        :py:func:`polaris.tasks.e3sm.init.topo.cull.cull.build_base_mesh_trees`
+
+    ds_culled : xarray.Dataset
+        A mesh culled from the base mesh
+
+    workers : int, optional
+        The number of threads used to query the KD-trees
+
+    Returns
+    -------
+    ds_map_culled_to_base : xarray.Dataset
+        A dataset with ``mapCulledToBaseCell``, ``mapCulledToBaseEdge`` and
+        ``mapCulledToBaseVertex``, the zero-based index in the base mesh of
+        each cell, edge and vertex of the culled mesh
+    """
+    ds_map_culled_to_base = xr.Dataset()
+    for dim, suffix in [
+        ('nCells', 'Cell'),
+        ('nEdges', 'Edge'),
+        ('nVertices', 'Vertex'),
+    ]:
+        points = np.stack(
+            [ds_culled[f'{coord}{suffix}'].values for coord in 'xyz'],
+            axis=1,
+        )
+        _, culled_to_base = base_trees[suffix].query(points, workers=workers)
+        ds_map_culled_to_base[f'mapCulledToBase{suffix}'] = (
+            (dim,),
+            culled_to_base,
         )
-        descriptor.to_scrip(netcdf4_filename)
-
-        # writing directly in NETCDF3_64BIT_DATA proved prohibitively slow
-        # so we will use ncks to convert
-        args = [
-            'ncks',
-            '-O',
-            '-5',
-            netcdf4_filename,
-            scrip_filename,
+    return ds_map_culled_to_base
+
+
+def map_culled_to_base_from_mask(ds_base, ds_culled, cull_mask):
+    """
+    Find the base-mesh index of each cell, edge and vertex of a culled mesh
+    from the cull mask, without a nearest-neighbor search
+
+    The cells kept by culling are those not in the cull mask, and the edges
+    and vertices kept are those adjacent to a kept cell, all in the order of
+    the base mesh (so that the culled index of each is a prefix sum of the
+    kept elements).  The culled mesh may since have been reordered (e.g. by
+    ``sort_mesh()``), so the kept elements are matched to those of the
+    culled mesh by sorting both by their exact Cartesian coordinates.
+
+    Parameters
+    ----------
+    ds_base : xarray.Dataset
+        The base MPAS mesh
+
+    ds_culled : xarray.Dataset
+        A mesh culled from the base mesh with the cull mask
+
+    cull_mask : numpy.ndarray
+        The mask of base-mesh cells that were culled
+
+    Returns
+    -------
+    ds_map_culled_to_base : xarray.Dataset or None
+        A dataset with ``mapCulledToBaseCell``, ``mapCulledToBaseEdge`` and
+        ``mapCulledToBaseVertex``, the same as from
+        :py:func:`polaris.tasks.e3sm.init.topo.cull.cull.map_culled_to_base`,
+        or ``None`` if the elements of the culled mesh are not exactly those
+        kept by the cull mask
+    """
+    keep_cell = np.asarray(cull_mask) == 0
+    kept = dict(Cell=np.flatnonzero(keep_cell))
+    for suffix, cells_on in [
+        ('Edge', 'cellsOnEdge'),
+        ('Vertex', 'cellsOnVertex'),
+    ]:
+        cells = ds_base[cells_on].values - 1
+        adjacent = np.logical_and(cells >= 0, keep_cell[np.maximum(cells, 0)])
+        kept[suffix] = np.flatnonzero(np.any(adjacent, axis=1))
+
+    ds_map_culled_to_base = xr.Dataset()
+    for dim, suffix in [
+        ('nCells', 'Cell'),
+        ('nEdges', 'Edge'),
+        ('nVertices', 'Vertex'),
+    ]:
+        candidates = kept[suffix]
+        if candidates.size != ds_culled.sizes[dim]:
+            return None
+        base_xyz = [
+            ds_base[f'{coord}{suffix}'].values[candidates] for coord in 'xyz'
         ]
-        check_call(args, logger)
+        culled_xyz = [ds_culled[f'{coord}{suffix}'].values for coord in 'xyz']
+        base_order = np.lexsort(base_xyz)
+        culled_order = np.lexsort(culled_xyz)
+        for base_coord, culled_coord in zip(base_xyz, culled_xyz, strict=True):
+            if not np.array_equal(
+                base_coord[base_order], culled_coord[culled_order]
+            ):
+                return None
+        culled_to_base = np.zeros(candidates.size, dtype=int)
+        culled_to_base[culled_order] = candidates[base_order]
+        ds_map_culled_to_base[f'mapCulledToBase{suffix}'] = (
+            (dim,),
+            culled_to_base,
+        )
+    return ds_map_culled_to_base
 
-        logger.info('  Done.')
+
+def get_cached_culled_map_filename(cache_dir, base_mesh_hash, cull_mask):
+    """
+    Get the name of the cached map from a culled mesh to its base mesh
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of cached maps
+
+    base_mesh_hash : str
+        The hash of the base mesh file from
+        :py:func:`polaris.partition.get_file_hash`
+
+    cull_mask : numpy.ndarray
+        The mask of base-mesh cells that were culled
+
+    Returns
+    -------
+    cache_filename : str
+        The cached map file, which may not exist yet
+    """
+    sha = hashlib.sha256(base_mesh_hash.encode('utf-8'))
+    sha.update(np.packbits(np.asarray(cull_mask) != 0).tobytes())
+    return os.path.join(cache_dir, f'{sha.hexdigest()}.nc')
+
+
+def get_mpas_cell_scrip_dataset(ds_mesh, mesh_name):
+    """
+    Get a SCRIP dataset describing the cells of an MPAS mesh, with the same
+    contents as ``pyremap.MpasCellMeshDescriptor.to_scrip()``
+
+    Parameters
+    ----------
+    ds_mesh : xarray.Dataset
+        A spherical MPAS mesh
+
+    mesh_name : str
+        The name of the mesh
+
+    Returns
+    -------
+    ds_scrip : xarray.Dataset
+        The SCRIP dataset, with the vertices of each cell as its corners (the
+        last vertex is repeated for cells with fewer than ``maxEdges``
+        vertices)
+    """
+    n_cells = ds_mesh.sizes['nCells']
+    max_edges = ds_mesh.sizes['maxEdges']
+    n_edges_on_cell = ds_mesh.nEdgesOnCell.values
+    vertices_on_cell = ds_mesh.verticesOnCell.values - 1
+    local_vertices = np.minimum(
+        n_edges_on_cell[:, np.newaxis] - 1, np.arange(max_edges)
+    )
+    corners = np.take_along_axis(vertices_on_cell, local_vertices, axis=1)
+    sphere_radius = float(ds_mesh.attrs['sphere_radius'])
+
+    ds_scrip = xr.Dataset()
+    ds_scrip.attrs['mesh_name'] = mesh_name
+    ds_scrip['grid_center_lat'] = ('grid_size', ds_mesh.latCell.values)
+    ds_scrip['grid_center_lon'] = ('grid_size', ds_mesh.lonCell.values)
+    ds_scrip['grid_corner_lat'] = (
+        ('grid_size', 'grid_corners'),
+        ds_mesh.latVertex.values[corners],
+    )
+    ds_scrip['grid_corner_lon'] = (
+        ('grid_size', 'grid_corners'),
+        ds_mesh.lonVertex.values[corners],
+    )
+    for var in [
+        'grid_center_lat',
+        'grid_center_lon',
+        'grid_corner_lat',
+        'grid_corner_lon',
+    ]:
+        ds_scrip[var].attrs['units'] = 'radians'
+    ds_scrip['grid_imask'] = ('grid_size', np.ones(n_cells, dtype=np.int32))
+    ds_scrip.grid_imask.attrs['units'] = 'unitless'
+    ds_scrip['grid_dims'] = ('grid_rank', np.array([n_cells], dtype=np.int32))
+    # SCRIP uses square radians
+    ds_scrip['grid_area'] = (
+        'grid_size',
+        ds_mesh.areaCell.values / sphere_radius**2,
+    )
+    ds_scrip.grid_area.attrs['units'] = 'radian^2'
+    return ds_scrip
+
+
+def _worker_cull_mesh(prefix):
+    """
+    Cull the mesh for one prefix from the shared base mesh
+    """
+    shared = dict(_WORKER_CULL)
+    step = shared.pop('step')
+    step._cull_mesh(prefix, **shared)
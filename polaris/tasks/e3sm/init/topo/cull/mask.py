@@ -1,6 +1,5 @@
 import os
 
-import mpas_tools.io
 import numpy as np
 import xarray as xr
 from geometric_features import (
@@ -8,17 +7,16 @@ from geometric_features import (
     read_feature_collection,
 )
 from mpas_tools.io import open_dataset, write_netcdf
-from mpas_tools.logging import check_call
 from mpas_tools.mesh.mask import compute_mpas_flood_fill_mask
 from mpas_tools.ocean.coastline_alteration import (
     add_land_locked_cells_to_mask,
-    widen_transect_edge_masks,
 )
 
 from polaris import Step
 from polaris.mesh.spherical.critical_transects import (
     load_default_critical_transects,
 )
+from polaris.mesh.spherical.transect_mask import MeshTransectIndex
 from polaris.tasks.e3sm.init.topo.cull.dc_edge_diagnostics import (
     check_ocean_dc_edge,
 )
@@ -99,6 +97,7 @@ class CullMaskStep(Step):
 
         self.add_output_file(filename='cull_masks.nc')
         self._critical_transects = None
+        self._pipeline = None
 
     def setup(self):
         """
@@ -264,24 +263,23 @@ class CullMaskStep(Step):
         section = config['cull_mesh']
         latitude_threshold = section.getfloat('sea_ice_latitude_threshold')
         iterations = section.getint('land_locked_cell_iterations')
+        pipeline = self._pipeline
 
         # critical land transects must be culled from ocean
-        crit_land_filename = 'critical_land_transects_mask.nc'
-        if os.path.exists(crit_land_filename):
+        ds_crit = pipeline.get('critical_land_transects_mask')
+        if ds_crit is not None:
             logger.info(
                 'Applying critical land transect mask to ocean cull mask.'
             )
-            ds_crit = open_dataset(crit_land_filename)
             preserve_land = ds_crit.regionCellMasks.isel(nRegions=0) > 0
             cull_mask = np.logical_or(cull_mask, preserve_land)
 
         # critical ocean transects must not be culled from ocean
-        crit_ocean_filename = 'critical_ocean_transects_mask.nc'
-        if os.path.exists(crit_ocean_filename):
+        ds_crit = pipeline.get('critical_ocean_transects_mask')
+        if ds_crit is not None:
             logger.info(
                 'Applying critical ocean transect mask to ocean cull mask.'
             )
-            ds_crit = open_dataset(crit_ocean_filename)
             preserve_ocean = ds_crit.regionCellMasks.isel(nRegions=0) > 0
             cull_mask = np.logical_and(
                 cull_mask, np.logical_not(preserve_ocean)
@@ -293,8 +291,7 @@ class CullMaskStep(Step):
         ds_mask = xr.Dataset()
         # make a copy so we can modify `regionCellMasks`
         ds_mask['regionCellMasks'] = region_cell_mask.copy()
-        write_netcdf(ds_mask, 'ocean_cull_mask_with_critical_transects.nc')
-        logger.info('Wrote ocean_cull_mask_with_critical_transects.nc.')
+        pipeline.add('ocean_cull_mask_with_critical_transects', ds_mask)
 
         ds_mask = add_land_locked_cells_to_mask(
             ds_mask,
@@ -302,8 +299,7 @@ class CullMaskStep(Step):
             latitude_threshold=latitude_threshold,
             nSweeps=iterations,
         )
-        write_netcdf(ds_mask, 'ocean_cull_mask_with_land_locked_cells.nc')
-        logger.info('Wrote ocean_cull_mask_with_land_locked_cells.nc.')
+        pipeline.add('ocean_cull_mask_with_land_locked_cells', ds_mask)
 
         ocean_mask = 1 - ds_mask.regionCellMasks.isel(nRegions=0)
 
@@ -353,18 +349,19 @@ class CullMaskStep(Step):
         # exclude anything that was added to the ocean without cavities
         # during the flood fill, etc. in _create_ocean_no_cavities_cull_mask()
 
+        pipeline = self._pipeline
+
         # critical ocean transects must be culled from land
-        crit_ocean_filename = 'critical_ocean_transects_mask.nc'
-        if os.path.exists(crit_ocean_filename):
+        ds_crit = pipeline.get('critical_ocean_transects_mask')
+        if ds_crit is not None:
             logger.info(
                 'Applying critical ocean transect mask to land cull mask.'
             )
-            ds_crit = open_dataset(crit_ocean_filename)
             preserve_ocean = ds_crit.regionCellMasks.isel(nRegions=0) > 0
             cull_mask = np.logical_or(cull_mask, preserve_ocean)
 
-        ds_ocean_no_cavity_cull_mask = open_dataset(
-            'ocean_no_cavities_cull_mask.nc'
+        ds_ocean_no_cavity_cull_mask = pipeline.get(
+            'ocean_no_cavities_cull_mask'
         )
 
         ocean_no_cavity_mask = (
@@ -386,13 +383,23 @@ class CullMaskStep(Step):
         super().run()
         logger = self.logger
         logger.info('Starting CullMaskStep run sequence.')
-        self._create_critical_transects()
-        self._create_ocean_cull_mask()
-        self._create_land_ice_mask()
-        self._create_ocean_no_cavities_cull_mask()
-        self._create_land_cull_mask()
-        self._combine_masks()
-        self._check_ocean_dc_edge()
+        section = self.config['cull_mesh']
+        self._pipeline = CullMaskPipeline(
+            base_mesh_filename='base_mesh.nc',
+            topo_filename='topography_unsmoothed.nc',
+            logger=logger,
+            write_intermediate=section.getboolean('write_intermediate_masks'),
+        )
+        try:
+            self._create_critical_transects()
+            self._create_ocean_cull_mask()
+            self._create_land_ice_mask()
+            self._create_ocean_no_cavities_cull_mask()
+            self._create_land_cull_mask()
+            self._combine_masks()
+            self._check_ocean_dc_edge()
+        finally:
+            self._pipeline = None
         logger.info('Completed CullMaskStep run sequence.')
 
     def _create_critical_transects(self):
@@ -405,108 +412,53 @@ class CullMaskStep(Step):
         section = config['cull_mesh']
         latitude_threshold = section.getfloat('sea_ice_latitude_threshold')
 
-        cpus_per_task = self.cpus_per_task
-        netcdf_format = mpas_tools.io.default_format
-        netcdf_engine = mpas_tools.io.default_engine
+        pipeline = self._pipeline
+        ds_base_mesh = pipeline.ds_base_mesh
 
         gf = GeometricFeatures()
 
-        ds_base_mesh = open_dataset('base_mesh.nc')
+        # one spatial index of the base mesh is shared by all transects
+        transect_index = MeshTransectIndex(ds_base_mesh)
 
         fc_crit_land_transects = self.define_critical_land_transects(gf)
 
         if fc_crit_land_transects is not None:
             logger.info('Processing critical land transects.')
-            geojson_filename = 'critical_land_transects.geojson'
-            nc_filename = 'critical_land_transects_all.nc'
-            fc_crit_land_transects.to_geojson(geojson_filename)
-            args = [
-                'compute_mpas_transect_masks',
-                '-m',
-                'base_mesh.nc',
-                '-g',
-                geojson_filename,
-                '-o',
-                nc_filename,
-                '-t',
-                'cell',
-                '-s',
-                '10e3',
-                '--process_count',
-                f'{cpus_per_task}',
-                '--format',
-                netcdf_format,
-                '--engine',
-                netcdf_engine,
-            ]
-            check_call(args, logger=logger)
-
-            ds_all = open_dataset(nc_filename)
-
-            # combine into a single field
-            preserve = xr.where(
-                ds_all.transectCellMasks.sum(dim='nTransects') > 0, 1, 0
+            land_masks = transect_index.compute_masks(
+                fc_crit_land_transects,
+                mask_types=('cell',),
+                workers=self.cpus_per_task,
             )
-
-            ds_mask = xr.Dataset()
-            ds_mask['regionCellMasks'] = preserve
-            ds_mask['regionCellMasks'] = ds_mask.regionCellMasks.expand_dims(
-                dim='nRegions', axis=1
+            pipeline.add(
+                'critical_land_transects_mask',
+                _region_mask(ds_base_mesh, land_masks.cell_union()),
             )
 
-            write_netcdf(ds_mask, 'critical_land_transects_mask.nc')
-            logger.info('Wrote critical_land_transects_mask.nc.')
-
         fc_crit_ocean_transects = self.define_critical_ocean_transects(gf)
 
         if fc_crit_ocean_transects is not None:
             logger.info('Processing critical ocean transects.')
-            geojson_filename = 'critical_ocean_transects.geojson'
-            nc_filename = 'critical_ocean_transects_all.nc'
-            fc_crit_ocean_transects.to_geojson(geojson_filename)
-            args = [
-                'compute_mpas_transect_masks',
-                '-m',
-                'base_mesh.nc',
-                '-g',
-                geojson_filename,
-                '-o',
-                nc_filename,
-                '-t',
-                'cell',
-                'edge',
-                '-s',
-                '10e3',
-                '--process_count',
-                f'{cpus_per_task}',
-                '--format',
-                netcdf_format,
-                '--engine',
-                netcdf_engine,
-            ]
-            check_call(args, logger=logger)
-            ds_all = open_dataset(nc_filename)
-
-            ds_widened = widen_transect_edge_masks(
-                ds_all, ds_base_mesh, latitude_threshold=latitude_threshold
+            ocean_masks = transect_index.compute_masks(
+                fc_crit_ocean_transects,
+                mask_types=('cell', 'edge'),
+                workers=self.cpus_per_task,
             )
-            write_netcdf(ds_widened, 'critical_ocean_transects_widened.nc')
-            logger.info('Wrote critical_ocean_transects_widened.nc.')
 
-            # combine into a single field
-            preserve = xr.where(
-                ds_widened.transectCellMasks.sum(dim='nTransects') > 0, 1, 0
+            widened_masks = ocean_masks.widen_edges(
+                ds_base_mesh, latitude_threshold=latitude_threshold
             )
-
-            ds_mask = xr.Dataset()
-            ds_mask['regionCellMasks'] = preserve
-            ds_mask['regionCellMasks'] = ds_mask.regionCellMasks.expand_dims(
-                dim='nRegions', axis=1
+            if pipeline.write_intermediate:
+                # dense masks are only needed for debugging
+                pipeline.add(
+                    'critical_ocean_transects_widened',
+                    widened_masks.to_dataset(),
+                )
+
+            pipeline.add(
+                'critical_ocean_transects_mask',
+                _region_mask(ds_base_mesh, widened_masks.cell_union()),
             )
 
-            write_netcdf(ds_mask, 'critical_ocean_transects_mask.nc')
-            logger.info('Wrote critical_ocean_transects_mask.nc.')
-
     def _create_ocean_cull_mask(self):
         """
         Create a mask for culling land and grounded land ice from the ocean
@@ -515,10 +467,10 @@ class CullMaskStep(Step):
         """
         logger = self.logger
         logger.info('Creating ocean cull mask.')
+        pipeline = self._pipeline
+        ds_base_mesh = pipeline.ds_base_mesh
+        ds_topo = pipeline.ds_topo
 
-        ds_base_mesh = open_dataset('base_mesh.nc')
-
-        ds_topo = open_dataset('topography_unsmoothed.nc')
         ocean_frac = ds_topo.ocean_frac
         cull_mask = ocean_frac < 0.5
 
@@ -530,9 +482,7 @@ class CullMaskStep(Step):
 
         ds_mask = xr.Dataset()
         ds_mask['oceanCullMask'] = cull_mask
-
-        write_netcdf(ds_mask, 'ocean_cull_mask.nc')
-        logger.info('Wrote ocean_cull_mask.nc.')
+        pipeline.add('ocean_cull_mask', ds_mask)
 
     def _create_land_ice_mask(self):
         """
@@ -545,12 +495,13 @@ class CullMaskStep(Step):
         land_ice_max_latitude = section.getfloat('land_ice_max_latitude')
         land_ice_min_fraction = section.getfloat('land_ice_min_fraction')
 
-        ds_base_mesh = open_dataset('base_mesh.nc')
+        pipeline = self._pipeline
+        ds_base_mesh = pipeline.ds_base_mesh
+        ds_topo = pipeline.ds_topo
 
-        ds_topo = open_dataset('topography_unsmoothed.nc')
         land_ice_frac = ds_topo.ice_frac
 
-        ds_ocean_cull_mask = open_dataset('ocean_cull_mask.nc')
+        ds_ocean_cull_mask = pipeline.get('ocean_cull_mask')
         ocean_cull_mask = ds_ocean_cull_mask.oceanCullMask > 0
 
         land_ice_present = self._antarctic_land_ice_ownership(
@@ -576,11 +527,9 @@ class CullMaskStep(Step):
         land_ice_frac = land_ice_frac.where(land_ice_present, 0.0)
         land_ice_mask = xr.where(land_ice_frac > 0.5, 1, 0)
 
-        # write the land ice mask to a file
         ds_mask = xr.Dataset()
         ds_mask['landIceMask'] = land_ice_mask
-        write_netcdf(ds_mask, 'land_ice_mask_preliminary.nc')
-        logger.info('Wrote land_ice_mask_preliminary.nc.')
+        pipeline.add('land_ice_mask_preliminary', ds_mask)
 
     def _create_ocean_no_cavities_cull_mask(self):
         """
@@ -597,12 +546,13 @@ class CullMaskStep(Step):
         latitude_threshold = section.getfloat('sea_ice_latitude_threshold')
         iterations = section.getint('land_locked_cell_iterations')
 
-        ds_base_mesh = open_dataset('base_mesh.nc')
+        pipeline = self._pipeline
+        ds_base_mesh = pipeline.ds_base_mesh
 
-        ds_ocean_cull_mask = open_dataset('ocean_cull_mask.nc')
+        ds_ocean_cull_mask = pipeline.get('ocean_cull_mask')
         ocean_cull_mask = ds_ocean_cull_mask.oceanCullMask > 0
 
-        ds_land_ice_mask = open_dataset('land_ice_mask_preliminary.nc')
+        ds_land_ice_mask = pipeline.get('land_ice_mask_preliminary')
         land_ice_mask = ds_land_ice_mask.landIceMask > 0
 
         # Exclude all land ice, not just the grounded ice
@@ -651,13 +601,11 @@ class CullMaskStep(Step):
 
         ds_mask = xr.Dataset()
         ds_mask['oceanNoCavitiesCullMask'] = cull_mask
-        write_netcdf(ds_mask, 'ocean_no_cavities_cull_mask.nc')
-        logger.info('Wrote ocean_no_cavities_cull_mask.nc.')
+        pipeline.add('ocean_no_cavities_cull_mask', ds_mask)
 
         ds_mask = xr.Dataset()
         ds_mask['landIceMask'] = land_ice_mask
-        write_netcdf(ds_mask, 'land_ice_mask.nc')
-        logger.info('Wrote land_ice_mask.nc.')
+        pipeline.add('land_ice_mask', ds_mask)
 
     def _create_land_cull_mask(self):
         """
@@ -667,21 +615,21 @@ class CullMaskStep(Step):
         """
         logger = self.logger
         logger.info('Creating land cull mask.')
+        pipeline = self._pipeline
+        ds_topo = pipeline.ds_topo
 
-        ds_topo = open_dataset('topography_unsmoothed.nc')
         land_frac = ds_topo.land_frac
         cull_mask = land_frac < 0.5
 
         cull_mask = self.refine_land_cull_mask(
-            ds_base_mesh=open_dataset('base_mesh.nc'),
+            ds_base_mesh=pipeline.ds_base_mesh,
             ds_topo=ds_topo,
             cull_mask=cull_mask,
         )
 
         ds_mask = xr.Dataset()
         ds_mask['landCullMask'] = cull_mask
-        write_netcdf(ds_mask, 'land_cull_mask.nc')
-        logger.info('Wrote land_cull_mask.nc.')
+        pipeline.add('land_cull_mask', ds_mask)
 
     def _combine_masks(self):
         """
@@ -691,12 +639,13 @@ class CullMaskStep(Step):
         logger = self.logger
         logger.info('Combining land and ocean cull masks.')
 
-        ds_ocean_cull_mask = open_dataset('ocean_cull_mask.nc')
-        ds_ocean_no_cavities_cull_mask = open_dataset(
-            'ocean_no_cavities_cull_mask.nc'
+        pipeline = self._pipeline
+        ds_ocean_cull_mask = pipeline.get('ocean_cull_mask')
+        ds_ocean_no_cavities_cull_mask = pipeline.get(
+            'ocean_no_cavities_cull_mask'
         )
-        ds_land_cull_mask = open_dataset('land_cull_mask.nc')
-        ds_land_ice_mask = open_dataset('land_ice_mask.nc')
+        ds_land_cull_mask = pipeline.get('land_cull_mask')
+        ds_land_ice_mask = pipeline.get('land_ice_mask')
 
         ds_masks = xr.Dataset()
         ds_masks['oceanCullMask'] = ds_ocean_cull_mask.oceanCullMask
@@ -706,8 +655,8 @@ class CullMaskStep(Step):
         ds_masks['landCullMask'] = ds_land_cull_mask.landCullMask
         ds_masks['landIceMask'] = ds_land_ice_mask.landIceMask
 
-        write_netcdf(ds_masks, 'cull_masks.nc')
-        logger.info('Wrote cull_masks.nc.')
+        # the combined masks are always written
+        pipeline.add('cull_masks', ds_masks, write=True)
 
     def _check_ocean_dc_edge(self):
         """
@@ -727,12 +676,12 @@ class CullMaskStep(Step):
         min_ratio = section.getfloat('min_dc_edge_ratio')
         max_ratio = section.getfloat('max_dc_edge_ratio')
 
-        ds_base_mesh = open_dataset('base_mesh.nc')
-        ds_masks = open_dataset('cull_masks.nc')
+        pipeline = self._pipeline
+        ds_masks = pipeline.get('cull_masks')
         ds_sizing = open_dataset('sizing_field.nc')
 
         check_ocean_dc_edge(
-            ds_base_mesh=ds_base_mesh,
+            ds_base_mesh=pipeline.ds_base_mesh,
             ocean_cull_mask=ds_masks.oceanCullMask.values,
             ds_sizing=ds_sizing,
             min_ratio=min_ratio,
@@ -756,3 +705,108 @@ class CullMaskStep(Step):
             ocean_cull_mask, lat_cell < land_ice_max_latitude
         )
         return np.logical_or(land_ice_present, antarctic_not_ocean)
+
+
+def _region_mask(ds_base_mesh, cells):
+    """
+    Make a dataset with a single region mask of the given cells
+    """
+    preserve = np.zeros(ds_base_mesh.sizes['nCells'], dtype=int)
+    preserve[cells] = 1
+    ds_mask = xr.Dataset()
+    ds_mask['regionCellMasks'] = (('nCells', 'nRegions'), preserve[:, None])
+    return ds_mask
+
+
+class CullMaskPipeline:
+    """
+    The base mesh, topography and masks shared in memory by the stages of
+    creating cull masks
+
+    Each stage adds the masks it creates with :py:meth:`add()` and later
+    stages get them with :py:meth:`get()`, so the base mesh and topography
+    are read only once and intermediate masks are not written to files and
+    read back.  Intermediate masks are only written (as ``<name>.nc``) if
+    requested for debugging.
+
+    Attributes
+    ----------
+    ds_base_mesh : xarray.Dataset
+        The base mesh
+
+    ds_topo : xarray.Dataset
+        The topography remapped to the base mesh
+
+    logger : logging.Logger
+        A logger for output
+
+    write_intermediate : bool
+        Whether to write every mask to a file, not just those added with
+        ``write=True``
+    """
+
+    def __init__(
+        self, base_mesh_filename, topo_filename, logger, write_intermediate
+    ):
+        """
+        Load the base mesh and topography
+
+        Parameters
+        ----------
+        base_mesh_filename : str
+            The base mesh file
+
+        topo_filename : str
+            The file with the topography remapped to the base mesh
+
+        logger : logging.Logger
+            A logger for output
+
+        write_intermediate : bool
+            Whether to write every mask to a file
+        """
+        with open_dataset(base_mesh_filename) as ds:
+            self.ds_base_mesh = ds.load()
+        with open_dataset(topo_filename) as ds:
+            self.ds_topo = ds.load()
+        self.logger = logger
+        self.write_intermediate = write_intermediate
+        self._masks = dict()
+
+    def add(self, name, ds_mask, write=False):
+        """
+        Add a mask for later stages, writing it to ``<name>.nc`` if requested
+
+        Parameters
+        ----------
+        name : str
+            The name of the mask
+
+        ds_mask : xarray.Dataset
+            A dataset containing the mask
+
+        write : bool, optional
+            Whether to write the mask even if intermediate masks are not
+            being written
+        """
+        self._masks[name] = ds_mask
+        if write or self.write_intermediate:
+            write_netcdf(ds_mask, f'{name}.nc')
+            self.logger.info(f'Wrote {name}.nc.')
+
+    def get(self, name):
+        """
+        Get a mask added by an earlier stage
+
+        Parameters
+        ----------
+        name : str
+            The name of the mask
+
+        Returns
+        -------
+        ds_mask : xarray.Dataset or None
+            The dataset containing the mask, or ``None`` if no mask with this
+            name has been added
+        """
+        return self._masks.get(name)
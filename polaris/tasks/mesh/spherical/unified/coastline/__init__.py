@@ -10,6 +10,9 @@ from polaris.mesh.spherical.coastline import (
 from polaris.tasks.mesh.spherical.unified.coastline.compute import (
     ComputeCoastlineStep as ComputeCoastlineStep,
 )
+from polaris.tasks.mesh.spherical.unified.coastline.pyramid import (
+    PyramidCoastlineStep as PyramidCoastlineStep,
+)
 from polaris.tasks.mesh.spherical.unified.coastline.remap import (
     RemapCoastlineStep as RemapCoastlineStep,
 )
@@ -47,7 +47,7 @@ class ComputeCoastlineStep(Step):
             component=component,
             name='coastline_compute',
             subdir=subdir,
-            cpus_per_task=1,
+            cpus_per_task=128,
             min_cpus_per_task=1,
         )
         self.default_cached = True
@@ -83,6 +83,11 @@ class ComputeCoastlineStep(Step):
         mask_threshold = section.getfloat('mask_threshold')
         sea_level_elevation = section.getfloat('sea_level_elevation')
         distance_chunk_size = section.getint('distance_chunk_size')
+        # without the option, distances are not saturated
+        distance_max_km = section.getfloat('distance_max_km', fallback=None)
+        max_distance = None
+        if distance_max_km is not None:
+            max_distance = 1.0e3 * distance_max_km
 
         critical_transects = None
         if include_critical_transects:
@@ -97,6 +102,7 @@ class ComputeCoastlineStep(Step):
             distance_chunk_size=distance_chunk_size,
             workers=self.cpus_per_task,
             critical_transects=critical_transects,
+            max_distance=max_distance,
         )
         for convention, ds_coastline in ds_coastlines.items():
             ds_coastline.attrs['source_topography'] = (
@@ -0,0 +1,127 @@
+import os
+
+import xarray as xr
+
+from polaris.e3sm.init.topo import format_lat_lon_resolution_name
+from polaris.mesh.spherical.coastline import (
+    CONVENTIONS,
+    _write_netcdf_with_fill_values,
+)
+from polaris.mesh.spherical.unified.resolutions import (
+    FINEST_RESOLUTION,
+    LAT_LON_TARGET_GRID_RESOLUTIONS,
+)
+from polaris.step import Step
+from polaris.tasks.mesh.spherical.unified.coastline.remap import (
+    _build_coarse_dataset,
+    _build_pyramid,
+    _compute_scale,
+)
+
+__all__ = ['PyramidCoastlineStep']
+
+
+class PyramidCoastlineStep(Step):
+    """
+    Remap coastline products from the finest lat-lon grid to every coarser
+    target grid in one pass.
+
+    Each fine coastline file is read once.  The ocean fraction is
+    block-averaged in cascade, each level from the next finer one, and the
+    unsigned distance is sampled bilinearly from the fine field at each level
+    (see ``_build_pyramid``).  The coarse files for all of the target
+    resolutions are written together, and a :class:`RemapCoastlineStep` for
+    each resolution links to its own level.
+    """
+
+    def __init__(self, component, fine_coastline_step, subdir):
+        """
+        Create a new step.
+
+        Parameters
+        ----------
+        component : polaris.Component
+            The component the step belongs to
+
+        fine_coastline_step : ComputeCoastlineStep
+            The shared highest-resolution coastline step whose outputs are
+            remapped to the coarser grids
+
+        subdir : str
+            The subdirectory within the component's work directory
+        """
+        super().__init__(
+            component=component,
+            name='coastline_pyramid',
+            subdir=subdir,
+            cpus_per_task=1,
+            min_cpus_per_task=1,
+        )
+        self.default_cached = True
+        self.fine_coastline_step = fine_coastline_step
+        self.fine_resolution = FINEST_RESOLUTION
+        self.coarse_resolutions = sorted(
+            resolution
+            for resolution in LAT_LON_TARGET_GRID_RESOLUTIONS
+            if resolution > FINEST_RESOLUTION
+        )
+        self.output_filenames = {
+            resolution: {
+                convention: (
+                    f'coastline_{convention}_'
+                    f'{format_lat_lon_resolution_name(resolution)}.nc'
+                )
+                for convention in CONVENTIONS
+            }
+            for resolution in self.coarse_resolutions
+        }
+
+    def setup(self):
+        """
+        Set up the step in the work directory, including linking inputs.
+        """
+        fine_step = self.fine_coastline_step
+        for filename in fine_step.output_filenames.values():
+            self.add_input_file(
+                filename=f'fine_{filename}',
+                work_dir_target=os.path.join(fine_step.path, filename),
+            )
+        for filenames in self.output_filenames.values():
+            for filename in filenames.values():
+                self.add_output_file(filename=filename)
+
+    def run(self):
+        """
+        Run this step.
+        """
+        logger = self.logger
+        section = self.config['coastline']
+        mask_threshold = section.getfloat('mask_threshold')
+        fine_resolution = self.fine_resolution
+        fine_step = self.fine_coastline_step
+
+        scales = {
+            resolution: _compute_scale(
+                fine_resolution=fine_resolution,
+                coarse_resolution=resolution,
+            )
+            for resolution in self.coarse_resolutions
+        }
+
+        for convention in CONVENTIONS:
+            in_filename = f'fine_{fine_step.output_filenames[convention]}'
+            logger.info(f'Building the coastline pyramid for {convention}')
+            with xr.open_dataset(in_filename) as ds_fine:
+                levels = _build_pyramid(ds_fine, list(scales.values()))
+            for resolution, scale in scales.items():
+                ds_coarse = _build_coarse_dataset(
+                    level=levels[scale],
+                    mask_threshold=mask_threshold,
+                    convention=convention,
+                    fine_resolution=fine_resolution,
+                    coarse_resolution=resolution,
+                    fine_step_subdir=fine_step.subdir,
+                )
+                _write_netcdf_with_fill_values(
+                    ds_coarse, self.output_filenames[resolution][convention]
+                )
@@ -23,6 +23,10 @@ class RemapCoastlineStep(Step):
     no second flood fill is performed.  The signed distance is remapped
     bilinearly (as an unsigned magnitude) and then re-signed using the
     remapped ocean mask.
+
+    With a :class:`PyramidCoastlineStep`, which remaps the fine coastline to
+    all coarser target resolutions in one pass, the outputs are links to the
+    pyramid level for this resolution and there is nothing left to compute.
     """
 
     def __init__(
@@ -31,6 +35,7 @@ class RemapCoastlineStep(Step):
         fine_coastline_step,
         coarse_resolution,
         subdir,
+        pyramid_step=None,
     ):
         """
         Create a new step.
@@ -49,6 +54,11 @@ class RemapCoastlineStep(Step):
 
         subdir : str
             The subdirectory within the component's work directory
+
+        pyramid_step : PyramidCoastlineStep, optional
+            The shared step that remaps the fine coastline to every coarser
+            target resolution.  If not provided, this step remaps the fine
+            coastline to its own resolution.
         """
         super().__init__(
             component=component,
@@ -61,6 +71,7 @@ class RemapCoastlineStep(Step):
         self.fine_coastline_step = fine_coastline_step
         self.fine_resolution = FINEST_RESOLUTION
         self.coarse_resolution = coarse_resolution
+        self.pyramid_step = pyramid_step
         self.output_filenames = {
             convention: f'coastline_{convention}.nc'
             for convention in CONVENTIONS
@@ -70,6 +81,21 @@ class RemapCoastlineStep(Step):
         """
         Set up the step in the work directory, including linking inputs.
         """
+        pyramid_step = self.pyramid_step
+        if pyramid_step is not None:
+            pyramid_filenames = pyramid_step.output_filenames[
+                self.coarse_resolution
+            ]
+            for convention, filename in self.output_filenames.items():
+                self.add_input_file(
+                    filename=filename,
+                    work_dir_target=os.path.join(
+                        pyramid_step.path, pyramid_filenames[convention]
+                    ),
+                )
+                self.add_output_file(filename=filename)
+            return
+
         fine_step = self.fine_coastline_step
         for filename in fine_step.output_filenames.values():
             self.add_input_file(
@@ -83,6 +109,10 @@ class RemapCoastlineStep(Step):
         """
         Run this step.
         """
+        if self.pyramid_step is not None:
+            # the outputs were linked to the pyramid level during setup
+            return
+
         section = self.config['coastline']
         mask_threshold = section.getfloat('mask_threshold')
         fine_resolution = self.fine_resolution
@@ -96,10 +126,10 @@ class RemapCoastlineStep(Step):
         fine_step = self.fine_coastline_step
         for convention, out_filename in self.output_filenames.items():
             in_filename = f'fine_{fine_step.output_filenames[convention]}'
-            ds_fine = xr.open_dataset(in_filename)
-            ds_coarse = _coastline_remap_dataset(
-                ds_fine=ds_fine,
-                scale=scale,
+            with xr.open_dataset(in_filename) as ds_fine:
+                level = _build_pyramid(ds_fine, [scale])[scale]
+            ds_coarse = _build_coarse_dataset(
+                level=level,
                 mask_threshold=mask_threshold,
                 convention=convention,
                 fine_resolution=fine_resolution,
@@ -120,6 +150,54 @@ def _compute_scale(fine_resolution, coarse_resolution):
     return scale_int
 
 
+def _build_pyramid(ds_fine, scales):
+    """
+    Remap the fine ocean mask and distance to several coarser grids, reading
+    each fine field once.
+
+    The ocean fraction is block-averaged in cascade: each level is averaged
+    from the finest level already computed whose scale divides its own, so a
+    level costs a fraction of a pass over the fine grid.  Because the
+    fractions are sums of 0s and 1s over power-of-2 blocks, the cascade is
+    exact.  The unsigned distance at each level is sampled bilinearly from
+    the fine field, which costs a pass over the coarse grid only.
+
+    Parameters
+    ----------
+    ds_fine : xarray.Dataset
+        The fine coastline dataset
+
+    scales : list of int
+        Integer downscaling factors
+
+    Returns
+    -------
+    levels : dict
+        For each scale, a dict with the ``ocean_fraction`` and unsigned
+        ``distance`` on the coarse grid and the coarse ``lat`` and ``lon``
+    """
+    fine_mask = ds_fine['ocean_mask'].values
+    abs_dist = np.abs(ds_fine['signed_distance'].values)
+    fine_lat = ds_fine['lat'].values
+    fine_lon = ds_fine['lon'].values
+
+    fractions = {1: fine_mask}
+    levels = dict()
+    for scale in sorted(set(scales)):
+        source = max(
+            computed for computed in fractions if scale % computed == 0
+        )
+        fraction = _block_average(fractions[source], scale // source)
+        fractions[scale] = fraction.astype(np.float32)
+        levels[scale] = dict(
+            ocean_fraction=fractions[scale],
+            distance=_bilinear_zoom(abs_dist, scale),
+            lat=_coarsen_coordinate(fine_lat, scale),
+            lon=_coarsen_coordinate(fine_lon, scale),
+        )
+    return levels
+
+
 def _coastline_remap_dataset(
     ds_fine,
     scale,
@@ -129,18 +207,30 @@ def _coastline_remap_dataset(
     coarse_resolution,
     fine_step_subdir,
 ):
-    fine_mask = ds_fine['ocean_mask'].values.astype(np.float64)
-    fine_dist = ds_fine['signed_distance'].values.astype(np.float64)
+    level = _build_pyramid(ds_fine, [scale])[scale]
+    return _build_coarse_dataset(
+        level=level,
+        mask_threshold=mask_threshold,
+        convention=convention,
+        fine_resolution=fine_resolution,
+        coarse_resolution=coarse_resolution,
+        fine_step_subdir=fine_step_subdir,
+    )
 
-    ocean_fraction = _block_average(fine_mask, scale)
-    ocean_mask = (ocean_fraction >= mask_threshold).astype(np.int8)
 
-    abs_dist = np.abs(fine_dist)
-    coarse_abs_dist = _bilinear_zoom(abs_dist, scale)
+def _build_coarse_dataset(
+    level,
+    mask_threshold,
+    convention,
+    fine_resolution,
+    coarse_resolution,
+    fine_step_subdir,
+):
+    ocean_mask = (level['ocean_fraction'] >= mask_threshold).astype(np.int8)
+    coarse_abs_dist = level['distance']
     signed_distance = np.where(ocean_mask, coarse_abs_dist, -coarse_abs_dist)
-
-    coarse_lat = _coarsen_coordinate(ds_fine['lat'].values, scale)
-    coarse_lon = _coarsen_coordinate(ds_fine['lon'].values, scale)
+    coarse_lat = level['lat']
+    coarse_lon = level['lon']
 
     ds_coarse = xr.Dataset(
         coords=dict(
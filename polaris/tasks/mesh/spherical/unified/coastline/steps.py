@@ -3,7 +3,10 @@ from typing import TypeAlias, Union
 
 from polaris.config import PolarisConfigParser
 from polaris.e3sm.init.topo import format_lat_lon_resolution_name
-from polaris.mesh.spherical.unified.resolutions import FINEST_RESOLUTION
+from polaris.mesh.spherical.unified.resolutions import (
+    FINEST_RESOLUTION,
+    LAT_LON_TARGET_GRID_RESOLUTIONS,
+)
 from polaris.step import Step
 from polaris.tasks.e3sm.init import e3sm_init
 from polaris.tasks.e3sm.init.topo.combine.step import CombineStep
@@ -13,6 +16,9 @@ from polaris.tasks.e3sm.init.topo.combine.steps import (
 from polaris.tasks.mesh.spherical.unified.coastline.compute import (
     ComputeCoastlineStep,
 )
+from polaris.tasks.mesh.spherical.unified.coastline.pyramid import (
+    PyramidCoastlineStep,
+)
 from polaris.tasks.mesh.spherical.unified.coastline.remap import (
     RemapCoastlineStep,
 )
@@ -33,12 +39,17 @@ def get_unified_mesh_coastline_steps(
     A :class:`ComputeCoastlineStep` is always created at the finest supported
     resolution using the finest combined-topography step.
 
-    For coarser resolutions, a :class:`RemapCoastlineStep` is also created to
-    remap the finest-resolution coastline to the requested resolution.
-
-    The :class:`ComputeCoastlineStep` and :class:`RemapCoastlineStep` set
-    ``default_cached = True`` in their constructors because they are expensive
-    to produce.  Downstream tasks benefit from cached outputs automatically.
+    For coarser resolutions, a shared :class:`PyramidCoastlineStep` remaps
+    the finest-resolution coastline to all of the coarser resolutions in
+    ``LAT_LON_TARGET_GRID_RESOLUTIONS`` in one pass, and a
+    :class:`RemapCoastlineStep` links to the level for the requested
+    resolution.  Other coarse resolutions get a :class:`RemapCoastlineStep`
+    that remaps the finest-resolution coastline on its own.
+
+    The :class:`ComputeCoastlineStep`, :class:`PyramidCoastlineStep` and
+    :class:`RemapCoastlineStep` set ``default_cached = True`` in their
+    constructors because they are expensive to produce.  Downstream tasks
+    benefit from cached outputs automatically.
     Tasks that require free-running execution (e.g. standalone coastline tasks)
     should add each returned step's ``subdir`` to ``self.free_running_steps``
     in their ``__init__``, as :class:`LatLonCoastlineTask` does.
@@ -56,6 +67,7 @@ def get_unified_mesh_coastline_steps(
     steps : dict of str to polaris.Step
         The coastline steps keyed by suggested subdir symlink in the task.
         Contains ``'coastline_compute'`` at resolutions other than the finest;
+        contains ``'coastline_pyramid'`` at the coarser target resolutions;
         contains ``'coastline_final'`` with the coastline output for downstream
         workflows; contains ``'coastline_viz'`` when ``include_viz=True``.
 
@@ -116,6 +128,24 @@ def get_unified_mesh_coastline_steps(
     else:
         steps['coastline_compute'] = compute_step
 
+        pyramid_step = None
+        if resolution in LAT_LON_TARGET_GRID_RESOLUTIONS:
+            pyramid_subdir = os.path.join(
+                'spherical',
+                'unified',
+                'coastline',
+                fine_resolution_name,
+                'pyramid',
+            )
+            pyramid_step = component.get_or_create_shared_step(
+                step_cls=PyramidCoastlineStep,
+                subdir=pyramid_subdir,
+                config=config,
+                config_filename=config_filename,
+                fine_coastline_step=compute_step,
+            )
+            steps['coastline_pyramid'] = pyramid_step
+
         remap_subdir = os.path.join(
             'spherical',
             'unified',
@@ -130,6 +160,7 @@ def get_unified_mesh_coastline_steps(
             config_filename=config_filename,
             fine_coastline_step=compute_step,
             coarse_resolution=resolution,
+            pyramid_step=pyramid_step,
         )
         steps['coastline_final'] = remap_step
 
@@ -8,6 +8,7 @@ from polaris.tasks.mesh.spherical.unified.river.rasterize import (
 from polaris.tasks.mesh.spherical.unified.river.simplify import (
     SimplifyRiverNetworkStep,
     simplify_river_network_feature_collection,
+    simplify_river_segments,
 )
 from polaris.tasks.mesh.spherical.unified.river.steps import (
     get_unified_mesh_river_steps,
@@ -30,4 +31,5 @@ __all__ = [
     'build_river_network_dataset',
     'get_unified_mesh_river_steps',
     'simplify_river_network_feature_collection',
+    'simplify_river_segments',
 ]
@@ -9,6 +9,12 @@ from polaris.mesh.spherical.unified.river.geojson import (
     read_geojson,
     write_geojson,
 )
+from polaris.mesh.spherical.unified.river.ragged import (
+    clip_lines_by_threshold,
+    densify_lines,
+    pack_lines,
+    split_lines,
+)
 from polaris.step import Step
 from polaris.tasks.mesh.spherical.unified.river.rasterize import (
     build_river_network_dataset,
@@ -179,47 +185,43 @@ def condition_base_mesh_river_segments(
     threshold_m = -float(clip_distance_m)
     max_spacing_deg = _get_sample_spacing_deg(lon=lon, lat=lat)
 
-    all_coords = [
-        _densify_line_coords(
-            coords=np.asarray(seg.geometry.coords, dtype=float),
-            max_spacing_deg=max_spacing_deg,
-        )
-        for seg in segments
-    ]
-    seg_sizes = [len(c) for c in all_coords]
-    if seg_sizes:
-        all_distances = _interpolate_signed_distance(
-            coords=np.vstack(all_coords),
+    coords, offsets = pack_lines(
+        [np.asarray(seg.geometry.coords, dtype=float) for seg in segments]
+    )
+    coords, offsets = densify_lines(
+        coords=coords, offsets=offsets, max_spacing_deg=max_spacing_deg
+    )
+    if coords.shape[0] > 0:
+        point_signed_distance = _interpolate_signed_distance(
+            coords=coords,
             lon=lon,
             lat=lat,
             signed_distance=signed_distance,
         )
-        per_segment_distances = np.split(
-            all_distances, np.cumsum(seg_sizes)[:-1]
-        )
     else:
-        per_segment_distances = []
+        point_signed_distance = np.zeros(0)
 
-    for segment, coords, point_signed_distance in zip(
-        segments, all_coords, per_segment_distances, strict=True
-    ):
-        clipped_geometries = _clip_line_string_with_distances(
-            coords=coords,
-            point_signed_distance=point_signed_distance,
-            threshold_m=threshold_m,
+    piece_coords, piece_offsets, piece_segment = clip_lines_by_threshold(
+        coords=coords,
+        offsets=offsets,
+        values=point_signed_distance,
+        threshold=threshold_m,
+    )
+    pieces = split_lines(piece_coords, piece_offsets)
+    for segment_index, piece in zip(piece_segment, pieces, strict=True):
+        segment = segments[segment_index]
+        geometry = LineString(piece)
+        simplified = geometry.simplify(
+            simplify_tolerance_deg, preserve_topology=False
+        )
+        cleaned = _clean_conditioned_geometry(simplified)
+        if cleaned is None:
+            cleaned = _clean_conditioned_geometry(geometry)
+        if cleaned is None:
+            continue
+        clipped_segments.append(
+            _conditioned_segment_from_geometry(segment, cleaned)
         )
-        for geometry in clipped_geometries:
-            simplified = geometry.simplify(
-                simplify_tolerance_deg, preserve_topology=False
-            )
-            cleaned = _clean_conditioned_geometry(simplified)
-            if cleaned is None:
-                cleaned = _clean_conditioned_geometry(geometry)
-            if cleaned is None:
-                continue
-            clipped_segments.append(
-                _conditioned_segment_from_geometry(segment, cleaned)
-            )
 
     outlet_area_by_id = {
         s.outlet_hyriv_id: s.drainage_area
@@ -305,101 +307,6 @@ def _get_sample_spacing_deg(lon, lat):
     return min(spacings)
 
 
-def _densify_line_coords(coords, max_spacing_deg):
-    """
-    Densify a line so coastline-distance clipping is geometry-local.
-    """
-    if coords.shape[0] < 2:
-        return coords
-
-    dense_coords = [coords[0]]
-    for start, end in zip(coords[:-1], coords[1:], strict=True):
-        delta_lon = _wrapped_longitude_difference(end[0] - start[0])
-        delta_lat = end[1] - start[1]
-        segment_extent = max(abs(delta_lon), abs(delta_lat))
-        n_steps = max(1, int(np.ceil(segment_extent / max_spacing_deg)))
-        for index in range(1, n_steps + 1):
-            fraction = index / n_steps
-            point = np.array(
-                [
-                    _wrap_longitude(start[0] + fraction * delta_lon),
-                    start[1] + fraction * delta_lat,
-                ],
-                dtype=float,
-            )
-            _append_point_if_distinct(dense_coords, point)
-
-    return np.vstack(dense_coords)
-
-
-def _clip_line_string_with_distances(
-    coords,
-    point_signed_distance,
-    threshold_m,
-):
-    clipped_coords = _clip_coords_by_threshold(
-        coords=coords,
-        point_signed_distance=point_signed_distance,
-        threshold_m=threshold_m,
-    )
-
-    return [LineString(line) for line in clipped_coords if len(line) >= 2]
-
-
-def _clip_coords_by_threshold(coords, point_signed_distance, threshold_m):
-    clipped_lines: list[np.ndarray] = []
-    current_points: list[np.ndarray] = []
-
-    for start_index in range(coords.shape[0] - 1):
-        start_point = coords[start_index]
-        end_point = coords[start_index + 1]
-        start_distance = float(point_signed_distance[start_index])
-        end_distance = float(point_signed_distance[start_index + 1])
-        start_valid = start_distance <= threshold_m
-        end_valid = end_distance <= threshold_m
-
-        if start_valid and not current_points:
-            _append_point_if_distinct(current_points, start_point)
-
-        if start_valid and end_valid:
-            _append_point_if_distinct(current_points, end_point)
-            continue
-
-        if start_valid and not end_valid:
-            _append_point_if_distinct(
-                current_points,
-                _interpolate_threshold_crossing(
-                    start_point=start_point,
-                    end_point=end_point,
-                    start_distance=start_distance,
-                    end_distance=end_distance,
-                    threshold_m=threshold_m,
-                ),
-            )
-            if len(current_points) >= 2:
-                clipped_lines.append(np.vstack(current_points))
-            current_points = []
-            continue
-
-        if not start_valid and end_valid:
-            _append_point_if_distinct(
-                current_points,
-                _interpolate_threshold_crossing(
-                    start_point=start_point,
-                    end_point=end_point,
-                    start_distance=start_distance,
-                    end_distance=end_distance,
-                    threshold_m=threshold_m,
-                ),
-            )
-            _append_point_if_distinct(current_points, end_point)
-
-    if len(current_points) >= 2:
-        clipped_lines.append(np.vstack(current_points))
-
-    return clipped_lines
-
-
 def _km_to_equatorial_degrees(distance_km):
     return float(distance_km) / 111.0
 
@@ -459,41 +366,3 @@ def _prepare_periodic_longitude_interpolation(lon, field, sample_lon):
     lon = np.append(lon, lon[0] + 360.0)
     field = np.concatenate([field, field[:, :1]], axis=1)
     return lon, field, sample_lon
-
-
-def _interpolate_threshold_crossing(
-    start_point,
-    end_point,
-    start_distance,
-    end_distance,
-    threshold_m,
-):
-    if np.isclose(end_distance, start_distance):
-        fraction = 0.5
-    else:
-        fraction = (threshold_m - start_distance) / (
-            end_distance - start_distance
-        )
-
-    fraction = float(np.clip(fraction, 0.0, 1.0))
-    return start_point + fraction * (end_point - start_point)
-
-
-def _append_point_if_distinct(points, point):
-    point = np.asarray(point, dtype=np.float64)
-    if len(points) == 0 or not np.allclose(points[-1], point):
-        points.append(point)
-
-
-def _wrapped_longitude_difference(delta_lon):
-    """
-    Wrap a longitude difference into the [-180, 180) interval.
-    """
-    return (delta_lon + 180.0) % 360.0 - 180.0
-
-
-def _wrap_longitude(lon):
-    """
-    Wrap a longitude into the [-180, 180) interval.
-    """
-    return _wrapped_longitude_difference(lon)
@@ -2,6 +2,7 @@ import os
 
 import numpy as np
 import xarray as xr
+from scipy.spatial import cKDTree
 
 from polaris.mesh.spherical.unified.river.distance import (
     haversine_distance,
@@ -9,12 +10,20 @@ from polaris.mesh.spherical.unified.river.distance import (
 from polaris.mesh.spherical.unified.river.geojson import (
     read_geojson,
 )
+from polaris.mesh.spherical.unified.river.ragged import (
+    densify_lines,
+    pack_lines,
+)
 from polaris.step import Step
 from polaris.tasks.mesh.spherical.unified.river.simplify import (
     EARTH_RADIUS,
     read_river_segments_from_feature_collection,
 )
 
+# the approximate number of candidate grid cells checked at a time when
+# marking the buffers around channel samples
+_BUFFER_CHUNK_SIZE = 2**22
+
 
 class RasterizeRiverLatLonStep(Step):
     """
@@ -146,21 +155,27 @@ def build_river_network_dataset(
     river_channel_mask = np.zeros(shape_2d, dtype=np.int8)
     channel_buffer_m = channel_buffer_km * 1.0e3
 
-    for segment in river_segments:
-        sample_points = _sample_line(
-            segment.geometry,
-            resolution=resolution,
-            subsegment_fraction=channel_subsegment_fraction,
+    sample_coords = _sample_lines(
+        river_segments,
+        resolution=resolution,
+        subsegment_fraction=channel_subsegment_fraction,
+    )
+    lat_index, lon_index = _nearest_grid_indices(
+        sample_lon=sample_coords[:, 0],
+        sample_lat=sample_coords[:, 1],
+        lon=lon,
+        lat=lat,
+    )
+    river_channel_mask[lat_index, lon_index] = 1
+    if channel_buffer_m > 0.0 and sample_coords.shape[0] > 0:
+        _mark_channel_buffers(
+            mask=river_channel_mask,
+            sample_lon=sample_coords[:, 0],
+            sample_lat=sample_coords[:, 1],
+            lon=lon,
+            lat=lat,
+            buffer_m=channel_buffer_m,
         )
-        for sample_lon, sample_lat in sample_points:
-            _mark_channel_sample(
-                mask=river_channel_mask,
-                sample_lon=sample_lon,
-                sample_lat=sample_lat,
-                lon=lon,
-                lat=lat,
-                buffer_m=channel_buffer_m,
-            )
 
     ds_river = xr.Dataset(
         coords=dict(lat=ds_coastline.lat, lon=ds_coastline.lon)
@@ -182,125 +197,160 @@ def build_river_network_dataset(
     return ds_river
 
 
-def _sample_line(geometry, resolution, subsegment_fraction):
+def _sample_lines(segments, resolution, subsegment_fraction):
     """
-    Sample a line densely enough to rasterize it onto a regular grid.
+    Sample all lines densely enough to rasterize them onto a regular grid.
     """
-    coords = np.asarray(geometry.coords)
-    sample_points = [tuple(coords[0])]
-    max_step = resolution * subsegment_fraction
-    for start, end in zip(coords[:-1], coords[1:], strict=True):
-        lon0, lat0 = start
-        lon1, lat1 = end
-        delta_lon = _wrapped_longitude_difference(lon1 - lon0)
-        delta_lat = lat1 - lat0
-        segment_extent = max(abs(delta_lon), abs(delta_lat))
-        n_steps = max(1, int(np.ceil(segment_extent / max_step)))
-        for index in range(1, n_steps + 1):
-            fraction = index / n_steps
-            sample_points.append(
-                (
-                    _wrap_longitude(lon0 + fraction * delta_lon),
-                    lat0 + fraction * delta_lat,
-                )
-            )
-    return sample_points
+    coords, offsets = pack_lines(
+        [np.asarray(segment.geometry.coords) for segment in segments]
+    )
+    sample_coords, _ = densify_lines(
+        coords=coords,
+        offsets=offsets,
+        max_spacing_deg=resolution * subsegment_fraction,
+        drop_repeated=False,
+    )
+    return sample_coords
 
 
-def _nearest_grid_index(sample_lon, sample_lat, lon, lat):
+def _nearest_grid_indices(sample_lon, sample_lat, lon, lat):
     """
-    Find the nearest lat-lon grid-cell center.
+    Find the nearest lat-lon grid-cell centers of many samples.
     """
-    lon_index = _nearest_periodic_index(sample_lon, lon)
-    lat_index = _nearest_bounded_index(sample_lat, lat)
+    if lon.size == 1:
+        lon_index = np.zeros(sample_lon.shape, dtype=int)
+    else:
+        raw_index = np.rint((sample_lon - lon[0]) / (lon[1] - lon[0]))
+        lon_index = raw_index.astype(int) % lon.size
+    if lat.size == 1:
+        lat_index = np.zeros(sample_lat.shape, dtype=int)
+    else:
+        raw_index = np.rint((sample_lat - lat[0]) / (lat[1] - lat[0]))
+        lat_index = np.clip(raw_index.astype(int), 0, lat.size - 1)
     return lat_index, lon_index
 
 
-def _mark_channel_sample(mask, sample_lon, sample_lat, lon, lat, buffer_m):
+def _mark_channel_buffers(mask, sample_lon, sample_lat, lon, lat, buffer_m):
     """
-    Mark grid cells within a physical buffer of a sampled river point.
-    """
-    lat_index, lon_index = _nearest_grid_index(
-        sample_lon=sample_lon,
-        sample_lat=sample_lat,
-        lon=lon,
-        lat=lat,
-    )
-    mask[lat_index, lon_index] = 1
-    if buffer_m <= 0.0:
-        return
+    Mark grid cells within a physical buffer of any sampled river point.
 
+    Candidate cells are those in a lat-lon window around each grid cell
+    containing samples, with each window large enough to hold the buffers of
+    its samples.  A KD-tree of all samples finds the sample nearest each
+    candidate, which is within the buffer if any sample is.
+    """
     angular_buffer = buffer_m / EARTH_RADIUS
+    tree = cKDTree(_lon_lat_to_xyz(sample_lon, sample_lat))
+    # a slightly larger chord distance, so no candidate within the buffer is
+    # missed because of round-off
+    chord = 2.0 * np.sin(0.5 * min(angular_buffer, np.pi)) * (1.0 + 1.0e-9)
+
+    # the buffer is widest in longitude at its latitude farthest from the
+    # equator
     lat_delta = np.rad2deg(angular_buffer)
-    cos_lat = max(np.cos(np.deg2rad(sample_lat)), 1.0e-6)
-    lon_delta = min(180.0, np.rad2deg(angular_buffer / cos_lat))
-    lat_indices = _coordinate_window(sample_lat, lat, lat_delta)
-    lon_indices = _coordinate_window(sample_lon, lon, lon_delta, periodic=True)
-
-    candidate_lat = lat[lat_indices][:, np.newaxis]
-    candidate_lon = lon[lon_indices][np.newaxis, :]
-    distances = haversine_distance(
-        sample_lon, sample_lat, candidate_lon, candidate_lat
+    max_lat = np.minimum(np.abs(sample_lat) + lat_delta, 90.0)
+    cos_lat = np.maximum(np.cos(np.deg2rad(max_lat)), 1.0e-6)
+    lon_delta = np.minimum(180.0, np.rad2deg(angular_buffer / cos_lat))
+    lat_half_width = int(_window_half_width(lat_delta, lat))
+    lon_half_width = np.minimum(
+        _window_half_width(lon_delta, lon), lon.size // 2
     )
-    buffered_mask = distances <= buffer_m
-    mask[np.ix_(lat_indices, lon_indices)] |= buffered_mask.astype(np.int8)
-
 
-def _nearest_bounded_index(value, coord):
-    """
-    Find the nearest index in a regular coordinate array.
-    """
-    if coord.size == 1:
-        return 0
-
-    step = coord[1] - coord[0]
-    raw_index = int(np.rint((value - coord[0]) / step))
-    return int(np.clip(raw_index, 0, coord.size - 1))
-
-
-def _nearest_periodic_index(value, coord):
-    """
-    Find the nearest index in a regular periodic coordinate array.
-    """
-    if coord.size == 1:
-        return 0
-
-    step = coord[1] - coord[0]
-    raw_index = int(np.rint((value - coord[0]) / step))
-    return raw_index % coord.size
+    # one window per grid cell containing samples
+    lat_center, lon_center = _nearest_grid_indices(
+        sample_lon=sample_lon, sample_lat=sample_lat, lon=lon, lat=lat
+    )
+    cells, inverse = np.unique(
+        lat_center * lon.size + lon_center, return_inverse=True
+    )
+    half_width = np.zeros(cells.size, dtype=int)
+    np.maximum.at(half_width, inverse, lon_half_width)
+    lat_center, lon_center = np.divmod(cells, lon.size)
+
+    # the range of longitude indices of each window in each of its rows
+    lat_offsets = np.arange(-lat_half_width, lat_half_width + 1)
+    rows = (lat_center[:, np.newaxis] + lat_offsets).ravel()
+    starts = np.repeat(lon_center - half_width, lat_offsets.size)
+    widths = np.repeat(
+        np.minimum(2 * half_width + 1, lon.size), lat_offsets.size
+    )
+    valid = np.logical_and(rows >= 0, rows < lat.size)
+    order = np.argsort(rows[valid], kind='stable')
+    rows = rows[valid][order]
+    starts = starts[valid][order] % lon.size
+    widths = widths[valid][order]
+
+    block_rows = max(1, _BUFFER_CHUNK_SIZE // lon.size)
+    for block_start in np.unique(rows // block_rows) * block_rows:
+        block_stop = min(block_start + block_rows, lat.size)
+        first, last = np.searchsorted(rows, [block_start, block_stop])
+        covered = _window_coverage(
+            rows=rows[first:last] - block_start,
+            starts=starts[first:last],
+            widths=widths[first:last],
+            n_rows=block_stop - block_start,
+            n_lon=lon.size,
+        )
+        covered &= mask[block_start:block_stop] == 0
+        lat_index, lon_index = np.nonzero(covered)
+        lat_index += block_start
+        distance, nearest = tree.query(
+            _lon_lat_to_xyz(lon[lon_index], lat[lat_index]),
+            distance_upper_bound=chord,
+        )
+        found = np.isfinite(distance)
+        lat_index = lat_index[found]
+        lon_index = lon_index[found]
+        nearest = nearest[found]
+        within = (
+            haversine_distance(
+                sample_lon[nearest],
+                sample_lat[nearest],
+                lon[lon_index],
+                lat[lat_index],
+            )
+            <= buffer_m
+        )
+        mask[lat_index[within], lon_index[within]] = 1
 
 
-def _coordinate_window(value, coord, delta, periodic=False):
+def _window_half_width(delta, coord):
     """
-    Find candidate coordinate indices within one regular-grid window.
+    The number of grid cells on either side of a sample's nearest cell that
+    covers a coordinate distance ``delta`` in degrees
     """
     if coord.size == 1:
-        return np.array([0], dtype=int)
+        return np.zeros(np.shape(delta), dtype=int)
 
     spacing = abs(coord[1] - coord[0])
-    half_width = int(np.ceil(delta / spacing)) + 1
-    if periodic:
-        center = _nearest_periodic_index(value, coord)
-        indices = np.arange(
-            center - half_width, center + half_width + 1, dtype=int
-        )
-        return np.unique(indices % coord.size)
+    return np.ceil(np.asarray(delta) / spacing).astype(int) + 1
 
-    center = _nearest_bounded_index(value, coord)
-    start = max(0, center - half_width)
-    stop = min(coord.size, center + half_width + 1)
-    return np.arange(start, stop, dtype=int)
 
-
-def _wrapped_longitude_difference(delta_lon):
+def _window_coverage(rows, starts, widths, n_rows, n_lon):
     """
-    Wrap a longitude difference into the [-180, 180) interval.
+    Mark the cells in periodic ranges of longitude indices in each row
     """
-    return (delta_lon + 180.0) % 360.0 - 180.0
+    stops = starts + widths
+    wrapped = stops > n_lon
+    diff = np.zeros((n_rows, n_lon + 1), dtype=np.int32)
+    np.add.at(diff, (rows, starts), 1)
+    np.add.at(diff, (rows, np.minimum(stops, n_lon)), -1)
+    np.add.at(diff, (rows[wrapped], 0), 1)
+    np.add.at(diff, (rows[wrapped], stops[wrapped] - n_lon), -1)
+    return np.cumsum(diff[:, :-1], axis=1) > 0
 
 
-def _wrap_longitude(lon):
+def _lon_lat_to_xyz(lon, lat):
     """
-    Wrap a longitude into the [-180, 180) interval.
+    Convert lon/lat in degrees to Cartesian points on the unit sphere.
     """
-    return _wrapped_longitude_difference(lon)
+    lon_rad = np.radians(lon)
+    lat_rad = np.radians(lat)
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack(
+        [
+            cos_lat * np.cos(lon_rad),
+            cos_lat * np.sin(lon_rad),
+            np.sin(lat_rad),
+        ]
+    )
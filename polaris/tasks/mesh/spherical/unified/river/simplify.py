@@ -11,6 +11,7 @@ from shapely.strtree import STRtree
 
 from polaris.archive import extract_zip_subdir
 from polaris.constants import get_constant
+from polaris.mesh.spherical.unified.river.columnar import ColumnarLineCache
 from polaris.mesh.spherical.unified.river.distance import (
     haversine_distance,
 )
@@ -142,7 +143,7 @@ class SimplifyRiverNetworkStep(Step):
 
     def run(self):
         """
-        Download, unpack, convert, and simplify HydroRIVERS source data.
+        Download, unpack, cache, and simplify HydroRIVERS source data.
         """
         import time
 
@@ -152,6 +153,7 @@ class SimplifyRiverNetworkStep(Step):
         archive_filename = section.get('hydrorivers_archive_filename')
         shp_directory = section.get('hydrorivers_shp_directory')
         shp_filename = section.get('hydrorivers_shp_filename')
+        cache_directory = section.get('hydrorivers_cache_directory')
         _unpack_hydrorivers_archive(archive_filename, shp_directory)
 
         drainage_area_threshold = section.getfloat('drainage_area_threshold')
@@ -176,18 +178,28 @@ class SimplifyRiverNetworkStep(Step):
             branch_distance_tolerance = river_channel_km * 1000.0
 
         t0 = time.time()
-        feature_collection = _read_filtered_shapefile_feature_collection(
+        cache = ColumnarLineCache.from_shapefile(
             shp_filename=os.path.join(shp_directory, shp_filename),
+            directory=cache_directory,
+        )
+        print(
+            f'open columnar cache: {time.time() - t0:.1f} s',
+            flush=True,
+        )
+
+        t0 = time.time()
+        segments = read_river_segments_from_columnar(
+            cache=cache,
             drainage_area_threshold=drainage_area_threshold,
         )
         print(
-            f'read shapefile (filtered): {time.time() - t0:.1f} s',
+            f'read segments (filtered): {time.time() - t0:.1f} s',
             flush=True,
         )
 
         t0 = time.time()
-        simplified_fc = simplify_river_network_feature_collection(
-            feature_collection=feature_collection,
+        simplified_fc = simplify_river_segments(
+            segments=segments,
             drainage_area_threshold=drainage_area_threshold,
             branch_distance_tolerance=branch_distance_tolerance,
             tributary_area_ratio=section.getfloat('tributary_area_ratio'),
@@ -228,31 +240,64 @@ def _unpack_hydrorivers_archive(archive_filename, data_directory):
         )
 
 
-def _read_filtered_shapefile_feature_collection(
-    shp_filename, drainage_area_threshold
-):
+def read_river_segments_from_columnar(cache, drainage_area_threshold):
     """
-    Read a HydroRIVERS shapefile, skipping segments below the drainage area
-    threshold before constructing geometry to avoid processing the ~97% of
-    records that would be discarded immediately afterward.
+    Read canonical river segments from a columnar HydroRIVERS cache,
+    skipping segments below the drainage area threshold with an array mask
+    so that only the vertices of retained segments are read from disk.
+
+    Parameters
+    ----------
+    cache : polaris.mesh.spherical.unified.river.columnar.ColumnarLineCache
+        The columnar cache of the HydroRIVERS shapefile
+
+    drainage_area_threshold : float
+        Minimum retained drainage area in square meters
+
+    Returns
+    -------
+    list of RiverSegment
+        Canonical river segments; geometries with duplicate HydroRIVERS
+        identifiers are merged into a single segment
     """
-    reader = shapefile.Reader(shp_filename)
-    features = []
-    for shape_record in reader.iterShapeRecords():
-        props = shape_record.record.as_dict()
-        upland_skm = props.get('UPLAND_SKM')
-        if upland_skm is None:
-            upland_skm = props.get('upland_skm', 0.0)
-        if float(upland_skm) * KM2_TO_M2 < drainage_area_threshold:
-            continue
-        features.append(
-            dict(
-                type='Feature',
-                properties=props,
-                geometry=shape_record.shape.__geo_interface__,
+    drainage_area = KM2_TO_M2 * np.asarray(
+        cache.field('UPLAND_SKM'), dtype=np.float64
+    )
+    indices = cache.select(drainage_area >= drainage_area_threshold)
+    geometries = cache.geometries(indices)
+
+    columns = dict()
+    for name in ('HYRIV_ID', 'MAIN_RIV', 'ORD_STRA', 'NEXT_DOWN', 'ENDORHEIC'):
+        columns[name] = np.asarray(cache.field(name)[indices]).tolist()
+    river_names = None
+    for name in ('RIVER_NAME', 'RIV_NAME', 'NAME'):
+        if cache.has_field(name):
+            river_names = np.asarray(cache.field(name)[indices]).tolist()
+            break
+
+    segments = []
+    for index, geometry in enumerate(geometries):
+        if not isinstance(geometry, LineString):
+            raise ValueError(
+                f'Unsupported river geometry type {geometry.geom_type!r}; '
+                'expected a LineString-compatible geometry.'
+            )
+        river_name = None
+        if river_names is not None and river_names[index] != '':
+            river_name = river_names[index]
+        segments.append(
+            RiverSegment(
+                geometry=geometry,
+                hyriv_id=int(columns['HYRIV_ID'][index]),
+                main_riv=int(columns['MAIN_RIV'][index]),
+                ord_stra=int(columns['ORD_STRA'][index]),
+                drainage_area=float(drainage_area[indices[index]]),
+                next_down=int(columns['NEXT_DOWN'][index]),
+                endorheic=int(columns['ENDORHEIC'][index]),
+                river_name=river_name,
             )
         )
-    return dict(type='FeatureCollection', features=features)
+    return _merge_duplicate_segments(segments)
 
 
 def _convert_hydrorivers_shapefile_to_geojson(shp_filename, output_filename):
@@ -308,11 +353,56 @@ def simplify_river_network_feature_collection(
     simplified_fc : dict
         A GeoJSON feature collection for the simplified river network
 
+    """
+    return simplify_river_segments(
+        segments=read_river_segments_from_feature_collection(
+            feature_collection
+        ),
+        drainage_area_threshold=drainage_area_threshold,
+        branch_distance_tolerance=branch_distance_tolerance,
+        tributary_area_ratio=tributary_area_ratio,
+        n_cpus=n_cpus,
+    )
+
+
+def simplify_river_segments(
+    segments,
+    drainage_area_threshold,
+    branch_distance_tolerance,
+    tributary_area_ratio=0.05,
+    n_cpus=1,
+):
+    """
+    Simplify a list of canonical river segments.
+
+    Parameters
+    ----------
+    segments : list of RiverSegment
+        Canonical river segments
+
+    drainage_area_threshold : float
+        Minimum retained drainage area in square meters
+
+    branch_distance_tolerance : float
+        Minimum retained spacing between nearby upstream branches in meters
+
+    tributary_area_ratio : float, optional
+        The minimum tributary-to-main-stem drainage-area ratio for retaining
+        a nearby tributary at a confluence
+
+    n_cpus : int, optional
+        Number of parallel worker processes for basin traversal.
+        Defaults to 1 (single-process).
+
+    Returns
+    -------
+    simplified_fc : dict
+        A GeoJSON feature collection for the simplified river network
+
     """
     import time
 
     t0 = time.time()
-    segments = read_river_segments_from_feature_collection(feature_collection)
     n_raw = len(segments)
     segments = [
         segment
@@ -320,8 +410,8 @@ def simplify_river_network_feature_collection(
         if segment.drainage_area >= drainage_area_threshold
     ]
     print(
-        f'  read segments: {n_raw} raw, {len(segments)} after area filter, '
-        f'{time.time() - t0:.1f} s',
+        f'  filter segments: {n_raw} raw, {len(segments)} after area '
+        f'filter, {time.time() - t0:.1f} s',
         flush=True,
     )
     if len(segments) == 0:
@@ -430,31 +520,12 @@ def read_river_segments_from_feature_collection(
         Canonical river segments; geometries with duplicate HydroRIVERS
         identifiers are merged into a single segment
     """
-    merged_segments: dict[int, RiverSegment] = {}
-    for feature in feature_collection['features']:
-        segment = _segment_from_feature(feature)
-        existing = merged_segments.get(segment.hyriv_id)
-        if existing is None:
-            merged_segments[segment.hyriv_id] = segment
-            continue
-
-        merged_geometry = line_merge(
-            unary_union([existing.geometry, segment.geometry])
-        )
-        if not isinstance(merged_geometry, LineString):
-            merged_geometry = LineString(
-                np.vstack(
-                    [
-                        np.asarray(existing.geometry.coords),
-                        np.asarray(segment.geometry.coords),
-                    ]
-                )
-            )
-        merged_segments[segment.hyriv_id] = replace(
-            existing, geometry=merged_geometry
-        )
-
-    return list(merged_segments.values())
+    return _merge_duplicate_segments(
+        [
+            _segment_from_feature(feature)
+            for feature in feature_collection['features']
+        ]
+    )
 
 
 def river_segments_to_feature_collection(segments):
@@ -500,6 +571,36 @@ def river_segments_to_feature_collection(segments):
     return dict(type='FeatureCollection', features=features)
 
 
+def _merge_duplicate_segments(segments):
+    """
+    Merge the geometries of segments that share a HydroRIVERS identifier.
+    """
+    merged_segments: dict[int, RiverSegment] = {}
+    for segment in segments:
+        existing = merged_segments.get(segment.hyriv_id)
+        if existing is None:
+            merged_segments[segment.hyriv_id] = segment
+            continue
+
+        merged_geometry = line_merge(
+            unary_union([existing.geometry, segment.geometry])
+        )
+        if not isinstance(merged_geometry, LineString):
+            merged_geometry = LineString(
+                np.vstack(
+                    [
+                        np.asarray(existing.geometry.coords),
+                        np.asarray(segment.geometry.coords),
+                    ]
+                )
+            )
+        merged_segments[segment.hyriv_id] = replace(
+            existing, geometry=merged_geometry
+        )
+
+    return list(merged_segments.values())
+
+
 def _process_basin_root(root):
     """
     Process one terminal-root basin in a fork-based worker process.
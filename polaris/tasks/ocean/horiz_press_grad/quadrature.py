@@ -0,0 +1,249 @@
+from typing import Callable
+
+import numpy as np
+
+# 2- and 4-point Gauss-Legendre nodes and weights on [-1, 1]
+_GAUSS_RULES = {
+    'gauss2': (
+        np.array([-1.0 / np.sqrt(3.0), 1.0 / np.sqrt(3.0)]),
+        np.array([1.0, 1.0]),
+    ),
+    'gauss4': (
+        np.array(
+            [
+                -0.8611363115940526,
+                -0.3399810435848563,
+                0.3399810435848563,
+                0.8611363115940526,
+            ]
+        ),
+        np.array(
+            [
+                0.34785484513745385,
+                0.6521451548625461,
+                0.6521451548625461,
+                0.34785484513745385,
+            ]
+        ),
+    ),
+}
+
+
+def composite_rule(method: str, nsub: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the nodes and weights of a composite quadrature rule on the unit
+    interval [0, 1].
+
+    The integral of ``f`` over ``[a, b]`` is approximated by
+    ``(b - a) * sum(weights * f(a + (b - a) * nodes))``, so a single rule
+    can be applied to any number of intervals by broadcasting.
+
+    Parameters
+    ----------
+    method : str
+        One of ``midpoint``, ``trapezoid``, ``simpson``, ``gauss2`` or
+        ``gauss4``
+
+    nsub : int
+        The number of equal sub-panels
+
+    Returns
+    -------
+    nodes : np.ndarray
+        Quadrature nodes in [0, 1]
+
+    weights : np.ndarray
+        Quadrature weights, summing to one
+    """
+    if nsub < 1:
+        raise ValueError(f'nsub must be positive, got {nsub}.')
+    h = 1.0 / nsub
+    if method == 'midpoint':
+        nodes = (np.arange(nsub) + 0.5) * h
+        weights = np.full(nsub, h)
+    elif method == 'trapezoid':
+        nodes = np.arange(nsub + 1) * h
+        weights = np.full(nsub + 1, h)
+        weights[0] *= 0.5
+        weights[-1] *= 0.5
+    elif method == 'simpson':
+        if nsub % 2 != 0:
+            raise ValueError('Simpson requires even nsub.')
+        nodes = np.arange(nsub + 1) * h
+        weights = np.full(nsub + 1, 2.0 * h / 3.0)
+        weights[1:-1:2] = 4.0 * h / 3.0
+        weights[0] = h / 3.0
+        weights[-1] = h / 3.0
+    elif method in _GAUSS_RULES:
+        xi, wi = _GAUSS_RULES[method]
+        mids = (np.arange(nsub) + 0.5) * h
+        nodes = (mids[:, np.newaxis] + 0.5 * h * xi[np.newaxis, :]).ravel()
+        weights = np.tile(0.5 * h * wi, nsub)
+    else:
+        raise ValueError(f'Unknown quadrature method: {method}')
+    return nodes, weights
+
+
+def fixed_quadrature(
+    integrand: Callable[[np.ndarray], np.ndarray],
+    a: np.ndarray,
+    b: np.ndarray,
+    nsub: int,
+    method: str,
+) -> np.ndarray:
+    """
+    Composite fixed-step quadrature over any number of intervals at once.
+
+    The integrand is evaluated exactly once, on a flat array holding the
+    nodes of every interval, so that an expensive vectorized integrand (e.g.
+    the equation of state) is called with a single array.
+
+    Parameters
+    ----------
+    integrand : callable
+        A vectorized function of a 1D array of points
+
+    a : np.ndarray
+        The lower limits of the intervals
+
+    b : np.ndarray
+        The upper limits of the intervals, broadcastable with ``a``
+
+    nsub : int
+        The number of sub-panels per interval
+
+    method : str
+        The composite rule (see :py:func:`composite_rule`)
+
+    Returns
+    -------
+    integral : np.ndarray
+        The integral over each interval with the broadcast shape of ``a``
+        and ``b``
+    """
+    a, b = np.broadcast_arrays(
+        np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    )
+    nodes, weights = composite_rule(method, nsub)
+    width = b - a
+    points = a[..., np.newaxis] + width[..., np.newaxis] * nodes
+    values = np.asarray(integrand(points.ravel()), dtype=float)
+    values = values.reshape(points.shape)
+    return width * np.sum(weights * values, axis=-1)
+
+
+def adaptive_simpson(
+    integrand: Callable[[np.ndarray], np.ndarray],
+    a: np.ndarray,
+    b: np.ndarray,
+    rel_tol: float,
+    abs_tol: float,
+    max_depth: int,
+) -> np.ndarray:
+    """
+    Adaptive Simpson integration over any number of intervals at once.
+
+    Rather than recursing panel by panel, all panels that have not yet met
+    the error criterion at a given depth are refined together, so the
+    integrand is called once per refinement level with the midpoints of
+    every active panel.  Converged panels are accumulated with Richardson
+    extrapolation; panels still active at ``max_depth`` are accepted as is.
+
+    Parameters
+    ----------
+    integrand : callable
+        A vectorized function of a 1D array of points
+
+    a : np.ndarray
+        The lower limits of the intervals
+
+    b : np.ndarray
+        The upper limits of the intervals, broadcastable with ``a``
+
+    rel_tol : float
+        The relative error tolerance for each panel
+
+    abs_tol : float
+        The absolute error tolerance for each panel
+
+    max_depth : int
+        The maximum number of times a panel may be bisected
+
+    Returns
+    -------
+    integral : np.ndarray
+        The integral over each interval with the broadcast shape of ``a``
+        and ``b``
+    """
+    a, b = np.broadcast_arrays(
+        np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    )
+    shape = a.shape
+    pa = a.ravel()
+    pb = b.ravel()
+    count = pa.size
+    total = np.zeros(count)
+    if count == 0:
+        return total.reshape(shape)
+
+    pm = 0.5 * (pa + pb)
+    fa, fm, fb = _evaluate_split(integrand, pa, pm, pb)
+    whole = _simpson_basic(fa, fm, fb, pa, pb)
+    owner = np.arange(count)
+
+    for depth in range(max_depth + 1):
+        lm = 0.5 * (pa + pm)
+        rm = 0.5 * (pm + pb)
+        flm, frm = _evaluate_split(integrand, lm, rm)
+        left = _simpson_basic(fa, flm, fm, pa, pm)
+        right = _simpson_basic(fm, frm, fb, pm, pb)
+        s2 = left + right
+        err = s2 - whole
+        if depth == max_depth:
+            np.add.at(total, owner, s2)
+            break
+        tol = np.maximum(abs_tol, rel_tol * np.maximum(np.abs(s2), 1e-15))
+        done = np.abs(err) < 15.0 * tol
+        # Richardson extrapolation on the converged panels
+        np.add.at(total, owner[done], s2[done] + err[done] / 15.0)
+
+        active = ~done
+        if not np.any(active):
+            break
+        # bisect the remaining panels: left halves followed by right halves
+        pa, pm, pb = (
+            np.concatenate([pa[active], pm[active]]),
+            np.concatenate([lm[active], rm[active]]),
+            np.concatenate([pm[active], pb[active]]),
+        )
+        fa, fm, fb = (
+            np.concatenate([fa[active], fm[active]]),
+            np.concatenate([flm[active], frm[active]]),
+            np.concatenate([fm[active], fb[active]]),
+        )
+        whole = np.concatenate([left[active], right[active]])
+        owner = np.concatenate([owner[active], owner[active]])
+
+    return total.reshape(shape)
+
+
+def _evaluate_split(
+    integrand: Callable[[np.ndarray], np.ndarray], *points: np.ndarray
+) -> list[np.ndarray]:
+    """
+    Evaluate the integrand at several equal-length point arrays with a single
+    call and split the result back up
+    """
+    values = np.asarray(integrand(np.concatenate(points)), dtype=float)
+    return np.split(values, len(points))
+
+
+def _simpson_basic(
+    fa: np.ndarray,
+    fm: np.ndarray,
+    fb: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+) -> np.ndarray:
+    """Single Simpson panel."""
+    return (b - a) / 6.0 * (fa + 4.0 * fm + fb)
@@ -11,6 +11,11 @@ from polaris.tasks.ocean.horiz_press_grad.column import (
     get_array_from_mid_grad,
     get_pchip_interpolator,
 )
+from polaris.tasks.ocean.horiz_press_grad.quadrature import (
+    adaptive_simpson,
+    composite_rule,
+    fixed_quadrature,
+)
 
 
 class ReferenceColumn:
@@ -71,6 +76,9 @@ class ReferenceColumn:
 
         self._method = method
         self._nsub = nsub
+        self._rel_tol = section.getfloat('reference_quadrature_rel_tol')
+        self._abs_tol = section.getfloat('reference_quadrature_abs_tol')
+        self._max_depth = section.getint('reference_quadrature_max_depth')
         # full centred-difference width in metres (2 * eps_km, km -> m)
         self._two_eps_m = 2.0 * eps_km * 1000.0
         self._x_sign = x_sign
@@ -164,16 +172,12 @@ class ReferenceColumn:
         unique_z = np.unique(np.concatenate([[z_surf], flat]))
 
         # Cumulative integral, then re-reference to the surface so that
-        # I(z̃) = ∫_{z̃_surf}^{z̃} dalpha_dx dz̃' (zero at the surface).
+        # I(z̃) = ∫_{z̃_surf}^{z̃} dalpha_dx dz̃' (zero at the surface).  All
+        # intervals are integrated together with one call to the EOS.
         I_cum = np.zeros(len(unique_z))
-        for i in range(1, len(unique_z)):
-            I_cum[i] = I_cum[i - 1] + _fixed_quadrature(
-                self.dalpha_dx,
-                unique_z[i - 1],
-                unique_z[i],
-                self._nsub,
-                self._method,
-            )
+        I_cum[1:] = np.cumsum(
+            self._integrate(self.dalpha_dx, unique_z[:-1], unique_z[1:])
+        )
         I_cum -= np.interp(z_surf, unique_z, I_cum)
 
         I_at = np.interp(flat, unique_z, I_cum)
@@ -187,70 +191,54 @@ class ReferenceColumn:
         """
         Layer-averaged HPGA in the edge-normal direction (m s⁻²).
 
+        The quadrature nodes of all layers (and all columns, if several are
+        given) are gathered into a single call to :py:meth:`hpga`.
+
         Parameters
         ----------
         z_tilde_interfaces : ndarray
-            Shape ``(nLayers+1,)`` interface pseudo-heights, decreasing
-            from surface (index 0) to seafloor (index -1).
+            Shape ``(nLayers+1,)`` or ``(nColumns, nLayers+1)`` interface
+            pseudo-heights, decreasing from surface (index 0) to seafloor
+            (index -1).
 
         Returns
         -------
         ndarray
-            Shape ``(nLayers,)`` Gauss-weighted layer-mean HPGA.
+            Shape ``(nLayers,)`` or ``(nColumns, nLayers)`` Gauss-weighted
+            layer-mean HPGA.
         """
         z_tilde_interfaces = np.asarray(z_tilde_interfaces, dtype=float)
-        n_layers = len(z_tilde_interfaces) - 1
-
-        # 4-point Gauss–Legendre nodes and weights on [-1, 1]
-        xi = np.array(
-            [
-                -0.8611363115940526,
-                -0.3399810435848563,
-                0.3399810435848563,
-                0.8611363115940526,
-            ]
-        )
-        wi = np.array(
-            [
-                0.34785484513745385,
-                0.6521451548625461,
-                0.6521451548625461,
-                0.34785484513745385,
-            ]
-        )
+        z_top = z_tilde_interfaces[..., :-1]
+        z_bot = z_tilde_interfaces[..., 1:]
+        layer_dz = z_top - z_bot
+
+        # composite 4-point Gauss–Legendre rule on [0, 1]
+        nodes, weights = composite_rule('gauss4', self._nsub)
+        pts = z_bot[..., np.newaxis] + layer_dz[..., np.newaxis] * nodes
+        a_arr = self.hpga(pts)
 
-        all_pts: list[float] = []
-        all_wts: list[float] = []
-        slices: list[tuple[int, int]] = []
-        layer_dz: list[float] = []
-
-        for k in range(n_layers):
-            z_top = float(z_tilde_interfaces[k])
-            z_bot = float(z_tilde_interfaces[k + 1])
-            dz = z_top - z_bot
-            layer_dz.append(dz)
-            h = dz / self._nsub
-            start = len(all_pts)
-            for s in range(self._nsub):
-                a_s = z_bot + s * h
-                b_s = a_s + h
-                mid_s = 0.5 * (a_s + b_s)
-                half = 0.5 * h
-                for j in range(len(xi)):
-                    all_pts.append(float(mid_s + half * xi[j]))
-                    all_wts.append(float(wi[j] * half))
-            slices.append((start, len(all_pts)))
-
-        pts_arr = np.array(all_pts)
-        wts_arr = np.array(all_wts)
-        a_arr = self.hpga(pts_arr)
-
-        result = np.zeros(n_layers)
-        for k in range(n_layers):
-            s0, s1 = slices[k]
-            if layer_dz[k] > 0.0:
-                result[k] = np.dot(wts_arr[s0:s1], a_arr[s0:s1]) / layer_dz[k]
-        return result
+        result = np.sum(weights * a_arr, axis=-1)
+        return np.where(layer_dz > 0.0, result, 0.0)
+
+    def _integrate(
+        self,
+        integrand: Callable[[np.ndarray], np.ndarray],
+        a: np.ndarray,
+        b: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Integrate over each interval [a, b] with the configured method
+        """
+        if self._method == 'adaptive_simpson':
+            return adaptive_simpson(
+                integrand,
+                a,
+                b,
+                rel_tol=self._rel_tol,
+                abs_tol=self._abs_tol,
+                max_depth=self._max_depth,
+            )
+        return fixed_quadrature(integrand, a, b, self._nsub, self._method)
 
 
 def _get_surface_pressure_mid_grad(
@@ -290,166 +278,3 @@ class _ClampedInterp:
     def __call__(self, z_tilde: np.ndarray) -> np.ndarray:
         z = np.clip(np.asarray(z_tilde, dtype=float), self._z_min, self._z_max)
         return self._interp(z)
-
-
-# ---- quadrature primitives --------------------------------------------------
-
-
-def _fixed_quadrature(
-    integrand: Callable[[np.ndarray], np.ndarray],
-    a: float,
-    b: float,
-    nsub: int,
-    method: str,
-) -> float:
-    """Composite fixed-step quadrature over [a,b]."""
-    h = (b - a) / nsub
-    total = 0.0
-    if method == 'midpoint':
-        mids = a + (np.arange(nsub) + 0.5) * h
-        total = np.sum(integrand(mids)) * h
-    elif method == 'trapezoid':
-        x = a + np.arange(nsub + 1) * h
-        fx = integrand(x)
-        total = h * (0.5 * fx[0] + fx[1:-1].sum() + 0.5 * fx[-1])
-    elif method == 'simpson':
-        if nsub % 2 != 0:
-            raise ValueError('Simpson requires even nsub.')
-        x = a + np.arange(nsub + 1) * h
-        fx = integrand(x)
-        total = (
-            h
-            / 3.0
-            * (
-                fx[0]
-                + fx[-1]
-                + 4.0 * fx[1:-1:2].sum()
-                + 2.0 * fx[2:-2:2].sum()
-            )
-        )
-    elif method in {'gauss2', 'gauss4'}:
-        total = _gauss_composite(integrand, a, b, nsub, method)
-    else:  # pragma: no cover - defensive
-        raise ValueError(f'Unknown quadrature method: {method}')
-    return float(total)
-
-
-def _gauss_composite(
-    integrand: Callable[[np.ndarray], np.ndarray],
-    a: float,
-    b: float,
-    nsub: int,
-    method: str,
-) -> float:
-    """Composite Gauss-Legendre quadrature (2- or 4-point)."""
-    h = (b - a) / nsub
-    total = 0.0
-    if method == 'gauss2':
-        xi = np.array([-1.0 / np.sqrt(3.0), 1.0 / np.sqrt(3.0)])
-        wi = np.array([1.0, 1.0])
-    else:  # gauss4
-        xi = np.array(
-            [
-                -0.8611363115940526,
-                -0.3399810435848563,
-                0.3399810435848563,
-                0.8611363115940526,
-            ]
-        )
-        wi = np.array(
-            [
-                0.34785484513745385,
-                0.6521451548625461,
-                0.6521451548625461,
-                0.34785484513745385,
-            ]
-        )
-    for k in range(nsub):
-        a_k = a + k * h
-        b_k = a_k + h
-        mid = 0.5 * (a_k + b_k)
-        half = 0.5 * h
-        xk = mid + half * xi
-        fx = integrand(xk)
-        total += half * np.sum(wi * fx)
-    return float(total)
-
-
-def _adaptive_simpson(
-    integrand: Callable[[np.ndarray], np.ndarray],
-    a: float,
-    b: float,
-    rel_tol: float,
-    abs_tol: float,
-    max_depth: int,
-) -> float:
-    """Adaptive Simpson integration over [a,b]."""
-    fa = integrand(np.array([a]))[0]
-    fb = integrand(np.array([b]))[0]
-    m = 0.5 * (a + b)
-    fm = integrand(np.array([m]))[0]
-    whole = _simpson_basic(fa, fm, fb, a, b)
-    return _adaptive_simpson_recursive(
-        integrand, a, b, fa, fm, fb, whole, rel_tol, abs_tol, max_depth, 0
-    )
-
-
-def _simpson_basic(
-    fa: float, fm: float, fb: float, a: float, b: float
-) -> float:
-    """Single Simpson panel."""
-    return (b - a) / 6.0 * (fa + 4.0 * fm + fb)
-
-
-def _adaptive_simpson_recursive(
-    integrand: Callable[[np.ndarray], np.ndarray],
-    a: float,
-    b: float,
-    fa: float,
-    fm: float,
-    fb: float,
-    whole: float,
-    rel_tol: float,
-    abs_tol: float,
-    max_depth: int,
-    depth: int,
-) -> float:
-    m = 0.5 * (a + b)
-    lm = 0.5 * (a + m)
-    rm = 0.5 * (m + b)
-    flm = integrand(np.array([lm]))[0]
-    frm = integrand(np.array([rm]))[0]
-    left = _simpson_basic(fa, flm, fm, a, m)
-    right = _simpson_basic(fm, frm, fb, m, b)
-    S2 = left + right
-    err = S2 - whole
-    tol = max(abs_tol, rel_tol * max(abs(S2), 1e-15))
-    if depth >= max_depth:
-        return S2
-    if abs(err) < 15.0 * tol:
-        return S2 + err / 15.0  # Richardson extrapolation
-    return _adaptive_simpson_recursive(
-        integrand,
-        a,
-        m,
-        fa,
-        flm,
-        fm,
-        left,
-        rel_tol,
-        abs_tol,
-        max_depth,
-        depth + 1,
-    ) + _adaptive_simpson_recursive(
-        integrand,
-        m,
-        b,
-        fm,
-        frm,
-        fb,
-        right,
-        rel_tol,
-        abs_tol,
-        max_depth,
-        depth + 1,
-    )
@@ -3,11 +3,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import xarray as xr
-from mpas_tools.ocean.viz.transect import compute_transect, plot_transect
+from mpas_tools.ocean.viz.transect import plot_transect
 
 from polaris.mpas import cell_mask_to_edge_mask
 from polaris.ocean.model import OceanIOStep
-from polaris.viz import plot_horiz_field
+from polaris.viz import TransectGeometry, plot_horiz_field
 
 
 class Viz(OceanIOStep):
@@ -72,6 +72,7 @@ class Viz(OceanIOStep):
         y_max = ds_mesh.yCell.max()
         x = xr.DataArray(data=[x_mid, x_mid], dims=('nPoints',))
         y = xr.DataArray(data=[y_min, y_max], dims=('nPoints',))
+        transect = TransectGeometry(x=x, y=y, ds_horiz_mesh=ds_mesh)
 
         # Plot the time series of max velocity
         plt.figure(figsize=[12, 6], dpi=100)
@@ -106,15 +107,11 @@ class Viz(OceanIOStep):
         )
 
         time_index = 0  # Plot the initial time
-        ds_transect = compute_transect(
-            x=x,
-            y=y,
-            ds_horiz_mesh=ds_mesh,
+        ds_transect = transect.compute_transect(
             layer_thickness=ds_init.layerThickness.isel(Time=time_index),
             bottom_depth=ds_vert_coord.bottomDepth,
             min_level_cell=ds_vert_coord.minLevelCell - 1,
             max_level_cell=ds_vert_coord.maxLevelCell - 1,
-            spherical=False,
         )
 
         plot_transect(
@@ -212,15 +209,11 @@ class Viz(OceanIOStep):
         )
 
         # Plot transects
-        ds_transect = compute_transect(
-            x=x,
-            y=y,
-            ds_horiz_mesh=ds_mesh,
+        ds_transect = transect.compute_transect(
             layer_thickness=ds.layerThickness.isel(Time=time_index),
             bottom_depth=ds_vert_coord.bottomDepth,
             min_level_cell=ds_vert_coord.minLevelCell - 1,
             max_level_cell=ds_vert_coord.maxLevelCell - 1,
-            spherical=False,
         )
 
         plot_horiz_field(
@@ -25,6 +25,10 @@ class PStarInit(PStarInitStep, OceanIOStep):
     and practical salinity when writing the initial state for MPAS-Ocean.
     """
 
+    # the tracers depend only on each column's xCell, so later outer
+    # iterations can recompute just the columns that are still changing
+    pstar_active_set = True
+
     def __init__(self, component, name='init', indir=None):
         """
         Create the step
@@ -2,11 +2,11 @@ import cmocean  # noqa: F401
 import matplotlib.pyplot as plt
 import numpy as np
 import xarray as xr
-from mpas_tools.ocean.viz.transect import compute_transect, plot_transect
+from mpas_tools.ocean.viz.transect import plot_transect
 
 from polaris.ocean.model import OceanIOStep, get_days_since_start
 from polaris.ocean.rpe import compute_rpe
-from polaris.viz import use_mplstyle
+from polaris.viz import TransectGeometry, use_mplstyle
 
 
 class Analysis(OceanIOStep):
@@ -126,6 +126,7 @@ class Analysis(OceanIOStep):
 
         x = xr.DataArray(data=np.linspace(x_min, x_max, 2), dims=('nPoints',))
         y = y_mid * xr.ones_like(x)
+        transect = TransectGeometry(x=x, y=y, ds_horiz_mesh=ds_mesh)
         for row_index, nu in enumerate(nus):
             ax = axes[row_index]
             ds = self.open_model_dataset(
@@ -134,15 +135,11 @@ class Analysis(OceanIOStep):
             times = get_days_since_start(ds)
             time_index = np.argmin(np.abs(times - time))
             time = times[time_index]
-            ds_transect = compute_transect(
-                x=x,
-                y=y,
-                ds_horiz_mesh=ds_mesh,
+            ds_transect = transect.compute_transect(
                 layer_thickness=ds.layerThickness.isel(Time=time_index),
                 bottom_depth=ds_vert_coord.bottomDepth,
                 min_level_cell=ds_vert_coord.minLevelCell - 1,
                 max_level_cell=ds_vert_coord.maxLevelCell - 1,
-                spherical=False,
             )
 
             if row_index == len(nus) - 1:
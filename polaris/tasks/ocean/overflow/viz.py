@@ -1,9 +1,10 @@
 import cmocean  # noqa: F401
 import numpy as np
 import xarray as xr
-from mpas_tools.ocean.viz.transect import compute_transect, plot_transect
+from mpas_tools.ocean.viz.transect import plot_transect
 
 from polaris.ocean.model import OceanIOStep
+from polaris.viz import TransectGeometry
 
 
 class Viz(OceanIOStep):
@@ -114,17 +115,14 @@ class Viz(OceanIOStep):
 
         x = xr.DataArray(data=np.linspace(x_min, x_max, 2), dims=('nPoints',))
         y = y_mid * xr.ones_like(x)
+        transect = TransectGeometry(x=x, y=y, ds_horiz_mesh=ds_mesh)
 
         t_index = 0
-        ds_transect = compute_transect(
-            x=x,
-            y=y,
-            ds_horiz_mesh=ds_mesh,
+        ds_transect = transect.compute_transect(
             layer_thickness=ds_init.layerThickness.isel(Time=t_index),
             bottom_depth=ds_vert_coord.bottomDepth,
             min_level_cell=ds_vert_coord.minLevelCell - 1,
             max_level_cell=ds_vert_coord.maxLevelCell - 1,
-            spherical=False,
         )
 
         field_name = 'temperature'
@@ -146,15 +144,11 @@ class Viz(OceanIOStep):
         )
 
         t_index = ds.sizes['Time'] - 1
-        ds_transect = compute_transect(
-            x=x,
-            y=y,
-            ds_horiz_mesh=ds_mesh,
+        ds_transect = transect.compute_transect(
             layer_thickness=ds.layerThickness.isel(Time=t_index),
             bottom_depth=ds_vert_coord.bottomDepth,
             min_level_cell=ds_vert_coord.minLevelCell - 1,
             max_level_cell=ds_vert_coord.maxLevelCell - 1,
-            spherical=False,
         )
 
         field_name = 'temperature'
@@ -1,9 +1,8 @@
-import gsw
-import numpy as np
 import xarray as xr
 from mpas_tools.io import write_netcdf
 
 from polaris import Step
+from polaris.ocean.eos.gridded import teos10_from_insitu
 
 
 class CombineStep(Step):
@@ -29,6 +28,8 @@ class CombineStep(Step):
             subdir=subdir,
             ntasks=1,
             min_tasks=1,
+            cpus_per_task=16,
+            min_cpus_per_task=1,
         )
         self.add_output_file(filename='woa_combined.nc')
 
@@ -97,23 +98,23 @@ class CombineStep(Step):
                     f'woa_{field}_jan.nc', decode_times=False
                 ) as ds_jan:
                     ds_jan = ds_jan.isel(time=0, drop=True)
-                    slices = []
-                    for depth_index in range(ds_ann.sizes['depth']):
-                        if depth_index < ds_jan.sizes['depth']:
-                            ds = ds_jan
-                        else:
-                            ds = ds_ann
-                        slices.append(ds[var_name].isel(depth=depth_index))
-
-                    ds_out[var_name] = xr.concat(slices, dim='depth')
-                    ds_out[var_name].attrs = ds_ann[var_name].attrs
-
-        ds_out = self._to_canonical_teos10(ds_out)
+                    # January fields replace the annual ones at the depths
+                    # where they are available
+                    ann = ds_ann[var_name].transpose('depth', ...)
+                    jan_depths = min(ds_jan.sizes['depth'], ann.sizes['depth'])
+                    jan = ds_jan[var_name].isel(depth=slice(0, jan_depths))
+                    data = ann.values
+                    data[0:jan_depths] = jan.transpose(*ann.dims).values
+                    ds_out[var_name] = xr.DataArray(
+                        data=data, dims=ann.dims, attrs=ann.attrs
+                    )
+
+        ds_out = self._to_canonical_teos10(ds_out, workers=self.cpus_per_task)
         write_netcdf(ds_out, 'woa_combined.nc')
         logger.info('Wrote woa_combined.nc')
 
     @staticmethod
-    def _to_canonical_teos10(ds):
+    def _to_canonical_teos10(ds, workers=1):
         """
         Convert WOA in-situ temperature and practical salinity to canonical
         conservative temperature and absolute salinity.
@@ -123,59 +124,36 @@ class CombineStep(Step):
         ds : xarray.Dataset
             A combined WOA dataset with in-situ temperature and salinity.
 
+        workers : int, optional
+            The number of worker processes for the conversion.
+
         Returns
         -------
         ds : xarray.Dataset
             The dataset with conservative temperature and absolute salinity.
         """
         dims = ds.t_an.dims
-        ct_slices = []
-        sa_slices = []
-        for depth_index in range(ds.sizes['depth']):
-            temp_slice = ds.t_an.isel(depth=depth_index)
-            in_situ_temp = temp_slice.values
-            practical_salinity = ds.s_an.isel(depth=depth_index).values
-            lat = ds.lat.broadcast_like(temp_slice).values
-            lon = ds.lon.broadcast_like(temp_slice).values
-            z = -ds.depth.isel(depth=depth_index).values
-            pressure = gsw.p_from_z(z, lat)
-
-            mask = np.isfinite(in_situ_temp) & np.isfinite(practical_salinity)
-            conservative_temp = np.full(in_situ_temp.shape, np.nan)
-            absolute_salinity = np.full(practical_salinity.shape, np.nan)
-            absolute_salinity[mask] = gsw.SA_from_SP(
-                practical_salinity[mask],
-                pressure[mask],
-                lon[mask],
-                lat[mask],
-            )
-            conservative_temp[mask] = gsw.CT_from_t(
-                absolute_salinity[mask],
-                in_situ_temp[mask],
-                pressure[mask],
-            )
-            ct_slices.append(
-                xr.DataArray(
-                    data=conservative_temp,
-                    dims=temp_slice.dims,
-                    attrs=temp_slice.attrs,
-                )
-            )
-            sa_slices.append(
-                xr.DataArray(
-                    data=absolute_salinity,
-                    dims=temp_slice.dims,
-                    attrs=ds.s_an.attrs,
-                )
-            )
+        grid_dims = ('depth', 'lat', 'lon')
+        conservative_temp, absolute_salinity = teos10_from_insitu(
+            in_situ_temp=ds.t_an.transpose(*grid_dims).values,
+            practical_salinity=ds.s_an.transpose(*grid_dims).values,
+            depth=ds.depth.values,
+            lat=ds.lat.values,
+            lon=ds.lon.values,
+            workers=workers,
+        )
 
-        ds['ct_an'] = xr.concat(ct_slices, dim='depth').transpose(*dims)
+        ds['ct_an'] = xr.DataArray(
+            data=conservative_temp, dims=grid_dims, attrs=ds.t_an.attrs
+        ).transpose(*dims)
         ds.ct_an.attrs['standard_name'] = 'sea_water_conservative_temperature'
         ds.ct_an.attrs['long_name'] = (
             'Objectively analyzed mean fields for '
             'sea_water_conservative_temperature at standard depth levels.'
         )
-        ds['sa_an'] = xr.concat(sa_slices, dim='depth').transpose(*dims)
+        ds['sa_an'] = xr.DataArray(
+            data=absolute_salinity, dims=grid_dims, attrs=ds.s_an.attrs
+        ).transpose(*dims)
         ds.sa_an.attrs['standard_name'] = 'sea_water_absolute_salinity'
         ds.sa_an.attrs['long_name'] = (
             'Objectively analyzed mean fields for '
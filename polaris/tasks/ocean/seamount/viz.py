@@ -2,11 +2,11 @@ import cmocean  # noqa: F401
 import matplotlib.pyplot as plt
 import numpy as np
 import xarray as xr
-from mpas_tools.ocean.viz.transect import compute_transect, plot_transect
+from mpas_tools.ocean.viz.transect import plot_transect
 
 from polaris.mpas import cell_mask_to_edge_mask
 from polaris.ocean.model import OceanIOStep, get_days_since_start
-from polaris.viz import plot_horiz_field
+from polaris.viz import TransectGeometry, plot_horiz_field
 
 
 class Viz(OceanIOStep):
@@ -53,29 +53,22 @@ class Viz(OceanIOStep):
 
         x = xr.DataArray(data=[x_min, x_max], dims=('nPoints',))
         y = y_mid * xr.ones_like(x)
+        transect = TransectGeometry(x=x, y=y, ds_horiz_mesh=ds_mesh)
 
         t_index = 0
-        ds_transect = compute_transect(
-            x=x,
-            y=y,
-            ds_horiz_mesh=ds_mesh,
+        ds_transect = transect.compute_transect(
             layer_thickness=ds_init.layerThickness.isel(Time=t_index),
             bottom_depth=ds_vert_coord.bottomDepth,
             min_level_cell=ds_vert_coord.minLevelCell - 1,
             max_level_cell=ds_vert_coord.maxLevelCell - 1,
-            spherical=False,
         )
 
         t_index = ds.sizes['Time'] - 1
-        ds_transect = compute_transect(
-            x=x,
-            y=y,
-            ds_horiz_mesh=ds_mesh,
+        ds_transect = transect.compute_transect(
             layer_thickness=ds.layerThickness.isel(Time=t_index),
             bottom_depth=ds_vert_coord.bottomDepth,
             min_level_cell=ds_vert_coord.minLevelCell - 1,
             max_level_cell=ds_vert_coord.maxLevelCell - 1,
-            spherical=False,
         )
 
         field_name = 'kineticEnergyCell'
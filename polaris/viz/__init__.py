@@ -16,3 +16,4 @@ from polaris.viz.spherical import (
 )
 from polaris.viz.spherical import setup_colormap as setup_colormap
 from polaris.viz.style import use_mplstyle as use_mplstyle
+from polaris.viz.transect import TransectGeometry as TransectGeometry
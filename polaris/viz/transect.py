@@ -0,0 +1,110 @@
+import numpy as np
+from mpas_tools.ocean.viz.transect.vert import (
+    find_transect_levels_and_weights,
+)
+from mpas_tools.viz.transect.horiz import (
+    find_planar_transect_cells_and_weights,
+    find_spherical_transect_cells_and_weights,
+    make_triangle_tree,
+    mesh_to_triangles,
+)
+
+
+class TransectGeometry:
+    """
+    The horizontal geometry of a transect through an MPAS mesh, computed once
+    and reused for any number of fields, times and runs on that mesh
+
+    Finding where a transect intersects the cells of a mesh (triangulating
+    the mesh, building a tree of triangles and intersecting the transect with
+    it) is by far the most expensive part of
+    :py:func:`mpas_tools.ocean.viz.transect.compute_transect()`.  Plots
+    comparing several runs or times on the same mesh only need to do it once;
+    the vertical part of the transect, which depends on the layer thickness,
+    is then a cheap gather from the cells along the transect.
+
+    Attributes
+    ----------
+    ds_horiz_transect : xarray.Dataset
+        The horizontal transect: the nodes and segments of the transect with
+        the indices of the cells they lie in and interpolation weights
+    """
+
+    def __init__(self, x, y, ds_horiz_mesh, spherical=False):
+        """
+        Intersect a transect with a mesh
+
+        Parameters
+        ----------
+        x : xarray.DataArray
+            The x or longitude coordinate of the transect
+
+        y : xarray.DataArray
+            The y or latitude coordinate of the transect
+
+        ds_horiz_mesh : xarray.Dataset
+            The horizontal MPAS mesh to use for plotting
+
+        spherical : bool, optional
+            Whether ``x`` and ``y`` are longitude and latitude in degrees
+            on a spherical mesh, rather than planar coordinates
+        """
+        ds_tris = mesh_to_triangles(ds_horiz_mesh)
+        triangle_tree = make_triangle_tree(ds_tris)
+        if spherical:
+            ds_horiz_transect = find_spherical_transect_cells_and_weights(
+                x, y, ds_tris, ds_horiz_mesh, triangle_tree, degrees=True
+            )
+        else:
+            ds_horiz_transect = find_planar_transect_cells_and_weights(
+                x, y, ds_tris, ds_horiz_mesh, triangle_tree
+            )
+        self.ds_horiz_transect = ds_horiz_transect.compute()
+
+    def compute_transect(
+        self, layer_thickness, bottom_depth, min_level_cell, max_level_cell
+    ):
+        """
+        Build the transect for a given vertical coordinate, as
+        :py:func:`mpas_tools.ocean.viz.transect.compute_transect()` would
+
+        Parameters
+        ----------
+        layer_thickness : xarray.DataArray
+            The layer thickness at a particular instant in time
+
+        bottom_depth : xarray.DataArray
+            The bottom depth of each cell
+
+        min_level_cell : xarray.DataArray
+            The zero-based index of the top valid level of each cell
+
+        max_level_cell : xarray.DataArray
+            The zero-based index of the bottom valid level of each cell
+
+        Returns
+        -------
+        ds_transect : xarray.Dataset
+            The transect dataset to pass to
+            :py:func:`mpas_tools.ocean.viz.transect.plot_transect()`
+        """
+        ds_horiz_transect = self.ds_horiz_transect.copy()
+
+        # mask the transect to valid cells (max_level_cell >= 0)
+        cell_indices = ds_horiz_transect.horizCellIndices.values
+        seg_mask = max_level_cell.values[cell_indices] >= 0
+        node_mask = np.zeros(ds_horiz_transect.sizes['nNodes'], dtype=bool)
+        node_mask[0:-1] = seg_mask
+        node_mask[1:] = np.logical_or(node_mask[1:], seg_mask)
+
+        ds_horiz_transect['segMask'] = ('nSegments', seg_mask)
+        ds_horiz_transect['nodeMask'] = ('nNodes', node_mask)
+
+        ds_transect = find_transect_levels_and_weights(
+            ds_horiz_transect,
+            layer_thickness,
+            bottom_depth,
+            min_level_cell,
+            max_level_cell,
+        )
+        return ds_transect.compute()
@@ -7,6 +7,8 @@ from jinja2 import Template
 from lxml import etree
 from ruamel.yaml import YAML
 
+import polaris.registry
+
 
 class PolarisYaml:
     """
@@ -256,6 +258,8 @@ def yaml_to_mpas_streams(processed_registry_filename, yaml):
     processed_registry_filename : str
         The processed registry file, used to determine the types of variables
         each steam (since the yaml format doesn't supply that information).
+        The registry is only parsed once per process (or again if the file
+        changes); see :py:func:`polaris.registry.read`.
 
     yaml : polaris.yaml.PolarisYaml
         A yaml object with the namelists and streams
@@ -266,15 +270,12 @@ def yaml_to_mpas_streams(processed_registry_filename, yaml):
         A tree of XML data describing MPAS i/o streams with the content from
         the streams in the yaml file
     """
-    with open(processed_registry_filename, 'r') as reg_file:
-        registry_string = reg_file.read()
-    registry_string = registry_string.lstrip('\n')
-    registry = etree.fromstring(registry_string)
+    registry = polaris.registry.read(processed_registry_filename)
 
     root = etree.Element('streams')
     for stream in yaml.streams:
         # find out if stream or immutable_stream
-        tag = _get_stream_tag(registry, stream)
+        tag = registry.get_stream_tag(stream)
         attrs = dict(yaml.streams[stream])
         contents = None
         if 'contents' in attrs:
@@ -284,7 +285,7 @@ def yaml_to_mpas_streams(processed_registry_filename, yaml):
         if contents is not None:
             for var in contents:
                 # find out what type it has
-                tag = _get_var_tag(registry, var)
+                tag = registry.get_var_tag(var)
                 etree.SubElement(child, tag, attrib=dict(name=var))
 
     tree = etree.ElementTree(element=root)
@@ -454,55 +455,3 @@ def _streams_xml_to_dict(streams_filename):
             streams[stream_name]['contents'] = contents
 
     return streams
-
-
-def _get_stream_tag(registry, stream):
-    """Get the xml tag, 'stream' or 'immutable_stream' for a given stream"""
-    streams = next(next(registry.iter('registry')).iter('streams'))
-    # if we don't find the stream, it can't be an immutable stream
-    tag = 'stream'
-    for child in streams:
-        if child.tag == 'stream' and child.attrib['name'] == stream:
-            if (
-                'immutable' in child.attrib
-                and child.attrib['immutable'] == 'true'
-            ):
-                tag = 'immutable_stream'
-            break
-    return tag
-
-
-def _get_var_tag(registry, variable):
-    """
-    Get the xml tag -- 'stream', 'var_struct', 'var_array' or 'var' -- for a
-    variable
-    """
-    tag = None
-    streams = next(next(registry.iter('registry')).iter('streams'))
-    for child in streams:
-        if child.tag == 'stream' and child.attrib['name'] == variable:
-            return 'stream'
-
-    tree = next(registry.iter('registry'))
-    for child in tree:
-        if child.tag == 'var_struct':
-            if child.attrib['name'] == variable:
-                return 'var_struct'
-
-            for grandchild in child:
-                if (
-                    grandchild.tag in ['var_struct', 'var_array', 'var']
-                    and grandchild.attrib['name'] == variable
-                ):
-                    return grandchild.tag
-                if grandchild.tag in ['var_struct', 'var_array']:
-                    for greatgrand in grandchild:
-                        if (
-                            greatgrand.tag in ['var_array', 'var']
-                            and greatgrand.attrib['name'] == variable
-                        ):
-                            return greatgrand.tag
-
-    if tag is None:
-        raise ValueError(f'Could not find {variable} in preprocessed registry')
-    return tag
@@ -1,7 +1,15 @@
+import logging
+import os
+
 import numpy as np
+import pytest
 import xarray as xr
 
-from polaris.tasks.e3sm.init.topo.cull.mask import CullMaskStep
+import polaris.tasks.e3sm.init.topo.cull.mask as mask
+from polaris.tasks.e3sm.init.topo.cull.mask import (
+    CullMaskPipeline,
+    CullMaskStep,
+)
 
 
 def test_antarctic_land_ice_ownership_includes_southern_non_ocean_cells():
@@ -26,6 +34,42 @@ def test_antarctic_land_ice_ownership_includes_southern_non_ocean_cells():
     np.testing.assert_array_equal(land_ice.values, [True, True, False])
 
 
+@pytest.mark.parametrize('write_intermediate', [False, True])
+def test_cull_mask_pipeline_writes_only_requested_masks(
+    tmp_path, monkeypatch, write_intermediate
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(mask, 'open_dataset', xr.open_dataset)
+    monkeypatch.setattr(
+        mask, 'write_netcdf', lambda ds, filename: ds.to_netcdf(filename)
+    )
+    xr.Dataset(dict(latCell=('nCells', [0.0, 1.0]))).to_netcdf('mesh.nc')
+    _topo_dataset(
+        ocean_frac=[1.0, 0.0],
+        land_frac=[0.0, 1.0],
+        ice_frac=[0.0, 0.0],
+        grounded_mask=[0.0, 0.0],
+        base_elevation=[-100.0, 100.0],
+    ).to_netcdf('topo.nc')
+
+    pipeline = CullMaskPipeline(
+        base_mesh_filename='mesh.nc',
+        topo_filename='topo.nc',
+        logger=logging.getLogger('test_cull_mask'),
+        write_intermediate=write_intermediate,
+    )
+    np.testing.assert_array_equal(pipeline.ds_topo.land_frac, [0.0, 1.0])
+
+    ds_ocean = xr.Dataset(dict(oceanCullMask=('nCells', [0, 1])))
+    pipeline.add('ocean_cull_mask', ds_ocean)
+    pipeline.add('cull_masks', ds_ocean, write=True)
+
+    assert pipeline.get('ocean_cull_mask') is ds_ocean
+    assert pipeline.get('land_cull_mask') is None
+    assert os.path.exists('cull_masks.nc')
+    assert os.path.exists('ocean_cull_mask.nc') == write_intermediate
+
+
 def _topo_dataset(
     ocean_frac,
     land_frac,
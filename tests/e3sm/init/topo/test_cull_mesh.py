@@ -0,0 +1,153 @@
+import numpy as np
+import xarray as xr
+
+from polaris.tasks.e3sm.init.topo.cull.cull import (
+    build_base_mesh_trees,
+    get_cached_culled_map_filename,
+    get_mpas_cell_scrip_dataset,
+    map_culled_to_base,
+    map_culled_to_base_from_mask,
+)
+
+
+def test_map_culled_to_base_shares_base_mesh_trees():
+    rng = np.random.default_rng(seed=0)
+    sizes = dict(
+        Cell=('nCells', 50), Edge=('nEdges', 150), Vertex=('nVertices', 100)
+    )
+    ds_base = xr.Dataset()
+    for suffix, (dim, size) in sizes.items():
+        points = rng.normal(size=(size, 3))
+        points /= np.linalg.norm(points, axis=1)[:, np.newaxis]
+        for index, coord in enumerate('xyz'):
+            ds_base[f'{coord}{suffix}'] = (dim, points[:, index])
+    base_trees = build_base_mesh_trees(ds_base)
+
+    # two different culled meshes, each a shuffled subset of the base mesh
+    for _ in range(2):
+        indices = dict()
+        ds_culled = xr.Dataset()
+        for suffix, (dim, size) in sizes.items():
+            indices[suffix] = rng.permutation(size)[: size // 2]
+            for coord in 'xyz':
+                ds_culled[f'{coord}{suffix}'] = (
+                    dim,
+                    ds_base[f'{coord}{suffix}'].values[indices[suffix]],
+                )
+
+        ds_map = map_culled_to_base(base_trees, ds_culled, workers=2)
+
+        for suffix, (dim, _) in sizes.items():
+            culled_to_base = ds_map[f'mapCulledToBase{suffix}']
+            assert culled_to_base.dims == (dim,)
+            np.testing.assert_array_equal(
+                culled_to_base.values, indices[suffix]
+            )
+
+
+def test_map_culled_to_base_from_mask_matches_kd_tree():
+    rng = np.random.default_rng(seed=0)
+    n_cells = 40
+    ds_base = xr.Dataset()
+    sizes = dict(Cell=('nCells', n_cells), Edge=('nEdges', 120))
+    sizes['Vertex'] = ('nVertices', 80)
+    for suffix, (dim, size) in sizes.items():
+        for coord in 'xyz':
+            ds_base[f'{coord}{suffix}'] = (dim, rng.normal(size=size))
+    ds_base['cellsOnEdge'] = (
+        ('nEdges', 'TWO'),
+        rng.integers(0, n_cells + 1, size=(120, 2)),
+    )
+    ds_base['cellsOnVertex'] = (
+        ('nVertices', 'vertexDegree'),
+        rng.integers(1, n_cells + 1, size=(80, 3)),
+    )
+    cull_mask = rng.random(n_cells) < 0.5
+
+    # the culled mesh keeps cells that aren't culled and edges and vertices
+    # next to them, and is then reordered
+    keep_cell = np.logical_not(cull_mask)
+    kept = dict(Cell=np.flatnonzero(keep_cell))
+    for suffix, cells_on in [
+        ('Edge', 'cellsOnEdge'),
+        ('Vertex', 'cellsOnVertex'),
+    ]:
+        cells = ds_base[cells_on].values - 1
+        kept[suffix] = np.array(
+            [
+                index
+                for index, row in enumerate(cells)
+                if any(keep_cell[cell] for cell in row if cell >= 0)
+            ]
+        )
+    ds_culled = xr.Dataset()
+    expected = dict()
+    for suffix, (dim, _) in sizes.items():
+        expected[suffix] = rng.permutation(kept[suffix])
+        for coord in 'xyz':
+            ds_culled[f'{coord}{suffix}'] = (
+                dim,
+                ds_base[f'{coord}{suffix}'].values[expected[suffix]],
+            )
+
+    ds_map = map_culled_to_base_from_mask(ds_base, ds_culled, cull_mask)
+
+    ds_tree_map = map_culled_to_base(build_base_mesh_trees(ds_base), ds_culled)
+    for suffix, (dim, _) in sizes.items():
+        variable = f'mapCulledToBase{suffix}'
+        assert ds_map[variable].dims == (dim,)
+        np.testing.assert_array_equal(ds_map[variable], expected[suffix])
+        np.testing.assert_array_equal(ds_map[variable], ds_tree_map[variable])
+
+    # a culled mesh that doesn't match the mask can't be mapped
+    ds_moved = ds_culled.copy()
+    ds_moved['xCell'] = ds_culled.xCell + 1.0
+    assert map_culled_to_base_from_mask(ds_base, ds_moved, cull_mask) is None
+    assert (
+        map_culled_to_base_from_mask(
+            ds_base, ds_culled, np.logical_not(cull_mask)
+        )
+        is None
+    )
+
+
+def test_cached_culled_map_filename_follows_mesh_and_mask():
+    mask = np.array([0, 1, 1, 0])
+    filename = get_cached_culled_map_filename('cache', 'abc', mask)
+    assert filename.startswith('cache/')
+    assert (
+        get_cached_culled_map_filename('cache', 'abc', mask == 1) == filename
+    )
+    assert get_cached_culled_map_filename('cache', 'abd', mask) != filename
+    assert get_cached_culled_map_filename('cache', 'abc', 1 - mask) != filename
+
+
+def test_mpas_cell_scrip_dataset_repeats_last_vertex():
+    ds_mesh = xr.Dataset()
+    ds_mesh.attrs['sphere_radius'] = 2.0
+    ds_mesh['latCell'] = ('nCells', [0.1, 0.2])
+    ds_mesh['lonCell'] = ('nCells', [1.1, 1.2])
+    ds_mesh['latVertex'] = ('nVertices', [0.0, 0.5, 1.0, 1.5])
+    ds_mesh['lonVertex'] = ('nVertices', [2.0, 2.5, 3.0, 3.5])
+    ds_mesh['nEdgesOnCell'] = ('nCells', [3, 4])
+    ds_mesh['verticesOnCell'] = (
+        ('nCells', 'maxEdges'),
+        [[1, 2, 3, 0], [4, 3, 2, 1]],
+    )
+    ds_mesh['areaCell'] = ('nCells', [4.0, 8.0])
+
+    ds_scrip = get_mpas_cell_scrip_dataset(ds_mesh, mesh_name='mesh')
+
+    assert ds_scrip.attrs['mesh_name'] == 'mesh'
+    np.testing.assert_array_equal(
+        ds_scrip.grid_corner_lat.values,
+        [[0.0, 0.5, 1.0, 1.0], [1.5, 1.0, 0.5, 0.0]],
+    )
+    np.testing.assert_array_equal(
+        ds_scrip.grid_corner_lon.values[0], [2.0, 2.5, 3.0, 3.0]
+    )
+    np.testing.assert_array_equal(ds_scrip.grid_center_lon.values, [1.1, 1.2])
+    np.testing.assert_array_equal(ds_scrip.grid_area.values, [1.0, 2.0])
+    np.testing.assert_array_equal(ds_scrip.grid_dims.values, [2])
+    np.testing.assert_array_equal(ds_scrip.grid_imask.values, [1, 1])
+    assert ds_scrip.grid_corner_lat.attrs['units'] == 'radians'
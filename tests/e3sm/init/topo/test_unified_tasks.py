@@ -168,6 +168,7 @@ def test_unified_remap_topo_task_includes_base_mesh_dependencies():
     assert list(task.steps.keys()) == [
         'combine_topo_bedmap3_gebco2023_lat_lon_0.03125_degree',
         'coastline_compute',
+        'coastline_pyramid',
         'coastline_remap',
         'river_simplify',
         'river_rasterize',
@@ -214,6 +215,7 @@ def test_unified_cull_topo_task_includes_base_mesh_dependencies():
     assert list(task.steps.keys()) == [
         'combine_topo_bedmap3_gebco2023_lat_lon_0.03125_degree',
         'coastline_compute',
+        'coastline_pyramid',
         'coastline_remap',
         'river_simplify',
         'river_rasterize',
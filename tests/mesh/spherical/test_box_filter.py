@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from polaris.mesh.spherical.box_filter import iter_box_sums
+
+
+@pytest.mark.parametrize('max_elements', [40, 2**22])
+def test_iter_box_sums_matches_uniform_filter(max_elements):
+    # per-row windows, including even windows, windows wider than the
+    # raster in longitude and windows reaching past both latitude bounds
+    rng = np.random.default_rng(seed=0)
+    field = rng.random((12, 9))
+    rows = np.array([0, 0, 3, 5, 5, 8, 11])
+    lat_windows = np.array([1, 5, 4, 3, 30, 2, 7])
+    lon_windows = np.array([1, 3, 9, 4, 20, 1, 6])
+
+    sums = np.zeros((rows.size, field.shape[1]))
+    for band, band_sums in iter_box_sums(
+        field, rows, lat_windows, lon_windows, max_elements=max_elements
+    ):
+        sums[band] = band_sums
+
+    for index, row in enumerate(rows):
+        lat_window = lat_windows[index]
+        lon_window = lon_windows[index]
+        expected = ndimage.uniform_filter1d(
+            field, size=lat_window, axis=0, mode='nearest'
+        )[row]
+        expected = ndimage.uniform_filter1d(
+            expected, size=lon_window, mode='wrap'
+        )
+        np.testing.assert_allclose(
+            sums[index] / (lat_window * lon_window), expected, atol=1e-12
+        )
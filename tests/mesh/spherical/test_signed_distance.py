@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from polaris.mesh.spherical.signed_distance import (
+    BoundaryDistance,
+    SignedDistanceCache,
+)
+
+# a 2-degree global grid with a few irregular continents
+RESOLUTION = 2.0
+LAT = np.arange(-90.0 + 0.5 * RESOLUTION, 90.0, RESOLUTION)
+LON = np.arange(-180.0 + 0.5 * RESOLUTION, 180.0, RESOLUTION)
+
+
+def _ocean_mask():
+    lon, lat = np.meshgrid(LON, LAT)
+    field = np.sin(np.radians(3.0 * lon)) * np.cos(np.radians(2.0 * lat))
+    field += 0.3 * np.sin(np.radians(7.0 * lat + lon))
+    return field > 0.2
+
+
+@pytest.mark.parametrize('max_distance', [300.0e3, 1500.0e3])
+def test_narrow_band_saturates_full_distance(max_distance):
+    ocean_mask = _ocean_mask()
+    full = BoundaryDistance(
+        ocean_mask, LON, LAT, chunk_size=8
+    ).signed_distance(ocean_mask)
+    capped = BoundaryDistance(
+        ocean_mask, LON, LAT, max_distance=max_distance, chunk_size=8
+    ).signed_distance(ocean_mask)
+
+    assert np.all(np.abs(capped) <= max_distance)
+    assert np.any(np.abs(capped) == max_distance)
+    np.testing.assert_allclose(
+        capped, np.clip(full, -max_distance, max_distance), atol=1e-6
+    )
+    assert np.all((capped > 0.0) == ocean_mask)
+
+
+def test_worker_pool_matches_serial():
+    ocean_mask = _ocean_mask()
+    boundary = BoundaryDistance(
+        ocean_mask, LON, LAT, max_distance=800.0e3, chunk_size=8
+    )
+    np.testing.assert_array_equal(
+        boundary.signed_distance(ocean_mask, workers=2),
+        boundary.signed_distance(ocean_mask, workers=1),
+    )
+
+
+def test_no_coastline_is_infinite():
+    ocean_mask = np.ones((LAT.size, LON.size), dtype=bool)
+    boundary = BoundaryDistance(ocean_mask, LON, LAT, max_distance=100.0e3)
+    assert boundary.tree is None
+    assert np.all(boundary.signed_distance(ocean_mask) == np.inf)
+
+
+def test_cache_reuses_identical_masks():
+    ocean_mask = _ocean_mask()
+    cache = SignedDistanceCache(LON, LAT, max_distance=500.0e3, chunk_size=8)
+
+    first = cache.signed_distance(ocean_mask)
+    second = cache.signed_distance(ocean_mask.copy())
+    other = cache.signed_distance(np.logical_not(ocean_mask))
+
+    assert len(cache._distances) == 2
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_array_equal(other, -first)
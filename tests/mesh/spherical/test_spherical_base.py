@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from polaris.mesh.spherical import (
+    _run_jobs,
+    _write_graph_file,
+    compute_spherical_mesh_density,
+)
+
+
+def test_compute_spherical_mesh_density():
+    lon = np.linspace(-180.0, 180.0, 9)
+    lat = np.linspace(-90.0, 90.0, 5)
+    # twice the minimum cell width in the southern hemisphere
+    cell_width = np.where(lat[:, np.newaxis] < 0.0, 60.0, 30.0) * np.ones(
+        (lat.size, lon.size)
+    )
+    ds_mesh = xr.Dataset()
+    ds_mesh['lonCell'] = ('nCells', np.deg2rad([0.0, 350.0, 90.0]))
+    ds_mesh['latCell'] = ('nCells', np.deg2rad([45.0, 45.0, -90.0]))
+    ds_mesh['meshDensity'] = ('nCells', np.ones(3))
+    ds_mesh.meshDensity.attrs['long_name'] = 'mesh density'
+
+    mesh_density = compute_spherical_mesh_density(
+        ds_mesh=ds_mesh, cell_width=cell_width, lon=lon, lat=lat
+    )
+
+    assert mesh_density.dims == ('nCells',)
+    # longitudes in [0, 2 pi) on the mesh are wrapped to [-pi, pi)
+    np.testing.assert_allclose(mesh_density.values, [1.0, 1.0, 1.0 / 16.0])
+    assert mesh_density.attrs['long_name'] == 'mesh density'
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_run_jobs(tmp_path, workers):
+    paths = [str(tmp_path / name) for name in ['weights', 'vtk', 'graph']]
+    jobs = [(os.mkdir, (path,)) for path in paths]
+    _run_jobs(xr.Dataset(), jobs, workers=workers)
+    assert all(os.path.isdir(path) for path in paths)
+
+    # errors in the jobs are raised
+    with pytest.raises(FileExistsError):
+        _run_jobs(xr.Dataset(), jobs, workers=workers)
+
+
+def test_graph_file_is_made_from_the_shared_mesh(tmp_path):
+    # three cells in a ring; the mesh file itself is never written
+    ds_mesh = xr.Dataset()
+    ds_mesh['nEdgesOnCell'] = ('nCells', np.array([2, 2, 3]))
+    ds_mesh['cellsOnCell'] = (
+        ('nCells', 'maxEdges'),
+        np.array([[2, 3, 0], [1, 3, 0], [1, 2, 0]]),
+    )
+    graph_filename = str(tmp_path / 'graph.info')
+    jobs = [(_write_graph_file, (str(tmp_path / 'mesh.nc'), graph_filename))]
+
+    _run_jobs(ds_mesh, jobs, workers=1)
+
+    with open(graph_filename) as graph:
+        assert graph.read() == '3 3\n2 3 \n1 3 \n1 2 \n'
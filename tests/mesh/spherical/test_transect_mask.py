@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+import xarray as xr
+from scipy.spatial import SphericalVoronoi
+
+from polaris.mesh.spherical.transect_mask import MeshTransectIndex
+
+RADIUS = 6.371e6
+
+
+class _FeatureCollection:
+    def __init__(self, features):
+        self.features = features
+
+
+def test_transect_masks_match_dense_sampling():
+    ds_mesh = _voronoi_mesh(n_cells=400)
+    index = MeshTransectIndex(ds_mesh)
+    geometry = dict(
+        type='LineString', coordinates=[[-30.0, -20.0], [40.0, 35.0]]
+    )
+    fc = _FeatureCollection(
+        [
+            dict(properties=dict(name='line'), geometry=geometry),
+            dict(
+                properties=dict(name='multi'),
+                geometry=dict(
+                    type='MultiLineString',
+                    coordinates=[[[170.0, 0.0], [-170.0, 5.0]]],
+                ),
+            ),
+        ]
+    )
+
+    masks = index.compute_masks(fc, max_spacing=50e3, workers=2)
+    ds_masks = masks.to_dataset()
+
+    assert list(ds_masks.transectNames.values) == ['line', 'multi']
+    assert ds_masks.transectCellMasks.dims == ('nCells', 'nTransects')
+    assert ds_masks.transectEdgeMasks.dims == ('nEdges', 'nTransects')
+
+    # a much denser sampling of the transect visits the same cells, and the
+    # edges between consecutive cells are in the edge mask
+    lon = np.deg2rad(np.linspace(-30.0, 40.0, 2))
+    lat = np.deg2rad(np.linspace(-20.0, 35.0, 2))
+    start, end = (
+        np.array(
+            [np.cos(la) * np.cos(lo), np.cos(la) * np.sin(lo), np.sin(la)]
+        )
+        for lo, la in zip(lon, lat, strict=True)
+    )
+    angle = np.arccos(np.dot(start, end))
+    frac = np.linspace(0.0, 1.0, 200001)[:, np.newaxis]
+    points = (
+        np.sin((1.0 - frac) * angle) * start + np.sin(frac * angle) * end
+    ) / np.sin(angle)
+    cell_xyz = np.stack(
+        [ds_mesh[f'{coord}Cell'].values for coord in 'xyz'], axis=1
+    )
+    nearest = np.argmax(points @ cell_xyz.T, axis=1)
+    cell_mask = ds_masks.transectCellMasks.isel(nTransects=0).values
+    np.testing.assert_array_equal(np.nonzero(cell_mask)[0], np.unique(nearest))
+
+    cells_on_edge = ds_mesh.cellsOnEdge.values - 1
+    edge_mask = ds_masks.transectEdgeMasks.isel(nTransects=0).values
+    changes = np.nonzero(nearest[1:] != nearest[:-1])[0]
+    for change in changes:
+        pair = {nearest[change], nearest[change + 1]}
+        edge = np.nonzero([set(cells) == pair for cells in cells_on_edge])[0]
+        assert edge_mask[edge[0]] == 1
+
+    # every edge in the mask belongs to a cell in the mask
+    for edge in np.nonzero(edge_mask)[0]:
+        assert np.any(cell_mask[cells_on_edge[edge]] == 1)
+
+    with pytest.raises(ValueError, match='Unexpected mask type'):
+        index.compute_masks(fc, mask_types=('vertex',))
+
+
+def test_widen_edges_matches_dense_widening():
+    ds_mesh = _voronoi_mesh(n_cells=400)
+    ds_mesh['latEdge'] = (
+        'nEdges',
+        np.linspace(-1.5, 1.5, ds_mesh.sizes['nEdges']),
+    )
+    index = MeshTransectIndex(ds_mesh)
+    fc = _FeatureCollection(
+        [
+            dict(
+                properties=dict(name=f'transect{lon}'),
+                geometry=dict(
+                    type='LineString',
+                    coordinates=[[lon, -80.0], [lon + 20.0, 80.0]],
+                ),
+            )
+            for lon in [0.0, 90.0, 180.0]
+        ]
+    )
+    masks = index.compute_masks(fc)
+    widened = masks.widen_edges(ds_mesh, latitude_threshold=43.0)
+
+    # the dense algorithm of widen_transect_edge_masks in mpas_tools
+    ds_dense = masks.to_dataset()
+    edge_mask = np.logical_and(
+        np.abs(ds_mesh.latEdge.values[:, np.newaxis]) > np.deg2rad(43.0),
+        ds_dense.transectEdgeMasks.values == 1,
+    )
+    cell_masks = ds_dense.transectCellMasks.values.copy()
+    for local in range(ds_mesh.sizes['maxEdges']):
+        edges_on_cell = ds_mesh.edgesOnCell.values[:, local] - 1
+        mask = np.logical_and(
+            edges_on_cell[:, np.newaxis] >= 0, edge_mask[edges_on_cell]
+        )
+        cell_masks[mask] = 1
+
+    ds_widened = widened.to_dataset()
+    np.testing.assert_array_equal(
+        ds_widened.transectCellMasks.values, cell_masks
+    )
+    assert np.any(cell_masks != ds_dense.transectCellMasks.values)
+    np.testing.assert_array_equal(
+        widened.cell_union(), np.nonzero(cell_masks.sum(axis=1) > 0)[0]
+    )
+
+    with pytest.raises(ValueError, match='Edge masks are required'):
+        index.compute_masks(fc, mask_types=('cell',)).widen_edges(ds_mesh)
+
+
+def _voronoi_mesh(n_cells):
+    rng = np.random.default_rng(seed=1)
+    points = rng.normal(size=(n_cells, 3))
+    points /= np.linalg.norm(points, axis=1)[:, np.newaxis]
+    voronoi = SphericalVoronoi(points)
+    voronoi.sort_vertices_of_regions()
+    max_edges = max(len(region) for region in voronoi.regions)
+
+    edge_ids = dict()
+    cells_on_edge = []
+    vertices_on_edge = []
+    edges_on_cell = np.zeros((n_cells, max_edges), dtype=int)
+    n_edges_on_cell = np.zeros(n_cells, dtype=int)
+    for cell, region in enumerate(voronoi.regions):
+        n_edges_on_cell[cell] = len(region)
+        for index, vertex0 in enumerate(region):
+            vertex1 = region[(index + 1) % len(region)]
+            key = (min(vertex0, vertex1), max(vertex0, vertex1))
+            if key not in edge_ids:
+                edge_ids[key] = len(cells_on_edge)
+                cells_on_edge.append([cell + 1, 0])
+                vertices_on_edge.append([key[0] + 1, key[1] + 1])
+            else:
+                cells_on_edge[edge_ids[key]][1] = cell + 1
+            edges_on_cell[cell, index] = edge_ids[key] + 1
+
+    cells_on_edge = np.array(cells_on_edge)
+    cell_xyz = RADIUS * points
+    vertex_xyz = RADIUS * voronoi.vertices
+    dc_edge = np.linalg.norm(
+        cell_xyz[cells_on_edge[:, 0] - 1] - cell_xyz[cells_on_edge[:, 1] - 1],
+        axis=1,
+    )
+
+    ds_mesh = xr.Dataset()
+    for index, coord in enumerate('xyz'):
+        ds_mesh[f'{coord}Cell'] = ('nCells', cell_xyz[:, index])
+        ds_mesh[f'{coord}Vertex'] = ('nVertices', vertex_xyz[:, index])
+    ds_mesh['nEdgesOnCell'] = ('nCells', n_edges_on_cell)
+    ds_mesh['edgesOnCell'] = (('nCells', 'maxEdges'), edges_on_cell)
+    ds_mesh['cellsOnEdge'] = (('nEdges', 'TWO'), cells_on_edge)
+    ds_mesh['verticesOnEdge'] = (('nEdges', 'TWO'), np.array(vertices_on_edge))
+    ds_mesh['dcEdge'] = ('nEdges', dc_edge)
+    return ds_mesh
@@ -221,3 +221,46 @@ def test_build_effective_ocean_mask_respects_blockages():
     row = LAT.size // 2
     assert not emulated[row, wall_col]
     assert emulated[row, 2]
+
+
+def test_widen_passages_matches_great_circle_distance():
+    # passages near the pole and on both sides of the longitude seam, where
+    # the swath spans many more columns than rows
+    passages = np.zeros((LAT.size, LON.size), dtype=bool)
+    passages[_grid_indices(-178.0, 72.0)] = True
+    passages[_grid_indices(10.0, -84.0)] = True
+    passages[_grid_indices(178.0, 0.0)] = True
+    rng = np.random.default_rng(0)
+    width_km = rng.uniform(200.0, 900.0, passages.shape)
+
+    widened = widen_passages(
+        passages=passages,
+        lat=LAT,
+        lon=LON,
+        resolution=RESOLUTION,
+        width_km=width_km,
+        factor=1.5,
+        high_lat_factor=3.0,
+        latitude_threshold=43.0,
+    )
+
+    lon_rad = np.radians(LON)[np.newaxis, :]
+    lat_rad = np.radians(LAT)[:, np.newaxis]
+    distance_km = np.full(passages.shape, np.inf)
+    for row, col in zip(*np.nonzero(passages), strict=True):
+        cos_angle = np.sin(lat_rad) * np.sin(np.radians(LAT[row])) + np.cos(
+            lat_rad
+        ) * np.cos(np.radians(LAT[row])) * np.cos(
+            lon_rad - np.radians(LON[col])
+        )
+        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+        distance_km = np.minimum(distance_km, angle * 6371.0)
+    factor = np.where(np.abs(LAT) > 43.0, 3.0, 1.5)[:, np.newaxis]
+    expected = distance_km <= 0.5 * factor * width_km
+
+    # allow for the small difference from the constant Earth radius
+    margin = np.abs(distance_km - 0.5 * factor * width_km) > 1.0
+    np.testing.assert_array_equal(widened[margin], expected[margin])
+    # the swath near the pole wraps around in longitude
+    row, _ = _grid_indices(0.0, 72.0)
+    assert widened[row, 0] and widened[row, -1]
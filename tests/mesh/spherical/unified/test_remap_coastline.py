@@ -1,4 +1,5 @@
 import configparser
+import logging
 from types import SimpleNamespace
 
 import numpy as np
@@ -11,16 +12,23 @@ from polaris.mesh.spherical.unified.resolutions import FINEST_RESOLUTION
 from polaris.tasks.mesh.spherical.unified.coastline import (
     get_unified_mesh_coastline_steps,
 )
+from polaris.tasks.mesh.spherical.unified.coastline import (
+    pyramid as pyramid_module,
+)
 from polaris.tasks.mesh.spherical.unified.coastline import (
     remap as remap_module,
 )
 from polaris.tasks.mesh.spherical.unified.coastline import (
     steps as coastline_steps_module,
 )
+from polaris.tasks.mesh.spherical.unified.coastline.pyramid import (
+    PyramidCoastlineStep,
+)
 from polaris.tasks.mesh.spherical.unified.coastline.remap import (
     RemapCoastlineStep,
     _bilinear_zoom,
     _block_average,
+    _build_pyramid,
     _coarsen_coordinate,
     _coastline_remap_dataset,
     _compute_scale,
@@ -236,6 +244,129 @@ def test_coastline_remap_step_writes_all_conventions(tmp_path, monkeypatch):
         assert ds['ocean_mask'].shape == (2, 2)
 
 
+def test_pyramid_cascade_matches_direct_remap():
+    rng = np.random.default_rng(0)
+    fine_mask = (rng.random((16, 16)) < 0.6).astype(np.float64)
+    fine_dist = 1000.0 * rng.standard_normal((16, 16))
+    ds_fine = _make_fine_dataset(fine_mask, fine_dist, n=16)
+
+    levels = _build_pyramid(ds_fine, [4, 2, 8])
+    assert sorted(levels) == [2, 4, 8]
+
+    for scale, level in levels.items():
+        ds_direct = _coastline_remap_dataset(
+            ds_fine=ds_fine,
+            scale=scale,
+            mask_threshold=0.5,
+            convention='bedrock_zero',
+            fine_resolution=1.0,
+            coarse_resolution=float(scale),
+            fine_step_subdir='fine/prepare',
+        )
+        assert level['ocean_fraction'].shape == (16 // scale, 16 // scale)
+        np.testing.assert_array_equal(
+            level['ocean_fraction'] >= 0.5, ds_direct['ocean_mask'].values
+        )
+        np.testing.assert_array_equal(
+            level['distance'], np.abs(ds_direct['signed_distance'].values)
+        )
+
+
+def test_pyramid_step_writes_every_level_from_one_read(tmp_path, monkeypatch):
+    fine_output_filenames = {
+        convention: f'coastline_{convention}.nc' for convention in CONVENTIONS
+    }
+    fine_step = SimpleNamespace(
+        output_filenames=fine_output_filenames,
+        path=str(tmp_path),
+        subdir='fine/prepare',
+    )
+    rng = np.random.default_rng(0)
+    fine_mask = (rng.random((16, 16)) < 0.6).astype(np.float64)
+    fine_dist = 1000.0 * rng.standard_normal((16, 16))
+    for convention in CONVENTIONS:
+        ds = _make_fine_dataset(fine_mask, fine_dist, n=16)
+        ds.to_netcdf(tmp_path / f'fine_{fine_output_filenames[convention]}')
+
+    step = PyramidCoastlineStep(
+        component=Component('mesh'),
+        fine_coastline_step=fine_step,
+        subdir='fine/pyramid',
+    )
+    step.config = _make_remap_config()
+    step.logger = logging.getLogger(__name__)
+    assert step.coarse_resolutions == [0.0625, 0.125, 0.25]
+
+    built = []
+
+    def build_pyramid(ds_fine, scales):
+        built.append(sorted(scales))
+        return _build_pyramid(ds_fine, scales)
+
+    written = {}
+
+    def fake_write(ds, filename):
+        written[filename] = ds
+
+    monkeypatch.setattr(pyramid_module, '_build_pyramid', build_pyramid)
+    monkeypatch.setattr(
+        pyramid_module, '_write_netcdf_with_fill_values', fake_write
+    )
+    monkeypatch.chdir(tmp_path)
+    step.run()
+
+    # one read of each fine file for all of the coarse levels
+    assert built == [[2, 4, 8]] * len(CONVENTIONS)
+    for resolution, filenames in step.output_filenames.items():
+        scale = _compute_scale(FINEST_RESOLUTION, resolution)
+        for convention, filename in filenames.items():
+            ds_direct = _coastline_remap_dataset(
+                ds_fine=_make_fine_dataset(fine_mask, fine_dist, n=16),
+                scale=scale,
+                mask_threshold=0.5,
+                convention=convention,
+                fine_resolution=FINEST_RESOLUTION,
+                coarse_resolution=resolution,
+                fine_step_subdir='fine/prepare',
+            )
+            xr.testing.assert_identical(written[filename], ds_direct)
+
+
+def test_coastline_remap_step_links_pyramid_level():
+    pyramid_step = SimpleNamespace(
+        path='fine/pyramid',
+        output_filenames={
+            0.25: {
+                convention: f'coastline_{convention}_0.25000_degree.nc'
+                for convention in CONVENTIONS
+            }
+        },
+    )
+    step = RemapCoastlineStep(
+        component=Component('mesh'),
+        fine_coastline_step=SimpleNamespace(),
+        coarse_resolution=0.25,
+        subdir='coarse/remap',
+        pyramid_step=pyramid_step,
+    )
+    step.setup()
+
+    targets = {
+        entry['filename']: entry['work_dir_target']
+        for entry in step.input_data
+    }
+    assert targets == {
+        f'coastline_{convention}.nc': (
+            f'fine/pyramid/coastline_{convention}_0.25000_degree.nc'
+        )
+        for convention in CONVENTIONS
+    }
+    assert sorted(step.outputs) == sorted(targets)
+
+    # there is nothing to compute, not even the config is needed
+    step.run()
+
+
 def test_get_unified_mesh_coastline_steps_creates_remap_step_for_coarse(
     monkeypatch,
 ):
@@ -250,6 +381,16 @@ def test_get_unified_mesh_coastline_steps_creates_remap_step_for_coarse(
     )
     assert 'coastline_final' in steps
     assert isinstance(steps['coastline_final'], RemapCoastlineStep)
+    assert isinstance(steps['coastline_pyramid'], PyramidCoastlineStep)
+    assert steps['coastline_final'].pyramid_step is steps['coastline_pyramid']
+
+    # every coarse resolution shares the same pyramid
+    other_steps, _ = get_unified_mesh_coastline_steps(
+        resolution=0.125,
+        include_viz=False,
+    )
+    assert other_steps['coastline_pyramid'] is steps['coastline_pyramid']
+    assert other_steps['coastline_final'] is not steps['coastline_final']
 
 
 def _make_fine_dataset(ocean_mask, signed_distance, n):
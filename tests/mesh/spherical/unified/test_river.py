@@ -10,6 +10,15 @@ from polaris.component import Component
 from polaris.mesh.spherical.unified import (
     UNIFIED_MESH_NAMES,
 )
+from polaris.mesh.spherical.unified.river.columnar import ColumnarLineCache
+from polaris.mesh.spherical.unified.river.distance import haversine_distance
+from polaris.mesh.spherical.unified.river.geojson import read_geojson
+from polaris.mesh.spherical.unified.river.ragged import (
+    clip_lines_by_threshold,
+    densify_lines,
+    pack_lines,
+    split_lines,
+)
 from polaris.tasks.mesh.spherical.unified.river import (
     add_river_tasks,
     build_river_network_dataset,
@@ -19,9 +28,14 @@ from polaris.tasks.mesh.spherical.unified.river import (
 from polaris.tasks.mesh.spherical.unified.river.clip import (
     condition_base_mesh_river_segments,
 )
+from polaris.tasks.mesh.spherical.unified.river.rasterize import (
+    _nearest_grid_indices,
+    _sample_lines,
+)
 from polaris.tasks.mesh.spherical.unified.river.simplify import (
     _convert_hydrorivers_shapefile_to_geojson,
     _unpack_hydrorivers_archive,
+    read_river_segments_from_columnar,
     read_river_segments_from_feature_collection,
     river_segments_to_feature_collection,
 )
@@ -392,6 +406,71 @@ def test_build_river_network_dataset_applies_physical_channel_buffer():
     assert ds_river.river_channel_mask.sel(lat=60.0, lon=2.0) == 0
 
 
+def test_build_river_network_dataset_buffer_matches_brute_force():
+    river_fc = dict(
+        type='FeatureCollection',
+        features=[
+            _line_feature(
+                hyriv_id=10,
+                coords=[(170.0, 68.0), (-170.0, 72.0)],
+                next_down=0,
+                drainage_area=100.0e6,
+                endorheic=0,
+            ),
+            _line_feature(
+                hyriv_id=20,
+                coords=[(0.0, 84.0), (120.0, 86.0)],
+                next_down=0,
+                drainage_area=100.0e6,
+                endorheic=0,
+            ),
+            _line_feature(
+                hyriv_id=30,
+                coords=[(20.0, -5.0), (30.0, 5.0)],
+                next_down=0,
+                drainage_area=100.0e6,
+                endorheic=0,
+            ),
+        ],
+    )
+    resolution = 2.0
+    lat = np.arange(89.0, -90.0, -resolution)
+    lon = np.arange(-179.0, 180.0, resolution)
+    ds_coastline = xr.Dataset(
+        coords=dict(
+            lat=xr.DataArray(lat, dims=('lat',)),
+            lon=xr.DataArray(lon, dims=('lon',)),
+        ),
+    )
+    buffer_m = 500.0e3
+
+    ds_river = build_river_network_dataset(
+        river_feature_collection=river_fc,
+        ds_coastline=ds_coastline,
+        resolution=resolution,
+        channel_subsegment_fraction=0.5,
+        channel_buffer_km=1.0e-3 * buffer_m,
+    )
+
+    segments = read_river_segments_from_feature_collection(river_fc)
+    samples = _sample_lines(
+        segments, resolution=resolution, subsegment_fraction=0.5
+    )
+    lat_2d, lon_2d = np.meshgrid(lat, lon, indexing='ij')
+    distance = haversine_distance(
+        samples[:, 0, np.newaxis, np.newaxis],
+        samples[:, 1, np.newaxis, np.newaxis],
+        lon_2d,
+        lat_2d,
+    ).min(axis=0)
+    expected = (distance <= buffer_m).astype(np.int8)
+    lat_index, lon_index = _nearest_grid_indices(
+        samples[:, 0], samples[:, 1], lon, lat
+    )
+    expected[lat_index, lon_index] = 1
+    np.testing.assert_array_equal(ds_river.river_channel_mask.values, expected)
+
+
 def test_condition_base_mesh_river_segments_clips_then_simplifies():
     ds_coastline = xr.Dataset(
         data_vars=dict(
@@ -670,6 +749,108 @@ def test_convert_hydrorivers_shapefile_to_geojson(tmp_path):
     assert 'LineString' in feature_collection
 
 
+def test_columnar_cache_matches_shapefile_features(tmp_path):
+    base = tmp_path / 'HydroRIVERS_v10'
+    writer = shapefile.Writer(str(base))
+    writer.field('HYRIV_ID', 'N', 10, 0)
+    writer.field('MAIN_RIV', 'N', 10, 0)
+    writer.field('ORD_STRA', 'N', 10, 0)
+    writer.field('UPLAND_SKM', 'F', 18, 3)
+    writer.field('NEXT_DOWN', 'N', 10, 0)
+    writer.field('ENDORHEIC', 'N', 10, 0)
+    writer.line([[[-1.0, 0.0], [0.0, 0.0]]])
+    writer.record(1, 1, 2, 100.0, 0, 0)
+    # filtered by the drainage-area threshold
+    writer.line([[[-1.0, 1.0], [-1.0, 0.0]]])
+    writer.record(2, 1, 1, 1.0, 1, 0)
+    # a multi-part record that merges into one line
+    writer.line([[[-3.0, 0.0], [-2.0, 0.0]], [[-2.0, 0.0], [-1.0, 0.0]]])
+    writer.record(3, 1, 1, 80.0, 1, 0)
+    # a duplicate identifier whose geometry is merged with the first record
+    writer.line([[[0.0, 0.0], [0.5, -0.5]]])
+    writer.record(1, 1, 2, 100.0, 0, 0)
+    writer.close()
+
+    shp_filename = f'{base}.shp'
+    cache_directory = str(tmp_path / 'HydroRIVERS_v10_columnar')
+    cache = ColumnarLineCache.from_shapefile(shp_filename, cache_directory)
+    assert len(cache) == 4
+    assert cache.coords.shape == (10, 2)
+    np.testing.assert_array_equal(
+        cache.field('hyriv_id'), np.array([1, 2, 3, 1])
+    )
+
+    segments = read_river_segments_from_columnar(
+        cache=cache, drainage_area_threshold=10.0e6
+    )
+
+    geojson_filename = tmp_path / 'source_river_network.geojson'
+    _convert_hydrorivers_shapefile_to_geojson(
+        shp_filename=shp_filename, output_filename=str(geojson_filename)
+    )
+    expected = [
+        segment
+        for segment in read_river_segments_from_feature_collection(
+            read_geojson(str(geojson_filename))
+        )
+        if segment.drainage_area >= 10.0e6
+    ]
+    assert [segment.hyriv_id for segment in segments] == [1, 3]
+    for segment, expected_segment in zip(segments, expected, strict=True):
+        assert segment.geometry.equals(expected_segment.geometry)
+        assert segment.drainage_area == expected_segment.drainage_area
+        assert segment.next_down == expected_segment.next_down
+        assert segment.ord_stra == expected_segment.ord_stra
+
+    # the cache is reused as long as the shapefile is unchanged
+    manifest = os.path.join(cache_directory, 'manifest.json')
+    mtime = os.stat(manifest).st_mtime_ns
+    ColumnarLineCache.from_shapefile(shp_filename, cache_directory)
+    assert os.stat(manifest).st_mtime_ns == mtime
+
+
+def test_densify_lines_wraps_and_drops_repeated_points():
+    coords, offsets = pack_lines(
+        [
+            np.array([[179.5, 0.0], [-179.5, 0.0]]),
+            np.array([[10.0, 10.0]]),
+            np.zeros((0, 2)),
+            np.array([[0.0, 0.0], [0.0, 0.0], [0.0, 1.0]]),
+        ]
+    )
+
+    dense_coords, dense_offsets = densify_lines(
+        coords, offsets, max_spacing_deg=0.5
+    )
+    lines = split_lines(dense_coords, dense_offsets)
+
+    np.testing.assert_allclose(
+        lines[0], [[179.5, 0.0], [-180.0, 0.0], [-179.5, 0.0]]
+    )
+    np.testing.assert_array_equal(lines[1], [[10.0, 10.0]])
+    assert lines[2].shape == (0, 2)
+    np.testing.assert_allclose(lines[3], [[0.0, 0.0], [0.0, 0.5], [0.0, 1.0]])
+
+
+def test_clip_lines_by_threshold_splits_at_crossings():
+    coords, offsets = pack_lines(
+        [
+            np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [3.0, 0.0]]),
+            np.array([[0.0, 1.0], [1.0, 1.0]]),
+        ]
+    )
+    values = np.array([-1.0, 1.0, -1.0, -3.0, 1.0, 2.0])
+
+    piece_coords, piece_offsets, piece_line = clip_lines_by_threshold(
+        coords, offsets, values, threshold=0.0
+    )
+    pieces = split_lines(piece_coords, piece_offsets)
+
+    np.testing.assert_array_equal(piece_line, [0, 0])
+    np.testing.assert_allclose(pieces[0], [[0.0, 0.0], [0.5, 0.0]])
+    np.testing.assert_allclose(pieces[1], [[1.5, 0.0], [2.0, 0.0], [3.0, 0.0]])
+
+
 def test_mesh_river_step_factories_use_mesh_subdirs():
     mesh_name = 'u.oi30.lr10'
     unified_steps, _ = get_unified_mesh_river_steps(
@@ -716,13 +897,14 @@ def test_mesh_river_step_factories_reuse_shared_configs():
         unified_steps_first['river_clip'] is unified_steps_second['river_clip']
     )
     assert unified_config_first is unified_config_second
-    # without viz: {combine_topo, coastline_compute, coastline_final,
-    #               river_simplify, river_rasterize, river_clip}
+    # without viz: {combine_topo, coastline_compute, coastline_pyramid,
+    #               coastline_final, river_simplify, river_rasterize,
+    #               river_clip}
     # with viz: those plus river_viz
     print(unified_steps_first.keys())
     print(unified_steps_second.keys())
-    assert len(unified_steps_first) == 6
-    assert len(unified_steps_second) == 7
+    assert len(unified_steps_first) == 7
+    assert len(unified_steps_second) == 8
 
 
 def test_add_river_tasks_registers_mesh_tasks():
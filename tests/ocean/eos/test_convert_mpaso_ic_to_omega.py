@@ -0,0 +1,155 @@
+import importlib.util
+import os
+
+import gsw
+import numpy as np
+import pytest
+import xarray as xr
+
+from polaris.constants import get_constant
+
+
+@pytest.fixture(scope='module')
+def convert_module():
+    """The utility script that converts MPAS-Ocean ICs to Omega."""
+    filename = os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        '..',
+        'utils',
+        'omega',
+        'convert_mpaso_ic_to_omega.py',
+    )
+    spec = importlib.util.spec_from_file_location(
+        'convert_mpaso_ic_to_omega', filename
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _make_ic_ds():
+    """A 2-time, 5-cell, 3-layer dataset with surface pressures and cells
+    whose deeper layers are invalid."""
+    rng = np.random.default_rng(0)
+    shape = (2, 5, 3)
+    temperature = rng.uniform(-1.0, 25.0, shape)
+    salinity = rng.uniform(33.0, 36.0, shape)
+    layer_thickness = rng.uniform(5.0, 200.0, shape)
+    temperature[:, 1, 2] = np.nan
+    salinity[:, 3, 1:] = np.nan
+    surface_dims = ('Time', 'nCells')
+    dims = ('Time', 'nCells', 'nVertLevels')
+    ds = xr.Dataset(
+        data_vars=dict(
+            temperature=(dims, temperature),
+            salinity=(dims, salinity),
+            layerThickness=(dims, layer_thickness),
+            atmosphericPressure=(
+                surface_dims,
+                rng.uniform(0.95e5, 1.05e5, shape[:2]),
+            ),
+            seaIcePressure=(surface_dims, rng.uniform(0.0, 3.0e4, shape[:2])),
+            latCell=(('nCells',), np.deg2rad(np.linspace(-70.0, 70.0, 5))),
+            lonCell=(('nCells',), np.deg2rad(np.linspace(0.0, 300.0, 5))),
+        )
+    )
+    # surface pressures whose sum in dbar depends on whether each is
+    # converted to dbar before they are added
+    ds.atmosphericPressure.values[0, 0] = 96587.12
+    ds.seaIcePressure.values[0, 0] = 28726.92
+    valid = np.isfinite(temperature) & np.isfinite(salinity)
+    valid[:, 4, 2] = False
+    return ds, valid
+
+
+def _convert_level_by_level(ds, valid):
+    """The conversion one level of all cells at a time, as the utility did
+    before it converted blocks of columns."""
+    g = get_constant('standard_acceleration_of_gravity')
+    Pa_per_dbar = 1.0e4
+    lat = np.rad2deg(ds.latCell.values)
+    lon = np.rad2deg(ds.lonCell.values)
+    shape = ds.temperature.shape
+    ct = np.full(shape, np.nan)
+    sa = np.full(shape, np.nan)
+    spec_vol = np.full(shape, np.nan)
+    for time_index in range(shape[0]):
+        p_interface = np.zeros(shape[1])
+        p_interface = p_interface + (
+            ds.atmosphericPressure.values[time_index] / Pa_per_dbar
+        )
+        p_interface = p_interface + (
+            ds.seaIcePressure.values[time_index] / Pa_per_dbar
+        )
+        rho_prev = np.full(shape[1], np.nan)
+        for depth_index in range(shape[2]):
+            pt = ds.temperature.values[time_index, :, depth_index]
+            sp = ds.salinity.values[time_index, :, depth_index]
+            dz = ds.layerThickness.values[time_index, :, depth_index]
+            base_mask = (
+                np.isfinite(pt)
+                & np.isfinite(sp)
+                & np.isfinite(dz)
+                & valid[time_index, :, depth_index]
+            )
+            if depth_index == 0:
+                p_mid_est = p_interface
+            else:
+                p_mid_est = p_interface + 0.5 * rho_prev * g * dz / Pa_per_dbar
+            mask_tmp = base_mask & np.isfinite(p_mid_est)
+            sa_tmp = np.full(sp.shape, np.nan)
+            sa_tmp[mask_tmp] = gsw.SA_from_SP(
+                sp[mask_tmp], p_mid_est[mask_tmp], lon[mask_tmp], lat[mask_tmp]
+            )
+            ct_tmp = np.full(pt.shape, np.nan)
+            mask_ct_tmp = mask_tmp & np.isfinite(sa_tmp)
+            ct_tmp[mask_ct_tmp] = gsw.CT_from_pt(
+                sa_tmp[mask_ct_tmp], pt[mask_ct_tmp]
+            )
+            rho = np.full(sp.shape, np.nan)
+            mask_rho = mask_ct_tmp & np.isfinite(ct_tmp)
+            rho[mask_rho] = gsw.rho(
+                sa_tmp[mask_rho], ct_tmp[mask_rho], p_mid_est[mask_rho]
+            )
+            pressure = np.full(sp.shape, np.nan)
+            pressure[mask_rho] = (
+                p_interface[mask_rho]
+                + 0.5 * rho[mask_rho] * g * dz[mask_rho] / Pa_per_dbar
+            )
+            mask = base_mask & np.isfinite(pressure)
+            sa_level = np.full(sp.shape, np.nan)
+            ct_level = np.full(sp.shape, np.nan)
+            spec_vol_level = np.full(sp.shape, np.nan)
+            sa_level[mask] = gsw.SA_from_SP(
+                sp[mask], pressure[mask], lon[mask], lat[mask]
+            )
+            ct_level[mask] = gsw.CT_from_pt(sa_level[mask], pt[mask])
+            spec_vol_level[mask] = gsw.specvol(
+                sa_level[mask], ct_level[mask], pressure[mask]
+            )
+            ct[time_index, :, depth_index] = ct_level
+            sa[time_index, :, depth_index] = sa_level
+            spec_vol[time_index, :, depth_index] = spec_vol_level
+            p_interface = np.where(
+                mask_rho, p_interface + rho * g * dz / Pa_per_dbar, p_interface
+            )
+            rho_prev = np.where(mask_rho, rho, rho_prev)
+    return ct, sa, spec_vol
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5])
+def test_teos10_conversion_matches_level_by_level(convert_module, chunk_size):
+    ds, valid = _make_ic_ds()
+    ct, sa, spec_vol = _convert_level_by_level(ds, valid)
+
+    spec_vol_chunked = convert_module._convert_teos10_tracers(
+        ds, valid, chunk_size=chunk_size
+    )
+
+    # the block-of-columns conversion is bitwise identical
+    np.testing.assert_array_equal(ds.temperature.values, ct)
+    np.testing.assert_array_equal(ds.salinity.values, sa)
+    np.testing.assert_array_equal(spec_vol_chunked, spec_vol)
+    assert np.isfinite(spec_vol).sum() == 30 - 2 - 2 * 2 - 2
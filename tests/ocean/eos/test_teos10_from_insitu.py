@@ -0,0 +1,67 @@
+import gsw
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from polaris.ocean.eos import teos10_from_insitu
+
+
+def _make_fields():
+    rng = np.random.default_rng(0)
+    depth = np.array([0.0, 500.0, 2000.0])
+    lat = np.linspace(-80.0, 80.0, 9)
+    lon = np.linspace(-170.0, 170.0, 6)
+    shape = (depth.size, lat.size, lon.size)
+    in_situ_temp = rng.uniform(-1.5, 25.0, shape)
+    practical_salinity = rng.uniform(33.0, 36.0, shape)
+    in_situ_temp[0, 2, 3] = np.nan
+    practical_salinity[2, 5, 1] = np.nan
+    return in_situ_temp, practical_salinity, depth, lat, lon
+
+
+def _convert_by_level(in_situ_temp, practical_salinity, depth, lat, lon):
+    """Convert one depth level at a time, as a reference"""
+    conservative_temp = np.full(in_situ_temp.shape, np.nan)
+    absolute_salinity = np.full(in_situ_temp.shape, np.nan)
+    lon_2d, lat_2d = np.meshgrid(lon, lat)
+    for index in range(depth.size):
+        pressure = gsw.p_from_z(-depth[index], lat_2d)
+        temp = in_situ_temp[index]
+        salin = practical_salinity[index]
+        mask = np.isfinite(temp) & np.isfinite(salin)
+        sa = gsw.SA_from_SP(
+            salin[mask], pressure[mask], lon_2d[mask], lat_2d[mask]
+        )
+        absolute_salinity[index][mask] = sa
+        conservative_temp[index][mask] = gsw.CT_from_t(
+            sa, temp[mask], pressure[mask]
+        )
+    return conservative_temp, absolute_salinity
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_teos10_from_insitu_matches_level_by_level(workers):
+    fields = _make_fields()
+    expected_ct, expected_sa = _convert_by_level(*fields)
+
+    # bands of two rows, so there are several bands for the workers
+    conservative_temp, absolute_salinity = teos10_from_insitu(
+        *fields, workers=workers, max_points=36
+    )
+
+    assert_array_equal(conservative_temp, expected_ct)
+    assert_array_equal(absolute_salinity, expected_sa)
+    assert np.isnan(conservative_temp[0, 2, 3])
+    assert np.isnan(absolute_salinity[2, 5, 1])
+
+
+def test_teos10_from_insitu_checks_shapes():
+    in_situ_temp, practical_salinity, depth, lat, lon = _make_fields()
+    with pytest.raises(ValueError, match='same shape'):
+        teos10_from_insitu(
+            in_situ_temp, practical_salinity[1:], depth, lat, lon
+        )
+    with pytest.raises(ValueError, match='must match'):
+        teos10_from_insitu(
+            in_situ_temp, practical_salinity, depth, lat[1:], lon
+        )
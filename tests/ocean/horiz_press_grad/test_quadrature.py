@@ -0,0 +1,129 @@
+"""
+Unit tests for the batched quadrature primitives used by ReferenceColumn.
+"""
+
+import numpy as np
+import pytest
+
+from polaris.config import PolarisConfigParser
+from polaris.tasks.ocean.horiz_press_grad.quadrature import (
+    adaptive_simpson,
+    composite_rule,
+    fixed_quadrature,
+)
+from polaris.tasks.ocean.horiz_press_grad.reference import ReferenceColumn
+
+_HPG_PKG = 'polaris.tasks.ocean.horiz_press_grad'
+
+
+def _make_config(**overrides: str) -> PolarisConfigParser:
+    """Load default horiz_press_grad config and apply string overrides."""
+    config = PolarisConfigParser()
+    config.add_from_package(_HPG_PKG, 'horiz_press_grad.cfg')
+    for key, value in overrides.items():
+        config.set('horiz_press_grad', key, value)
+    return config
+
+
+@pytest.mark.parametrize(
+    'method, nsub, degree',
+    [
+        ('midpoint', 3, 1),
+        ('trapezoid', 3, 1),
+        ('simpson', 4, 3),
+        ('gauss2', 2, 3),
+        ('gauss4', 1, 7),
+    ],
+)
+def test_fixed_quadrature_exact_for_polynomials(method, nsub, degree):
+    """Each rule integrates polynomials up to its degree exactly on every
+    interval of a batch."""
+    a = np.array([[-3.0, 0.0], [1.0, 2.5]])
+    b = np.array([[-1.0, 0.5], [4.0, 2.5]])
+
+    integral = fixed_quadrature(lambda x: x**degree, a, b, nsub, method)
+    expected = (b ** (degree + 1) - a ** (degree + 1)) / (degree + 1)
+
+    assert integral.shape == a.shape
+    np.testing.assert_allclose(integral, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_composite_rule_weights_sum_to_one():
+    for method in ['midpoint', 'trapezoid', 'simpson', 'gauss2', 'gauss4']:
+        nodes, weights = composite_rule(method, 4)
+        assert np.all((nodes >= 0.0) & (nodes <= 1.0))
+        np.testing.assert_allclose(np.sum(weights), 1.0, rtol=1e-14)
+
+
+def test_fixed_quadrature_calls_integrand_once():
+    calls = []
+
+    def integrand(x):
+        calls.append(x.shape)
+        return np.cos(x)
+
+    fixed_quadrature(
+        integrand, np.zeros(10), np.arange(1.0, 11.0), 4, 'gauss4'
+    )
+    assert calls == [(160,)]
+
+
+def test_adaptive_simpson_matches_exact():
+    """Vectorized refinement reaches the requested tolerance on intervals
+    that need very different refinement depths."""
+    a = np.array([0.0, 0.0, 1.0])
+    b = np.array([np.pi, 20.0 * np.pi + 0.5, 1.0])
+
+    integral = adaptive_simpson(
+        np.sin, a, b, rel_tol=1e-12, abs_tol=1e-14, max_depth=30
+    )
+    expected = np.cos(a) - np.cos(b)
+
+    np.testing.assert_allclose(integral, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_adaptive_reference_matches_gauss():
+    """The adaptive-Simpson reference agrees with the default Gauss rule."""
+    overrides = dict(
+        temperature_grad='[0.5, 0.4, 0.3, 0.2, 0.1]',
+        salinity_grad='[0.02, 0.02, 0.01, 0.01, 0.005]',
+    )
+    ref_gauss = ReferenceColumn(_make_config(**overrides), x_sign=1.0)
+    ref_adapt = ReferenceColumn(
+        _make_config(
+            reference_quadrature_method='adaptive_simpson', **overrides
+        ),
+        x_sign=1.0,
+    )
+
+    z_test = np.linspace(-450.0, 0.0, 10)
+    np.testing.assert_allclose(
+        ref_adapt.hpga(z_test), ref_gauss.hpga(z_test), rtol=1e-6
+    )
+
+
+def test_layer_mean_batched_columns():
+    """Batched columns give the same layer means as one column at a time."""
+    config = _make_config(
+        temperature_grad='[0.5, 0.4, 0.3, 0.2, 0.1]',
+        salinity_grad='[0.02, 0.015, 0.01, 0.005, 0.0]',
+    )
+    ref = ReferenceColumn(config, x_sign=1.0)
+
+    z_b = config['horiz_press_grad'].getfloat('z_tilde_bot_mid')
+    interfaces = np.stack(
+        [
+            np.linspace(0.0, z_b, 7),
+            np.linspace(0.0, 0.8 * z_b, 7),
+            np.linspace(-5.0, 0.5 * z_b, 7),
+        ]
+    )
+
+    batched = ref.layer_mean_hpga(interfaces)
+    assert batched.shape == (3, 6)
+    for column in range(interfaces.shape[0]):
+        np.testing.assert_allclose(
+            batched[column],
+            ref.layer_mean_hpga(interfaces[column]),
+            rtol=1e-4,
+        )
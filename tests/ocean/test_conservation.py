@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from polaris.ocean.conservation import (
+    compute_conservation_totals,
+    compute_total_energy,
+    compute_total_mass,
+    compute_total_salt,
+    compute_total_tracer,
+)
+
+
+def _datasets(ncells=37, nlevels=5, ntimes=3):
+    rng = np.random.default_rng(seed=0)
+    ds_mesh = xr.Dataset(
+        {'areaCell': ('nCells', rng.uniform(1.0e6, 2.0e6, ncells))}
+    )
+    dims = ('Time', 'nCells', 'nVertLevels')
+    shape = (ntimes, ncells, nlevels)
+    layer_thickness = rng.uniform(1.0, 20.0, shape)
+    # invalid levels below the bathymetry
+    layer_thickness[:, ::4, -1] = np.nan
+    ds = xr.Dataset(
+        {
+            'layerThickness': (dims, layer_thickness),
+            'temperature': (dims, rng.uniform(-2.0, 30.0, shape)),
+            'salinity': (dims, rng.uniform(30.0, 37.0, shape)),
+            'tracer1': (dims, rng.uniform(0.0, 1.0, shape)),
+        }
+    )
+    return ds_mesh, ds
+
+
+@pytest.mark.parametrize('chunk_size', [5, 100])
+def test_fused_totals_match_individual_totals(chunk_size):
+    ds_mesh, ds = _datasets()
+    time_indices = (0, -1)
+    totals = compute_conservation_totals(
+        ds_mesh,
+        ds,
+        mass=True,
+        energy=True,
+        tracer_names=['salinity', 'tracer1', 'salinity'],
+        time_indices=time_indices,
+        chunk_size=chunk_size,
+    )
+    assert sorted(totals) == ['energy', 'mass', 'salinity', 'tracer1']
+
+    for index, time in enumerate(time_indices):
+        ds_time = ds.isel(Time=time)
+        expected = {
+            'mass': compute_total_mass(ds_mesh, ds_time),
+            'energy': compute_total_energy(ds_mesh, ds_time),
+            'salinity': compute_total_salt(ds_mesh, ds_time),
+            'tracer1': compute_total_tracer(ds_mesh, ds_time, 'tracer1'),
+        }
+        for name, value in expected.items():
+            np.testing.assert_allclose(
+                totals[name][index], value.values, rtol=1e-12
+            )
@@ -522,6 +522,50 @@ def test_geom_height_round_trips_from_written_bottom_depth(
     )
 
 
+@pytest.mark.parametrize('partial_cell_type', [None, 'partial'])
+def test_active_set_matches_full_iteration(partial_cell_type):
+    """With ``pstar_active_set`` enabled, later iterations recompute only the
+    columns that are still changing, and the result matches iterating on
+    every column.
+    """
+
+    class _RecordingStep(_ConstantTracerPStarStep):
+        def init_tracers(self, ds):
+            self.column_counts.append(ds.sizes['nCells'])
+            return super().init_tracers(ds)
+
+    class _ActiveSetStep(_RecordingStep):
+        pstar_active_set = True
+
+    config = _make_config(iter_count=20, partial_cell_type=partial_cell_type)
+    # a nonlinear equation of state so columns converge at different rates
+    config.set('ocean', 'eos_type', 'teos-10')
+
+    ncells = 50
+    geom_z_bot = xr.DataArray(
+        -np.linspace(100.0, 590.0, ncells), dims=['nCells']
+    )
+    results = []
+    for cls in (_RecordingStep, _ActiveSetStep):
+        step = _make_step(cls, config)
+        step.column_counts = []
+        ds = step.run_pstar_init(_make_ds_mesh(ncells), geom_z_bot)
+        results.append((ds, step.column_counts))
+
+    (ds_full, full_counts), (ds_active, active_counts) = results
+    assert all(count == ncells for count in full_counts)
+    assert active_counts[0] == ncells
+    assert sum(active_counts) < sum(full_counts)
+    for var in ds_full.data_vars:
+        np.testing.assert_allclose(
+            ds_active[var].values,
+            ds_full[var].values,
+            rtol=1e-10,
+            atol=1e-9,
+            err_msg=var,
+        )
+
+
 def test_snap_stagnation_message_and_early_exit(caplog):
     """When _build_pstar_coord_ds always returns the same BottomPressure
     (simulating cell snapping) the stagnation check should fire and the loop
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from polaris.benchmark import (
+    Benchmark,
+    append_history,
+    compare_to_baseline,
+    read_history,
+    run_benchmarks,
+)
+
+
+def test_run_benchmarks_times_kernel_in_temp_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def setup(size):
+        # inputs are written to a temporary directory, not the current one
+        with open('input.txt', 'w') as handle:
+            handle.write('x' * size)
+        work_dir = os.getcwd()
+
+        def kernel():
+            with open(os.path.join(work_dir, 'input.txt')) as handle:
+                calls.append(len(handle.read()))
+
+        return kernel
+
+    benchmarks = {
+        'toy': Benchmark(
+            name='toy',
+            description='Read a file',
+            sizes={'small': 1, 'medium': 10, 'large': 100},
+            setup=setup,
+        )
+    }
+    results = run_benchmarks(size='medium', repeat=4, benchmarks=benchmarks)
+
+    assert calls == [10, 10, 10, 10]
+    assert not os.path.exists(tmp_path / 'input.txt')
+    assert len(results) == 1
+    result = results[0]
+    assert result['benchmark'] == 'toy'
+    assert result['size'] == 'medium'
+    assert result['problem_size'] == 10
+    assert len(result['times']) == 4
+    assert result['best'] == min(result['times'])
+
+    with pytest.raises(ValueError, match='Unknown benchmark'):
+        run_benchmarks(names=['missing'], benchmarks=benchmarks)
+
+
+def test_synthetic_flood_fill_benchmarks():
+    results = run_benchmarks(
+        names=['coastline_flood_fill', 'seeded_flood_fill'], repeat=1
+    )
+    assert [result['benchmark'] for result in results] == [
+        'coastline_flood_fill',
+        'seeded_flood_fill',
+    ]
+    assert all(result['best'] > 0.0 for result in results)
+
+
+def test_history_and_baseline_comparison(tmp_path):
+    history = str(tmp_path / 'history.jsonl')
+    old = [
+        dict(benchmark='a', size='small', best=1.0),
+        dict(benchmark='b', size='small', best=1.0),
+    ]
+    newer = [dict(benchmark='a', size='small', best=2.0)]
+    append_history(old, history)
+    append_history(newer, history)
+    baseline = read_history(history)
+    assert baseline == old + newer
+
+    results = [
+        dict(benchmark='a', size='small', best=2.2),
+        dict(benchmark='b', size='small', best=1.5),
+        dict(benchmark='b', size='large', best=10.0),
+    ]
+    comparisons = compare_to_baseline(results, baseline, tolerance=0.2)
+
+    # the most recent baseline is used and results without one are skipped
+    assert [
+        (comparison['benchmark'], comparison['baseline'])
+        for comparison in comparisons
+    ] == [('a', 2.0), ('b', 1.0)]
+    assert comparisons[0]['regression'] is False
+    assert comparisons[1]['regression'] is True
+    assert comparisons[1]['ratio'] == pytest.approx(1.5)
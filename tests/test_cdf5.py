@@ -0,0 +1,54 @@
+import netCDF4
+import numpy as np
+import pytest
+import xarray as xr
+
+from polaris.cdf5 import write_cdf5
+
+
+@pytest.mark.parametrize('n_record_vars', [1, 2])
+def test_write_cdf5_round_trip(tmp_path, n_record_vars):
+    filename = str(tmp_path / 'out.nc')
+    ds = xr.Dataset()
+    ds.attrs['title'] = 'a mesh'
+    ds.attrs['sphere_radius'] = 6371229.0
+    ds.attrs['on_a_sphere'] = np.int32(1)
+    ds['xCell'] = ('nCells', np.linspace(0.0, 1.0, 7))
+    ds.xCell.attrs['units'] = 'm'
+    ds['fraction'] = (('nCells', 'nLevels'), np.arange(21.0).reshape(7, 3))
+    ds['fraction'][2, 1] = np.nan
+    ds['cellsOnCell'] = (('nCells', 'TWO'), np.arange(14).reshape(7, 2))
+    ds['mask'] = ('nCells', np.arange(7) % 2 == 0)
+    ds['small'] = ('nOdd', np.array([1, 2, 3], dtype=np.int8))
+    ds['density'] = ('nCells', np.ones(7, dtype=np.float32))
+    ds['xtime'] = ('Time', np.array([b'0001-01-01', b'0001-01-02']))
+    if n_record_vars == 2:
+        ds['ssh'] = (('Time', 'nCells'), np.arange(14.0).reshape(2, 7))
+
+    # small blocks so variables are written in several blocks
+    write_cdf5(ds, filename, unlimited_dims=['Time'], block_size=16)
+
+    with netCDF4.Dataset(filename) as nc:
+        assert nc.data_model == 'NETCDF3_64BIT_DATA'
+        assert nc.dimensions['Time'].isunlimited()
+        assert nc.variables['cellsOnCell'].dtype == np.int32
+        assert (
+            nc.variables['fraction']._FillValue
+            == (netCDF4.default_fillvals['f8'])
+        )
+        assert nc.getncattr('title') == 'a mesh'
+
+    with xr.open_dataset(filename) as ds_read:
+        ds_read.load()
+    assert ds_read.attrs['sphere_radius'] == 6371229.0
+    assert ds_read.xCell.attrs['units'] == 'm'
+    np.testing.assert_array_equal(ds_read.fraction.values, ds.fraction.values)
+    np.testing.assert_array_equal(
+        ds_read.cellsOnCell.values, ds.cellsOnCell.values
+    )
+    np.testing.assert_array_equal(ds_read.mask.values, [1, 0, 1, 0, 1, 0, 1])
+    np.testing.assert_array_equal(ds_read.small.values, [1, 2, 3])
+    np.testing.assert_array_equal(ds_read.density.values, np.ones(7))
+    assert list(ds_read.xtime.values) == [b'0001-01-01', b'0001-01-02']
+    if n_record_vars == 2:
+        np.testing.assert_array_equal(ds_read.ssh.values, ds.ssh.values)
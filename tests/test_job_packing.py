@@ -0,0 +1,320 @@
+import logging
+import os
+import pickle
+import shlex
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from polaris.job.packing import (
+    NodePool,
+    PackedStep,
+    StepLauncher,
+    collect_steps,
+    read_tasks,
+    run_packed_steps,
+)
+from polaris.parallel import PACKED_HOST_ARGS, add_packed_host_args
+from polaris.run import pack
+
+
+def _make_step(tmp_path, name, ntasks, dependencies=(), gpus_per_task=0):
+    work_dir = tmp_path / name
+    work_dir.mkdir()
+    step = SimpleNamespace(
+        name=name,
+        path=f'test/{name}',
+        work_dir=str(work_dir),
+        cpus_per_task=1,
+        ntasks=ntasks,
+        min_cpus_per_task=1,
+        min_tasks=1,
+        gpus_per_task=gpus_per_task,
+        min_gpus_per_task=0,
+    )
+    packed = PackedStep(step)
+    packed.dependencies = [
+        str(tmp_path / dependency) for dependency in dependencies
+    ]
+    return packed
+
+
+class FakeProcess:
+    """Finish after being polled a given number of times."""
+
+    def __init__(self, step, polls, events, fail):
+        self.step = step
+        self.polls = polls
+        self.events = events
+        self.fail = fail
+
+    def poll(self):
+        self.polls -= 1
+        if self.polls > 0:
+            return None
+        self.events.append(('finish', self.step.name))
+        if self.fail:
+            return 1
+        with open(
+            os.path.join(self.step.work_dir, 'polaris_step_complete.log'), 'w'
+        ) as handle:
+            handle.write('done')
+        return 0
+
+
+def _run(steps, pool, polls=None, failing=(), launcher=None):
+    events = []
+    peak = dict(cores=0)
+    total_cores = pool.nodes * pool.cores_per_node
+
+    def launch(step, allocation):
+        events.append(('launch', step.name))
+        if launcher is not None:
+            events.append(('command', launcher.get_command(step, allocation)))
+        in_use = total_cores - int(pool.free_cores.sum())
+        peak['cores'] = max(peak['cores'], in_use)
+        count = 1 if polls is None else polls.get(step.name, 1)
+        return FakeProcess(step, count, events, step.name in failing)
+
+    steps = {step.work_dir: step for step in steps}
+    run_packed_steps(
+        steps,
+        pool,
+        logging.getLogger('test_job_packing'),
+        launch=launch,
+        poll_interval=0.0,
+    )
+    return events, peak['cores']
+
+
+def test_node_pool_best_fit_and_whole_nodes():
+    pool = NodePool(nodes=3, cores_per_node=4)
+    first = pool.allocate(3)
+    # the 1-core step goes on the busy node, keeping two nodes free
+    second = pool.allocate(1)
+    assert first[0][0] == second[0][0]
+    # a step larger than a node takes whole, idle nodes
+    large = pool.allocate(6)
+    assert len(large) == 2
+    assert pool.allocate(1) is None
+    pool.release(second)
+    assert pool.allocate(1) == second
+
+
+def test_steps_are_packed_concurrently(tmp_path):
+    steps = [_make_step(tmp_path, f'step{index}', 2) for index in range(4)]
+    pool = NodePool(nodes=2, cores_per_node=4)
+    events, peak_cores = _run(steps, pool)
+    # all four steps fit at once
+    assert [event for event, _ in events[:4]] == ['launch'] * 4
+    assert peak_cores == 8
+    assert all(step.status == 'succeeded' for step in steps)
+
+
+def test_dependencies_are_respected(tmp_path):
+    init = _make_step(tmp_path, 'init', 1)
+    forward = _make_step(tmp_path, 'forward', 4, dependencies=['init'])
+    viz = _make_step(tmp_path, 'viz', 1, dependencies=['forward'])
+    other = _make_step(tmp_path, 'other', 1)
+    pool = NodePool(nodes=1, cores_per_node=4)
+    events, peak_cores = _run(
+        [init, forward, viz, other], pool, polls={'init': 3}
+    )
+    assert peak_cores <= 4
+    assert events.index(('finish', 'init')) < events.index(
+        ('launch', 'forward')
+    )
+    assert events.index(('finish', 'forward')) < events.index(
+        ('launch', 'viz')
+    )
+    # an independent step runs alongside the first one
+    assert events.index(('launch', 'other')) < events.index(('finish', 'init'))
+
+
+def test_failure_skips_dependents(tmp_path):
+    init = _make_step(tmp_path, 'init', 1)
+    forward = _make_step(tmp_path, 'forward', 1, dependencies=['init'])
+    other = _make_step(tmp_path, 'other', 1)
+    pool = NodePool(nodes=1, cores_per_node=4)
+    _run([init, forward, other], pool, failing=['init'])
+    assert init.status == 'failed'
+    assert forward.status == 'skipped'
+    assert other.status == 'succeeded'
+
+
+def test_requests_are_constrained_to_the_pool(tmp_path):
+    step = _make_step(tmp_path, 'big', 64, gpus_per_task=1)
+    pool = NodePool(nodes=2, cores_per_node=16)
+    pool.fit_request(step)
+    assert step.cores == 32
+    assert step.gpus == 0
+
+    step = _make_step(tmp_path, 'too_big', 64)
+    step.min_cores = 48
+    with pytest.raises(ValueError, match='needs at least 48 cores'):
+        pool.fit_request(step)
+
+
+def test_slurm_steps_are_launched_on_their_nodes(tmp_path):
+    small = _make_step(tmp_path, 'small', 3)
+    large = _make_step(tmp_path, 'large', 8)
+    pool = NodePool(nodes=3, cores_per_node=4)
+    launcher = StepLauncher(system='slurm', hosts=['nid1', 'nid2', 'nid3'])
+    events, _ = _run([small, large], pool, launcher=launcher)
+    commands = [event[1] for event in events if event[0] == 'command']
+
+    # the large step is launched first, on the first two idle nodes
+    args, env = commands[0]
+    assert args[:7] == [
+        'srun',
+        '--nodes=1',
+        '--ntasks=1',
+        '--cpus-per-task=4',
+        '--nodelist=nid1',
+        '--exact',
+        '--overlap',
+    ]
+    assert args[7:] == ['polaris', 'serial', '--step_is_subprocess']
+    assert shlex.split(env[PACKED_HOST_ARGS]) == ['--nodelist=nid1,nid2']
+
+    # the small step gets the remaining node and only the cores it needs
+    args, env = commands[1]
+    assert '--nodelist=nid3' in args
+    assert '--cpus-per-task=3' in args
+    assert shlex.split(env[PACKED_HOST_ARGS]) == ['--nodelist=nid3']
+
+
+def test_pbs_and_single_node_launch_commands(tmp_path):
+    step = _make_step(tmp_path, 'step', 2)
+    launcher = StepLauncher(system='pbs', hosts=['x1000', 'x1001'])
+    args, env = launcher.get_command(step, [(1, 2, 0)])
+    assert args[:5] == ['mpiexec', '-n', '1', '--hosts', 'x1001']
+    assert shlex.split(env[PACKED_HOST_ARGS]) == ['--hosts', 'x1001']
+
+    launcher = StepLauncher(system='single_node', hosts=None)
+    args, env = launcher.get_command(step, [(0, 2, 0)])
+    assert args == ['polaris', 'serial', '--step_is_subprocess']
+    assert PACKED_HOST_ARGS not in env
+
+    with pytest.raises(ValueError, match='host names'):
+        StepLauncher(system='slurm', hosts=None)
+
+
+def test_host_args_are_added_to_parallel_commands():
+    args = ['srun', '-c', '1', '-N', '2', '-n', '64', 'ocean_model']
+    env = {PACKED_HOST_ARGS: '--nodelist=nid1,nid2'}
+    assert add_packed_host_args(args, env) == [
+        'srun',
+        '--nodelist=nid1,nid2',
+        '-c',
+        '1',
+        '-N',
+        '2',
+        '-n',
+        '64',
+        'ocean_model',
+    ]
+    assert add_packed_host_args(args, {}) == args
+
+
+def _setup_tasks(tmp_path):
+    """Pickle a suite of two tasks sharing a step, as polaris setup would."""
+
+    def make_step(name, dependencies=None, cached=False):
+        work_dir = tmp_path / 'ocean' / name
+        work_dir.mkdir(parents=True)
+        return SimpleNamespace(
+            name=name,
+            path=f'ocean/{name}',
+            work_dir=str(work_dir),
+            cpus_per_task=1,
+            ntasks=4,
+            min_cpus_per_task=1,
+            min_tasks=1,
+            gpus_per_task=0,
+            min_gpus_per_task=0,
+            cached=cached,
+            dependencies=dict() if dependencies is None else dependencies,
+        )
+
+    mesh = make_step('mesh')
+    cached_mesh = make_step('cached_mesh', cached=True)
+    init = make_step('init', dict(mesh=mesh, cached_mesh=cached_mesh))
+    forward = make_step('forward', dict(init=init))
+    done = make_step('done')
+    with open(os.path.join(done.work_dir, 'polaris_step_complete.log'), 'w'):
+        pass
+
+    component = SimpleNamespace(name='ocean')
+    tasks = dict()
+    for name, steps in [('first', [init, forward, done]), ('second', [init])]:
+        config_filepath = f'ocean/{name}.cfg'
+        step_names = ' '.join(step.name for step in steps)
+        with open(tmp_path / config_filepath, 'w') as handle:
+            handle.write(f'[{name}]\nsteps_to_run = {step_names}\n')
+        tasks[f'ocean/{name}'] = SimpleNamespace(
+            name=name,
+            path=f'ocean/{name}',
+            base_work_dir=str(tmp_path),
+            component=component,
+            config=SimpleNamespace(filepath=config_filepath),
+            steps={step.name: step for step in steps},
+        )
+    with open(tmp_path / 'ocean.cfg', 'w') as handle:
+        handle.write('[parallel]\nsystem = single_node\n')
+    with open(tmp_path / 'suite.pickle', 'wb') as handle:
+        pickle.dump(dict(name='suite', tasks=tasks), handle)
+    return tasks
+
+
+def test_read_tasks_and_collect_steps(tmp_path):
+    _setup_tasks(tmp_path)
+    tasks = read_tasks(str(tmp_path))
+    assert list(tasks) == ['ocean/first', 'ocean/second']
+    assert read_tasks(str(tmp_path / 'suite.pickle')).keys() == tasks.keys()
+
+    steps = collect_steps(tasks)
+    # dependencies come first; cached and complete steps are left out
+    assert [step.name for step in steps.values()] == [
+        'mesh',
+        'init',
+        'forward',
+    ]
+    init = steps[str(tmp_path / 'ocean' / 'init')]
+    assert init.dependencies == [str(tmp_path / 'ocean' / 'mesh')]
+    assert init.tasks == ['ocean/first', 'ocean/second']
+    assert init.cores == 4
+
+
+def test_read_tasks_needs_a_single_suite(tmp_path):
+    _setup_tasks(tmp_path)
+    with open(tmp_path / 'other.pickle', 'wb') as handle:
+        pickle.dump(dict(name='other', tasks=dict()), handle)
+    with pytest.raises(ValueError, match='Expected one task or suite'):
+        read_tasks(str(tmp_path))
+
+
+def test_pack_writes_a_job_script(tmp_path, monkeypatch):
+    _setup_tasks(tmp_path)
+    written = dict()
+
+    def write_job_script(**kwargs):
+        written.update(kwargs)
+
+    monkeypatch.setattr(pack, 'write_job_script', write_job_script)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        sys,
+        'argv',
+        ['polaris', 'pack', 'suite.pickle', '--nodes', '4', '--job_script'],
+    )
+    pack.main()
+
+    assert written['nodes'] == 4
+    assert written['script_filename'] == str(tmp_path / 'job_script.pack.sh')
+    suite_filename = tmp_path / 'suite.pickle'
+    assert (
+        f'polaris pack {suite_filename} --nodes 4 --poll_interval 5'
+        in written['run_command']
+    )
@@ -0,0 +1,77 @@
+import logging
+import os
+
+import pytest
+
+import polaris.partition
+from polaris.partition import get_file_hash, partition_graph
+
+GRAPH = '3 2\n2 \n1 3 \n2 \n'
+
+
+@pytest.fixture
+def fake_partitioner(monkeypatch):
+    calls = []
+
+    def check_call(args, logger):
+        executable, graph_filename, ntasks = args
+        calls.append((graph_filename, int(ntasks)))
+        with open(f'{graph_filename}.part.{ntasks}', 'w') as part_file:
+            part_file.write(f'partition into {ntasks}\n')
+
+    monkeypatch.setattr(polaris.partition, 'check_call', check_call)
+    return calls
+
+
+def test_partition_graph_reuses_cached_partitions(
+    tmp_path, monkeypatch, fake_partitioner
+):
+    cache_dir = str(tmp_path / 'partition_cache')
+    logger = logging.getLogger('test_partition')
+    for step in ['full_run', 'restart_run', 'other']:
+        step_dir = tmp_path / step
+        step_dir.mkdir()
+        (step_dir / 'graph.info').write_text(GRAPH)
+    (tmp_path / 'other' / 'graph.info').write_text(GRAPH.replace('3 2', '3 3'))
+
+    for step, ntasks in [
+        ('full_run', 4),
+        ('restart_run', 4),
+        ('restart_run', 8),
+        ('other', 4),
+    ]:
+        monkeypatch.chdir(tmp_path / step)
+        partition_graph('graph.info', ntasks, 'gpmetis', logger, cache_dir)
+        with open(f'graph.info.part.{ntasks}') as part_file:
+            assert part_file.read() == f'partition into {ntasks}\n'
+
+    # the same graph for the same number of tasks is only partitioned once
+    assert len(fake_partitioner) == 3
+    partitions = os.listdir(os.path.join(cache_dir, 'partitions', 'gpmetis'))
+    assert len(partitions) == 3
+    assert not any(name.endswith('.tmp') for name in partitions)
+
+
+def test_partition_graph_without_cache(
+    tmp_path, monkeypatch, fake_partitioner
+):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'graph.info').write_text(GRAPH)
+    logger = logging.getLogger('test_partition')
+    partition_graph('graph.info', 4, 'gpmetis', logger)
+    partition_graph('graph.info', 4, 'gpmetis', logger)
+    assert len(fake_partitioner) == 2
+
+
+def test_file_hash_follows_contents(tmp_path):
+    filename = tmp_path / 'mesh.nc'
+    filename.write_bytes(b'mesh one')
+    link = tmp_path / 'link.nc'
+    link.symlink_to(filename)
+    first = get_file_hash(str(filename))
+    assert get_file_hash(str(link)) == first
+
+    filename.write_bytes(b'mesh two')
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert get_file_hash(str(link)) != first
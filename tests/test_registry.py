@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+import polaris.registry
+
+REGISTRY = """
+<registry model="mpas" core="ocean">
+  <streams>
+    <stream name="mesh" type="none" immutable="true"/>
+    <stream name="output" type="output"/>
+  </streams>
+  <var_struct name="state" time_levs="2">
+    <var name="layerThickness" type="real"/>
+    <var_array name="tracers" type="real">
+      <var name="temperature" array_group="activeTracers"/>
+    </var_array>
+  </var_struct>
+  <var_struct name="diagnostics" time_levs="1">
+    <var_array name="layerThickness" type="real"/>
+    <var name="velocityZonal" type="real"/>
+  </var_struct>
+</registry>
+"""
+
+
+@pytest.fixture
+def registry_filename(tmp_path):
+    filename = tmp_path / 'processed_registry.xml'
+    filename.write_text(REGISTRY)
+    polaris.registry.clear_cache()
+    yield str(filename)
+    polaris.registry.clear_cache()
+
+
+def test_registry_tags(registry_filename):
+    registry = polaris.registry.read(registry_filename)
+
+    assert registry.get_stream_tag('mesh') == 'immutable_stream'
+    assert registry.get_stream_tag('output') == 'stream'
+    assert registry.get_stream_tag('restart') == 'stream'
+
+    assert registry.get_var_tag('mesh') == 'stream'
+    assert registry.get_var_tag('state') == 'var_struct'
+    assert registry.get_var_tag('tracers') == 'var_array'
+    assert registry.get_var_tag('temperature') == 'var'
+    assert registry.get_var_tag('velocityZonal') == 'var'
+    # the first definition in the registry wins
+    assert registry.get_var_tag('layerThickness') == 'var'
+
+    with pytest.raises(ValueError, match='Could not find salinity'):
+        registry.get_var_tag('salinity')
+
+
+def test_registry_cache_invalidated_by_changes(registry_filename):
+    first = polaris.registry.read(registry_filename)
+    assert polaris.registry.read(registry_filename) is first
+
+    with open(registry_filename, 'w') as reg_file:
+        reg_file.write(REGISTRY.replace('velocityZonal', 'velocityMerid'))
+    stat = os.stat(registry_filename)
+    os.utime(registry_filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    second = polaris.registry.read(registry_filename)
+    assert second is not first
+    assert second.get_var_tag('velocityMerid') == 'var'
+    with pytest.raises(ValueError):
+        second.get_var_tag('velocityZonal')
@@ -0,0 +1,114 @@
+import os
+import pickle
+import threading
+
+import pytest
+
+from polaris.setup import _setup_tasks_concurrently, setup_task
+
+SETUP_LOG: list = []
+SETUP_LOCK = threading.Lock()
+
+
+class FakeStep:
+    """The attributes and methods of a step that setup relies on."""
+
+    def __init__(self, path, dependencies=()):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.dependencies = {dep.name: dep for dep in dependencies}
+        self.setup_complete = False
+        self.work_dir = ''
+        self.base_work_dir = ''
+
+    def setup(self):
+        with SETUP_LOCK:
+            SETUP_LOG.append(self.path)
+
+    def process_inputs_and_outputs(self):
+        with open(os.path.join(self.work_dir, 'inputs'), 'w') as handle:
+            handle.write(self.path)
+
+
+class FakeTask:
+    def __init__(self, path, steps, step_symlinks=None):
+        self.path = path
+        self.steps = {step.name: step for step in steps}
+        self.step_symlinks = dict() if step_symlinks is None else step_symlinks
+
+
+def _make_tasks():
+    mesh = FakeStep('shared/mesh')
+    init_a = FakeStep('task_a/init', [mesh])
+    forward_a = FakeStep('task_a/forward', [init_a])
+    init_b = FakeStep('task_b/init', [mesh])
+    viz_b = FakeStep('task_b/viz', [init_b, forward_a])
+    tasks = {
+        'task_a': FakeTask(
+            'task_a', [mesh, init_a, forward_a], step_symlinks={'mesh': 'mesh'}
+        ),
+        'task_b': FakeTask(
+            'task_b', [mesh, init_b, viz_b], step_symlinks={'mesh': 'mesh'}
+        ),
+    }
+    return tasks
+
+
+def _setup(tmp_path, concurrent):
+    SETUP_LOG.clear()
+    tasks = _make_tasks()
+    cached_steps = {path: [] for path in tasks}
+    work_dir = str(tmp_path)
+    if concurrent:
+        _setup_tasks_concurrently(
+            tasks, None, work_dir, None, cached_steps, workers=4
+        )
+    else:
+        for path, task in tasks.items():
+            setup_task(path, task, None, work_dir, None, cached_steps[path])
+    return tasks, list(SETUP_LOG)
+
+
+def _files(tmp_path):
+    files = set()
+    for root, _, filenames in os.walk(tmp_path):
+        for filename in filenames:
+            files.add(os.path.relpath(os.path.join(root, filename), tmp_path))
+    return files
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_setup_respects_order_and_shares_steps(tmp_path, concurrent):
+    tasks, setup_log = _setup(tmp_path, concurrent)
+
+    # each step, including the shared mesh step, is set up once
+    assert sorted(setup_log) == sorted(
+        [
+            'shared/mesh',
+            'task_a/init',
+            'task_a/forward',
+            'task_b/init',
+            'task_b/viz',
+        ]
+    )
+    for task in tasks.values():
+        for step in task.steps.values():
+            assert step.setup_complete
+            for dependency in step.dependencies.values():
+                assert setup_log.index(dependency.path) < setup_log.index(
+                    step.path
+                )
+
+    assert os.path.islink(tmp_path / 'task_b' / 'mesh')
+    with open(tmp_path / 'task_b' / 'task.pickle', 'rb') as handle:
+        suite = pickle.load(handle)
+    viz = suite['tasks']['task_b'].steps['viz']
+    assert viz.dependencies['forward'].work_dir == str(
+        tmp_path / 'task_a' / 'forward'
+    )
+
+
+def test_concurrent_setup_matches_serial(tmp_path):
+    _setup(tmp_path / 'serial', concurrent=False)
+    _setup(tmp_path / 'concurrent', concurrent=True)
+    assert _files(tmp_path / 'serial') == _files(tmp_path / 'concurrent')
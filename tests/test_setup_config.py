@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from polaris.run import clear_config_cache, setup_config
+
+CONFIG = """
+[paths]
+component_path = /path/to/component
+mesh_path = meshes
+
+[my_task]
+steps_to_run = init forward
+resolution = 10.0
+dt = ${resolution}
+"""
+
+
+@pytest.fixture
+def base_work_dir(tmp_path):
+    (tmp_path / 'ocean').mkdir()
+    (tmp_path / 'ocean' / 'my_task.cfg').write_text(CONFIG)
+    clear_config_cache()
+    yield str(tmp_path)
+    clear_config_cache()
+
+
+def test_setup_config_returns_independent_copies(base_work_dir):
+    first = setup_config(base_work_dir, 'ocean/my_task.cfg')
+    assert first.filepath == 'ocean/my_task.cfg'
+    assert first.getfloat('my_task', 'dt') == 10.0
+
+    first.set('my_task', 'resolution', '20.0')
+    assert first.getfloat('my_task', 'dt') == 20.0
+
+    second = setup_config(base_work_dir, 'ocean/my_task.cfg')
+    assert second is not first
+    assert second.getfloat('my_task', 'dt') == 10.0
+    assert second.get('my_task', 'steps_to_run') == 'init forward'
+
+
+def test_setup_config_rereads_changed_file(base_work_dir):
+    first = setup_config(base_work_dir, 'ocean/my_task.cfg')
+    assert first.getfloat('my_task', 'resolution') == 10.0
+
+    config_filename = os.path.join(base_work_dir, 'ocean', 'my_task.cfg')
+    with open(config_filename, 'w') as config_file:
+        config_file.write(CONFIG.replace('10.0', '30.0'))
+    stat = os.stat(config_filename)
+    os.utime(config_filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    second = setup_config(base_work_dir, 'ocean/my_task.cfg')
+    assert second.getfloat('my_task', 'resolution') == 30.0
+
+
+def test_setup_config_combines_each_copy_in_its_directory(
+    base_work_dir, monkeypatch
+):
+    first_dir = os.path.join(base_work_dir, 'first')
+    second_dir = os.path.join(base_work_dir, 'second')
+    os.makedirs(first_dir)
+    os.makedirs(second_dir)
+
+    monkeypatch.chdir(first_dir)
+    first = setup_config(base_work_dir, 'ocean/my_task.cfg')
+    assert first.get('paths', 'mesh_path') == os.path.join(first_dir, 'meshes')
+
+    # the cached config is only parsed, so relative paths are made absolute
+    # relative to the directory where each copy is used
+    monkeypatch.chdir(second_dir)
+    second = setup_config(base_work_dir, 'ocean/my_task.cfg')
+    assert second.get('paths', 'mesh_path') == os.path.join(
+        second_dir, 'meshes'
+    )
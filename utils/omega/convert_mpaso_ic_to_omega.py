@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
 import argparse
+import multiprocessing
+import os
 from pathlib import Path
 
 import gsw
+import netCDF4
 import numpy as np
 import xarray as xr
 from mpas_tools.io import write_netcdf
@@ -12,6 +15,13 @@ from scipy.interpolate import CubicSpline
 
 from polaris.constants import get_constant
 
+# the number of cells whose tracers are converted at a time, which bounds the
+# memory used for the conversion
+DEFAULT_CHUNK_SIZE = 100000
+
+# 1 dbar = 10000 Pa
+PA_PER_DBAR = 1.0e4
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -24,14 +34,23 @@ def parse_args():
     parser.add_argument(
         '--input-file',
         required=True,
-        help='Input MPAS-Ocean initial condition file.',
+        nargs='+',
+        help='Input MPAS-Ocean initial condition file(s).',
     )
-    parser.add_argument(
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument(
         '--output-file',
-        required=True,
         help=(
             'Base output initial condition file with Omega names. The script '
-            'appends .teos10eos.nc or .lineareos.nc based on --eos-type.'
+            'appends .teos10eos.nc or .lineareos.nc based on --eos-type. '
+            'Only for a single input file.'
+        ),
+    )
+    output.add_argument(
+        '--output-dir',
+        help=(
+            'Directory for the output initial condition files, each named '
+            'after its input file with the suffix for --eos-type.'
         ),
     )
     parser.add_argument(
@@ -59,7 +78,78 @@ def parse_args():
             'generated for planar meshes (i.e., on_a_sphere = 0).'
         ),
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help=(
+            'Number of input files to convert at the same time, each in its '
+            'own process.'
+        ),
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=(
+            'Number of cells whose tracers are converted at a time, and the '
+            'number of cells in each chunk of a NETCDF4 output file.'
+        ),
+    )
+    parser.add_argument(
+        '--format',
+        choices=['NETCDF3_64BIT_DATA', 'NETCDF4'],
+        default='NETCDF3_64BIT_DATA',
+        help=(
+            'Format of the output files. NETCDF4 files are compressed and '
+            'chunked by time slice and blocks of cells with full columns.'
+        ),
+    )
+    args = parser.parse_args()
+    if args.output_file is not None and len(args.input_file) > 1:
+        parser.error('--output-dir is required for more than one input file')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    return args
+
+
+def convert_files_to_omega(
+    input_files,
+    output_files,
+    eos_type,
+    include_wind_stress=True,
+    visualization=False,
+    workers=1,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    file_format='NETCDF3_64BIT_DATA',
+):
+    jobs = [
+        dict(
+            input_file=input_file,
+            output_file=output_file,
+            eos_type=eos_type,
+            include_wind_stress=include_wind_stress,
+            visualization=visualization,
+            chunk_size=chunk_size,
+            file_format=file_format,
+        )
+        for input_file, output_file in zip(
+            input_files, output_files, strict=True
+        )
+    ]
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            convert_to_omega(**job)
+        return
+
+    # a fresh process for each file returns its memory once it is converted
+    with multiprocessing.Pool(
+        processes=min(workers, len(jobs)), maxtasksperchild=1
+    ) as pool:
+        for _ in pool.imap_unordered(_convert_job, jobs):
+            pass
 
 
 def convert_to_omega(
@@ -68,16 +158,47 @@ def convert_to_omega(
     eos_type,
     include_wind_stress=True,
     visualization=False,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    file_format='NETCDF3_64BIT_DATA',
 ):
-    with xr.open_dataset(input_file, decode_times=False) as ds_in:
-        ds_input = ds_in.load()
+    # variables are read from the file as they are needed, rather than all
+    # at once, and aren't kept in memory once they have been used
+    with xr.open_dataset(
+        input_file, decode_times=False, cache=False
+    ) as ds_input:
+        _convert_dataset(
+            ds_input,
+            input_file,
+            output_file,
+            eos_type,
+            include_wind_stress,
+            visualization,
+            chunk_size,
+            file_format,
+        )
+
+
+def _convert_job(job):
+    convert_to_omega(**job)
+
 
+def _convert_dataset(
+    ds_input,
+    input_file,
+    output_file,
+    eos_type,
+    include_wind_stress,
+    visualization,
+    chunk_size,
+    file_format,
+):
     output_file = _append_eos_suffix(output_file, eos_type)
 
     input_path = Path(input_file)
     zero_velocity_mpas_file = str(input_path.with_suffix('')) + '.mpas.nc'
 
-    ds_mpas_zero = ds_input.copy(deep=True)
+    # shallow copies are enough since every variable that changes is replaced
+    ds_mpas_zero = ds_input.copy(deep=False)
     mpas_velocity_fields = _zero_velocity_fields(ds_mpas_zero)
     if ds_mpas_zero.attrs['sphere_radius'] > 0.0:
         _rescale_sphere_radius(ds_mpas_zero)
@@ -89,11 +210,8 @@ def convert_to_omega(
         )
     _keep_selected_global_attrs(ds_mpas_zero)
 
-    write_netcdf(
-        ds_mpas_zero,
-        zero_velocity_mpas_file,
-        format='NETCDF3_64BIT_DATA',
-        engine='netcdf4',
+    _write_dataset(
+        ds_mpas_zero, zero_velocity_mpas_file, file_format, chunk_size
     )
     print(f'Wrote {zero_velocity_mpas_file}')
     print(
@@ -117,7 +235,7 @@ def convert_to_omega(
 
     # Keep the original input dataset untouched; all Omega transforms
     # happen on a separate working copy.
-    ds_omega = ds_input.copy(deep=True)
+    ds_omega = ds_input.copy(deep=False)
 
     # Create valid mask with shape (Time, nCells, nVertLevels)
     layer_thickness_valid = ds_omega['layerThickness'].values > 0.0
@@ -131,7 +249,7 @@ def convert_to_omega(
         valid = layer_thickness_valid
 
     if eos_type == 'teos10':
-        spec_vol = _convert_teos10_tracers(ds_omega, valid)
+        spec_vol = _convert_teos10_tracers(ds_omega, valid, chunk_size)
     elif eos_type == 'linear':
         spec_vol = _compute_linear_spec_vol(ds_omega, valid)
 
@@ -157,9 +275,7 @@ def convert_to_omega(
     ds_omega = _rename_resting_thickness_for_omega(ds_omega)
     _keep_selected_global_attrs(ds_omega)
 
-    write_netcdf(
-        ds_omega, output_file, format='NETCDF3_64BIT_DATA', engine='netcdf4'
-    )
+    _write_dataset(ds_omega, output_file, file_format, chunk_size)
 
     print(f'Wrote {output_file}')
     if eos_type == 'teos10':
@@ -195,6 +311,51 @@ def convert_to_omega(
         print('Saved temperature/salinity percent-difference visualizations')
 
 
+def _write_dataset(ds, filename, file_format, chunk_size):
+    if file_format == 'NETCDF3_64BIT_DATA':
+        write_netcdf(ds, filename, format=file_format, engine='netcdf4')
+        return
+
+    # Omega reads whole columns for a block of cells, one time at a time, so
+    # chunks hold one time slice, chunk_size cells and all vertical levels
+    horizontal_dims = {
+        'nCells',
+        'nEdges',
+        'nVertices',
+        'NCells',
+        'NEdges',
+        'NVertices',
+    }
+    encoding = {}
+    for var_name in list(ds.data_vars.keys()) + list(ds.coords.keys()):
+        var = ds[var_name]
+        ds[var_name].attrs.pop('_FillValue', None)
+        if not np.issubdtype(var.dtype, np.number):
+            encoding[var_name] = {'_FillValue': None}
+            continue
+        fill_value = None
+        if np.issubdtype(var.dtype, np.floating) and np.any(np.isnan(var)):
+            fill_value = netCDF4.default_fillvals[var.dtype.str[1:]]
+        var_encoding = {'_FillValue': fill_value}
+        if var.ndim > 0:
+            chunksizes = []
+            for dim, size in zip(var.dims, var.shape, strict=True):
+                if dim in ['Time', 'time']:
+                    chunksizes.append(1)
+                elif dim in horizontal_dims:
+                    chunksizes.append(min(size, chunk_size))
+                else:
+                    chunksizes.append(size)
+            var_encoding.update(
+                zlib=True,
+                complevel=1,
+                shuffle=True,
+                chunksizes=tuple(chunksizes),
+            )
+        encoding[var_name] = var_encoding
+    ds.to_netcdf(filename, format=file_format, encoding=encoding)
+
+
 def _to_degrees(angle):
     finite = np.isfinite(angle)
     if not np.any(finite):
@@ -219,7 +380,7 @@ def _append_eos_suffix(output_file, eos_type):
     return f'{output_file}{eos_suffix}'
 
 
-def _convert_teos10_tracers(ds, valid):
+def _convert_teos10_tracers(ds, valid, chunk_size=DEFAULT_CHUNK_SIZE):
     required_vars = [
         'temperature',
         'salinity',
@@ -241,135 +402,38 @@ def _convert_teos10_tracers(ds, valid):
     absolute_salinity = np.full(salinity.shape, np.nan)
     spec_vol = np.full(ds['layerThickness'].shape, np.nan)
 
-    g = get_constant('standard_acceleration_of_gravity')
-    Pa_per_dbar = 1.0e4  # 1 dbar = 10000 Pa
-
+    # Columns are independent, so the conversion reads and converts blocks
+    # of whole columns, one block at a time
+    n_cells = ds.sizes['nCells']
     for time_index in range(ds.sizes['Time']):
-        # Pressure at the top interface of the current layer (dbar),
-        # accumulated downward via hydrostatic integration.
-        # Start with surface pressure from atmospheric and sea ice
-        # contributions if available, otherwise zero.
-        p_interface = np.zeros(ds.sizes['nCells'])
-        if 'atmosphericPressure' in ds:
-            p_interface = p_interface + (
-                ds['atmosphericPressure'].isel(Time=time_index).values
-                / Pa_per_dbar
-            )
-        if 'seaIcePressure' in ds:
-            p_interface = p_interface + (
-                ds['seaIcePressure'].isel(Time=time_index).values / Pa_per_dbar
-            )
-        rho_prev = np.full(ds.sizes['nCells'], np.nan)
-
-        for depth_index in range(ds.sizes['nVertLevels']):
-            # Extract the current layer's potential temperature,
-            # practical salinity, and thickness
-            potential_temperature = temperature.isel(
-                Time=time_index, nVertLevels=depth_index
-            ).values
-            practical_salinity = salinity.isel(
-                Time=time_index, nVertLevels=depth_index
-            ).values
-            dz = (
-                ds['layerThickness']
-                .isel(Time=time_index, nVertLevels=depth_index)
-                .values
-            )
-
-            # Create a mask for valid data points where all required inputs
-            # are finite
-            base_mask = (
-                np.isfinite(potential_temperature)
-                & np.isfinite(practical_salinity)
-                & np.isfinite(dz)
-                & np.isfinite(lat)
-                & np.isfinite(lon)
-                & valid[time_index, :, depth_index]
-            )
-
-            # Initialize output slices with NaNs
-            conservative_slice = np.full(potential_temperature.shape, np.nan)
-            absolute_slice = np.full(practical_salinity.shape, np.nan)
-            spec_vol_slice = np.full(practical_salinity.shape, np.nan)
-
-            # First-pass mid-layer pressure using previous layer's density
-            # For the top layer, use the interface pressure directly since
-            # we have no layer above to integrate through
-            if depth_index == 0:
-                p_mid_est = p_interface
-            else:
-                p_mid_est = p_interface + 0.5 * rho_prev * g * dz / Pa_per_dbar
-
-            # Compute SA and CT to update the mid-layer pressure
-            sa_tmp = np.full(practical_salinity.shape, np.nan)
-            mask_tmp = base_mask & np.isfinite(p_mid_est)
-            sa_tmp[mask_tmp] = gsw.SA_from_SP(
-                practical_salinity[mask_tmp],
-                p_mid_est[mask_tmp],
-                lon[mask_tmp],
-                lat[mask_tmp],
-            )
-            conservative_tmp = np.full(potential_temperature.shape, np.nan)
-            mask_ct_tmp = mask_tmp & np.isfinite(sa_tmp)
-            conservative_tmp[mask_ct_tmp] = gsw.CT_from_pt(
-                sa_tmp[mask_ct_tmp],
-                potential_temperature[mask_ct_tmp],
-            )
-
-            # Compute in-situ density using the estimated mid-layer pressure
-            rho = np.full(practical_salinity.shape, np.nan)
-            mask_rho = mask_ct_tmp & np.isfinite(conservative_tmp)
-            rho[mask_rho] = gsw.rho(
-                sa_tmp[mask_rho],
-                conservative_tmp[mask_rho],
-                p_mid_est[mask_rho],
-            )
-
-            # Updated mid-layer pressure from hydrostatic integration
-            pressure_dbar = np.full(practical_salinity.shape, np.nan)
-            pressure_dbar[mask_rho] = (
-                p_interface[mask_rho]
-                + 0.5 * rho[mask_rho] * g * dz[mask_rho] / Pa_per_dbar
-            )
-
-            # Final mask for valid points where we can compute absolute
-            # salinity and specific volume
-            mask = base_mask & np.isfinite(pressure_dbar)
-
-            # Compute final SA, CT, and specific volume for valid points using
-            # the updated mid-layer pressure.
-            absolute_slice[mask] = gsw.SA_from_SP(
-                practical_salinity[mask],
-                pressure_dbar[mask],
-                lon[mask],
-                lat[mask],
-            )
-            conservative_slice[mask] = gsw.CT_from_pt(
-                absolute_slice[mask],
-                potential_temperature[mask],
-            )
-            spec_vol_slice[mask] = gsw.specvol(
-                absolute_slice[mask],
-                conservative_slice[mask],
-                pressure_dbar[mask],
-            )
-
-            # Store the converted tracers and specific volume back into the
-            # output arrays
-            conservative_temperature[time_index, :, depth_index] = (
-                conservative_slice
-            )
-            absolute_salinity[time_index, :, depth_index] = absolute_slice
-            spec_vol[time_index, :, depth_index] = spec_vol_slice
-
-            # Advance interface pressure to the bottom of this layer
-            # and carry rho forward as the first-pass for the next layer
-            p_interface = np.where(
-                mask_rho,
-                p_interface + rho * g * dz / Pa_per_dbar,
-                p_interface,
+        for cell_start in range(0, n_cells, chunk_size):
+            cells = slice(cell_start, min(cell_start + chunk_size, n_cells))
+            selection = dict(Time=time_index, nCells=cells)
+
+            # Start with surface pressure (dbar) from atmospheric and sea ice
+            # contributions if available, otherwise zero.  Each contribution
+            # is converted to dbar before they are added, as in the
+            # level-by-level conversion, so results are bitwise identical.
+            p_surface = np.zeros(cells.stop - cells.start)
+            for name in ['atmosphericPressure', 'seaIcePressure']:
+                if name in ds:
+                    p_surface = p_surface + (
+                        ds[name].isel(selection).values / PA_PER_DBAR
+                    )
+
+            (
+                conservative_temperature[time_index, cells, :],
+                absolute_salinity[time_index, cells, :],
+                spec_vol[time_index, cells, :],
+            ) = _convert_teos10_columns(
+                potential_temperature=temperature.isel(selection).values,
+                practical_salinity=salinity.isel(selection).values,
+                layer_thickness=ds['layerThickness'].isel(selection).values,
+                valid=valid[time_index, cells, :],
+                p_surface=p_surface,
+                lon=lon[cells],
+                lat=lat[cells],
             )
-            rho_prev = np.where(mask_rho, rho, rho_prev)
 
     ds['temperature'] = xr.DataArray(
         conservative_temperature,
@@ -392,6 +456,123 @@ def _convert_teos10_tracers(ds, valid):
     return spec_vol
 
 
+def _convert_teos10_columns(
+    potential_temperature,
+    practical_salinity,
+    layer_thickness,
+    valid,
+    p_surface,
+    lon,
+    lat,
+):
+    """
+    Convert tracers in a block of columns with dimensions (nCells,
+    nVertLevels), given the surface pressure of each column in dbar,
+    returning conservative temperature, absolute salinity and specific volume
+    """
+    g = get_constant('standard_acceleration_of_gravity')
+
+    conservative_temperature = np.full(potential_temperature.shape, np.nan)
+    absolute_salinity = np.full(practical_salinity.shape, np.nan)
+    spec_vol = np.full(layer_thickness.shape, np.nan)
+
+    # Pressure at the top interface of the current layer (dbar),
+    # accumulated downward via hydrostatic integration.
+    p_interface = p_surface
+    rho_prev = np.full(p_interface.shape, np.nan)
+
+    for depth_index in range(layer_thickness.shape[1]):
+        # Extract the current layer's potential temperature,
+        # practical salinity, and thickness
+        pt = potential_temperature[:, depth_index]
+        sp = practical_salinity[:, depth_index]
+        dz = layer_thickness[:, depth_index]
+
+        # Create a mask for valid data points where all required inputs
+        # are finite
+        base_mask = (
+            np.isfinite(pt)
+            & np.isfinite(sp)
+            & np.isfinite(dz)
+            & np.isfinite(lat)
+            & np.isfinite(lon)
+            & valid[:, depth_index]
+        )
+
+        # First-pass mid-layer pressure using previous layer's density
+        # For the top layer, use the interface pressure directly since
+        # we have no layer above to integrate through
+        if depth_index == 0:
+            p_mid_est = p_interface
+        else:
+            p_mid_est = p_interface + 0.5 * rho_prev * g * dz / PA_PER_DBAR
+
+        # Compute SA and CT to update the mid-layer pressure
+        sa_tmp = np.full(sp.shape, np.nan)
+        mask_tmp = base_mask & np.isfinite(p_mid_est)
+        sa_tmp[mask_tmp] = gsw.SA_from_SP(
+            sp[mask_tmp],
+            p_mid_est[mask_tmp],
+            lon[mask_tmp],
+            lat[mask_tmp],
+        )
+        conservative_tmp = np.full(pt.shape, np.nan)
+        mask_ct_tmp = mask_tmp & np.isfinite(sa_tmp)
+        conservative_tmp[mask_ct_tmp] = gsw.CT_from_pt(
+            sa_tmp[mask_ct_tmp],
+            pt[mask_ct_tmp],
+        )
+
+        # Compute in-situ density using the estimated mid-layer pressure
+        rho = np.full(sp.shape, np.nan)
+        mask_rho = mask_ct_tmp & np.isfinite(conservative_tmp)
+        rho[mask_rho] = gsw.rho(
+            sa_tmp[mask_rho],
+            conservative_tmp[mask_rho],
+            p_mid_est[mask_rho],
+        )
+
+        # Updated mid-layer pressure from hydrostatic integration
+        pressure_dbar = np.full(sp.shape, np.nan)
+        pressure_dbar[mask_rho] = (
+            p_interface[mask_rho]
+            + 0.5 * rho[mask_rho] * g * dz[mask_rho] / PA_PER_DBAR
+        )
+
+        # Final mask for valid points where we can compute absolute
+        # salinity and specific volume
+        mask = base_mask & np.isfinite(pressure_dbar)
+
+        # Compute final SA, CT, and specific volume for valid points using
+        # the updated mid-layer pressure.
+        # views into the output arrays for this layer
+        sa = absolute_salinity[:, depth_index]
+        ct = conservative_temperature[:, depth_index]
+        sa[mask] = gsw.SA_from_SP(
+            sp[mask],
+            pressure_dbar[mask],
+            lon[mask],
+            lat[mask],
+        )
+        ct[mask] = gsw.CT_from_pt(sa[mask], pt[mask])
+        spec_vol[mask, depth_index] = gsw.specvol(
+            sa[mask],
+            ct[mask],
+            pressure_dbar[mask],
+        )
+
+        # Advance interface pressure to the bottom of this layer
+        # and carry rho forward as the first-pass for the next layer
+        p_interface = np.where(
+            mask_rho,
+            p_interface + rho * g * dz / PA_PER_DBAR,
+            p_interface,
+        )
+        rho_prev = np.where(mask_rho, rho, rho_prev)
+
+    return conservative_temperature, absolute_salinity, spec_vol
+
+
 def _add_pseudo_thickness(ds, valid, spec_vol):
     rho_sw = get_constant('seawater_density_reference')
     pseudo_thickness = ds['layerThickness'].values / (rho_sw * spec_vol)
@@ -892,12 +1073,23 @@ def _save_percent_difference_visualizations(
 
 def main():
     args = parse_args()
-    convert_to_omega(
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+        output_files = [
+            os.path.join(args.output_dir, os.path.basename(input_file))
+            for input_file in args.input_file
+        ]
+    else:
+        output_files = [args.output_file]
+    convert_files_to_omega(
         args.input_file,
-        args.output_file,
+        output_files,
         args.eos_type,
         args.include_wind_stress,
         args.visualization,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        file_format=args.format,
     )
 
 